@@ -0,0 +1,271 @@
+# -*- coding: utf-8 -*-
+"""Bulk PDF report generation for batch audits on a pre-warmed process pool.
+
+ReportLab (and the Matplotlib fallback) are CPU-bound and serialised by the
+GIL, so one PDF per URL is rendered in worker processes instead of threads.
+Every worker imports the report builder once in the pool initializer (by
+default ``core.pdf_report``, which does not load the Streamlit app), which
+registers the Japanese PDF font and loads ReportLab before the first task;
+after that a task only unpickles one analysis result and returns the PDF
+bytes.  ``start()`` returns once the workers answer (or fails fast when the
+builder cannot be imported).  At most ``window`` tasks are in flight, so
+memory stays bounded however many results are fed in.
+
+Finished reports are written as they arrive, either into a zip archive
+(path or binary stream) or into a directory, followed by a
+``manifest.json`` listing every URL with its file name, size, render time
+and error.  Command line::
+
+    python -m core.bulk_reports results.jsonl --out reports.zip --workers 4
+    python -m core.bulk_reports --from-cache .aio_cache/pages --out reports/
+"""
+import argparse
+import hashlib
+import importlib
+import json
+import multiprocessing
+import os
+import queue
+import re
+import sys
+import time
+import zipfile
+from dataclasses import asdict, dataclass
+from typing import Callable, Dict, Iterable, Iterator, List, Optional, Sequence, Tuple
+
+from .page_cache import PageCache
+from .report_jobs import analysis_key
+
+DEFAULT_REPORT_BUILDER = "core.pdf_report:build_pdf_report"
+MANIFEST_NAME = "manifest.json"
+
+STARTUP_TIMEOUT = 120  # ワーカーの初期化（アプリの import とフォント登録）を待つ上限（秒）
+
+_build: Optional[Callable[[Dict], bytes]] = None
+_build_error = ""
+
+
+def resolve_builder(path: str) -> Callable[[Dict], bytes]:
+    """Resolve ``"module:attr.attr"`` to the report builder callable."""
+    module_name, _, attr_path = path.partition(":")
+    target = importlib.import_module(module_name)
+    for attr in attr_path.split("."):
+        target = getattr(target, attr)
+    return target
+
+
+def _init_worker(builder: str) -> None:
+    """Pool initializer: import the builder (fonts, ReportLab) once per worker process."""
+    global _build, _build_error
+    try:
+        _build = resolve_builder(builder)
+    except BaseException as e:  # import 先の sys.exit() も含め、ワーカーを終了させない
+        # 初期化で例外を出すとプールがワーカーを再起動し続けるため、各タスクのエラーとして返す
+        _build_error = f"cannot load report builder {builder}: {type(e).__name__}: {e}"
+
+
+def _ready(_) -> str:
+    return _build_error
+
+
+@dataclass
+class ReportRecord:
+    """Manifest entry for one report."""
+    index: int
+    url: str
+    analysis_id: str
+    filename: str
+    status: str  # ok / error
+    bytes: int = 0
+    seconds: float = 0.0
+    error: str = ""
+
+
+def report_filename(url: str, analysis_id: str = "") -> str:
+    """Readable, collision-free PDF name for ``url``."""
+    slug = re.sub(r"^https?://", "", url or "report")
+    slug = re.sub(r"[^0-9A-Za-z._-]+", "_", slug).strip("_.")[:80] or "report"
+    digest = hashlib.sha1(f"{url}|{analysis_id}".encode("utf-8")).hexdigest()[:8]
+    return f"{slug}-{digest}.pdf"
+
+
+def _render(task: Tuple[int, Dict]) -> Tuple[ReportRecord, Optional[bytes]]:
+    index, results = task
+    url = str(results.get("url", ""))
+    key = analysis_key(results)
+    record = ReportRecord(index, url, key, report_filename(url, key), "ok")
+    start = time.perf_counter()
+    try:
+        if _build is None:
+            raise RuntimeError(_build_error or "report builder not initialized")
+        data = _build(results)
+        record.bytes = len(data)
+    except Exception as e:
+        data = None
+        record.status, record.error = "error", f"{type(e).__name__}: {e}"
+    record.seconds = round(time.perf_counter() - start, 4)
+    return record, data
+
+
+class BulkReportGenerator:
+    """Process pool rendering analysis results to PDFs; use as a context manager."""
+
+    def __init__(self, workers: Optional[int] = None, builder: str = DEFAULT_REPORT_BUILDER,
+                 window: Optional[int] = None):
+        self.workers = workers or os.cpu_count() or 1
+        self.builder = builder
+        self.window = window or self.workers * 2
+        self._pool = None
+
+    def start(self) -> "BulkReportGenerator":
+        if self._pool is None:
+            # spawn: スレッドを持つ親プロセス（Streamlit など）からでも安全に起動できる
+            context = multiprocessing.get_context("spawn")
+            pool = context.Pool(self.workers, initializer=_init_worker, initargs=(self.builder,))
+            try:
+                errors = pool.map_async(_ready, range(self.workers), chunksize=1).get(STARTUP_TIMEOUT)
+            except multiprocessing.TimeoutError:
+                pool.terminate()
+                raise RuntimeError(f"report workers did not start within {STARTUP_TIMEOUT}s")
+            if any(errors):
+                pool.terminate()
+                raise RuntimeError(next(e for e in errors if e))
+            self._pool = pool
+        return self
+
+    def close(self) -> None:
+        if self._pool is not None:
+            self._pool.close()
+            self._pool.join()
+            self._pool = None
+
+    def __enter__(self) -> "BulkReportGenerator":
+        return self.start()
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+    def render(self, results: Iterable[Dict]) -> Iterator[Tuple[ReportRecord, Optional[bytes]]]:
+        """Yield ``(record, pdf_bytes)`` in completion order; ``pdf_bytes`` is None on error."""
+        self.start()
+        done: "queue.Queue" = queue.Queue()
+        in_flight = 0
+        for index, item in enumerate(results):
+            url = str(item.get("url", ""))
+
+            def failed(error, index=index, url=url):
+                # 結果を送れなかった（pickle できない等）場合もマニフェストに残す
+                done.put((ReportRecord(index, url, "", report_filename(url), "error",
+                                       error=f"{type(error).__name__}: {error}"), None))
+
+            self._pool.apply_async(_render, ((index, item),), callback=done.put, error_callback=failed)
+            in_flight += 1
+            while in_flight >= self.window:
+                yield done.get()
+                in_flight -= 1
+        while in_flight:
+            yield done.get()
+            in_flight -= 1
+
+    def write_zip(self, results: Iterable[Dict], target) -> List[ReportRecord]:
+        """Stream reports into a zip archive (path or writable binary stream)."""
+        manifest: List[ReportRecord] = []
+        with zipfile.ZipFile(target, "w", compression=zipfile.ZIP_DEFLATED) as archive:
+            for record, data in self.render(results):
+                if data is not None:
+                    archive.writestr(record.filename, data)
+                manifest.append(record)
+            archive.writestr(MANIFEST_NAME, _manifest_json(manifest))
+        return manifest
+
+    def write_directory(self, results: Iterable[Dict], directory: str) -> List[ReportRecord]:
+        """Write reports into ``directory`` as they finish, then ``manifest.json``."""
+        os.makedirs(directory, exist_ok=True)
+        manifest: List[ReportRecord] = []
+        for record, data in self.render(results):
+            if data is not None:
+                _write_atomic(os.path.join(directory, record.filename), data)
+            manifest.append(record)
+        _write_atomic(os.path.join(directory, MANIFEST_NAME), _manifest_json(manifest))
+        return manifest
+
+
+def _write_atomic(path: str, data: bytes) -> None:
+    tmp = f"{path}.{os.getpid()}.tmp"
+    with open(tmp, "wb") as f:
+        f.write(data)
+    os.replace(tmp, path)
+
+
+def _manifest_json(records: Sequence[ReportRecord]) -> bytes:
+    ordered = sorted(records, key=lambda r: r.index)
+    payload = {
+        "generated_at": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "reports": sum(r.status == "ok" for r in ordered),
+        "errors": sum(r.status != "ok" for r in ordered),
+        "items": [asdict(r) for r in ordered],
+    }
+    return json.dumps(payload, ensure_ascii=False, indent=2).encode("utf-8")
+
+
+def latest_per_url(results: Iterable[Dict]) -> List[Dict]:
+    """Keep the newest result (by ``timestamp``) for each URL."""
+    latest: Dict[str, Dict] = {}
+    for item in results:
+        if "error" in item and "seo_results" not in item:
+            continue
+        url = item.get("url", "")
+        if url not in latest or str(item.get("timestamp", "")) > str(latest[url].get("timestamp", "")):
+            latest[url] = item
+    return list(latest.values())
+
+
+def iter_results_file(path: str) -> Iterator[Dict]:
+    """Analysis results from a JSON file (one object or a list) or JSON lines."""
+    with open(path, "r", encoding="utf-8") as f:
+        if path.endswith((".jsonl", ".ndjson")):
+            for line in f:
+                if line.strip():
+                    yield json.loads(line)
+            return
+        data = json.load(f)
+    yield from (data if isinstance(data, list) else [data])
+
+
+def generate_bulk_reports(results: Iterable[Dict], out: str, workers: Optional[int] = None,
+                          builder: str = DEFAULT_REPORT_BUILDER) -> List[ReportRecord]:
+    """Render ``results`` to ``out`` (``*.zip`` archive, otherwise a directory)."""
+    with BulkReportGenerator(workers, builder) as generator:
+        if out.endswith(".zip"):
+            return generator.write_zip(results, out)
+        return generator.write_directory(results, out)
+
+
+def main(argv: Optional[Sequence[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Render stored analysis results to PDF reports.")
+    parser.add_argument("inputs", nargs="*", help="JSON / JSON lines files with analysis results")
+    parser.add_argument("--from-cache", metavar="DIR", help="page cache directory (latest result per URL)")
+    parser.add_argument("--out", required=True, help="output .zip file or directory")
+    parser.add_argument("--workers", type=int, default=None, help="worker processes (default: CPU count)")
+    parser.add_argument("--builder", default=DEFAULT_REPORT_BUILDER, help="report builder as module:attr")
+    args = parser.parse_args(argv)
+    if not args.inputs and not args.from_cache:
+        parser.error("give result files or --from-cache")
+
+    results: List[Dict] = []
+    for path in args.inputs:
+        results.extend(iter_results_file(path))
+    if args.from_cache:
+        results.extend(PageCache(args.from_cache).iter_analyses())
+    results = latest_per_url(results)
+
+    start = time.perf_counter()
+    manifest = generate_bulk_reports(results, args.out, args.workers, args.builder)
+    elapsed = time.perf_counter() - start
+    errors = sum(r.status != "ok" for r in manifest)
+    print(f"{len(manifest) - errors} reports, {errors} errors in {elapsed:.1f}s -> {args.out}")
+    return 1 if errors else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
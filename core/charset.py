@@ -0,0 +1,209 @@
+# -*- coding: utf-8 -*-
+"""Fast charset detection for fetched HTML.
+
+The decision order follows browsers: BOM, then the HTTP ``Content-Type``
+charset, then ``<meta charset>`` / ``http-equiv`` within the first few KB.
+Only when none of these is present is a bounded sample checked for valid
+UTF-8 and, failing that, passed to statistical detection.  The chosen path
+is reported so that mojibake can be traced back to its cause.
+"""
+import codecs
+import re
+from dataclasses import dataclass
+from typing import Optional, Tuple
+
+try:  # requests depends on charset_normalizer, but keep it optional here
+    from charset_normalizer import from_bytes as _detect_charset
+except Exception:  # pragma: no cover - fallback when charset_normalizer is missing
+    _detect_charset = None
+
+SNIFF_BYTES = 4096
+STATISTICAL_SAMPLE_BYTES = 64 * 1024
+
+_BOMS = (
+    (codecs.BOM_UTF8, "utf-8"),
+    (codecs.BOM_UTF16_LE, "utf-16-le"),
+    (codecs.BOM_UTF16_BE, "utf-16-be"),
+)
+_HEADER_CHARSET = re.compile(r"charset\s*=\s*[\"']?\s*([A-Za-z0-9_\-:.]+)", re.I)
+_META_CHARSET = re.compile(rb"<meta[^>]+?charset\s*=\s*[\"']?\s*([A-Za-z0-9_\-:.]+)", re.I)
+
+# WHATWG Encoding Standard に合わせたラベルの読み替え
+_ENCODING_ALIASES = {
+    "shift_jis": "cp932",
+    "shift-jis": "cp932",
+    "sjis": "cp932",
+    "x-sjis": "cp932",
+    "ms_kanji": "cp932",
+    "windows-31j": "cp932",
+    "csshiftjis": "cp932",
+    "euc-jp": "euc_jp",
+    "x-euc-jp": "euc_jp",
+    "iso-8859-1": "cp1252",
+    "latin1": "cp1252",
+    "latin-1": "cp1252",
+    "us-ascii": "cp1252",
+    "ascii": "cp1252",
+}
+_JAPANESE_TRIALS = ("cp932", "euc_jp")
+
+
+@dataclass
+class CharsetDecision:
+    """Encoding chosen for a document and the rule that chose it."""
+    encoding: str
+    source: str  # bom / http-header / meta / utf8-validation / statistical / trial / default
+    bom_length: int = 0
+
+
+def normalize_encoding(label: Optional[str]) -> Optional[str]:
+    """Return a Python codec name for an HTML charset label, or None if unknown."""
+    if not label:
+        return None
+    label = label.strip().strip("\"'").lower()
+    label = _ENCODING_ALIASES.get(label, label)
+    try:
+        return codecs.lookup(label).name
+    except LookupError:
+        return None
+
+
+def charset_from_content_type(content_type: str) -> Optional[str]:
+    match = _HEADER_CHARSET.search(content_type or "")
+    return normalize_encoding(match.group(1)) if match else None
+
+
+def charset_from_meta(head: bytes) -> Optional[str]:
+    match = _META_CHARSET.search(head[:SNIFF_BYTES])
+    if not match:
+        return None
+    encoding = normalize_encoding(match.group(1).decode("ascii", errors="ignore"))
+    # ASCII互換のバイト列から読めた宣言がUTF-16を指すことはない（WHATWG準拠でUTF-8扱い）
+    if encoding and encoding.startswith("utf-16"):
+        return "utf-8"
+    return encoding
+
+
+def _is_valid_utf8(sample: bytes, complete: bool) -> bool:
+    decoder = codecs.getincrementaldecoder("utf-8")()
+    try:
+        decoder.decode(sample, final=complete)
+        return True
+    except UnicodeDecodeError:
+        return False
+
+
+def _decodes_strictly(sample: bytes, encoding: str, complete: bool) -> bool:
+    decoder = codecs.getincrementaldecoder(encoding)()
+    try:
+        decoder.decode(sample, final=complete)
+        return True
+    except UnicodeDecodeError:
+        return False
+
+
+def _declared_encoding(head: bytes, content_type: str) -> Optional[CharsetDecision]:
+    """Return the decision from a BOM, HTTP header or meta declaration, if any."""
+    for bom, encoding in _BOMS:
+        if head.startswith(bom):
+            return CharsetDecision(encoding, "bom", len(bom))
+
+    encoding = charset_from_content_type(content_type)
+    if encoding:
+        return CharsetDecision(encoding, "http-header")
+
+    encoding = charset_from_meta(head[:SNIFF_BYTES])
+    if encoding:
+        return CharsetDecision(encoding, "meta")
+    return None
+
+
+def sniff_encoding(body: bytes, content_type: str = "", complete: Optional[bool] = None) -> CharsetDecision:
+    """Decide the encoding of ``body`` looking at no more than a bounded sample.
+
+    ``complete`` tells whether ``body`` is the whole document; by default it
+    is assumed to be when it fits into the statistical sample.
+    """
+    declared = _declared_encoding(body[:SNIFF_BYTES], content_type)
+    if declared:
+        return declared
+
+    sample = body[:STATISTICAL_SAMPLE_BYTES]
+    if complete is None:
+        complete = len(body) <= STATISTICAL_SAMPLE_BYTES
+    complete = complete and len(body) <= STATISTICAL_SAMPLE_BYTES
+    if _is_valid_utf8(sample, complete):
+        return CharsetDecision("utf-8", "utf8-validation")
+
+    if _detect_charset is not None:
+        best = _detect_charset(sample).best()
+        encoding = normalize_encoding(best.encoding) if best else None
+        if encoding:
+            return CharsetDecision(encoding, "statistical")
+
+    for encoding in _JAPANESE_TRIALS:
+        if _decodes_strictly(sample, encoding, complete):
+            return CharsetDecision(encoding, "trial")
+    return CharsetDecision("utf-8", "default")
+
+
+class IncrementalHTMLDecoder:
+    """Decode a byte stream chunk by chunk once the encoding is known.
+
+    Bytes are buffered only until a declaration is found in the first
+    ``SNIFF_BYTES`` or, for undeclared documents, until the statistical
+    sample is full; afterwards every chunk is decoded immediately.
+    """
+
+    def __init__(self, content_type: str = ""):
+        self.content_type = content_type
+        self.decision: Optional[CharsetDecision] = None
+        self._pending = bytearray()
+        self._decoder = None
+        # ヘッダーで宣言済みでもBOMが優先されるため、先頭バイトだけは確認する
+        self._bom_check_only = bool(charset_from_content_type(content_type))
+
+    def _decide(self, final: bool, complete: Optional[bool] = None) -> None:
+        head = bytes(self._pending)
+        if self._bom_check_only:
+            if len(head) < 3 and not final:
+                return
+            self.decision = _declared_encoding(head[:SNIFF_BYTES], self.content_type)
+        elif len(head) >= STATISTICAL_SAMPLE_BYTES or final:
+            self.decision = sniff_encoding(head, self.content_type, complete=final if complete is None else complete)
+        elif len(head) >= SNIFF_BYTES:
+            self.decision = _declared_encoding(head[:SNIFF_BYTES], self.content_type)
+        if self.decision is not None:
+            self._decoder = codecs.getincrementaldecoder(self.decision.encoding)(errors="replace")
+            del self._pending[:self.decision.bom_length]
+
+    def feed(self, chunk: bytes, final: bool = False) -> str:
+        """Return the text decodable so far (may be empty while sniffing)."""
+        if self._decoder is not None:
+            return self._decoder.decode(chunk, final=final)
+        self._pending.extend(chunk)
+        self._decide(final)
+        if self._decoder is None:
+            return ""
+        data, self._pending = bytes(self._pending), bytearray()
+        return self._decoder.decode(data, final=final)
+
+    def finish(self, truncated: bool = False) -> str:
+        """Flush buffered bytes; a ``truncated`` stream drops its cut-off last character."""
+        if not truncated:
+            return self.feed(b"", final=True)
+        if self._decoder is None:
+            # 途中で切れた本文は文書全体ではないので、末尾の不完全な文字を判定材料にしない
+            self._decide(final=True, complete=False)
+        data, self._pending = bytes(self._pending), bytearray()
+        text = self._decoder.decode(data)
+        # 途中で切れたマルチバイト文字は置換文字にせず捨てる
+        self._decoder.reset()
+        return text
+
+
+def decode_html(body: bytes, content_type: str = "") -> Tuple[str, CharsetDecision]:
+    """Decode ``body`` with the sniffed encoding, replacing undecodable bytes."""
+    decision = sniff_encoding(body, content_type)
+    text = body[decision.bom_length:].decode(decision.encoding, errors="replace")
+    return text, decision
@@ -65,3 +65,74 @@ SEO_SCORE_LABELS = {
     "images_score": "画像",
     "technical_score": "技術要素",
 }
+
+# ローカル計算で評価できるAIO項目（API呼び出し不要）
+LOCAL_AIO_CRITERIA = (
+    "structure",
+    "qa_compatibility",
+    "multimodal",
+    "metadata",
+    "mobile_friendly",
+    "readability",
+    "page_speed",
+)
+
+# 分析モード
+ANALYSIS_TIERS = {
+    "quick": "クイック（API不使用・ローカル評価のみ）",
+    "standard": "標準（ローカル評価項目はLLM評価を省略）",
+    "deep": "詳細（全項目をLLM評価・ローカル評価を参考値として送信）",
+}
+DEFAULT_ANALYSIS_TIER = "standard"
+
+# 類似ページ判定（MinHash推定Jaccard類似度）のしきい値
+NEAR_DUPLICATE_THRESHOLD = 0.9
+
+# 1ページあたりのダウンロード上限（展開後バイト数）。超過分は読み込まずに打ち切る
+MAX_FETCH_BYTES = 5 * 1024 * 1024
+
+# ページキャッシュ（条件付きGETで再検証。環境変数 AIO_PAGE_CACHE_DIR で変更可能）
+PAGE_CACHE_DIR = ".aio_cache/pages"
+PAGE_CACHE_MAX_BYTES = 200 * 1024 * 1024
+
+# サイト全体クロール
+CRAWL_MAX_PAGES = 50
+CRAWL_MAX_DEPTH = 3
+CRAWL_HOST_CONCURRENCY = 2
+CRAWL_DEFAULT_DELAY = 1.0  # 秒。robots.txt の Crawl-delay が長ければそちらを優先
+
+# 差分クロール: sitemapのlastmodが更新されていなくても、この日数を過ぎたページは再取得する
+RECRAWL_MAX_AGE_DAYS = 7
+CRAWL_STATE_PATH = ".aio_cache/crawl_state.sqlite3"
+
+# リンク切れチェック（任意）: ホスト単位の同時接続数、1リンクのタイムアウト、1ページ全体の時間予算
+LINK_CHECK_HOST_CONCURRENCY = 4
+LINK_CHECK_TIMEOUT = 5.0
+LINK_CHECK_BUDGET_SECONDS = 20.0
+LINK_CHECK_CACHE_TTL = 3600.0
+LINK_CHECK_MAX_LINKS = 500
+
+# サイト全体の重複・薄いコンテンツ判定
+SITE_DUPLICATE_THRESHOLD = 0.85  # MinHash推定Jaccard類似度
+THIN_CONTENT_WORDS = 200
+THIN_CONTENT_CHARS = 500  # 空白で区切られない日本語向けに文字数でも判定する
+
+# 本文のパッセージ分割とBM25による想定質問への回答チェック
+PASSAGE_MAX_CHARS = 300
+CONTENT_PREVIEW_CHARS = 7000  # LLMに送る本文の上限（超える場合は冒頭＋回答パッセージを送る）
+
+# 業界判定のみ（ストリーミング）: 信頼度と最低スコアを満たした時点、または読み込み上限で取得を打ち切る
+INDUSTRY_STREAM_CONFIDENCE = 80.0
+INDUSTRY_STREAM_MIN_SCORE = 15
+INDUSTRY_STREAM_MAX_BYTES = 512 * 1024
+
+# 学習済み業界分類モデル（任意）: キーワード判定の信頼度が低いときに、この確率以上なら採用する
+INDUSTRY_MODEL_MIN_CONFIDENCE = 60.0
+
+# PDFレポートをバイト列で逐次返すときのチャンクサイズ
+PDF_STREAM_CHUNK_SIZE = 64 * 1024
+
+# PDFレポートのバックグラウンド生成: ワーカー数、分析ごとに保持する生成済みレポート数、UIの状態確認間隔（秒）
+REPORT_WORKERS = 2
+REPORT_CACHE_SIZE = 32
+REPORT_POLL_SECONDS = 1.0
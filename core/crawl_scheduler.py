@@ -0,0 +1,121 @@
+# -*- coding: utf-8 -*-
+"""Priority-queue crawl scheduler ranking pages by estimated business value.
+
+The priority of a page combines its internal in-link count, its click depth,
+its sitemap ``<priority>`` and how long ago it was last analysed.  Entries
+live in a binary heap; when a page gains in-links it is pushed again with a
+new version and stale heap entries are discarded lazily on pop, so every
+update is O(log n).
+"""
+import heapq
+import itertools
+import math
+import time
+from dataclasses import dataclass
+from typing import Any, Dict, Hashable, List, Optional, Tuple
+
+DEFAULT_WEIGHTS = {"inlinks": 1.0, "depth": 1.0, "sitemap": 1.0, "staleness": 1.0}
+DEFAULT_SITEMAP_PRIORITY = 0.5  # sitemaps.org の既定値
+STALENESS_HORIZON_DAYS = 30.0
+
+
+@dataclass
+class ScheduledPage:
+    """Ranking features of a queued page."""
+    key: Hashable
+    payload: Any
+    depth: int = 0
+    inlinks: int = 0
+    sitemap_priority: Optional[float] = None
+    last_analyzed: Optional[float] = None
+    pinned: bool = False
+    version: int = 0
+    score: float = 0.0
+
+
+class CrawlScheduler:
+    """Hand out queued pages highest priority first, up to ``budget`` pages."""
+
+    def __init__(self, budget: Optional[int] = None, weights: Optional[Dict[str, float]] = None):
+        self.budget = budget
+        self.weights = dict(DEFAULT_WEIGHTS, **(weights or {}))
+        self.popped = 0
+        self._heap: List[Tuple[float, int, Hashable, int]] = []
+        self._pages: Dict[Hashable, ScheduledPage] = {}
+        self._counter = itertools.count()
+
+    def __len__(self) -> int:
+        return len(self._pages)
+
+    def __contains__(self, key: Hashable) -> bool:
+        return key in self._pages
+
+    def get(self, key: Hashable) -> Optional[ScheduledPage]:
+        return self._pages.get(key)
+
+    def score(self, page: ScheduledPage, now: Optional[float] = None) -> float:
+        """Return the priority of ``page``; larger is crawled earlier."""
+        if page.pinned:
+            return math.inf
+        now = time.time() if now is None else now
+        if page.last_analyzed:
+            staleness = min(1.0, (now - page.last_analyzed) / (STALENESS_HORIZON_DAYS * 86400))
+        else:
+            staleness = 1.0
+        sitemap = DEFAULT_SITEMAP_PRIORITY if page.sitemap_priority is None else page.sitemap_priority
+        w = self.weights
+        return (
+            w["inlinks"] * math.log2(1 + page.inlinks)
+            + w["depth"] / (1 + page.depth)
+            + w["sitemap"] * sitemap
+            + w["staleness"] * staleness
+        )
+
+    def _push(self, page: ScheduledPage) -> None:
+        page.version += 1
+        page.score = self.score(page)
+        heapq.heappush(self._heap, (-page.score, next(self._counter), page.key, page.version))
+
+    def push(self, key: Hashable, payload: Any, depth: int = 0, inlinks: int = 0,
+             sitemap_priority: Optional[float] = None, last_analyzed: Optional[float] = None,
+             pinned: bool = False) -> ScheduledPage:
+        """Queue a new page (an already queued key is updated instead, keeping its smaller depth)."""
+        page = self._pages.get(key)
+        if page is not None:
+            page.depth = min(page.depth, depth)
+            page.inlinks += inlinks
+            if sitemap_priority is not None:
+                page.sitemap_priority = sitemap_priority
+        else:
+            page = ScheduledPage(key, payload, depth, inlinks, sitemap_priority, last_analyzed, pinned)
+            self._pages[key] = page
+        self._push(page)
+        return page
+
+    def add_inlink(self, key: Hashable, depth: Optional[int] = None) -> bool:
+        """Count one more internal link to a queued page and re-rank it."""
+        page = self._pages.get(key)
+        if page is None:
+            return False
+        page.inlinks += 1
+        if depth is not None:
+            page.depth = min(page.depth, depth)
+        self._push(page)
+        return True
+
+    def exhausted(self) -> bool:
+        return self.budget is not None and self.popped >= self.budget
+
+    def pop(self) -> Optional[ScheduledPage]:
+        """Remove and return the best page, or None when empty or over budget."""
+        if self.exhausted():
+            return None
+        while self._heap:
+            _, _, key, version = heapq.heappop(self._heap)
+            page = self._pages.get(key)
+            if page is None or page.version != version:
+                continue  # 古い優先度のエントリ（遅延削除）
+            del self._pages[key]
+            self.popped += 1
+            return page
+        return None
@@ -0,0 +1,170 @@
+# -*- coding: utf-8 -*-
+"""Persistent crawl state for incremental site re-analysis.
+
+``CrawlStateStore`` keeps, per URL, when the page was last fetched, its HTTP
+validators, the hashes of the whole body and of the extracted main content,
+the sitemap ``lastmod`` seen at that time, the internal links and the last
+AIO result.  ``RecrawlPolicy`` uses it to decide which pages need fetching
+at all, and the analyzer reuses the stored AIO result while the main-content
+hash is unchanged.
+"""
+import json
+import sqlite3
+import threading
+import time
+from dataclasses import dataclass, field
+from datetime import datetime, timezone
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple
+
+from .constants import RECRAWL_MAX_AGE_DAYS
+from .page_cache import normalize_url, to_jsonable
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS page_state (
+    url TEXT PRIMARY KEY,
+    last_fetched REAL,
+    etag TEXT,
+    last_modified TEXT,
+    content_hash TEXT,
+    main_content_hash TEXT,
+    lastmod TEXT,
+    links TEXT,
+    aio_results TEXT,
+    last_analyzed REAL
+)
+"""
+_COLUMNS = (
+    "url", "last_fetched", "etag", "last_modified", "content_hash", "main_content_hash",
+    "lastmod", "links", "aio_results", "last_analyzed",
+)
+
+
+@dataclass
+class PageState:
+    """What was known about a page after its last crawl."""
+    url: str
+    last_fetched: float = 0.0
+    etag: str = ""
+    last_modified: str = ""
+    content_hash: str = ""
+    main_content_hash: str = ""
+    lastmod: Optional[str] = None
+    links: List[str] = field(default_factory=list)
+    aio_results: Optional[Dict] = None
+    last_analyzed: float = 0.0
+
+
+def parse_lastmod(value: Optional[str]) -> Optional[float]:
+    """Parse a W3C datetime (``2025-01-02`` or ``2025-01-02T10:00:00+09:00``) to epoch seconds."""
+    if not value:
+        return None
+    text = value.strip().replace("Z", "+00:00")
+    try:
+        parsed = datetime.fromisoformat(text)
+    except ValueError:
+        return None
+    if parsed.tzinfo is None:
+        parsed = parsed.replace(tzinfo=timezone.utc)
+    return parsed.timestamp()
+
+
+class CrawlStateStore:
+    """SQLite-backed ``PageState`` store keyed by the normalized URL."""
+
+    def __init__(self, path: str):
+        self.path = path
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute(_SCHEMA)
+        self._conn.commit()
+
+    def _from_row(self, row: Tuple) -> PageState:
+        values = dict(zip(_COLUMNS, row))
+        values["links"] = json.loads(values["links"]) if values["links"] else []
+        values["aio_results"] = json.loads(values["aio_results"]) if values["aio_results"] else None
+        for key in ("etag", "last_modified", "content_hash", "main_content_hash"):
+            values[key] = values[key] or ""
+        values["last_fetched"] = values["last_fetched"] or 0.0
+        values["last_analyzed"] = values["last_analyzed"] or 0.0
+        return PageState(**values)
+
+    def get(self, url: str) -> Optional[PageState]:
+        with self._lock:
+            row = self._conn.execute(
+                f"SELECT {', '.join(_COLUMNS)} FROM page_state WHERE url = ?", (normalize_url(url),)
+            ).fetchone()
+        return self._from_row(row) if row else None
+
+    def get_many(self, urls: Iterable[str]) -> Dict[str, PageState]:
+        """Return states for ``urls`` keyed by normalized URL, in chunks of 500."""
+        keys = list({normalize_url(u) for u in urls})
+        found: Dict[str, PageState] = {}
+        with self._lock:
+            for i in range(0, len(keys), 500):
+                chunk = keys[i:i + 500]
+                rows = self._conn.execute(
+                    f"SELECT {', '.join(_COLUMNS)} FROM page_state WHERE url IN ({', '.join('?' * len(chunk))})",
+                    chunk,
+                ).fetchall()
+                for row in rows:
+                    found[row[0]] = self._from_row(row)
+        return found
+
+    def upsert(self, state: PageState) -> None:
+        values = (
+            normalize_url(state.url), state.last_fetched, state.etag, state.last_modified,
+            state.content_hash, state.main_content_hash, state.lastmod,
+            json.dumps(state.links, ensure_ascii=False),
+            json.dumps(to_jsonable(state.aio_results), ensure_ascii=False) if state.aio_results is not None else None,
+            state.last_analyzed,
+        )
+        with self._lock:
+            self._conn.execute(
+                f"INSERT OR REPLACE INTO page_state ({', '.join(_COLUMNS)}) VALUES ({', '.join('?' * len(_COLUMNS))})",
+                values,
+            )
+            self._conn.commit()
+
+    def iter_links(self) -> Iterator[Tuple[str, List[str]]]:
+        """Yield ``(url, internal_links)`` for every stored page."""
+        with self._lock:
+            rows = self._conn.execute("SELECT url, links FROM page_state").fetchall()
+        for url, links in rows:
+            yield url, json.loads(links) if links else []
+
+    def __len__(self) -> int:
+        with self._lock:
+            return self._conn.execute("SELECT COUNT(*) FROM page_state").fetchone()[0]
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
+
+
+class RecrawlPolicy:
+    """Decide whether a known page has to be fetched again.
+
+    A page is re-fetched when it is new, when its sitemap ``lastmod`` moved
+    past the one recorded at the last fetch, or when the last fetch is older
+    than ``max_age_days``.
+    """
+
+    def __init__(self, max_age_days: float = RECRAWL_MAX_AGE_DAYS):
+        self.max_age = max_age_days * 86400
+
+    def needs_fetch(self, state: Optional[PageState], lastmod: Optional[str] = None,
+                    now: Optional[float] = None) -> Tuple[bool, str]:
+        """Return ``(fetch?, reason)`` with reason new / lastmod / stale / fresh."""
+        if state is None or not state.last_fetched:
+            return True, "new"
+        now = time.time() if now is None else now
+        new_lastmod = parse_lastmod(lastmod)
+        if new_lastmod is not None:
+            old_lastmod = parse_lastmod(state.lastmod)
+            if old_lastmod is None or new_lastmod > old_lastmod:
+                return True, "lastmod"
+        if now - state.last_fetched > self.max_age:
+            return True, "stale"
+        return False, "fresh"
@@ -0,0 +1,380 @@
+# -*- coding: utf-8 -*-
+"""Site crawler fed by robots.txt sitemaps and the links found during analysis.
+
+``SiteCrawler`` yields pages one at a time so the analysis pipeline can start
+immediately.  Sitemaps are read lazily and internal links reported back via
+``add_links`` are followed up to ``max_depth``.  Pending pages are ranked by a
+``CrawlScheduler`` so that a limited page budget goes to the most important
+pages first.  robots.txt is fetched once
+per origin and cached; ``HostThrottle`` enforces per-host concurrency and the
+crawl delay for every request made through it.  With a ``CrawlStateStore``
+pages that a ``RecrawlPolicy`` considers fresh are skipped without a fetch and
+their stored links are followed instead.
+"""
+import gzip
+import threading
+import time
+import xml.etree.ElementTree as ET
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+from typing import Any, Dict, Iterator, List, Optional, Set, Tuple
+from urllib.parse import urldefrag, urljoin, urlsplit
+from urllib.robotparser import RobotFileParser
+
+import requests
+
+from .constants import (
+    CRAWL_DEFAULT_DELAY,
+    CRAWL_HOST_CONCURRENCY,
+    CRAWL_MAX_DEPTH,
+    CRAWL_MAX_PAGES,
+)
+from .crawl_scheduler import CrawlScheduler
+from .crawl_state import CrawlStateStore, RecrawlPolicy
+from .fetcher import DEFAULT_USER_AGENT, create_session
+from .page_cache import normalize_url
+
+# HTMLではないため巡回対象から外す拡張子
+_SKIP_EXTENSIONS = (
+    ".pdf", ".jpg", ".jpeg", ".png", ".gif", ".webp", ".svg", ".ico", ".zip", ".gz",
+    ".mp4", ".mp3", ".mov", ".avi", ".css", ".js", ".xml", ".json", ".doc", ".docx",
+    ".xls", ".xlsx", ".ppt", ".pptx",
+)
+MAX_SITEMAPS = 50
+# 待ち行列がこの件数を下回ったら sitemap から追加で読み込む
+SITEMAP_BATCH = 500
+
+
+@dataclass
+class SitemapEntry:
+    """A ``<url>`` element of a sitemap."""
+    url: str
+    lastmod: Optional[str] = None
+    priority: Optional[float] = None
+    changefreq: Optional[str] = None
+
+
+@dataclass
+class CrawlTask:
+    """A page handed out by the crawler."""
+    url: str
+    depth: int
+    source: str  # start / sitemap / link
+    lastmod: Optional[str] = None
+    priority: Optional[float] = None
+    reason: str = ""  # 再取得の理由（new / lastmod / stale）。状態ストア未使用時は空
+    state: Optional[Any] = None  # 前回クロール時の PageState
+    score: float = 0.0  # 取り出し時点の優先度
+
+    def to_dict(self) -> Dict:
+        return {
+            "url": self.url, "depth": self.depth, "source": self.source,
+            "lastmod": self.lastmod, "priority": self.priority, "reason": self.reason,
+            "score": None if self.score == float("inf") else round(self.score, 3),
+        }
+
+
+@dataclass
+class CrawlConfig:
+    max_pages: int = CRAWL_MAX_PAGES
+    max_depth: int = CRAWL_MAX_DEPTH
+    host_concurrency: int = CRAWL_HOST_CONCURRENCY
+    default_delay: float = CRAWL_DEFAULT_DELAY
+    respect_robots: bool = True
+    use_sitemaps: bool = True
+    user_agent: str = DEFAULT_USER_AGENT
+    timeout: float = 10
+    allowed_hosts: Set[str] = field(default_factory=set)
+
+
+def _local_name(tag: str) -> str:
+    return tag.rsplit("}", 1)[-1]
+
+
+def parse_sitemap(body: bytes) -> Tuple[List[SitemapEntry], List[str]]:
+    """Return ``(entries, child_sitemaps)`` from a sitemap or sitemap index.
+
+    Gzip-compressed sitemaps are detected by their magic bytes and namespaces
+    are ignored.  Malformed XML yields empty lists.
+    """
+    if body[:2] == b"\x1f\x8b":
+        try:
+            body = gzip.decompress(body)
+        except (OSError, EOFError):
+            return [], []
+    try:
+        root = ET.fromstring(body)
+    except ET.ParseError:
+        return [], []
+
+    entries: List[SitemapEntry] = []
+    children: List[str] = []
+    for node in root:
+        name = _local_name(node.tag)
+        values = {_local_name(child.tag): (child.text or "").strip() for child in node}
+        loc = values.get("loc")
+        if not loc:
+            continue
+        if name == "sitemap":
+            children.append(loc)
+        elif name == "url":
+            try:
+                priority = float(values["priority"]) if values.get("priority") else None
+            except ValueError:
+                priority = None
+            entries.append(SitemapEntry(loc, values.get("lastmod") or None, priority, values.get("changefreq") or None))
+    return entries, children
+
+
+def _origin(url: str) -> str:
+    parts = urlsplit(url)
+    return f"{parts.scheme}://{parts.netloc}"
+
+
+class RobotsCache:
+    """Fetch robots.txt once per origin and answer ``can_fetch`` / delay queries.
+
+    Following RFC 9309, a 4xx robots.txt allows everything while a 5xx or an
+    unreachable server disallows everything.
+    """
+
+    def __init__(self, session: Optional[requests.Session] = None, user_agent: str = DEFAULT_USER_AGENT,
+                 timeout: float = 10, ttl: float = 24 * 3600):
+        self.session = session or create_session(user_agent=user_agent)
+        self.user_agent = user_agent
+        self.timeout = timeout
+        self.ttl = ttl
+        self._parsers: Dict[str, Tuple[float, RobotFileParser]] = {}
+        self._lock = threading.Lock()
+
+    def _parser(self, url: str) -> RobotFileParser:
+        origin = _origin(url)
+        with self._lock:
+            cached = self._parsers.get(origin)
+            if cached and time.time() - cached[0] < self.ttl:
+                return cached[1]
+        parser = RobotFileParser(origin + "/robots.txt")
+        try:
+            response = self.session.get(origin + "/robots.txt", timeout=self.timeout)
+            if response.status_code >= 500:
+                parser.disallow_all = True
+            elif response.status_code >= 400:
+                parser.allow_all = True
+            else:
+                parser.parse(response.text.splitlines())
+        except requests.RequestException:
+            parser.disallow_all = True
+        with self._lock:
+            self._parsers[origin] = (time.time(), parser)
+        return parser
+
+    def can_fetch(self, url: str) -> bool:
+        return self._parser(url).can_fetch(self.user_agent, url)
+
+    def crawl_delay(self, url: str) -> Optional[float]:
+        parser = self._parser(url)
+        delay = parser.crawl_delay(self.user_agent)
+        if delay is None:
+            rate = parser.request_rate(self.user_agent)
+            if rate is not None and rate.requests:
+                delay = rate.seconds / rate.requests
+        return float(delay) if delay is not None else None
+
+    def sitemaps(self, url: str) -> List[str]:
+        return list(self._parser(url).site_maps() or [])
+
+
+class HostThrottle:
+    """Limit concurrent requests per host and space them by a minimum delay."""
+
+    def __init__(self, concurrency: int = CRAWL_HOST_CONCURRENCY, default_delay: float = CRAWL_DEFAULT_DELAY):
+        self.concurrency = max(1, concurrency)
+        self.default_delay = default_delay
+        self._delays: Dict[str, float] = {}
+        self._semaphores: Dict[str, threading.BoundedSemaphore] = {}
+        self._next_slot: Dict[str, float] = {}
+        self._lock = threading.Lock()
+
+    def set_delay(self, host: str, delay: float) -> None:
+        with self._lock:
+            self._delays[host] = max(0.0, delay)
+
+    def _semaphore(self, host: str) -> threading.BoundedSemaphore:
+        with self._lock:
+            if host not in self._semaphores:
+                self._semaphores[host] = threading.BoundedSemaphore(self.concurrency)
+            return self._semaphores[host]
+
+    @contextmanager
+    def slot(self, url: str):
+        """Block until a request to the host of ``url`` may start."""
+        host = urlsplit(url).netloc.lower()
+        semaphore = self._semaphore(host)
+        with semaphore:
+            with self._lock:
+                delay = self._delays.get(host, self.default_delay)
+                now = time.monotonic()
+                start_at = max(now, self._next_slot.get(host, 0.0))
+                self._next_slot[host] = start_at + delay
+            if start_at > now:
+                time.sleep(start_at - now)
+            yield
+
+
+def is_crawlable_url(url: str) -> bool:
+    parts = urlsplit(url)
+    if parts.scheme not in ("http", "https"):
+        return False
+    return not parts.path.lower().endswith(_SKIP_EXTENSIONS)
+
+
+class SiteCrawler:
+    """Yield ``CrawlTask`` objects for one site, most important first.
+
+    The start page always comes first.  Sitemap entries are pulled in batches
+    whenever fewer than ``SITEMAP_BATCH`` pages are pending, so nothing is
+    collected up front.  Call ``add_links`` with the internal links of each
+    analysed page; a link to a page that is already queued raises its rank.
+    """
+
+    def __init__(self, start_url: str, session: Optional[requests.Session] = None,
+                 config: Optional[CrawlConfig] = None, robots: Optional[RobotsCache] = None,
+                 throttle: Optional[HostThrottle] = None, state_store: Optional[CrawlStateStore] = None,
+                 policy: Optional[RecrawlPolicy] = None, scheduler: Optional[CrawlScheduler] = None):
+        self.config = config or CrawlConfig()
+        self.start_url = urldefrag(start_url)[0]
+        self.session = session or create_session(user_agent=self.config.user_agent)
+        self.robots = robots or RobotsCache(self.session, self.config.user_agent, self.config.timeout)
+        self.throttle = throttle or HostThrottle(self.config.host_concurrency, self.config.default_delay)
+        self.state_store = state_store
+        self.policy = policy or RecrawlPolicy()
+        self.hosts = {urlsplit(self.start_url).netloc.lower()} | {h.lower() for h in self.config.allowed_hosts}
+        # ページ数の上限は取得したページで数えるため、スケジューラ側には予算を渡さない
+        self.scheduler = scheduler or CrawlScheduler()
+        self._seen: Set[str] = set()
+        self._sitemap_entries: Optional[Iterator[SitemapEntry]] = None
+        self._sitemaps_done = not self.config.use_sitemaps
+        self.stats = {
+            "yielded": 0, "discovered": 0, "robots_blocked": 0, "sitemaps": 0, "sitemap_urls": 0, "skipped_fresh": 0,
+        }
+        self._enqueue(CrawlTask(self.start_url, 0, "start"), pinned=True)
+        self._configure_delay(self.start_url)
+
+    def _configure_delay(self, url: str) -> None:
+        if not self.config.respect_robots:
+            return
+        delay = self.robots.crawl_delay(url)
+        if delay is not None:
+            self.throttle.set_delay(urlsplit(url).netloc.lower(), max(delay, self.config.default_delay))
+
+    def _in_scope(self, url: str) -> bool:
+        return urlsplit(url).netloc.lower() in self.hosts and is_crawlable_url(url)
+
+    def _enqueue(self, task: CrawlTask, inlinks: int = 0, pinned: bool = False) -> bool:
+        key = normalize_url(task.url)
+        if key in self._seen or not self._in_scope(task.url):
+            return False
+        self._seen.add(key)
+        if self.state_store is not None:
+            task.state = self.state_store.get(task.url)
+        last_analyzed = task.state.last_analyzed if task.state is not None else None
+        self.scheduler.push(key, task, task.depth, inlinks, task.priority, last_analyzed, pinned)
+        self.stats["discovered"] += 1
+        return True
+
+    def add_links(self, parent: CrawlTask, links: List[str]) -> int:
+        """Queue the internal ``links`` of ``parent``; returns the number added.
+
+        Links to pages that are still pending count as extra in-links.
+        """
+        depth = parent.depth + 1
+        added = 0
+        for url in dict.fromkeys(urldefrag(urljoin(parent.url, link))[0] for link in links):
+            key = normalize_url(url)
+            if key in self.scheduler:
+                self.scheduler.add_inlink(key, depth)
+            elif parent.depth < self.config.max_depth and self._enqueue(CrawlTask(url, depth, "link"), inlinks=1):
+                added += 1
+        return added
+
+    def sitemap_urls(self) -> List[str]:
+        """Sitemaps listed in robots.txt, or ``/sitemap.xml`` when none are."""
+        listed = self.robots.sitemaps(self.start_url) if self.config.respect_robots else []
+        return listed or [_origin(self.start_url) + "/sitemap.xml"]
+
+    def iter_sitemap_entries(self) -> Iterator[SitemapEntry]:
+        """Walk sitemaps and sitemap indexes depth first, lazily."""
+        pending = list(reversed(self.sitemap_urls()))
+        visited: Set[str] = set()
+        while pending and len(visited) < MAX_SITEMAPS:
+            sitemap_url = pending.pop()
+            if sitemap_url in visited:
+                continue
+            visited.add(sitemap_url)
+            try:
+                with self.throttle.slot(sitemap_url):
+                    response = self.session.get(sitemap_url, timeout=self.config.timeout)
+                if response.status_code >= 400:
+                    continue
+            except requests.RequestException:
+                continue
+            self.stats["sitemaps"] += 1
+            entries, children = parse_sitemap(response.content)
+            pending.extend(reversed(children))
+            for entry in entries:
+                self.stats["sitemap_urls"] += 1
+                yield entry
+
+    def _refill_from_sitemaps(self, batch: int = SITEMAP_BATCH) -> None:
+        if self._sitemaps_done or len(self.scheduler) >= batch:
+            return
+        if self._sitemap_entries is None:
+            self._sitemap_entries = self.iter_sitemap_entries()
+        for entry in self._sitemap_entries:
+            url = urldefrag(entry.url)[0]
+            key = normalize_url(url)
+            queued = self.scheduler.get(key)
+            if queued is not None:
+                # リンク経由で発見済みのページにも sitemap の priority を反映する（深さは浅い方を残す）
+                page = self.scheduler.push(key, None, depth=min(queued.depth, 1), sitemap_priority=entry.priority)
+                page.payload.lastmod = page.payload.lastmod or entry.lastmod
+                page.payload.priority = entry.priority
+                continue
+            self._enqueue(CrawlTask(url, 1, "sitemap", entry.lastmod, entry.priority))
+            if len(self.scheduler) >= batch:
+                return
+        self._sitemaps_done = True
+
+    def _next_task(self) -> Optional[CrawlTask]:
+        while True:
+            self._refill_from_sitemaps()
+            page = self.scheduler.pop()
+            if page is None:
+                return None
+            task = page.payload
+            task.depth, task.score = page.depth, page.score
+            if self.config.respect_robots and not self.robots.can_fetch(task.url):
+                self.stats["robots_blocked"] += 1
+                continue
+            if self.state_store is not None:
+                fetch, task.reason = self.policy.needs_fetch(task.state, task.lastmod)
+                if not fetch:
+                    # 変更のないページは取得せず、前回のリンクだけをたどる
+                    self.stats["skipped_fresh"] += 1
+                    self.add_links(task, task.state.links)
+                    continue
+            return task
+
+    def __iter__(self) -> Iterator[CrawlTask]:
+        while self.stats["yielded"] < self.config.max_pages:
+            task = self._next_task()
+            if task is None:
+                return
+            self.stats["yielded"] += 1
+            yield task
+
+    @contextmanager
+    def fetch_slot(self, url: str):
+        """Politeness gate to wrap around the page fetch of ``url``."""
+        with self.throttle.slot(url):
+            yield
@@ -0,0 +1,320 @@
+# -*- coding: utf-8 -*-
+"""HTTP fetch layer with timing and page-weight measurement.
+
+``fetch_page`` records DNS, connect, TTFB and download times, the transfer
+(compressed) and decoded sizes and every redirect hop.  DNS and connect
+times are taken from the connection the request actually used (sessions from
+``create_session`` time each new socket); a pooled keep-alive connection has
+none and is reported as reused.  The body is streamed
+and decoded incrementally and reading stops at ``max_bytes``, so memory use
+stays bounded however large the page is.  With a ``PageCache`` the request
+is made conditional and a ``304 Not Modified`` reuses the stored body.  ``measure_subresources``
+optionally totals the CSS, JS and image weight of a page with a small thread
+pool.
+"""
+import socket
+import time
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import asdict, dataclass, field
+from typing import Dict, Iterable, List, Optional
+from urllib.parse import urljoin
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.connection import HTTPConnection, HTTPSConnection
+from urllib3.connectionpool import HTTPConnectionPool, HTTPSConnectionPool
+
+from .charset import IncrementalHTMLDecoder
+from .constants import MAX_FETCH_BYTES
+from .page_cache import PageCache, body_hash
+
+DEFAULT_USER_AGENT = "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36"
+CHUNK_SIZE = 64 * 1024
+
+
+def _elapsed_ms(start: float) -> float:
+    return (time.perf_counter() - start) * 1000
+
+
+class _TimedConnectionMixin:
+    """Record DNS and TCP connect time whenever the connection opens a socket."""
+
+    connect_timings: Optional[Dict[str, float]] = None
+
+    def _new_conn(self):
+        start = time.perf_counter()
+        try:
+            infos = socket.getaddrinfo(self._dns_host, self.port, 0, socket.SOCK_STREAM)
+        except OSError:
+            return super()._new_conn()  # urllib3 の例外（NameResolutionError 等）に任せる
+        dns_ms = _elapsed_ms(start)
+        host, sock = self._dns_host, None
+        start = time.perf_counter()
+        try:
+            # 解決済みのアドレスへ接続し、名前解決を二重に行わない（host は SNI 用に接続後すぐ戻す）
+            self._dns_host = infos[0][4][0]
+            sock = super()._new_conn()
+        except Exception:
+            pass
+        finally:
+            self._dns_host = host
+        if sock is None:
+            return super()._new_conn()  # 最初のアドレスに繋がらなければ全アドレスを試す
+        self.connect_timings = {"dns_ms": dns_ms, "connect_ms": _elapsed_ms(start)}
+        return sock
+
+    def pop_connect_timings(self) -> Optional[Dict[str, float]]:
+        """Timings of the socket opened for the last request (None once read or when reused)."""
+        timings, self.connect_timings = self.connect_timings, None
+        return timings
+
+
+class _TimedHTTPConnection(_TimedConnectionMixin, HTTPConnection):
+    pass
+
+
+class _TimedHTTPSConnection(_TimedConnectionMixin, HTTPSConnection):
+    pass
+
+
+class _TimedHTTPConnectionPool(HTTPConnectionPool):
+    ConnectionCls = _TimedHTTPConnection
+
+
+class _TimedHTTPSConnectionPool(HTTPSConnectionPool):
+    ConnectionCls = _TimedHTTPSConnection
+
+
+class TimedHTTPAdapter(HTTPAdapter):
+    """``HTTPAdapter`` whose connections record their DNS and connect times."""
+
+    def init_poolmanager(self, *args, **kwargs):
+        super().init_poolmanager(*args, **kwargs)
+        self.poolmanager.pool_classes_by_scheme = {
+            "http": _TimedHTTPConnectionPool,
+            "https": _TimedHTTPSConnectionPool,
+        }
+
+
+def create_session(pool_maxsize: int = 20, user_agent: str = DEFAULT_USER_AGENT) -> requests.Session:
+    """Return a session with a connection pool sized for concurrent fetches."""
+    session = requests.Session()
+    adapter = TimedHTTPAdapter(pool_connections=pool_maxsize, pool_maxsize=pool_maxsize)
+    session.mount("http://", adapter)
+    session.mount("https://", adapter)
+    session.headers.update({"User-Agent": user_agent})
+    return session
+
+
+@dataclass
+class FetchTimings:
+    """Fetch phases in milliseconds (DNS/connect are None on a reused connection)."""
+    dns_ms: Optional[float] = None
+    connect_ms: Optional[float] = None
+    connection_reused: Optional[bool] = None
+    ttfb_ms: float = 0.0
+    download_ms: float = 0.0
+    total_ms: float = 0.0
+
+
+@dataclass
+class FetchResult:
+    """Downloaded page body together with its measurements."""
+    url: str
+    final_url: str
+    status_code: int
+    headers: Dict[str, str]
+    body: bytes
+    text: str
+    encoding: str
+    encoding_source: str = ""
+    timings: FetchTimings = field(default_factory=FetchTimings)
+    compressed_bytes: int = 0
+    uncompressed_bytes: int = 0
+    redirects: List[Dict] = field(default_factory=list)
+    truncated: bool = False
+    content_hash: str = ""
+    not_modified: bool = False
+
+    def metrics(self) -> Dict:
+        """Return a JSON-friendly summary for ``seo_results['technical']``."""
+        return {
+            **asdict(self.timings),
+            "status_code": self.status_code,
+            "final_url": self.final_url,
+            "compressed_bytes": self.compressed_bytes,
+            "uncompressed_bytes": self.uncompressed_bytes,
+            "content_encoding": self.headers.get("Content-Encoding", ""),
+            "charset": self.encoding,
+            "charset_source": self.encoding_source,
+            "redirect_count": len(self.redirects),
+            "redirects": list(self.redirects),
+            "truncated": self.truncated,
+            "not_modified": self.not_modified,
+        }
+
+
+def _decode_chunks(chunks: Iterable[bytes], content_type: str, max_bytes: Optional[int]):
+    """Return ``(body, text, decision, truncated)`` reading at most ``max_bytes``."""
+    decoder = IncrementalHTMLDecoder(content_type)
+    body = bytearray()
+    text_parts = []
+    truncated = False
+    for chunk in chunks:
+        if max_bytes is not None and len(body) + len(chunk) > max_bytes:
+            # 上限を超えた分は読まずに打ち切り、接続ごと破棄する（切れた末尾の文字は finish で捨てる）
+            chunk = chunk[:max_bytes - len(body)]
+            truncated = True
+        body.extend(chunk)
+        text_parts.append(decoder.feed(chunk))
+        if truncated:
+            break
+    text_parts.append(decoder.finish(truncated=truncated))
+    return bytes(body), "".join(text_parts), decoder.decision, truncated
+
+
+def fetch_page(
+    url: str,
+    session: Optional[requests.Session] = None,
+    timeout: float = 15,
+    headers: Optional[Dict[str, str]] = None,
+    measure_connection: bool = True,
+    max_bytes: Optional[int] = MAX_FETCH_BYTES,
+    cache: Optional[PageCache] = None,
+) -> FetchResult:
+    """Download ``url`` and return the body with timing and size measurements.
+
+    At most ``max_bytes`` of the decoded body are read (``None`` disables the
+    cap); a longer page is cut off and flagged with ``truncated``.  When
+    ``cache`` holds the page, the request carries its validators and a 304
+    response is answered from the cache with ``not_modified`` set.  HTTP
+    errors are raised as ``requests.HTTPError`` like ``raise_for_status``.
+    """
+    session = session or create_session()
+    timings = FetchTimings()
+
+    request_headers = dict(headers or {})
+    if cache is not None:
+        request_headers.update(cache.conditional_headers(url))
+
+    start = time.perf_counter()
+    response = session.get(url, headers=request_headers or None, timeout=timeout, stream=True)
+    not_modified = False
+    try:
+        timings.ttfb_ms = response.elapsed.total_seconds() * 1000
+        connection = getattr(response.raw, "connection", None)
+        if measure_connection and hasattr(connection, "pop_connect_timings"):
+            connect = connection.pop_connect_timings()
+            timings.connection_reused = connect is None
+            if connect is not None:
+                timings.dns_ms, timings.connect_ms = connect["dns_ms"], connect["connect_ms"]
+        response.raise_for_status()
+        download_start = time.perf_counter()
+        cached_body = cache.load_body(url) if cache is not None and response.status_code == 304 else None
+        if cached_body is not None:
+            entry = cache.get(url)
+            not_modified = True
+            body, text, decision, _ = _decode_chunks([cached_body], entry.content_type, None)
+            truncated = entry.truncated
+            compressed = entry.compressed_bytes
+        elif response.status_code == 304:
+            # キャッシュ本体が失われている場合は条件なしで取り直す
+            response.close()
+            return fetch_page(url, session, timeout, headers, measure_connection, max_bytes, cache=None)
+        else:
+            body, text, decision, truncated = _decode_chunks(
+                response.raw.stream(CHUNK_SIZE, decode_content=True),
+                response.headers.get("Content-Type", ""),
+                max_bytes,
+            )
+            compressed = response.raw.tell() or len(body)
+            if cache is not None:
+                cache.store(url, body, response.headers, final_url=response.url,
+                            compressed_bytes=compressed, truncated=truncated)
+        timings.download_ms = _elapsed_ms(download_start)
+    finally:
+        response.close()
+    timings.total_ms = _elapsed_ms(start)
+
+    redirects = [
+        {"url": hop.url, "status_code": hop.status_code, "location": hop.headers.get("Location", "")}
+        for hop in response.history
+    ]
+    return FetchResult(
+        url=url,
+        final_url=entry.final_url if not_modified else response.url,
+        status_code=response.status_code,
+        headers=dict(response.headers),
+        body=body,
+        text=text,
+        encoding=decision.encoding,
+        encoding_source=decision.source,
+        timings=timings,
+        compressed_bytes=compressed,
+        uncompressed_bytes=len(body),
+        redirects=redirects,
+        truncated=truncated,
+        content_hash=body_hash(body),
+        not_modified=not_modified,
+    )
+
+
+def collect_subresource_urls(soup, base_url: str) -> Dict[str, List[str]]:
+    """Return absolute stylesheet, script and image URLs referenced by the page."""
+    def absolute(values: Iterable[str]) -> List[str]:
+        seen = []
+        for value in values:
+            if not value or value.startswith("data:"):
+                continue
+            full = urljoin(base_url, value.strip())
+            if full.startswith(("http://", "https://")) and full not in seen:
+                seen.append(full)
+        return seen
+
+    stylesheets = [
+        link.get("href") for link in soup.find_all("link", href=True)
+        if "stylesheet" in [r.lower() for r in (link.get("rel") or [])]
+    ]
+    return {
+        "css": absolute(stylesheets),
+        "js": absolute(s.get("src") for s in soup.find_all("script", src=True)),
+        "image": absolute(img.get("src") for img in soup.find_all("img", src=True)),
+    }
+
+
+def _resource_size(session: requests.Session, url: str, timeout: float) -> Optional[int]:
+    try:
+        with session.get(url, timeout=timeout, stream=True) as response:
+            if response.status_code >= 400:
+                return None
+            for _ in response.raw.stream(CHUNK_SIZE, decode_content=False):
+                pass
+            return response.raw.tell()
+    except requests.RequestException:
+        return None
+
+
+def measure_subresources(
+    resources: Dict[str, List[str]],
+    session: Optional[requests.Session] = None,
+    max_workers: int = 8,
+    timeout: float = 10,
+    max_per_type: int = 50,
+) -> Dict:
+    """Fetch sub-resources concurrently and total transfer bytes per type."""
+    session = session or create_session(pool_maxsize=max_workers)
+    jobs = [(kind, url) for kind, urls in resources.items() for url in urls[:max_per_type]]
+    summary = {kind: {"requests": 0, "bytes": 0, "failed": 0} for kind in resources}
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=max_workers) as pool:
+        sizes = pool.map(lambda job: _resource_size(session, job[1], timeout), jobs)
+        for (kind, _), size in zip(jobs, sizes):
+            summary[kind]["requests"] += 1
+            if size is None:
+                summary[kind]["failed"] += 1
+            else:
+                summary[kind]["bytes"] += size
+    summary["total_requests"] = sum(v["requests"] for k, v in summary.items() if isinstance(v, dict))
+    summary["total_bytes"] = sum(v["bytes"] for k, v in summary.items() if isinstance(v, dict))
+    summary["elapsed_ms"] = _elapsed_ms(start)
+    return summary
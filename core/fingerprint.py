@@ -0,0 +1,218 @@
+# -*- coding: utf-8 -*-
+"""MinHash fingerprints and an LSH index for near-duplicate page detection.
+
+Text is shingled into overlapping character n-grams, which works for
+Japanese without a tokenizer.  Shingles are hashed as whole numpy arrays
+(a polynomial rolling hash over the code points, then a 64-bit mixer) and
+the permutations use multiply-shift hashing, applied to blocks of shingles
+so the working set stays small.  The cost grows with the number of distinct
+shingles times ``num_perm``; callers that need the signature more than once
+should compute it once and pass it on.
+"""
+import hashlib
+import re
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, Hashable, List, Optional, Set, Tuple
+
+import numpy as np
+
+SIGNATURE_VERSION = 2  # シングルのハッシュや置換の方式を変えたら上げる（保存済みシグネチャと比較しない）
+
+_WHITESPACE = re.compile(r"\s+")
+_ROLLING_BASE = np.uint64(0x100000001B3)
+_EMPTY_SLOT = np.uint64(1 << 32)  # 置換後の値（32ビット）より大きい番兵
+_BLOCK = 2048  # 置換を一度に適用するシングル数
+
+
+def normalize_text(text: str) -> str:
+    """Lowercase and collapse whitespace so that layout noise is ignored."""
+    return _WHITESPACE.sub(" ", (text or "").lower()).strip()
+
+
+def content_hash(text: str) -> str:
+    """Return a stable hash of the normalized text."""
+    return hashlib.sha1(normalize_text(text).encode("utf-8")).hexdigest()
+
+
+def _mix64(x: np.ndarray) -> np.ndarray:
+    """splitmix64 finalizer: spread every input bit over the whole word."""
+    x = x ^ (x >> np.uint64(30))
+    x = x * np.uint64(0xBF58476D1CE4E5B9)
+    x = x ^ (x >> np.uint64(27))
+    x = x * np.uint64(0x94D049BB133111EB)
+    return x ^ (x >> np.uint64(31))
+
+
+def shingle_hashes(text: str, k: int = 5) -> np.ndarray:
+    """Return sorted unique 32-bit hashes of the character ``k``-shingles of ``text``."""
+    norm = normalize_text(text)
+    if not norm:
+        return np.zeros(0, dtype=np.uint64)
+    codes = np.frombuffer(norm.encode("utf-32-le"), dtype=np.uint32).astype(np.uint64)
+    count = max(codes.size - k + 1, 1)  # k 文字以下の本文は全体を1つのシングルとする
+    rolling = np.zeros(count, dtype=np.uint64)
+    for offset in range(min(k, codes.size)):
+        rolling = rolling * _ROLLING_BASE + codes[offset:offset + count]  # 2**64 で桁あふれさせる
+    return np.unique(_mix64(rolling) >> np.uint64(32))
+
+
+class MinHasher:
+    """Multiply-shift MinHash with ``num_perm`` permutations."""
+
+    def __init__(self, num_perm: int = 128, shingle_size: int = 5, seed: int = 1):
+        rng = np.random.RandomState(seed)
+        self.num_perm = num_perm
+        self.shingle_size = shingle_size
+        # (a * x + b) mod 2**64 の上位32ビット（a は奇数）
+        self._a = rng.randint(0, 1 << 62, size=num_perm, dtype=np.int64).astype(np.uint64) * np.uint64(2) + np.uint64(1)
+        self._b = rng.randint(0, 1 << 62, size=num_perm, dtype=np.int64).astype(np.uint64)
+
+    def signature(self, text: str) -> np.ndarray:
+        hashes = shingle_hashes(text, self.shingle_size)
+        if hashes.size == 0:
+            return np.full(self.num_perm, _EMPTY_SLOT, dtype=np.uint64)
+        minimum = np.full(self.num_perm, np.iinfo(np.uint64).max, dtype=np.uint64)
+        buffer = np.empty((self.num_perm, min(hashes.size, _BLOCK)), dtype=np.uint64)
+        for start in range(0, hashes.size, _BLOCK):
+            block = hashes[start:start + _BLOCK]
+            permuted = buffer[:, :block.size]
+            np.multiply(self._a[:, None], block[None, :], out=permuted)
+            permuted += self._b[:, None]
+            np.minimum(minimum, permuted.min(axis=1), out=minimum)
+        # 上位32ビットを取る操作は単調なので、最小値を求めてからまとめてずらす
+        return minimum >> np.uint64(32)
+
+
+def estimate_similarity(sig_a: np.ndarray, sig_b: np.ndarray) -> float:
+    """Estimate the Jaccard similarity of two MinHash signatures."""
+    if sig_a.size == 0 or sig_a.size != sig_b.size:
+        return 0.0
+    return float(np.count_nonzero(sig_a == sig_b)) / sig_a.size
+
+
+def optimal_bands(num_perm: int, threshold: float) -> Tuple[int, int]:
+    """Return ``(bands, rows)`` whose S-curve midpoint is closest to ``threshold``."""
+    best = (num_perm, 1)
+    best_diff = float("inf")
+    for rows in range(1, num_perm + 1):
+        if num_perm % rows:
+            continue
+        bands = num_perm // rows
+        midpoint = (1.0 / bands) ** (1.0 / rows)
+        diff = abs(midpoint - threshold)
+        if diff < best_diff:
+            best, best_diff = (bands, rows), diff
+    return best
+
+
+class LSHIndex:
+    """Banded locality-sensitive hashing table over MinHash signatures."""
+
+    def __init__(self, num_perm: int = 128, threshold: float = 0.9):
+        self.bands, self.rows = optimal_bands(num_perm, threshold)
+        self._tables: List[Dict[bytes, Set[Hashable]]] = [dict() for _ in range(self.bands)]
+        self._keys: Dict[Hashable, List[bytes]] = {}
+
+    def _band_keys(self, signature: np.ndarray) -> List[bytes]:
+        return [
+            signature[i * self.rows:(i + 1) * self.rows].tobytes()
+            for i in range(self.bands)
+        ]
+
+    def insert(self, key: Hashable, signature: np.ndarray) -> None:
+        if key in self._keys:
+            self.remove(key)
+        band_keys = self._band_keys(signature)
+        for table, band_key in zip(self._tables, band_keys):
+            table.setdefault(band_key, set()).add(key)
+        self._keys[key] = band_keys
+
+    def remove(self, key: Hashable) -> None:
+        for table, band_key in zip(self._tables, self._keys.pop(key, [])):
+            bucket = table.get(band_key)
+            if bucket is not None:
+                bucket.discard(key)
+                if not bucket:
+                    del table[band_key]
+
+    def query(self, signature: np.ndarray) -> Set[Hashable]:
+        candidates: Set[Hashable] = set()
+        for table, band_key in zip(self._tables, self._band_keys(signature)):
+            candidates.update(table.get(band_key, ()))
+        return candidates
+
+    def __len__(self) -> int:
+        return len(self._keys)
+
+
+@dataclass
+class DuplicateMatch:
+    """A previously indexed page similar to the query text."""
+    key: Hashable
+    similarity: float
+    payload: Any
+
+
+class NearDuplicateIndex:
+    """Map page texts to stored payloads and find near-identical pages.
+
+    Exact duplicates are resolved through a content hash; near duplicates go
+    through the LSH index and are confirmed with the estimated Jaccard
+    similarity.  The oldest entries are evicted beyond ``max_entries``.
+    """
+
+    def __init__(self, threshold: float = 0.9, num_perm: int = 128, max_entries: int = 5000):
+        self.threshold = threshold
+        self.max_entries = max_entries
+        self._hasher = MinHasher(num_perm=num_perm)
+        self._lsh = LSHIndex(num_perm=num_perm, threshold=threshold)
+        self._entries: "OrderedDict[Hashable, Tuple[str, np.ndarray, Any]]" = OrderedDict()
+        self._by_hash: Dict[str, Hashable] = {}
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def signature(self, text: str) -> np.ndarray:
+        return self._hasher.signature(text)
+
+    def add(self, key: Hashable, text: str, payload: Any, signature: Optional[np.ndarray] = None) -> None:
+        if signature is None:
+            signature = self.signature(text)
+        self.remove(key)
+        digest = content_hash(text)
+        self._entries[key] = (digest, signature, payload)
+        self._by_hash[digest] = key
+        self._lsh.insert(key, signature)
+        while len(self._entries) > self.max_entries:
+            oldest = next(iter(self._entries))
+            self.remove(oldest)
+
+    def remove(self, key: Hashable) -> None:
+        entry = self._entries.pop(key, None)
+        if entry is None:
+            return
+        if self._by_hash.get(entry[0]) == key:
+            del self._by_hash[entry[0]]
+        self._lsh.remove(key)
+
+    def find(self, text: str, signature: Optional[np.ndarray] = None,
+             accept: Optional[Callable[[Hashable, Any], bool]] = None) -> Optional[DuplicateMatch]:
+        """Return the most similar indexed page at or above the threshold.
+
+        Only entries for which ``accept(key, payload)`` is true are considered.
+        """
+        exact_key = self._by_hash.get(content_hash(text))
+        if exact_key is not None and (accept is None or accept(exact_key, self._entries[exact_key][2])):
+            return DuplicateMatch(exact_key, 1.0, self._entries[exact_key][2])
+        if signature is None:
+            signature = self.signature(text)
+        best: Optional[DuplicateMatch] = None
+        for key in self._lsh.query(signature):
+            _, other_sig, payload = self._entries[key]
+            if accept is not None and not accept(key, payload):
+                continue
+            similarity = estimate_similarity(signature, other_sig)
+            if similarity >= self.threshold and (best is None or similarity > best.similarity):
+                best = DuplicateMatch(key, similarity, payload)
+        return best
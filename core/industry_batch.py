@@ -0,0 +1,154 @@
+# -*- coding: utf-8 -*-
+"""Batch industry classification over a sparse document × keyword matrix.
+
+Each document is scanned once with the taxonomy's ``KeywordMatcher`` and its
+keyword counts become one row of a CSR matrix.  Industry scores for all
+documents are the product of that matrix with a keyword × industry weight
+matrix built from the primary/secondary/specialized tiers; primary and
+secondary labels, confidences, audience and regulatory hits then come from
+numpy operations on the score matrix.  The results equal what
+``IndustryDetector.analyze_industries`` returns for each document.
+"""
+from dataclasses import dataclass
+from typing import Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from .industry_detector import IndustryAnalysis
+from .taxonomy import KEYWORD_LEVELS, Taxonomy, get_taxonomy
+
+UNDETERMINED = "指定なし（自動判定不可）"
+SECONDARY_RATIO = 0.3
+MAX_SECONDARY = 5
+
+
+@dataclass
+class DocumentTermMatrix:
+    """CSR matrix of keyword counts (rows: documents, columns: ``keywords``)."""
+    indptr: np.ndarray
+    indices: np.ndarray
+    data: np.ndarray
+    keywords: Tuple[str, ...]
+    word_counts: np.ndarray  # 空白区切りの語数（信頼度の計算用）
+
+    @property
+    def shape(self) -> Tuple[int, int]:
+        return len(self.indptr) - 1, len(self.keywords)
+
+    def dot(self, weights: np.ndarray) -> np.ndarray:
+        """Dense ``(documents, columns)`` product with a ``(keywords, columns)`` matrix."""
+        n = self.shape[0]
+        result = np.zeros((n, weights.shape[1]))
+        rows = np.flatnonzero(np.diff(self.indptr))
+        if rows.size:
+            contributions = self.data[:, None] * weights[self.indices]
+            result[rows] = np.add.reduceat(contributions, self.indptr[rows], axis=0)
+        return result
+
+
+class BatchIndustryClassifier:
+    """Classify many documents at once with one taxonomy snapshot."""
+
+    def __init__(self, taxonomy: Optional[Taxonomy] = None):
+        self.taxonomy = taxonomy or get_taxonomy()
+        tax = self.taxonomy
+        self.keywords = tax.matcher.keywords
+        self._column = {keyword: i for i, keyword in enumerate(self.keywords)}
+        self.industries = tuple(tax.industries)
+        self.weights = np.zeros((len(self.keywords), len(self.industries)))
+        for j, industry in enumerate(self.industries):
+            for level in KEYWORD_LEVELS:
+                for keyword in tax.industries[industry][level]:
+                    self.weights[self._column[keyword.lower()], j] += tax.weights[level]
+        self.audiences = tuple(tax.audiences)
+        self.audience_matrix = np.zeros((len(self.keywords), len(self.audiences)))
+        for j, audience in enumerate(self.audiences):
+            for pattern in tax.audiences[audience]:
+                self.audience_matrix[self._column[pattern.lower()], j] = 1
+        self.regulatory_terms = tuple(tax.regulatory_terms)
+        self.regulatory_matrix = np.zeros((len(self.keywords), len(self.regulatory_terms)))
+        for j, term in enumerate(self.regulatory_terms):
+            self.regulatory_matrix[self._column[term.lower()], j] = 1
+
+    def matrix(self, texts: Sequence[str]) -> DocumentTermMatrix:
+        """Count taxonomy keywords in lowercased ``texts`` (one matcher pass per text)."""
+        indptr = [0]
+        indices: List[int] = []
+        data: List[int] = []
+        word_counts = np.zeros(len(texts))
+        count = self.taxonomy.matcher.count
+        for i, text in enumerate(texts):
+            counts = count(text)
+            indices.extend(self._column[keyword] for keyword in counts)
+            data.extend(counts.values())
+            indptr.append(len(indices))
+            word_counts[i] = len(text.split())
+        return DocumentTermMatrix(
+            np.array(indptr, dtype=np.int64), np.array(indices, dtype=np.int64),
+            np.array(data, dtype=np.float64), self.keywords, word_counts,
+        )
+
+    def _matched_keywords(self, dtm: DocumentTermMatrix, row: int, industry: str) -> List[str]:
+        start, end = dtm.indptr[row], dtm.indptr[row + 1]
+        present = {self.keywords[c] for c in dtm.indices[start:end]}
+        levels = self.taxonomy.industries[industry]
+        return [kw for level in KEYWORD_LEVELS for kw in levels[level] if kw.lower() in present]
+
+    def classify(self, documents: Sequence[Tuple[str, str, str]]) -> List[IndustryAnalysis]:
+        """Classify ``(title, content, meta_description)`` tuples; returns one ``IndustryAnalysis`` each."""
+        texts = [f"{title} {meta} {content}".lower() for title, content, meta in documents]
+        dtm = self.matrix(texts)
+        return self.classify_matrix(dtm)
+
+    def scores(self, dtm: DocumentTermMatrix) -> np.ndarray:
+        """Industry score matrix ``(documents, industries)``."""
+        return dtm.dot(self.weights)
+
+    def classify_matrix(self, dtm: DocumentTermMatrix) -> List[IndustryAnalysis]:
+        n = dtm.shape[0]
+        if not n:
+            return []
+        scores = self.scores(dtm)
+        # 降順の安定ソート（同点は定義順）で analyze_industries と同じ並びにする
+        order = np.argsort(-scores, axis=1, kind="stable")
+        ranked = np.take_along_axis(scores, order, axis=1)
+        primary_score = ranked[:, 0] if len(self.industries) else np.zeros(n)
+        confidence = np.minimum(100, (primary_score / np.maximum(dtm.word_counts * 0.1, 1)) * 100)
+        secondary = ranked[:, 1:MAX_SECONDARY + 1]
+        secondary_mask = (secondary >= primary_score[:, None] * SECONDARY_RATIO) & (secondary > 0)
+        audiences = dtm.dot(self.audience_matrix) > 0
+        regulatory = dtm.dot(self.regulatory_matrix) > 0
+
+        results = []
+        for i in range(n):
+            if not len(self.industries) or primary_score[i] == 0:
+                results.append(IndustryAnalysis(UNDETERMINED, [], 0.0, [], [], [], []))
+                continue
+            primary = self.industries[order[i, 0]]
+            matched = self._matched_keywords(dtm, i, primary)
+            results.append(IndustryAnalysis(
+                primary_industry=primary,
+                secondary_industries=[
+                    f"{self.industries[j]}({s:.0f})"
+                    for j, s, keep in zip(order[i, 1:MAX_SECONDARY + 1], secondary[i], secondary_mask[i]) if keep
+                ],
+                confidence_score=float(confidence[i]),
+                industry_keywords=matched,
+                specialized_terms=list(matched),
+                regulatory_indicators=[t for t, hit in zip(self.regulatory_terms, regulatory[i]) if hit],
+                target_audience_clues=[a for a, hit in zip(self.audiences, audiences[i]) if hit],
+            ))
+        return results
+
+    def label_counts(self, results: Sequence[IndustryAnalysis]) -> Dict[str, int]:
+        """Number of documents per primary industry (portfolio summary)."""
+        counts: Dict[str, int] = {}
+        for result in results:
+            counts[result.primary_industry] = counts.get(result.primary_industry, 0) + 1
+        return dict(sorted(counts.items(), key=lambda x: x[1], reverse=True))
+
+
+def classify_industries(documents: Sequence[Tuple[str, str, str]],
+                        taxonomy: Optional[Taxonomy] = None) -> List[IndustryAnalysis]:
+    """Convenience wrapper: classify ``(title, content, meta_description)`` tuples."""
+    return BatchIndustryClassifier(taxonomy).classify(documents)
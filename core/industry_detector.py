@@ -1,35 +1,33 @@
 # -*- coding: utf-8 -*-
-"""Industry detection utilities."""
+"""Industry detection utilities.
+
+Keywords, recommended contents, audience patterns and regulatory terms come
+from the shared taxonomy (``core/taxonomy.py``), so industries can be added by
+editing the taxonomy file without touching this module.
+"""
+from collections import Counter
+from collections.abc import Mapping
 from dataclasses import dataclass
-from typing import List
+from typing import Dict, Iterator, List, Optional, Tuple
+
+from .taxonomy import KEYWORD_LEVELS, Taxonomy, get_taxonomy
+
+
+class _LiveIndustryContents(Mapping):
+    """Read-only view of the taxonomy's recommended contents (follows hot reloads)."""
+
+    def __getitem__(self, key):
+        return get_taxonomy().contents[key]
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(get_taxonomy().contents)
+
+    def __len__(self) -> int:
+        return len(get_taxonomy().contents)
+
 
 # Recommended contents per industry for personalization analysis
-INDUSTRY_CONTENTS = {
-    "restaurant": {
-        "keywords": ["メニュー", "コース", "予約", "アクセス", "地図", "テイクアウト", "デリバリー"],
-        "display_name": "飲食店",
-    },
-    "construction": {
-        "keywords": ["施工事例", "お客様の声", "技術紹介", "安全管理", "会社概要", "見積もり"],
-        "display_name": "建設業",
-    },
-    "clinic": {
-        "keywords": ["診療案内", "医師紹介", "アクセス", "予約", "診療時間", "初診"],
-        "display_name": "クリニック",
-    },
-    "real_estate": {
-        "keywords": ["物件", "賃貸", "売買", "マンション", "戸建て", "土地"],
-        "display_name": "不動産",
-    },
-    "education": {
-        "keywords": ["学習", "教育", "講座", "スクール", "研修", "資格"],
-        "display_name": "教育・人材",
-    },
-    "finance": {
-        "keywords": ["融資", "投資", "保険", "資産運用", "金利", "銀行"],
-        "display_name": "金融・保険",
-    },
-}
+INDUSTRY_CONTENTS = _LiveIndustryContents()
 
 
 def get_industry_display_name(key: str) -> str:
@@ -41,12 +39,19 @@ def detect_industry(text: str) -> str:
     """Detect industry key based on keyword matching."""
     if not text:
         return "unknown"
-    lowered = text.lower()
-    for key, info in INDUSTRY_CONTENTS.items():
-        if any(keyword.lower() in lowered for keyword in info.get("keywords", [])):
+    taxonomy = get_taxonomy()
+    counts = taxonomy.count(text)
+    for key, info in taxonomy.contents.items():
+        if any(counts[keyword.lower()] for keyword in info.get("keywords", ())):
             return key
     return "unknown"
 
+
+def industry_confidence(primary_score: float, total_words: int) -> float:
+    """Confidence (0-100) of the primary industry relative to the text length in words."""
+    return min(100, (primary_score / max(total_words * 0.1, 1)) * 100)
+
+
 @dataclass
 class IndustryAnalysis:
     """業界分析結果"""
@@ -59,88 +64,50 @@ class IndustryAnalysis:
     target_audience_clues: List[str]
 
 class IndustryDetector:
-    """業界自動判定システム"""
-
-    def __init__(self):
-        self.industry_keywords = {
-            "IT・テクノロジー": {
-                "primary": ["API", "SDK", "SaaS", "クラウド", "データベース", "システム開発", "ソフトウェア", "アプリ"],
-                "secondary": ["DX", "デジタル変革", "IT導入", "クラウド移行", "セキュリティ", "AI", "IoT"],
-                "specialized": ["React", "Python", "AWS", "Docker", "kubernetes", "GitHub", "DevOps"],
-            },
-            "医療・ヘルスケア": {
-                "primary": ["診療", "治療", "医師", "看護師", "病院", "クリニック", "薬事法", "医療"],
-                "secondary": ["予防医療", "遠隔診療", "電子カルテ", "医療DX", "健康管理"],
-                "specialized": ["ICD-10", "レセプト", "診療報酬", "薬機法", "PMDA"],
-            },
-            "不動産": {
-                "primary": ["物件", "賃貸", "売買", "マンション", "戸建て", "土地", "不動産投資"],
-                "secondary": ["リノベーション", "住宅ローン", "仲介手数料", "賃貸管理"],
-                "specialized": ["重要事項説明", "宅建士", "建ぺい率", "容積率", "登記"],
-            },
-            "教育・人材": {
-                "primary": ["学習", "教育", "講座", "スクール", "研修", "資格", "eラーニング", "人材"],
-                "secondary": ["オンライン授業", "学習管理", "教材開発", "採用", "転職"],
-                "specialized": ["LMS", "アダプティブラーニング", "学習分析", "HRtech"],
-            },
-            "金融・保険": {
-                "primary": ["融資", "投資", "保険", "資産運用", "金利", "リスク管理", "銀行"],
-                "secondary": ["フィンテック", "ロボアドバイザー", "仮想通貨", "決済"],
-                "specialized": ["AML", "KYC", "Basel III", "Solvency II", "PCI DSS"],
-            },
-            "製造業": {
-                "primary": ["製造", "生産", "工場", "品質管理", "サプライチェーン", "設備"],
-                "secondary": ["IoT", "スマートファクトリー", "予知保全", "自動化"],
-                "specialized": ["QMS", "ISO9001", "TPM", "5S", "カイゼン", "JIT"],
-            },
-            "小売・EC": {
-                "primary": ["商品", "販売", "店舗", "顧客", "在庫", "決済", "配送", "EC"],
-                "secondary": ["オムニチャネル", "CRM", "ポイント", "レコメンド"],
-                "specialized": ["SKU", "GMV", "LTV", "CAC", "CVR", "ROAS"],
-            },
-            "飲食・食品": {
-                "primary": ["メニュー", "レストラン", "食材", "調理", "衛生管理", "栄養"],
-                "secondary": ["テイクアウト", "デリバリー", "食品ロス", "フードテック"],
-                "specialized": ["HACCP", "食品表示法", "トレーサビリティ"],
-            },
-            "建設・建築": {
-                "primary": ["建設", "建築", "施工", "設計", "リフォーム", "住宅"],
-                "secondary": ["BIM", "建築DX", "省エネ", "耐震"],
-                "specialized": ["建築基準法", "一級建築士", "施工管理", "構造計算"],
-            },
-            "コンサルティング": {
-                "primary": ["コンサル", "戦略", "業務改善", "経営", "支援"],
-                "secondary": ["DXコンサル", "ITコンサル", "人事コンサル"],
-                "specialized": ["フレームワーク", "ベストプラクティス", "KPI"],
-            },
-        }
+    """業界自動判定システム
+
+    taxonomy を省略すると共有タクソノミー（ファイル更新時に自動再読み込み）を使う。
+    """
+
+    def __init__(self, taxonomy: Optional[Taxonomy] = None):
+        self._taxonomy = taxonomy
+
+    @property
+    def taxonomy(self) -> Taxonomy:
+        return self._taxonomy or get_taxonomy()
+
+    @property
+    def industry_keywords(self) -> Dict[str, Dict[str, List[str]]]:
+        return self.taxonomy.industries
 
     def analyze_industries(self, title: str, content: str, meta_description: str = "") -> IndustryAnalysis:
         combined_text = f"{title} {meta_description} {content}".lower()
+        # 全キーワードを1回の走査で数える
+        counts = self.taxonomy.matcher.count(combined_text)
+        return self.analyze_counts(counts, len(combined_text.split()))
+
+    def industry_scores(self, counts: Counter) -> Tuple[Dict[str, float], Dict[str, List[str]]]:
+        """Return per-industry scores and matched keywords for keyword ``counts``."""
+        taxonomy = self.taxonomy
         industry_scores = {}
         matched_keywords = {}
 
-        for industry, keywords in self.industry_keywords.items():
+        for industry, keywords in taxonomy.industries.items():
             score = 0
             matched = []
-            for keyword in keywords["primary"]:
-                count = combined_text.count(keyword.lower())
-                score += count * 3
-                if count > 0:
-                    matched.append(keyword)
-            for keyword in keywords["secondary"]:
-                count = combined_text.count(keyword.lower())
-                score += count * 2
-                if count > 0:
-                    matched.append(keyword)
-            for keyword in keywords["specialized"]:
-                count = combined_text.count(keyword.lower())
-                score += count * 5
-                if count > 0:
-                    matched.append(keyword)
+            for level in KEYWORD_LEVELS:
+                for keyword in keywords[level]:
+                    count = counts[keyword.lower()]
+                    score += count * taxonomy.weights[level]
+                    if count > 0:
+                        matched.append(keyword)
             industry_scores[industry] = score
             matched_keywords[industry] = matched
+        return industry_scores, matched_keywords
 
+    def analyze_counts(self, counts: Counter, total_words: int) -> IndustryAnalysis:
+        """Judge industries from keyword counts (lowercased keyword -> occurrences)."""
+        industry_scores, matched_keywords = self.industry_scores(counts)
         sorted_industries = sorted(industry_scores.items(), key=lambda x: x[1], reverse=True)
         if not sorted_industries or sorted_industries[0][1] == 0:
             return IndustryAnalysis(
@@ -161,11 +128,10 @@ class IndustryDetector:
             if score >= threshold and score > 0:
                 secondary_industries.append(f"{industry}({score:.0f})")
 
-        total_words = len(combined_text.split())
-        confidence = min(100, (primary_score / max(total_words * 0.1, 1)) * 100)
+        confidence = industry_confidence(primary_score, total_words)
 
-        target_clues = self._detect_target_audience(combined_text)
-        regulatory_indicators = self._detect_regulatory_terms(combined_text)
+        target_clues = self._detect_target_audience(counts)
+        regulatory_indicators = self._detect_regulatory_terms(counts)
 
         return IndustryAnalysis(
             primary_industry=primary_industry,
@@ -177,26 +143,11 @@ class IndustryDetector:
             target_audience_clues=target_clues,
         )
 
-    def _detect_target_audience(self, text: str) -> List[str]:
-        audience_patterns = {
-            "法人向け": ["企業", "会社", "法人", "ビジネス", "B2B"],
-            "個人向け": ["個人", "家庭", "一般", "消費者", "B2C"],
-            "専門職向け": ["医師", "弁護士", "税理士", "エンジニア", "専門家"],
-            "経営者向け": ["経営者", "社長", "CEO", "役員", "管理職"],
-        }
-        detected = []
-        for audience_type, patterns in audience_patterns.items():
-            if any(pattern in text for pattern in patterns):
-                detected.append(audience_type)
-        return detected
-
-    def _detect_regulatory_terms(self, text: str) -> List[str]:
-        regulatory_terms = [
-            "薬機法", "医療法", "金融商品取引法", "宅建業法", "建築基準法",
-            "個人情報保護法", "食品衛生法", "労働基準法", "GDPR", "ISO",
+    def _detect_target_audience(self, counts: Counter) -> List[str]:
+        return [
+            audience_type for audience_type, patterns in self.taxonomy.audiences.items()
+            if any(counts[pattern.lower()] for pattern in patterns)
         ]
-        detected = []
-        for term in regulatory_terms:
-            if term.lower() in text:
-                detected.append(term)
-        return detected
+
+    def _detect_regulatory_terms(self, counts: Counter) -> List[str]:
+        return [term for term in self.taxonomy.regulatory_terms if counts[term.lower()]]
@@ -0,0 +1,323 @@
+# -*- coding: utf-8 -*-
+"""Optional linear industry classifier over hashed character n-grams.
+
+The keyword heuristic in ``IndustryDetector`` gives up on pages without exact
+keyword hits.  This model scores the same industry labels from character
+1-3 grams hashed into ``2 ** hash_bits`` buckets (no tokenizer, so it works
+for Japanese and English alike).  A page's feature vector is the n-gram
+frequency distribution: the distinct buckets are gathered once as weight rows
+and weighted by their counts, so the logits are the mean weight of its n-grams
+plus a bias.  The probabilities are a softmax with a temperature fitted on
+held-out pages so that the reported confidence is calibrated.
+
+The model is trained offline from a labeled corpus (JSON lines with
+``label`` — a taxonomy industry name — and ``text`` or
+``title``/``content``/``meta_description``)::
+
+    python -m core.industry_model corpus.jsonl core/data/industry_model
+
+which writes ``industry_model.npy`` (float32 ``buckets × classes`` weights,
+memory-mapped at load time) and ``industry_model.json`` (labels, hashing
+settings, bias, temperature and validation metrics).  When no artifact is present the
+analyzer silently falls back to the keyword heuristic.
+"""
+import argparse
+import json
+import os
+import re
+import sys
+import time
+import unicodedata
+from dataclasses import dataclass
+from typing import Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+DEFAULT_MODEL_PATH = os.path.join(os.path.dirname(__file__), "data", "industry_model")
+MODEL_PATH_ENV = "AIO_INDUSTRY_MODEL_PATH"
+MODEL_FORMAT = 2  # 2: 重みは buckets × classes
+
+_WHITESPACE = re.compile(r"\s+")
+_MIX = np.uint64(0x100000001B3)  # FNV-1a の乗数
+_GOLDEN = np.uint64(0x9E3779B97F4A7C15)  # multiply-shift ハッシュ
+_SEEDS = (np.uint64(0xCBF29CE484222325), np.uint64(0x84222325CBF29CE4), np.uint64(0x2325CBF29CE48422))
+
+
+def _normalize(text: str, max_chars: int) -> str:
+    text = unicodedata.normalize("NFKC", (text or "")[:max_chars]).lower()
+    return _WHITESPACE.sub(" ", text).strip()[:max_chars]
+
+
+def ngram_buckets(text: str, hash_bits: int, ngram_range: Tuple[int, int] = (1, 3), max_chars: int = 4000) -> np.ndarray:
+    """Hash the character n-grams of ``text`` to bucket ids (one id per n-gram occurrence)."""
+    normalized = _normalize(text, max_chars)
+    codes = np.frombuffer(normalized.encode("utf-32-le"), dtype=np.uint32).astype(np.uint64)
+    shift = np.uint64(64 - hash_bits)
+    buckets = []
+    for n in range(ngram_range[0], ngram_range[1] + 1):
+        if len(codes) < n:
+            break
+        count = len(codes) - n + 1
+        h = np.full(count, _SEEDS[(n - 1) % len(_SEEDS)], dtype=np.uint64)
+        for k in range(n):
+            h = (h ^ codes[k:k + count]) * _MIX
+        buckets.append((h * _GOLDEN) >> shift)
+    if not buckets:
+        return np.zeros(0, dtype=np.int64)
+    return np.concatenate(buckets).astype(np.int64)
+
+
+@dataclass
+class IndustryPrediction:
+    """Predicted industry with its calibrated probability (0-100)."""
+    label: str
+    confidence: float
+    probabilities: Dict[str, float]
+
+
+class IndustryModel:
+    """Linear softmax classifier over hashed character n-grams."""
+
+    def __init__(self, weights: np.ndarray, bias: np.ndarray, labels: Sequence[str], hash_bits: int,
+                 ngram_range: Tuple[int, int] = (1, 3), max_chars: int = 4000, temperature: float = 1.0,
+                 metadata: Optional[Dict] = None):
+        if weights.shape != (2 ** hash_bits, len(labels)):
+            raise ValueError(f"weights shape {weights.shape} does not match {2 ** hash_bits} x {len(labels)}")
+        # memmap のサブクラスを外す（ファイルへの参照はそのまま）
+        self.weights = np.asarray(weights)
+        self.bias = np.asarray(bias, dtype=np.float64)
+        self.labels = tuple(labels)
+        self.hash_bits = hash_bits
+        self.ngram_range = tuple(ngram_range)
+        self.max_chars = max_chars
+        self.temperature = temperature
+        self.metadata = dict(metadata or {})
+
+    @property
+    def version(self) -> str:
+        return str(self.metadata.get("version", ""))
+
+    def buckets(self, text: str) -> np.ndarray:
+        return ngram_buckets(text, self.hash_bits, self.ngram_range, self.max_chars)
+
+    def logits(self, text: str) -> np.ndarray:
+        buckets = self.buckets(text)
+        if not len(buckets):
+            return self.bias.copy()
+        # 同じバケットは1回だけ読み、出現回数で重み付けする（バケットごとに全クラスの重みが連続している）
+        unique, counts = np.unique(buckets, return_counts=True)
+        totals = counts.astype(np.float32) @ self.weights[unique]
+        return totals.astype(np.float64) / len(buckets) + self.bias
+
+    def predict_text(self, text: str) -> IndustryPrediction:
+        probabilities = _softmax(self.logits(text) / self.temperature)
+        best = int(np.argmax(probabilities))
+        return IndustryPrediction(
+            label=self.labels[best],
+            confidence=float(probabilities[best] * 100),
+            probabilities={label: float(p) for label, p in zip(self.labels, probabilities)},
+        )
+
+    def predict(self, title: str, content: str, meta_description: str = "") -> IndustryPrediction:
+        """Predict from the same fields ``IndustryDetector.analyze_industries`` receives."""
+        return self.predict_text(f"{title} {meta_description} {content}")
+
+    def save(self, path: str) -> None:
+        """Write ``<path>.npy`` (weights) and ``<path>.json`` (everything else)."""
+        base = _base_path(path)
+        os.makedirs(os.path.dirname(os.path.abspath(base)), exist_ok=True)
+        np.save(base + ".npy", np.asarray(self.weights, dtype=np.float32))
+        meta = {
+            **self.metadata,
+            "format": MODEL_FORMAT,
+            "labels": list(self.labels),
+            "hash_bits": self.hash_bits,
+            "ngram_range": list(self.ngram_range),
+            "max_chars": self.max_chars,
+            "temperature": self.temperature,
+            "bias": [float(b) for b in self.bias],
+        }
+        with open(base + ".json", "w", encoding="utf-8") as f:
+            json.dump(meta, f, ensure_ascii=False, indent=2)
+
+    @classmethod
+    def load(cls, path: str) -> "IndustryModel":
+        """Load a saved model; the weight matrix is memory-mapped read-only."""
+        base = _base_path(path)
+        with open(base + ".json", encoding="utf-8") as f:
+            meta = json.load(f)
+        if meta.get("format") != MODEL_FORMAT:
+            raise ValueError(f"unsupported industry model format: {meta.get('format')}")
+        weights = np.load(base + ".npy", mmap_mode="r")
+        return cls(
+            weights, np.array(meta["bias"]), meta["labels"], meta["hash_bits"], tuple(meta["ngram_range"]),
+            meta["max_chars"], meta["temperature"],
+            {k: v for k, v in meta.items() if k not in {"bias", "labels", "hash_bits", "ngram_range", "max_chars", "temperature", "format"}},
+        )
+
+
+def _base_path(path: str) -> str:
+    for ext in (".json", ".npy"):
+        if path.endswith(ext):
+            return path[:-len(ext)]
+    return path
+
+
+def _softmax(logits: np.ndarray) -> np.ndarray:
+    shifted = logits - logits.max(axis=-1, keepdims=True)
+    exp = np.exp(shifted)
+    return exp / exp.sum(axis=-1, keepdims=True)
+
+
+_loaded: Dict[str, Tuple[Tuple[int, int], Optional[IndustryModel]]] = {}
+
+
+def load_industry_model(path: Optional[str] = None) -> Optional[IndustryModel]:
+    """Return the model at ``path`` (default ``AIO_INDUSTRY_MODEL_PATH``), or None when absent.
+
+    The loaded model is shared process-wide and reloaded when the weight
+    file changes.
+    """
+    base = _base_path(path or os.getenv(MODEL_PATH_ENV) or DEFAULT_MODEL_PATH)
+    try:
+        stat = os.stat(base + ".npy")
+    except OSError:
+        return None
+    stamp = (stat.st_mtime_ns, stat.st_size)
+    cached = _loaded.get(base)
+    if cached is None or cached[0] != stamp:
+        try:
+            model = IndustryModel.load(base)
+        except (OSError, ValueError, KeyError):
+            model = None
+        _loaded[base] = (stamp, model)
+    return _loaded[base][1]
+
+
+def industry_model_version() -> str:
+    """Version of the active model ("" when none), used to invalidate cached analyses."""
+    model = load_industry_model()
+    return model.version if model is not None else ""
+
+
+# ---- 学習（オフライン） ----
+
+def _feature_matrix(texts: Sequence[str], hash_bits: int, ngram_range: Tuple[int, int], max_chars: int):
+    """CSR rows of n-gram frequencies: ``(indptr, indices, values)``."""
+    indptr = [0]
+    indices: List[np.ndarray] = []
+    values: List[np.ndarray] = []
+    for text in texts:
+        buckets = ngram_buckets(text, hash_bits, ngram_range, max_chars)
+        unique, counts = np.unique(buckets, return_counts=True)
+        indices.append(unique)
+        values.append(counts / max(len(buckets), 1))
+        indptr.append(indptr[-1] + len(unique))
+    return (
+        np.array(indptr, dtype=np.int64),
+        np.concatenate(indices) if indices else np.zeros(0, dtype=np.int64),
+        np.concatenate(values) if values else np.zeros(0),
+    )
+
+
+def _csr_logits(indptr, indices, values, weights, bias) -> np.ndarray:
+    n = len(indptr) - 1
+    logits = np.tile(bias, (n, 1))
+    rows = np.flatnonzero(np.diff(indptr))
+    if rows.size:
+        contributions = values[:, None] * weights[indices]
+        logits[rows] += np.add.reduceat(contributions, indptr[rows], axis=0)
+    return logits
+
+
+def _fit_temperature(logits: np.ndarray, targets: np.ndarray) -> float:
+    """Temperature minimizing the negative log-likelihood on held-out logits."""
+    best_t, best_nll = 1.0, np.inf
+    for t in np.exp(np.linspace(np.log(0.05), np.log(20.0), 121)):
+        probabilities = _softmax(logits / t)
+        nll = -np.log(np.maximum(probabilities[np.arange(len(targets)), targets], 1e-12)).mean()
+        if nll < best_nll:
+            best_t, best_nll = float(t), nll
+    return best_t
+
+
+def train_industry_model(texts: Sequence[str], labels: Sequence[str], hash_bits: int = 18,
+                         ngram_range: Tuple[int, int] = (1, 3), max_chars: int = 4000, epochs: int = 200,
+                         learning_rate: float = 0.5, l2: float = 1e-6, validation_ratio: float = 0.2,
+                         seed: int = 0) -> IndustryModel:
+    """Fit the softmax classifier with full-batch Adam and calibrate it on a held-out split."""
+    if len(texts) != len(labels) or not texts:
+        raise ValueError("texts and labels must be non-empty and of equal length")
+    label_names = sorted(set(labels))
+    targets = np.array([label_names.index(label) for label in labels])
+    rng = np.random.default_rng(seed)
+    order = rng.permutation(len(texts))
+    n_valid = int(len(texts) * validation_ratio) if len(label_names) > 1 else 0
+    valid_ids, train_ids = order[:n_valid], order[n_valid:]
+
+    def subset(ids):
+        return _feature_matrix([texts[i] for i in ids], hash_bits, ngram_range, max_chars)
+
+    train_x, train_y = subset(train_ids), targets[train_ids]
+    n_features, n_classes = 2 ** hash_bits, len(label_names)
+    weights = np.zeros((n_features, n_classes))
+    bias = np.zeros(n_classes)
+    onehot = np.eye(n_classes)[train_y]
+    indptr, indices, values = train_x
+    doc_of_value = np.repeat(np.arange(len(indptr) - 1), np.diff(indptr))
+    moments = [np.zeros_like(weights), np.zeros_like(weights), np.zeros_like(bias), np.zeros_like(bias)]
+    beta1, beta2, eps = 0.9, 0.999, 1e-8
+    for step in range(1, epochs + 1):
+        probabilities = _softmax(_csr_logits(indptr, indices, values, weights, bias))
+        error = (probabilities - onehot) / len(train_y)
+        grad_w = np.zeros_like(weights)
+        np.add.at(grad_w, indices, values[:, None] * error[doc_of_value])
+        grad_w += l2 * weights
+        grad_b = error.sum(axis=0)
+        for param, grad, m, v in ((weights, grad_w, moments[0], moments[1]), (bias, grad_b, moments[2], moments[3])):
+            m *= beta1
+            m += (1 - beta1) * grad
+            v *= beta2
+            v += (1 - beta2) * grad ** 2
+            param -= learning_rate * (m / (1 - beta1 ** step)) / (np.sqrt(v / (1 - beta2 ** step)) + eps)
+
+    metrics: Dict = {"documents": len(texts), "train_documents": len(train_ids)}
+    temperature = 1.0
+    if n_valid:
+        valid_logits = _csr_logits(*subset(valid_ids), weights, bias)
+        temperature = _fit_temperature(valid_logits, targets[valid_ids])
+        metrics["validation_documents"] = int(n_valid)
+        metrics["validation_accuracy"] = float((valid_logits.argmax(axis=1) == targets[valid_ids]).mean())
+    return IndustryModel(
+        np.ascontiguousarray(weights, dtype=np.float32), bias, label_names, hash_bits, ngram_range, max_chars, temperature,
+        {"version": time.strftime("%Y%m%d%H%M%S"), **metrics},
+    )
+
+
+def _corpus_text(record: Dict) -> str:
+    if "text" in record:
+        return record["text"]
+    return f"{record.get('title', '')} {record.get('meta_description', '')} {record.get('content', '')}"
+
+
+def main(argv: Optional[Sequence[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Train the hashed n-gram industry classifier.")
+    parser.add_argument("corpus", help="JSON lines with 'label' and 'text' (or title/content/meta_description)")
+    parser.add_argument("output", nargs="?", default=DEFAULT_MODEL_PATH, help="output path without extension")
+    parser.add_argument("--hash-bits", type=int, default=18)
+    parser.add_argument("--epochs", type=int, default=200)
+    parser.add_argument("--max-chars", type=int, default=4000)
+    args = parser.parse_args(argv)
+    with open(args.corpus, encoding="utf-8") as f:
+        records = [json.loads(line) for line in f if line.strip()]
+    model = train_industry_model(
+        [_corpus_text(r) for r in records], [r["label"] for r in records],
+        hash_bits=args.hash_bits, epochs=args.epochs, max_chars=args.max_chars,
+    )
+    model.save(args.output)
+    print(json.dumps({k: v for k, v in model.metadata.items()}, ensure_ascii=False))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,207 @@
+# -*- coding: utf-8 -*-
+"""Streaming industry detection that stops the download early.
+
+For the quick "業界判定のみ" check the body is decoded chunk by chunk
+(``IncrementalHTMLDecoder``), visible text is pulled out by the stdlib
+incremental ``HTMLParser`` (no BeautifulSoup tree) and fed to a rolling
+keyword counter over the taxonomy matcher.  After every network chunk the
+industry scores are recomputed; the download is abandoned as soon as the
+primary industry reaches the confidence threshold and a minimum score, or
+when the byte budget is used up.  Unlike the full analysis the whole visible
+text (navigation and footer included) is counted, not only the main content.
+"""
+import time
+from collections import Counter
+from dataclasses import dataclass
+from html.parser import HTMLParser
+from typing import Callable, Optional
+
+import requests
+
+from .charset import IncrementalHTMLDecoder
+from .constants import INDUSTRY_STREAM_CONFIDENCE, INDUSTRY_STREAM_MAX_BYTES, INDUSTRY_STREAM_MIN_SCORE
+from .fetcher import create_session
+from .industry_detector import IndustryAnalysis, IndustryDetector, industry_confidence
+from .taxonomy import KeywordMatcher
+
+STREAM_CHUNK_SIZE = 16 * 1024  # 早期終了の判定間隔
+
+
+class IncrementalKeywordCounter:
+    """Count keywords over text that arrives in whitespace-separated segments.
+
+    Only the last ``max_length - 1`` characters are kept between calls, so a
+    keyword spanning two segments ("PCI" + "DSS") is still found once.
+    """
+
+    def __init__(self, matcher: KeywordMatcher):
+        self.matcher = matcher
+        self.counts: Counter = Counter()
+        self.words = 0
+        self._keep = max(matcher.max_length - 1, 0)
+        self._buffer = ""
+
+    def feed(self, segment: str) -> None:
+        segment = segment.lower()
+        self.words += len(segment.split())
+        buffer = f"{self._buffer} {segment}" if self._buffer else segment
+        end = len(buffer) - self._keep
+        if end > 0:
+            buffer = buffer[self.matcher.scan(buffer, self.counts, 0, end):]
+        self._buffer = buffer
+
+    def flush(self) -> Counter:
+        if self._buffer:
+            self.matcher.scan(self._buffer, self.counts)
+            self._buffer = ""
+        return self.counts
+
+
+class _VisibleTextParser(HTMLParser):
+    """Incremental HTML parser passing visible text, title and meta description on."""
+
+    _SKIP = frozenset({"script", "style", "noscript", "template", "svg"})
+
+    def __init__(self, on_text: Callable[[str], None]):
+        super().__init__(convert_charrefs=True)
+        self.on_text = on_text
+        self.title = ""
+        self.meta_description = ""
+        self._title_parts = []
+        self._in_title = False
+        self._skip_depth = 0
+
+    def handle_starttag(self, tag, attrs):
+        if tag in self._SKIP:
+            self._skip_depth += 1
+        elif tag == "title":
+            self._in_title = True
+        elif tag == "meta" and not self.meta_description:
+            values = dict(attrs)
+            if (values.get("name") or "").lower() == "description" and values.get("content"):
+                self.meta_description = values["content"].strip()
+                self.on_text(self.meta_description)
+
+    def handle_endtag(self, tag):
+        if tag in self._SKIP:
+            self._skip_depth = max(self._skip_depth - 1, 0)
+        elif tag == "title" and self._in_title:
+            self._in_title = False
+            self.title = "".join(self._title_parts).strip()
+            if self.title:
+                self.on_text(self.title)
+
+    def handle_data(self, data):
+        if self._skip_depth:
+            return
+        if self._in_title:
+            self._title_parts.append(data)
+            return
+        text = data.strip()
+        if text:
+            self.on_text(text)
+
+
+class StreamingIndustryDetector:
+    """Feed raw body chunks; ``feed`` returns True once no more bytes are needed."""
+
+    def __init__(self, detector: Optional[IndustryDetector] = None, content_type: str = "",
+                 confidence_threshold: float = INDUSTRY_STREAM_CONFIDENCE,
+                 min_score: float = INDUSTRY_STREAM_MIN_SCORE,
+                 max_bytes: Optional[int] = INDUSTRY_STREAM_MAX_BYTES):
+        self.detector = detector or IndustryDetector()
+        self.confidence_threshold = confidence_threshold
+        self.min_score = min_score
+        self.max_bytes = max_bytes
+        self.bytes_read = 0
+        self.reason = "complete"
+        self._decoder = IncrementalHTMLDecoder(content_type)
+        self._counter = IncrementalKeywordCounter(self.detector.taxonomy.matcher)
+        self._parser = _VisibleTextParser(self._counter.feed)
+
+    @property
+    def title(self) -> str:
+        return self._parser.title
+
+    def confident(self) -> bool:
+        scores, _ = self.detector.industry_scores(self._counter.counts)
+        primary = max(scores.values(), default=0)
+        return (
+            primary >= self.min_score
+            and industry_confidence(primary, self._counter.words) >= self.confidence_threshold
+        )
+
+    def feed(self, chunk: bytes) -> bool:
+        if self.max_bytes is not None and self.bytes_read + len(chunk) > self.max_bytes:
+            chunk = chunk[:self.max_bytes - self.bytes_read]
+            self.reason = "max_bytes"
+        self.bytes_read += len(chunk)
+        self._parser.feed(self._decoder.feed(chunk))
+        if self.reason == "max_bytes":
+            return True
+        if self.confident():
+            self.reason = "confident"
+            return True
+        return False
+
+    def finish(self) -> IndustryAnalysis:
+        self._parser.feed(self._decoder.finish())
+        self._parser.close()
+        counts = self._counter.flush()
+        return self.detector.analyze_counts(counts, self._counter.words)
+
+
+@dataclass
+class StreamingIndustryResult:
+    """Outcome of ``detect_industry_streaming``."""
+    analysis: IndustryAnalysis
+    url: str
+    final_url: str
+    status_code: int
+    title: str
+    bytes_read: int
+    stopped_early: bool
+    reason: str  # confident / max_bytes / complete
+    elapsed_ms: float
+
+
+def detect_industry_streaming(
+    url: str,
+    session: Optional[requests.Session] = None,
+    timeout: float = 10,
+    detector: Optional[IndustryDetector] = None,
+    confidence_threshold: float = INDUSTRY_STREAM_CONFIDENCE,
+    min_score: float = INDUSTRY_STREAM_MIN_SCORE,
+    max_bytes: Optional[int] = INDUSTRY_STREAM_MAX_BYTES,
+    chunk_size: int = STREAM_CHUNK_SIZE,
+) -> StreamingIndustryResult:
+    """Fetch ``url`` only as far as needed to judge its industry.
+
+    HTTP errors are raised as ``requests.HTTPError`` like ``fetch_page``.
+    """
+    session = session or create_session()
+    start = time.perf_counter()
+    response = session.get(url, timeout=timeout, stream=True)
+    try:
+        response.raise_for_status()
+        stream = StreamingIndustryDetector(
+            detector, response.headers.get("Content-Type", ""), confidence_threshold, min_score, max_bytes
+        )
+        for chunk in response.raw.stream(chunk_size, decode_content=True):
+            if stream.feed(chunk):
+                break
+    finally:
+        # 早期終了時は残りを読まずに接続ごと破棄する
+        response.close()
+    analysis = stream.finish()
+    return StreamingIndustryResult(
+        analysis=analysis,
+        url=url,
+        final_url=response.url,
+        status_code=response.status_code,
+        title=stream.title,
+        bytes_read=stream.bytes_read,
+        stopped_early=stream.reason != "complete",
+        reason=stream.reason,
+        elapsed_ms=(time.perf_counter() - start) * 1000,
+    )
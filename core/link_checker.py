@@ -0,0 +1,240 @@
+# -*- coding: utf-8 -*-
+"""Concurrent broken-link checker on top of the pooled fetch session.
+
+Links are deduplicated (fragments dropped) and checked with ``HEAD``,
+falling back to a one-byte ranged ``GET`` for servers that reject ``HEAD``.
+Requests run on a thread pool with a per-host concurrency limit, results
+are kept in a TTL cache shared between pages, and the whole check stops at
+a global time budget; links not reached in time are reported as unchecked.
+"""
+import threading
+import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from dataclasses import asdict, dataclass, field
+from itertools import zip_longest
+from typing import Dict, Iterable, List, Optional
+from urllib.parse import urldefrag, urlsplit
+
+import requests
+
+from .constants import (
+    LINK_CHECK_BUDGET_SECONDS,
+    LINK_CHECK_CACHE_TTL,
+    LINK_CHECK_HOST_CONCURRENCY,
+    LINK_CHECK_MAX_LINKS,
+    LINK_CHECK_TIMEOUT,
+)
+from .fetcher import create_session
+
+# HEAD を受け付けないサーバーが返しがちなステータス
+_HEAD_FALLBACK_STATUS = {400, 403, 405, 501}
+
+
+@dataclass
+class LinkStatus:
+    """Outcome of checking one link."""
+    url: str
+    status_code: Optional[int] = None
+    final_url: str = ""
+    redirects: List[Dict] = field(default_factory=list)
+    error: str = ""  # timeout / connection / redirect_loop / invalid / unchecked
+    method: str = "HEAD"
+    elapsed_ms: float = 0.0
+    checked_at: float = 0.0
+
+    @property
+    def category(self) -> str:
+        if self.error:
+            return self.error
+        if self.status_code >= 500:
+            return "server_error"
+        if self.status_code >= 400:
+            return "client_error"
+        return "redirect" if self.redirects else "ok"
+
+    @property
+    def broken(self) -> bool:
+        return self.category in ("client_error", "server_error", "timeout", "connection", "redirect_loop", "invalid")
+
+    def to_dict(self) -> Dict:
+        return {**asdict(self), "category": self.category}
+
+
+class LinkCheckCache:
+    """Thread-safe ``url -> LinkStatus`` cache whose entries expire after ``ttl`` seconds."""
+
+    def __init__(self, ttl: float = LINK_CHECK_CACHE_TTL):
+        self.ttl = ttl
+        self._entries: Dict[str, LinkStatus] = {}
+        self._lock = threading.Lock()
+
+    def get(self, url: str) -> Optional[LinkStatus]:
+        with self._lock:
+            status = self._entries.get(url)
+            if status is not None and time.time() - status.checked_at > self.ttl:
+                del self._entries[url]
+                return None
+            return status
+
+    def put(self, status: LinkStatus) -> None:
+        # 時間切れで未確認のものは次回確認できるよう保存しない
+        if status.error == "unchecked":
+            return
+        with self._lock:
+            self._entries[status.url] = status
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+
+def _interleave_by_host(urls: List[str]) -> List[str]:
+    """Order URLs round-robin over hosts so one large host does not block the pool."""
+    by_host: Dict[str, List[str]] = {}
+    for url in urls:
+        by_host.setdefault(urlsplit(url).netloc.lower(), []).append(url)
+    return [url for group in zip_longest(*by_host.values()) for url in group if url is not None]
+
+
+class LinkChecker:
+    """Check many links concurrently within a time budget."""
+
+    def __init__(
+        self,
+        session: Optional[requests.Session] = None,
+        host_concurrency: int = LINK_CHECK_HOST_CONCURRENCY,
+        timeout: float = LINK_CHECK_TIMEOUT,
+        budget_seconds: float = LINK_CHECK_BUDGET_SECONDS,
+        max_workers: int = 16,
+        max_links: int = LINK_CHECK_MAX_LINKS,
+        cache: Optional[LinkCheckCache] = None,
+    ):
+        self.session = session or create_session(pool_maxsize=max_workers)
+        self.host_concurrency = max(1, host_concurrency)
+        self.timeout = timeout
+        self.budget_seconds = budget_seconds
+        self.max_workers = max_workers
+        self.max_links = max_links
+        self.cache = cache if cache is not None else LinkCheckCache()
+        self._semaphores: Dict[str, threading.BoundedSemaphore] = {}
+        self._lock = threading.Lock()
+
+    def _semaphore(self, url: str) -> threading.BoundedSemaphore:
+        host = urlsplit(url).netloc.lower()
+        with self._lock:
+            if host not in self._semaphores:
+                self._semaphores[host] = threading.BoundedSemaphore(self.host_concurrency)
+            return self._semaphores[host]
+
+    def _request(self, method: str, url: str, timeout: float) -> requests.Response:
+        if method == "HEAD":
+            return self.session.head(url, allow_redirects=True, timeout=timeout)
+        response = self.session.get(
+            url, allow_redirects=True, timeout=timeout, stream=True, headers={"Range": "bytes=0-0"}
+        )
+        response.close()  # 本文は読まない
+        return response
+
+    def check_one(self, url: str, deadline: Optional[float] = None) -> LinkStatus:
+        """Check ``url`` with HEAD (ranged GET as fallback) and record redirects."""
+        status = LinkStatus(url=url)
+        start = time.monotonic()
+        with self._semaphore(url):
+            remaining = self.timeout if deadline is None else min(self.timeout, deadline - time.monotonic())
+            if remaining <= 0:
+                status.error = "unchecked"
+                return status
+            try:
+                response = self._request("HEAD", url, remaining)
+                if response.status_code in _HEAD_FALLBACK_STATUS:
+                    status.method = "GET"
+                    response = self._request("GET", url, remaining)
+                status.status_code = response.status_code
+                status.final_url = response.url
+                status.redirects = [{"url": r.url, "status_code": r.status_code} for r in response.history]
+            except requests.exceptions.Timeout:
+                status.error = "timeout"
+            except requests.exceptions.TooManyRedirects:
+                status.error = "redirect_loop"
+            except (requests.exceptions.InvalidURL, requests.exceptions.MissingSchema,
+                    requests.exceptions.InvalidSchema):
+                status.error = "invalid"
+            except requests.exceptions.RequestException:
+                status.error = "connection"
+        status.elapsed_ms = round((time.monotonic() - start) * 1000, 1)
+        status.checked_at = time.time()
+        return status
+
+    def check(self, urls: Iterable[str]) -> Dict:
+        """Check ``urls`` and return a report for ``seo_results['links']['validation']``."""
+        started = time.monotonic()
+        deadline = started + self.budget_seconds
+        unique = [u for u in dict.fromkeys(urldefrag(u)[0] for u in urls) if u.startswith(("http://", "https://"))]
+        skipped = max(0, len(unique) - self.max_links)
+        unique = unique[:self.max_links]
+
+        results: Dict[str, LinkStatus] = {}
+        pending = []
+        for url in unique:
+            cached = self.cache.get(url)
+            if cached is not None:
+                results[url] = cached
+            else:
+                pending.append(url)
+        cache_hits = len(results)
+
+        if pending:
+            pool = ThreadPoolExecutor(max_workers=min(self.max_workers, len(pending)))
+            futures = {pool.submit(self.check_one, url, deadline): url for url in _interleave_by_host(pending)}
+            not_done = set(futures)
+            while not_done:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                done, not_done = wait(not_done, timeout=remaining, return_when=FIRST_COMPLETED)
+                for future in done:
+                    status = future.result()
+                    results[futures[future]] = status
+                    self.cache.put(status)
+            # 時間予算を超えた分は待たずに打ち切る（実行中の要求はタイムアウトで終わる）
+            pool.shutdown(wait=False, cancel_futures=True)
+            for future in not_done:
+                results[futures[future]] = LinkStatus(url=futures[future], error="unchecked")
+
+        return summarize_link_statuses(
+            [results[u] for u in unique], skipped=skipped, cache_hits=cache_hits,
+            elapsed_ms=round((time.monotonic() - started) * 1000, 1),
+        )
+
+
+def summarize_link_statuses(statuses: List[LinkStatus], skipped: int = 0, cache_hits: int = 0,
+                            elapsed_ms: float = 0.0) -> Dict:
+    """Group link statuses into broken / redirected / timed out / unchecked lists."""
+    broken = [s.to_dict() for s in statuses if s.broken]
+    redirected = [s.to_dict() for s in statuses if s.redirects and not s.broken]
+    unchecked = [s.url for s in statuses if s.error == "unchecked"]
+    checked = len(statuses) - len(unchecked)
+    return {
+        "checked": checked,
+        "broken": broken,
+        "broken_count": len(broken),
+        "broken_ratio": len(broken) / checked if checked else 0.0,
+        "redirects": redirected,
+        "long_redirect_chains": sum(1 for s in redirected if len(s["redirects"]) > 1),
+        "timeouts": [s.url for s in statuses if s.error == "timeout"],
+        "unchecked": unchecked,
+        "skipped": skipped,
+        "cache_hits": cache_hits,
+        "elapsed_ms": elapsed_ms,
+    }
+
+
+def link_check_penalty(report: Optional[Dict]) -> float:
+    """Points to subtract from ``links_score`` for broken links and long redirect chains."""
+    if not report or not report.get("checked"):
+        return 0.0
+    penalty = 0.0
+    if report["broken_count"]:
+        penalty += min(4.0, 1.0 + 10.0 * report["broken_ratio"])
+    if report.get("long_redirect_chains"):
+        penalty += 0.5
+    return penalty
@@ -0,0 +1,276 @@
+# -*- coding: utf-8 -*-
+"""Compact internal link graph with PageRank, click depth and HITS.
+
+URLs are mapped to integer node IDs and edges are appended to ``array``
+buffers; a CSR adjacency (``indptr``/``indices`` in numpy) is built on demand
+as a snapshot of the graph.  All metrics are vectorized over the edge list
+with ``np.bincount`` so a 100k-page site with millions of links fits
+comfortably in memory.  While a crawl is still growing the graph,
+``refresh_ratio`` lets the snapshot (and the metrics computed on it) be
+reused until the number of edges has grown by that fraction.
+"""
+from array import array
+from typing import Dict, Iterable, List, Optional, Tuple
+
+import numpy as np
+
+from .page_cache import normalize_url
+
+
+class LinkGraph:
+    """Directed graph of internal links between pages of one site."""
+
+    def __init__(self, refresh_ratio: float = 0.0):
+        self.refresh_ratio = refresh_ratio
+        self._ids: Dict[str, int] = {}
+        self._aliases: Dict[str, int] = {}  # 正規化前のURL → ノードID（正規化を省くため）
+        self._urls: List[str] = []
+        self._src = array("i")
+        self._dst = array("i")
+        self._crawled = array("b")
+        self._csr: Optional[Tuple[np.ndarray, np.ndarray]] = None
+        self._snapshot = (0, 0)  # CSR構築時の (ノード数, 辺数)
+        self._metrics_cache: Dict[str, np.ndarray] = {}
+
+    def __len__(self) -> int:
+        return len(self._urls)
+
+    @property
+    def edge_count(self) -> int:
+        return len(self._src)
+
+    def node_id(self, url: str) -> int:
+        node = self._aliases.get(url)
+        if node is not None:
+            return node
+        key = normalize_url(url)
+        node = self._ids.get(key)
+        if node is None:
+            node = len(self._urls)
+            self._ids[key] = node
+            self._urls.append(key)
+            self._crawled.append(0)
+        self._aliases[url] = node
+        return node
+
+    def url(self, node: int) -> str:
+        return self._urls[node]
+
+    def add_page(self, url: str, links: Iterable[str]) -> None:
+        """Record ``url`` as crawled with its outgoing internal ``links``.
+
+        Duplicate links and self-links are ignored.  Re-adding a page appends
+        its new links only; call ``from_adjacency`` to rebuild from scratch.
+        """
+        source = self.node_id(url)
+        self._crawled[source] = 1
+        targets = {self.node_id(link) for link in links}
+        targets.discard(source)
+        for target in sorted(targets):
+            self._src.append(source)
+            self._dst.append(target)
+        if self._csr is not None:
+            nodes, edges = self._snapshot
+            if len(self._src) - edges > self.refresh_ratio * edges or (self.refresh_ratio == 0 and nodes != len(self)):
+                self.refresh()
+
+    def refresh(self) -> None:
+        """Drop the snapshot so the next metric call sees every page added so far."""
+        self._csr = None
+        self._metrics_cache.clear()
+
+    @property
+    def snapshot_nodes(self) -> int:
+        self.csr()
+        return self._snapshot[0]
+
+    @classmethod
+    def from_adjacency(cls, adjacency: Dict[str, Iterable[str]]) -> "LinkGraph":
+        graph = cls()
+        for url, links in adjacency.items():
+            graph.add_page(url, links)
+        return graph
+
+    def _edges(self, n: int) -> Tuple[np.ndarray, np.ndarray]:
+        src = np.array(self._src, dtype=np.int32)
+        dst = np.array(self._dst, dtype=np.int32)
+        if src.size:
+            # 同じページを複数回追加した場合の重複辺を除く
+            keys = np.unique(src.astype(np.int64) * n + dst)
+            src, dst = (keys // n).astype(np.int32), (keys % n).astype(np.int32)
+        return src, dst
+
+    def csr(self) -> Tuple[np.ndarray, np.ndarray]:
+        """Return ``(indptr, indices)`` of the out-link adjacency."""
+        if self._csr is None:
+            n = len(self._urls)
+            src, dst = self._edges(n)  # np.unique でソート済み（src 昇順）
+            counts = np.bincount(src, minlength=n)
+            indptr = np.zeros(n + 1, dtype=np.int64)
+            np.cumsum(counts, out=indptr[1:])
+            self._csr = (indptr, dst)
+            self._snapshot = (n, len(self._src))
+        return self._csr
+
+    def _sources(self) -> np.ndarray:
+        indptr, _ = self.csr()
+        return np.repeat(np.arange(len(indptr) - 1, dtype=np.int32), np.diff(indptr))
+
+    def in_degree(self) -> np.ndarray:
+        indptr, indices = self.csr()
+        return np.bincount(indices, minlength=len(indptr) - 1)
+
+    def out_degree(self) -> np.ndarray:
+        return np.diff(self.csr()[0])
+
+    def pagerank(self, damping: float = 0.85, tol: float = 1e-8, max_iter: int = 100) -> np.ndarray:
+        """Return PageRank scores summing to 1 (dangling mass spread uniformly)."""
+        if "pagerank" in self._metrics_cache:
+            return self._metrics_cache["pagerank"]
+        indptr, dst = self.csr()
+        n = len(indptr) - 1
+        if n == 0:
+            return np.zeros(0)
+        src = self._sources()
+        out_deg = self.out_degree().astype(np.float64)
+        dangling = out_deg == 0
+        inv_out = np.divide(1.0, out_deg, out=np.zeros(n), where=~dangling)
+        rank = np.full(n, 1.0 / n)
+        for _ in range(max_iter):
+            contrib = (rank * inv_out)[src]
+            new_rank = np.bincount(dst, weights=contrib, minlength=n)
+            new_rank = damping * (new_rank + rank[dangling].sum() / n) + (1.0 - damping) / n
+            delta = np.abs(new_rank - rank).sum()
+            rank = new_rank
+            if delta < tol:
+                break
+        self._metrics_cache["pagerank"] = rank
+        return rank
+
+    def hits(self, tol: float = 1e-8, max_iter: int = 100) -> Tuple[np.ndarray, np.ndarray]:
+        """Return ``(hub, authority)`` scores, each normalized to sum to 1."""
+        if "hub" in self._metrics_cache:
+            return self._metrics_cache["hub"], self._metrics_cache["authority"]
+        indptr, dst = self.csr()
+        n = len(indptr) - 1
+        src = self._sources()
+        hub = np.full(n, 1.0 / n) if n else np.zeros(0)
+        authority = hub.copy()
+        for _ in range(max_iter):
+            authority = np.bincount(dst, weights=hub[src], minlength=n)
+            authority /= authority.sum() or 1.0
+            new_hub = np.bincount(src, weights=authority[dst], minlength=n)
+            new_hub /= new_hub.sum() or 1.0
+            delta = np.abs(new_hub - hub).sum()
+            hub = new_hub
+            if delta < tol:
+                break
+        self._metrics_cache["hub"], self._metrics_cache["authority"] = hub, authority
+        return hub, authority
+
+    def click_depth(self, start_url: str) -> np.ndarray:
+        """Return BFS click depth from ``start_url`` (-1 where unreachable)."""
+        indptr, indices = self.csr()
+        n = len(indptr) - 1
+        depth = np.full(n, -1, dtype=np.int32)
+        start = self._ids.get(normalize_url(start_url))
+        if start is None or start >= n:
+            return depth
+        depth[start] = 0
+        frontier = np.array([start], dtype=np.int64)
+        level = 0
+        while frontier.size:
+            level += 1
+            starts, ends = indptr[frontier], indptr[frontier + 1]
+            lengths = ends - starts
+            if not lengths.sum():
+                break
+            # フロンティア全体の隣接ノードを一括で取り出す
+            offsets = np.repeat(starts - np.cumsum(lengths) + lengths, lengths) + np.arange(lengths.sum())
+            neighbours = np.unique(indices[offsets])
+            neighbours = neighbours[depth[neighbours] < 0]
+            depth[neighbours] = level
+            frontier = neighbours.astype(np.int64)
+        return depth
+
+    def orphans(self, start_url: Optional[str] = None) -> List[str]:
+        """Crawled pages that no other page links to (the start page excepted)."""
+        in_deg = self.in_degree()
+        crawled = np.array(self._crawled[:len(in_deg)], dtype=bool)
+        mask = crawled & (in_deg == 0)
+        start = self._ids.get(normalize_url(start_url)) if start_url else None
+        if start is not None and start < len(mask):
+            mask[start] = False
+        return [self._urls[i] for i in np.flatnonzero(mask)]
+
+    def page_metrics(self, url: str, start_url: Optional[str] = None, complete: bool = True) -> Optional[Dict]:
+        """Return the link metrics of one page, or None if it is not in the snapshot.
+
+        While the graph is still being crawled (``complete=False``) a page
+        without inlinks may yet be linked from a page not visited so far, so
+        its ``orphan`` flag is None (undetermined) instead of True, and
+        ``click_depth`` is None because the partial graph can only
+        overestimate it.
+        """
+        node = self._ids.get(normalize_url(url))
+        if node is None or node >= self.snapshot_nodes:
+            return None
+        rank = self.pagerank()
+        hub, authority = self.hits()
+        in_deg = self.in_degree()
+        percentile = float((rank < rank[node]).sum()) / max(1, len(rank) - 1) * 100 if len(rank) > 1 else 100.0
+        if start_url and complete:
+            if "depth" not in self._metrics_cache or self._metrics_cache.get("depth_start") != normalize_url(start_url):
+                self._metrics_cache["depth"] = self.click_depth(start_url)
+                self._metrics_cache["depth_start"] = normalize_url(start_url)
+            depth = int(self._metrics_cache["depth"][node])
+        else:
+            depth = None
+        orphan: Optional[bool] = bool(in_deg[node] == 0 and normalize_url(url) != normalize_url(start_url or ""))
+        if orphan and not complete:
+            orphan = None  # 辺は増える一方なので、被リンクがあれば途中でも孤立でないと確定できる
+        return {
+            "pages": len(rank),
+            "pagerank": float(rank[node]),
+            "pagerank_percentile": percentile,
+            "inlinks": int(in_deg[node]),
+            "outlinks": int(self.out_degree()[node]),
+            "click_depth": depth,
+            "hub": float(hub[node]),
+            "authority": float(authority[node]),
+            "orphan": orphan,
+        }
+
+    def summary(self, start_url: Optional[str] = None, top: int = 10) -> Dict:
+        """Site-level overview: top pages by PageRank, orphans and depth histogram."""
+        self.refresh()
+        rank = self.pagerank()
+        order = np.argsort(-rank, kind="stable")[:top]
+        result = {
+            "pages": len(rank),
+            "crawled_pages": int(sum(self._crawled)),
+            "links": int(self.csr()[1].size),
+            "top_pages": [{"url": self._urls[i], "pagerank": float(rank[i])} for i in order],
+            "orphans": self.orphans(start_url),
+        }
+        if start_url:
+            depth = self.click_depth(start_url)
+            reachable = depth[depth >= 0]
+            result["depth_histogram"] = {int(d): int(c) for d, c in zip(*np.unique(reachable, return_counts=True))}
+            result["unreachable"] = int((depth < 0).sum())
+        return result
+
+
+def format_link_context(metrics: Optional[Dict]) -> str:
+    """Return a short Japanese description of a page's position in the site graph."""
+    if not metrics:
+        return ""
+    depth = metrics.get("click_depth")
+    depth_text = "到達不可" if depth is not None and depth < 0 else (f"{depth}クリック" if depth is not None else "不明")
+    return (
+        f"サイト内PageRank: 上位{max(1.0, 100 - metrics['pagerank_percentile']):.0f}%（{metrics['pages']}ページ中）\n"
+        f"被リンク数（内部）: {metrics['inlinks']} / 発リンク数: {metrics['outlinks']}\n"
+        f"トップページからのクリック深度: {depth_text}\n"
+        f"オーソリティ: {metrics['authority']:.4f} / ハブ: {metrics['hub']:.4f}"
+        + ("\n孤立ページ（内部リンクなし）" if metrics.get("orphan") else "")
+    )
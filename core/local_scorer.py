@@ -0,0 +1,234 @@
+# -*- coding: utf-8 -*-
+"""Deterministic AIO heuristics computed from already extracted page features.
+
+Every function returns ``{"score": 0-10, "advice": str, "evidence": str}`` so
+the result can be merged directly into the AIO ``scores`` dictionary.
+"""
+from typing import Dict, List, Optional
+
+from .constants import LOCAL_AIO_CRITERIA
+from .readability import analyze_readability, readability_advice, readability_evidence
+
+_FAQ_SCHEMA_TYPES = {"FAQPage", "QAPage", "HowTo"}
+
+
+def _item(score: float, advice: str, evidence: str) -> Dict:
+    return {"score": round(max(0.0, min(10.0, score)), 1), "advice": advice, "evidence": evidence, "source": "local"}
+
+
+def _schema_types(seo_results: Dict) -> List[str]:
+    types = []
+    for t in seo_results.get("personalization", {}).get("structured_data_types", []):
+        types.extend(t if isinstance(t, list) else [t])
+    return [str(t) for t in types]
+
+
+def score_structure(seo_results: Dict) -> Dict:
+    structure = seo_results.get("structure", {})
+    headings = structure.get("headings", {})
+    score = 0.0
+    score += 2 if headings.get("h1", 0) == 1 else (1 if headings.get("h1", 0) > 1 else 0)
+    score += 2 if headings.get("h2", 0) >= 2 else (1 if headings.get("h2", 0) == 1 else 0)
+    score += 1 if headings.get("h3", 0) >= 1 else 0
+    score += 2 if structure.get("lists_count", 0) >= 1 else 0
+    score += 1 if structure.get("tables_count", 0) >= 1 else 0
+    score += 2 if structure.get("paragraphs_count", 0) >= 5 else (1 if structure.get("paragraphs_count", 0) >= 2 else 0)
+    evidence = (
+        f"H1:{headings.get('h1', 0)} H2:{headings.get('h2', 0)} H3:{headings.get('h3', 0)} "
+        f"リスト:{structure.get('lists_count', 0)} 表:{structure.get('tables_count', 0)} "
+        f"段落:{structure.get('paragraphs_count', 0)}"
+    )
+    advice = "見出し階層（H1→H2→H3）と箇条書き・表を組み合わせ、AIが要点を抽出しやすい構造にしてください。"
+    if score >= 8:
+        advice = "見出しとリストによる構造化は良好です。各セクション冒頭に要約文を置くとさらに効果的です。"
+    return _item(score, advice, evidence)
+
+
+def score_qa_compatibility(seo_results: Dict, passage_coverage: Optional[Dict] = None) -> Dict:
+    """Score Q&A friendliness; with ``passage_coverage`` the share of answered questions is blended in."""
+    structure = seo_results.get("structure", {})
+    questions = structure.get("question_headings", 0)
+    faq_schema = bool(_FAQ_SCHEMA_TYPES & set(_schema_types(seo_results)))
+    score = 6 if questions >= 3 else (3 if questions >= 1 else 0)
+    score += 3 if faq_schema else 0
+    score += 1 if structure.get("definition_lists_count", 0) >= 1 or structure.get("lists_count", 0) >= 2 else 0
+    evidence = f"質問形式の見出し:{questions} FAQ構造化データ:{'あり' if faq_schema else 'なし'}"
+    advice = "よくある質問を「〜とは？」「〜の方法は？」などの見出しにし、直後に簡潔な回答を置いてください。FAQPage構造化データの追加も有効です。"
+    if passage_coverage and passage_coverage.get("questions"):
+        # 本文中に想定質問の回答となるパッセージがあるか（BM25検索）
+        score = score * 0.7 + passage_coverage["answered_ratio"] * 10 * 0.3
+        evidence += f" 想定質問への回答:{passage_coverage['answered']}/{len(passage_coverage['questions'])}"
+        unanswered = passage_coverage.get("unanswered") or []
+        if unanswered:
+            advice += f" 本文で答えていない質問: {'、'.join(unanswered[:3])}"
+    if score >= 8:
+        advice = "質問応答形式のコンテンツが整っています。回答の冒頭1文で結論を述べる形を維持してください。"
+    return _item(score, advice, evidence)
+
+
+def score_multimodal(seo_results: Dict) -> Dict:
+    structure = seo_results.get("structure", {})
+    images = structure.get("images_count", 0)
+    with_alt = structure.get("images_with_alt", 0)
+    score = 3 if images > 0 else 0
+    score += 3 * (with_alt / images) if images else 0
+    score += 2 if structure.get("tables_count", 0) >= 1 else 0
+    score += 2 if structure.get("videos_count", 0) >= 1 else 0
+    evidence = (
+        f"画像:{images}（alt付き{with_alt}） 表:{structure.get('tables_count', 0)} "
+        f"動画:{structure.get('videos_count', 0)}"
+    )
+    advice = "図表・画像・動画を追加し、すべての画像に内容を説明するalt属性を設定してください。"
+    if score >= 8:
+        advice = "画像・表などの視覚情報が充実しています。キャプションで本文との関係を明示するとさらに引用されやすくなります。"
+    return _item(score, advice, evidence)
+
+
+def score_metadata(seo_results: Dict) -> Dict:
+    basics = seo_results.get("basics", {})
+    technical = seo_results.get("technical", {})
+    seo_scores = seo_results.get("scores", {})
+    ogp = seo_results.get("personalization", {}).get("ogp", {})
+    score = seo_scores.get("title_score", 0) * 0.25 + seo_scores.get("meta_description_score", 0) * 0.25
+    ogp_values = (
+        ogp.get("title") or basics.get("og_title"),
+        ogp.get("description") or basics.get("og_description"),
+        ogp.get("image"),
+    )
+    ogp_filled = sum(1 for v in ogp_values if v)
+    score += ogp_filled * (2 / 3)
+    score += 1 if technical.get("canonical_url") else 0
+    score += 2 if technical.get("has_structured_data") else 0
+    evidence = (
+        f"タイトル:{seo_scores.get('title_score', 0)}/10 ディスクリプション:{seo_scores.get('meta_description_score', 0)}/10 "
+        f"OGP:{ogp_filled}/3 canonical:{'あり' if technical.get('canonical_url') else 'なし'} "
+        f"構造化データ:{'あり' if technical.get('has_structured_data') else 'なし'}"
+    )
+    advice = "タイトル・メタディスクリプションの長さを最適化し、OGP・canonical・構造化データ（JSON-LD）を設定してください。"
+    if score >= 8:
+        advice = "メタデータは概ね適切に設定されています。構造化データの種類を内容に合わせて拡充してください。"
+    return _item(score, advice, evidence)
+
+
+def score_mobile_friendly(seo_results: Dict) -> Dict:
+    technical = seo_results.get("technical", {})
+    content = seo_results.get("content", {})
+    performance = technical.get("performance") or {}
+    size_kb = total_transfer_bytes(performance) / 1024 if performance else technical.get("page_size_kb", 0)
+    score = 6 if technical.get("has_viewport") else 0
+    score += 2 if size_kb <= 1024 else (1 if size_kb <= 2048 else 0)
+    score += 2 if content.get("text_html_ratio", 0) >= 10 else (1 if content.get("text_html_ratio", 0) >= 5 else 0)
+    evidence = (
+        f"viewport:{'あり' if technical.get('has_viewport') else 'なし'} "
+        f"{'転送量' if performance else 'HTMLサイズ'}:{size_kb:.0f}KB テキスト比率:{content.get('text_html_ratio', 0):.1f}%"
+    )
+    advice = "viewportメタタグを設定し、HTMLを軽量化してモバイル端末での表示を最適化してください。"
+    if score >= 8:
+        advice = "モバイル表示の基本要件を満たしています。タップ領域やフォントサイズも実機で確認してください。"
+    return _item(score, advice, evidence)
+
+
+def score_readability(main_content: str, seo_results: Optional[Dict] = None) -> Dict:
+    """Score readability from sentence lengths, character balance and page layout."""
+    details = analyze_readability(main_content or "", (seo_results or {}).get("structure"))
+    if not details["sentences"]:
+        return _item(0, "本文が少ないため読みやすさを評価できません。本文を充実させてください。", "文数:0")
+    advice = readability_advice(details) or ["読みやすさは良好です。専門用語には短い説明を添えるとさらに読みやすくなります。"]
+    item = _item(details["score"], " ".join(advice[:2]), readability_evidence(details))
+    item["details"] = details
+    return item
+
+
+def page_speed_score(performance: Dict) -> float:
+    """Return a 0-10 speed score from measured fetch metrics.
+
+    TTFB sets the base score and the total transfer weight (HTML plus any
+    measured sub-resources) subtracts a penalty.
+    """
+    ttfb = performance.get("ttfb_ms") or 0
+    if ttfb <= 200:
+        score = 10
+    elif ttfb <= 500:
+        score = 8
+    elif ttfb <= 1000:
+        score = 6
+    elif ttfb <= 2000:
+        score = 4
+    else:
+        score = 2
+    weight_mb = total_transfer_bytes(performance) / (1024 * 1024)
+    if weight_mb > 3:
+        score -= 4
+    elif weight_mb > 1:
+        score -= 2
+    score -= min(2, performance.get("redirect_count", 0))
+    return float(max(0, score))
+
+
+def total_transfer_bytes(performance: Dict) -> int:
+    """Return HTML transfer bytes plus measured sub-resource bytes."""
+    subresources = performance.get("subresources") or {}
+    return performance.get("compressed_bytes", 0) + subresources.get("total_bytes", 0)
+
+
+def score_page_speed(seo_results: Dict) -> Dict:
+    technical = seo_results.get("technical", {})
+    performance = technical.get("performance") or {}
+    size_kb = technical.get("page_size_kb", 0)
+    if performance:
+        score = page_speed_score(performance)
+        subresources = performance.get("subresources") or {}
+        evidence = (
+            f"TTFB:{performance.get('ttfb_ms', 0):.0f}ms ダウンロード:{performance.get('download_ms', 0):.0f}ms "
+            f"転送量:{total_transfer_bytes(performance) / 1024:.0f}KB "
+            f"リダイレクト:{performance.get('redirect_count', 0)}回"
+        )
+        if subresources:
+            evidence += f" サブリソース:{subresources.get('total_requests', 0)}件"
+    else:
+        if size_kb <= 500:
+            score = 10
+        elif size_kb <= 1000:
+            score = 8
+        elif size_kb <= 2000:
+            score = 6
+        elif size_kb <= 4000:
+            score = 4
+        else:
+            score = 2
+        evidence = f"HTMLサイズ:{size_kb:.0f}KB"
+    advice = "サーバー応答を高速化し（TTFB 200ms以下が目安）、HTML・画像・スクリプトを軽量化してください。"
+    if score >= 8:
+        advice = "応答速度とページ重量は良好です。画像の遅延読み込みやキャッシュ設定も確認してください。"
+    return _item(score, advice, evidence)
+
+
+def calculate_local_aio_scores(seo_results: Dict, main_content: str,
+                               passage_coverage: Optional[Dict] = None) -> Dict[str, Dict]:
+    """Return local scores for every key in ``LOCAL_AIO_CRITERIA``."""
+    scores = {
+        "structure": score_structure(seo_results),
+        "qa_compatibility": score_qa_compatibility(seo_results, passage_coverage),
+        "multimodal": score_multimodal(seo_results),
+        "metadata": score_metadata(seo_results),
+        "mobile_friendly": score_mobile_friendly(seo_results),
+        "readability": score_readability(main_content, seo_results),
+        "page_speed": score_page_speed(seo_results),
+    }
+    return {key: scores[key] for key in LOCAL_AIO_CRITERIA}
+
+
+def _mean(values: List[float]) -> float:
+    return sum(values) / len(values) if values else 0.0
+
+
+def local_category_scores(local_scores: Dict[str, Dict]) -> Dict[str, float]:
+    """Return 0-100 category scores computable from the local criteria alone."""
+    def pick(*keys):
+        return [local_scores[k]["score"] for k in keys if k in local_scores]
+
+    return {
+        "ai_search_score": _mean(pick("structure", "qa_compatibility", "multimodal")) * 10,
+        "user_experience_score": _mean(pick("readability")) * 10,
+        "technical_score": _mean(pick("mobile_friendly", "page_speed", "metadata")) * 10,
+    }
@@ -0,0 +1,256 @@
+# -*- coding: utf-8 -*-
+"""On-disk HTTP page cache with conditional-GET revalidation.
+
+Bodies are stored gzip-compressed and keyed by the normalized URL together
+with their ``ETag`` / ``Last-Modified`` validators, so a re-fetch can send
+``If-None-Match`` / ``If-Modified-Since`` and reuse the stored body on
+``304 Not Modified``.  Analysis results can be stored next to a page and are
+returned only while the page's content hash is unchanged.  The least
+recently used pages are evicted once the cache exceeds ``max_bytes``; sizes
+and recency are kept in memory (seeded by one directory scan at startup), so
+a write does not rescan the cache.
+"""
+import dataclasses
+import gzip
+import hashlib
+import json
+import os
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Any, Dict, Iterator, Mapping, Optional
+from urllib.parse import parse_qsl, urlencode, urlsplit, urlunsplit
+
+_DEFAULT_PORTS = {"http": 80, "https": 443}
+_BODY_SUFFIX = ".html.gz"
+_META_SUFFIX = ".json"
+_ANALYSIS_SUFFIX = ".analysis.json"
+
+
+def normalize_url(url: str) -> str:
+    """Return a canonical form of ``url`` used as the cache key.
+
+    The scheme and host are lowercased, default ports and fragments dropped
+    and query parameters sorted.
+    """
+    parts = urlsplit(url.strip())
+    scheme = parts.scheme.lower()
+    host = (parts.hostname or "").lower()
+    if parts.port and parts.port != _DEFAULT_PORTS.get(scheme):
+        host = f"{host}:{parts.port}"
+    query = urlencode(sorted(parse_qsl(parts.query, keep_blank_values=True)))
+    return urlunsplit((scheme, host, parts.path or "/", query, ""))
+
+
+def body_hash(body: bytes) -> str:
+    return hashlib.sha256(body).hexdigest()
+
+
+def to_jsonable(value: Any) -> Any:
+    """Convert dataclasses (e.g. ``IndustryAnalysis``) into JSON-friendly values."""
+    if dataclasses.is_dataclass(value) and not isinstance(value, type):
+        return dataclasses.asdict(value)
+    if isinstance(value, dict):
+        return {str(k): to_jsonable(v) for k, v in value.items()}
+    if isinstance(value, (list, tuple, set)):
+        return [to_jsonable(v) for v in value]
+    if hasattr(value, "item"):  # numpy scalar
+        return value.item()
+    return value
+
+
+@dataclass
+class CacheEntry:
+    """Metadata of a cached page."""
+    url: str
+    final_url: str
+    etag: str = ""
+    last_modified: str = ""
+    content_type: str = ""
+    content_hash: str = ""
+    compressed_bytes: int = 0
+    truncated: bool = False
+    stored_at: float = 0.0
+
+
+class PageCache:
+    """Directory-backed cache of page bodies and their analysis results."""
+
+    def __init__(self, directory: str, max_bytes: int = 200 * 1024 * 1024):
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+        # ページ（キー）ごとのファイルサイズ。古く使われたものから順に並べる
+        self._sizes: "OrderedDict[str, Dict[str, int]]" = OrderedDict()
+        self._total = 0
+        os.makedirs(directory, exist_ok=True)
+        self._scan()
+
+    @staticmethod
+    def _key(url: str) -> str:
+        return hashlib.sha256(normalize_url(url).encode("utf-8")).hexdigest()
+
+    def _path(self, url: str, suffix: str) -> str:
+        return os.path.join(self.directory, self._key(url) + suffix)
+
+    def _scan(self) -> None:
+        """Seed the size/recency index from the files on disk (once, at startup)."""
+        groups: Dict[str, list] = {}
+        for entry in os.scandir(self.directory):
+            if entry.is_file() and not entry.name.endswith(".tmp"):
+                key, _, suffix = entry.name.partition(".")
+                stat = entry.stat()
+                group = groups.setdefault(key, [0.0, {}])
+                group[0] = max(group[0], stat.st_mtime)
+                group[1]["." + suffix] = stat.st_size
+        for key, (_, sizes) in sorted(groups.items(), key=lambda item: item[1][0]):
+            self._sizes[key] = sizes
+            self._total += sum(sizes.values())
+
+    def _account(self, url: str, suffix: str, size: int) -> None:
+        """Record a written file and mark its page as most recently used (lock held)."""
+        key = self._key(url)
+        sizes = self._sizes.setdefault(key, {})
+        self._total += size - sizes.get(suffix, 0)
+        sizes[suffix] = size
+        self._sizes.move_to_end(key)
+
+    @staticmethod
+    def _write_atomic(path: str, data: bytes) -> None:
+        tmp = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        with open(tmp, "wb") as f:
+            f.write(data)
+        os.replace(tmp, path)
+
+    def get(self, url: str) -> Optional[CacheEntry]:
+        """Return the entry for ``url`` if both metadata and body are present."""
+        meta_path = self._path(url, _META_SUFFIX)
+        if not os.path.exists(self._path(url, _BODY_SUFFIX)):
+            return None
+        try:
+            with open(meta_path, "r", encoding="utf-8") as f:
+                data = json.load(f)
+            return CacheEntry(**data)
+        except (OSError, ValueError, TypeError):
+            return None
+
+    def conditional_headers(self, url: str) -> Dict[str, str]:
+        """Return ``If-None-Match`` / ``If-Modified-Since`` headers for ``url``."""
+        entry = self.get(url)
+        headers: Dict[str, str] = {}
+        if entry is None:
+            return headers
+        if entry.etag:
+            headers["If-None-Match"] = entry.etag
+        if entry.last_modified:
+            headers["If-Modified-Since"] = entry.last_modified
+        return headers
+
+    def load_body(self, url: str) -> Optional[bytes]:
+        """Return the stored body and mark the entry as recently used."""
+        path = self._path(url, _BODY_SUFFIX)
+        try:
+            with open(path, "rb") as f:
+                body = gzip.decompress(f.read())
+            os.utime(path, None)  # 再起動後のスキャンでも最近使ったページとして扱われるように
+            with self._lock:
+                key = self._key(url)
+                if key in self._sizes:
+                    self._sizes.move_to_end(key)
+            return body
+        except (OSError, EOFError):
+            return None
+
+    def store(self, url: str, body: bytes, headers: Mapping[str, str], final_url: str = "",
+              compressed_bytes: int = 0, truncated: bool = False) -> Optional[CacheEntry]:
+        """Store a freshly fetched body; pages without validators are skipped."""
+        etag = headers.get("ETag", "")
+        last_modified = headers.get("Last-Modified", "")
+        if not etag and not last_modified:
+            return None
+        if "no-store" in headers.get("Cache-Control", "").lower():
+            return None
+        entry = CacheEntry(
+            url=normalize_url(url),
+            final_url=final_url or url,
+            etag=etag,
+            last_modified=last_modified,
+            content_type=headers.get("Content-Type", ""),
+            content_hash=body_hash(body),
+            compressed_bytes=compressed_bytes or len(body),
+            truncated=truncated,
+            stored_at=time.time(),
+        )
+        compressed_body = gzip.compress(body, compresslevel=6)
+        meta = json.dumps(dataclasses.asdict(entry), ensure_ascii=False).encode("utf-8")
+        with self._lock:
+            self._write_atomic(self._path(url, _BODY_SUFFIX), compressed_body)
+            self._write_atomic(self._path(url, _META_SUFFIX), meta)
+            self._account(url, _BODY_SUFFIX, len(compressed_body))
+            self._account(url, _META_SUFFIX, len(meta))
+            self._evict()
+        return entry
+
+    def get_analysis(self, url: str, content_hash: str, variant: str) -> Optional[Dict]:
+        """Return results stored for ``variant`` while the content hash matches."""
+        try:
+            with open(self._path(url, _ANALYSIS_SUFFIX), "r", encoding="utf-8") as f:
+                stored = json.load(f)
+        except (OSError, ValueError):
+            return None
+        if stored.get("content_hash") != content_hash:
+            return None
+        return stored.get("variants", {}).get(variant)
+
+    def store_analysis(self, url: str, content_hash: str, variant: str, results: Dict) -> None:
+        """Store analysis ``results``; results for an older content hash are dropped."""
+        path = self._path(url, _ANALYSIS_SUFFIX)
+        with self._lock:
+            stored: Dict[str, Any] = {}
+            try:
+                with open(path, "r", encoding="utf-8") as f:
+                    stored = json.load(f)
+            except (OSError, ValueError):
+                pass
+            if stored.get("content_hash") != content_hash:
+                stored = {"content_hash": content_hash, "variants": {}}
+            stored["variants"][variant] = to_jsonable(results)
+            data = json.dumps(stored, ensure_ascii=False).encode("utf-8")
+            self._write_atomic(path, data)
+            self._account(url, _ANALYSIS_SUFFIX, len(data))
+            self._evict()
+
+    def iter_analyses(self) -> Iterator[Dict]:
+        """Yield every stored analysis result (all variants of all pages)."""
+        for entry in os.scandir(self.directory):
+            if not entry.name.endswith(_ANALYSIS_SUFFIX):
+                continue
+            try:
+                with open(entry.path, "r", encoding="utf-8") as f:
+                    stored = json.load(f)
+            except (OSError, ValueError):
+                continue
+            yield from stored.get("variants", {}).values()
+
+    def total_bytes(self) -> int:
+        return self._total
+
+    def _evict(self) -> None:
+        """Remove whole pages, least recently used first, until under ``max_bytes`` (lock held)."""
+        while self._total > self.max_bytes and self._sizes:
+            key, sizes = self._sizes.popitem(last=False)
+            for suffix in sizes:
+                try:
+                    os.remove(os.path.join(self.directory, key + suffix))
+                except OSError:
+                    pass
+            self._total -= sum(sizes.values())
+
+    def clear(self) -> None:
+        with self._lock:
+            for entry in os.scandir(self.directory):
+                if entry.is_file():
+                    os.remove(entry.path)
+            self._sizes.clear()
+            self._total = 0
@@ -0,0 +1,201 @@
+# -*- coding: utf-8 -*-
+"""Passage-level BM25 index for checking question-answer coverage locally.
+
+The main content is split into passages of a few sentences, indexed in an
+in-memory inverted index (kanji bigrams, katakana and Latin words from
+``tokenizer.index_terms``) and queried with industry-specific question sets
+built from ``INDUSTRY_CONTENTS`` and the ``IndustryDetector`` taxonomy.  For
+every question the best passage is reported with how many of the question's
+term groups it covers, so the result is explainable and the best passages
+can be sent to the LLM instead of a blind prefix of the page.
+"""
+import math
+import re
+from collections import Counter
+from dataclasses import dataclass
+from typing import Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from .constants import CONTENT_PREVIEW_CHARS, PASSAGE_MAX_CHARS
+from .industry_detector import INDUSTRY_CONTENTS
+from .tokenizer import index_terms
+
+# 句点等の後、または日本語の要素間に get_text が挟んだ空白で文を区切る
+_SENTENCE_END = re.compile(r"(?<=[。！？!?])\s*|(?<=[^\x00-\x7F])\s+(?=[^\x00-\x7F])|(?<=\.)\s+")
+
+# 業種を問わずユーザーが確認したい質問（各グループのいずれかの語があれば該当）
+COMMON_QUESTIONS = (
+    ("料金・費用はいくらですか？", (("料金", "費用", "価格", "円"),)),
+    ("問い合わせ・申し込みの方法は？", (("問い合わせ", "申し込み", "申込", "予約"),)),
+    ("所在地・アクセスは？", (("所在地", "住所", "アクセス"),)),
+    ("営業時間・対応時間は？", (("営業時間", "受付時間", "診療時間", "定休日"),)),
+    ("実績・事例はありますか？", (("実績", "事例", "導入"),)),
+)
+
+STRONG_COVERAGE = 1.0
+PARTIAL_COVERAGE = 0.5
+
+
+@dataclass
+class Question:
+    """A question and the term groups a passage must contain to answer it."""
+    text: str
+    groups: Tuple[Tuple[str, ...], ...]
+    source: str = "common"
+
+    @property
+    def terms(self) -> List[str]:
+        return [term for group in self.groups for term in group]
+
+
+def split_passages(text: str, max_chars: int = PASSAGE_MAX_CHARS) -> List[str]:
+    """Split ``text`` into passages of whole sentences up to ``max_chars``."""
+    passages: List[str] = []
+    current = ""
+    for sentence in _SENTENCE_END.split(text or ""):
+        sentence = sentence.strip()
+        if not sentence:
+            continue
+        if current and len(current) + len(sentence) + 1 > max_chars:
+            passages.append(current)
+            current = ""
+        current = f"{current} {sentence}" if current else sentence
+        while len(current) > max_chars:  # 句点のない長文は強制的に分割
+            passages.append(current[:max_chars])
+            current = current[max_chars:]
+    if current:
+        passages.append(current)
+    return passages
+
+
+class PassageIndex:
+    """In-memory inverted index over passages with BM25 scoring."""
+
+    def __init__(self, passages: Sequence[str], k1: float = 1.5, b: float = 0.75):
+        self.passages = list(passages)
+        self.k1 = k1
+        self.b = b
+        self._terms: List[Counter] = [Counter(index_terms(p)) for p in self.passages]
+        postings: Dict[str, List[Tuple[int, int]]] = {}
+        for pid, counts in enumerate(self._terms):
+            for term, tf in counts.items():
+                postings.setdefault(term, []).append((pid, tf))
+        self._postings = {
+            term: (np.array([p for p, _ in items]), np.array([tf for _, tf in items], dtype=np.float64))
+            for term, items in postings.items()
+        }
+        lengths = np.array([sum(c.values()) for c in self._terms], dtype=np.float64)
+        self._norm = k1 * (1 - b + b * lengths / (lengths.mean() if lengths.size and lengths.mean() else 1.0))
+
+    def __len__(self) -> int:
+        return len(self.passages)
+
+    def idf(self, term: str) -> float:
+        df = len(self._postings[term][0]) if term in self._postings else 0
+        n = len(self.passages)
+        return math.log(1 + (n - df + 0.5) / (df + 0.5))
+
+    def scores(self, query_terms: Sequence[str]) -> np.ndarray:
+        """BM25 score of every passage for ``query_terms``."""
+        scores = np.zeros(len(self.passages))
+        for term in set(query_terms):
+            if term not in self._postings:
+                continue
+            pids, tf = self._postings[term]
+            scores[pids] += self.idf(term) * tf * (self.k1 + 1) / (tf + self._norm[pids])
+        return scores
+
+    def search(self, query: str, top: int = 3) -> List[Tuple[int, float]]:
+        scores = self.scores(index_terms(query))
+        order = np.argsort(-scores, kind="stable")[:top]
+        return [(int(i), float(scores[i])) for i in order if scores[i] > 0]
+
+    def contains(self, pid: int, phrase: str) -> bool:
+        """True if every index term of ``phrase`` occurs in passage ``pid``."""
+        terms = index_terms(phrase)
+        return bool(terms) and all(t in self._terms[pid] for t in terms)
+
+
+def build_question_set(industry_key: Optional[str] = None, industry_name: Optional[str] = None,
+                       detector=None, max_questions: int = 20) -> List[Question]:
+    """Questions for a page: common ones plus the industry's recommended contents and key terms."""
+    questions = [Question(text, groups) for text, groups in COMMON_QUESTIONS]
+    seen = {term for q in questions for term in q.terms}
+
+    def add(keyword: str, template: str, source: str) -> None:
+        if keyword not in seen and len(questions) < max_questions:
+            seen.add(keyword)
+            questions.append(Question(template.format(keyword), ((keyword,),), source))
+
+    for keyword in INDUSTRY_CONTENTS.get(industry_key or "", {}).get("keywords", []):
+        add(keyword, "{}の情報は掲載されていますか？", "industry_contents")
+    taxonomy = getattr(detector, "industry_keywords", {}) if detector is not None else {}
+    name = industry_name if industry_name in taxonomy else INDUSTRY_CONTENTS.get(industry_key or "", {}).get("industry")
+    for level in ("primary", "secondary"):
+        for keyword in taxonomy.get(name, {}).get(level, []):
+            add(keyword, "{}について説明していますか？", f"taxonomy_{level}")
+    return questions
+
+
+def question_coverage(text: str, questions: Sequence[Question], index: Optional[PassageIndex] = None) -> Dict:
+    """Find the best answer passage for each question and grade its coverage."""
+    index = index or PassageIndex(split_passages(text))
+    results = []
+    for question in questions:
+        entry = {"question": question.text, "source": question.source, "strength": "none",
+                 "coverage": 0.0, "score": 0.0, "passage": "", "passage_id": None}
+        scores = index.scores([t for term in question.terms for t in index_terms(term)])
+        if len(scores) and scores.max() > 0:
+            pid = int(np.argmax(scores))
+            matched = sum(1 for group in question.groups if any(index.contains(pid, t) for t in group))
+            coverage = matched / len(question.groups)
+            entry.update({
+                "coverage": coverage,
+                "score": round(float(scores[pid]), 3),
+                "passage": index.passages[pid],
+                "passage_id": pid,
+                "strength": "strong" if coverage >= STRONG_COVERAGE else ("partial" if coverage >= PARTIAL_COVERAGE else "none"),
+            })
+        results.append(entry)
+    answered = sum(1 for r in results if r["strength"] == "strong")
+    return {
+        "passages": len(index),
+        "questions": results,
+        "answered": answered,
+        "answered_ratio": answered / len(results) if results else 0.0,
+        "unanswered": [r["question"] for r in results if r["strength"] == "none"],
+    }
+
+
+def build_content_preview(text: str, coverage: Optional[Dict], limit: int = CONTENT_PREVIEW_CHARS,
+                          head_ratio: float = 0.4) -> str:
+    """Return the text sent to the LLM: whole text if short, else its head plus the answer passages."""
+    text = text or ""
+    if len(text) <= limit or not coverage:
+        return text[:limit]
+    head = text[:int(limit * head_ratio)]
+    parts = [head]
+    used = len(head)
+    passages = sorted(
+        {(q["passage_id"], q["passage"]) for q in coverage["questions"] if q["passage"] and q["strength"] != "none"}
+    )
+    for _, passage in passages:
+        if passage in head:
+            continue
+        if used + len(passage) + 2 > limit:
+            break
+        parts.append(passage)
+        used += len(passage) + 2
+    return "\n…\n".join(parts)
+
+
+def format_coverage_context(coverage: Optional[Dict], max_items: int = 12) -> str:
+    """Japanese summary of question coverage for the AIO prompt."""
+    if not coverage or not coverage["questions"]:
+        return ""
+    marks = {"strong": "○", "partial": "△", "none": "×"}
+    lines = [f"想定質問への回答: {coverage['answered']}/{len(coverage['questions'])} 問（本文 {coverage['passages']} パッセージを検索）"]
+    for item in coverage["questions"][:max_items]:
+        lines.append(f"{marks[item['strength']]} {item['question']}")
+    return "\n".join(lines)
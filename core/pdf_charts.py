@@ -0,0 +1,117 @@
+# -*- coding: utf-8 -*-
+"""Vector score charts for the PDF report built with ``reportlab.graphics``.
+
+The bar and radar charts are ``Drawing`` flowables placed directly in the
+platypus story, so no raster image is rendered, encoded or embedded: the
+PDF carries a few hundred path operators per chart instead of a 300-dpi
+PNG, and text stays selectable.  Labels use the registered PDF font so
+Japanese category names render like the rest of the report.
+"""
+import math
+from typing import Sequence
+
+from reportlab.graphics.shapes import Drawing, Line, Polygon, Rect, String
+from reportlab.lib import colors
+from reportlab.lib.units import cm
+from reportlab.pdfbase.pdfmetrics import stringWidth
+
+from .constants import COLOR_PALETTE
+
+GRID_COLOR = colors.HexColor("#D0D7DE")
+
+
+def _clip(value, max_value: float) -> float:
+    try:
+        value = float(value)
+    except (TypeError, ValueError):
+        return 0.0
+    return min(max(value, 0.0), max_value)
+
+
+def bar_chart_drawing(labels: Sequence[str], values: Sequence[float], title: str = "",
+                      width: float = 16 * cm, max_value: float = 10, font_name: str = "Helvetica",
+                      axis_label: str = "スコア ( /10)", bar_height: float = 14, font_size: float = 9) -> Drawing:
+    """Horizontal bar chart (first label on top) with value labels and a 0..max_value axis."""
+    color = colors.HexColor(COLOR_PALETTE["primary"])
+    text_color = colors.HexColor(COLOR_PALETTE["text_primary"])
+    label_width = max((stringWidth(str(label), font_name, font_size) for label in labels), default=0) + 8
+    label_width = min(label_width, width * 0.4)
+    value_space = stringWidth("10.0", font_name, font_size) + 6
+    plot_width = width - label_width - value_space
+    row = bar_height * 1.6
+    title_space = font_size * 2.4 if title else 0
+    axis_space = font_size * 3.2
+    plot_height = row * len(labels)
+    height = title_space + plot_height + axis_space
+
+    drawing = Drawing(width, height)
+    x0, y0 = label_width, axis_space
+    if title:
+        drawing.add(String(width / 2, height - font_size * 1.6, title, fontName=font_name,
+                           fontSize=font_size * 1.4, fillColor=text_color, textAnchor="middle"))
+
+    # 目盛りと補助線
+    ticks = 5
+    for i in range(ticks + 1):
+        x = x0 + plot_width * i / ticks
+        drawing.add(Line(x, y0, x, y0 + plot_height, strokeColor=GRID_COLOR, strokeWidth=0.5))
+        drawing.add(String(x, y0 - font_size * 1.2, f"{max_value * i / ticks:g}", fontName=font_name,
+                           fontSize=font_size * 0.9, fillColor=text_color, textAnchor="middle"))
+    drawing.add(Line(x0, y0, x0, y0 + plot_height, strokeColor=text_color, strokeWidth=0.7))
+    if axis_label:
+        drawing.add(String(x0 + plot_width / 2, font_size * 0.4, axis_label, fontName=font_name,
+                           fontSize=font_size, fillColor=text_color, textAnchor="middle"))
+
+    for i, (label, value) in enumerate(zip(labels, values)):
+        clipped = _clip(value, max_value)
+        y = y0 + plot_height - row * (i + 1) + (row - bar_height) / 2
+        bar_width = plot_width * clipped / max_value if max_value else 0
+        drawing.add(Rect(x0, y, bar_width, bar_height, fillColor=color, strokeColor=None))
+        baseline = y + bar_height / 2 - font_size * 0.35
+        drawing.add(String(x0 - 4, baseline, str(label), fontName=font_name, fontSize=font_size,
+                           fillColor=text_color, textAnchor="end"))
+        drawing.add(String(x0 + bar_width + 3, baseline, f"{clipped:.1f}", fontName=font_name,
+                           fontSize=font_size, fillColor=text_color))
+    return drawing
+
+
+def radar_chart_drawing(labels: Sequence[str], values: Sequence[float], size: float = 12 * cm,
+                        max_value: float = 100, font_name: str = "Helvetica", font_size: float = 9,
+                        rings: int = 5) -> Drawing:
+    """Radar chart with the first axis at the top, going clockwise."""
+    color = colors.HexColor(COLOR_PALETTE["primary"])
+    text_color = colors.HexColor(COLOR_PALETTE["text_primary"])
+    drawing = Drawing(size, size)
+    n = len(labels)
+    if n < 3:
+        return drawing
+    cx = cy = size / 2
+    label_margin = max(stringWidth(str(label), font_name, font_size) for label in labels) / 2 + font_size
+    radius = size / 2 - max(label_margin, font_size * 2.5)
+    angles = [math.pi / 2 - 2 * math.pi * i / n for i in range(n)]
+
+    def point(angle, r):
+        return cx + r * math.cos(angle), cy + r * math.sin(angle)
+
+    def ring(r):
+        return [c for angle in angles for c in point(angle, r)]
+
+    for k in range(1, rings + 1):
+        r = radius * k / rings
+        drawing.add(Polygon(ring(r), fillColor=None, strokeColor=GRID_COLOR, strokeWidth=0.5))
+        drawing.add(String(cx + 2, cy + r + 1, f"{max_value * k / rings:g}", fontName=font_name,
+                           fontSize=font_size * 0.8, fillColor=text_color))
+    for angle, label in zip(angles, labels):
+        x, y = point(angle, radius)
+        drawing.add(Line(cx, cy, x, y, strokeColor=GRID_COLOR, strokeWidth=0.5))
+        lx, ly = point(angle, radius + font_size * 0.8)
+        cos = math.cos(angle)
+        anchor = "middle" if abs(cos) < 0.2 else ("start" if cos > 0 else "end")
+        ly -= font_size * (0.9 if math.sin(angle) < -0.2 else 0.35 if abs(math.sin(angle)) <= 0.2 else 0)
+        drawing.add(String(lx, ly, str(label), fontName=font_name, fontSize=font_size,
+                           fillColor=text_color, textAnchor=anchor))
+
+    scale = radius / max_value if max_value else 0
+    data = [c for angle, value in zip(angles, values) for c in point(angle, _clip(value, max_value) * scale)]
+    drawing.add(Polygon(data, fillColor=color, fillOpacity=0.25, strokeColor=color, strokeWidth=1.5))
+    return drawing
@@ -0,0 +1,614 @@
+# -*- coding: utf-8 -*-
+"""PDF report built from an analysis results dict alone.
+
+The module only needs ReportLab (and Matplotlib, imported lazily as a
+fallback for charts), not the Streamlit app, so background report jobs and
+bulk report worker processes import it without pulling in the UI, the
+OpenAI client or the app's environment setup.  The Japanese PDF font is
+registered once at import time.
+"""
+import io
+import os
+import sys
+from datetime import datetime
+from typing import List, Optional, Tuple
+
+import numpy as np
+from reportlab.lib import colors
+from reportlab.lib.enums import TA_CENTER
+from reportlab.lib.pagesizes import A4
+from reportlab.lib.styles import ParagraphStyle, getSampleStyleSheet
+from reportlab.lib.units import cm, mm
+from reportlab.lib.utils import ImageReader
+from reportlab.pdfbase import pdfmetrics
+from reportlab.pdfbase.ttfonts import TTFont
+from reportlab.platypus import (
+    Image as ReportLabImage,
+    ListFlowable,
+    ListItem,
+    PageBreak,
+    Paragraph,
+    SimpleDocTemplate,
+    Spacer,
+    Table,
+    TableStyle,
+)
+
+from .constants import (
+    AIO_SCORE_MAP_JP,
+    AIO_SCORE_MAP_JP_LOWER,
+    AIO_SCORE_MAP_JP_UPPER,
+    APP_NAME,
+    APP_VERSION,
+    COLOR_PALETTE,
+    PDF_STREAM_CHUNK_SIZE,
+    SEO_SCORE_LABELS,
+)
+from .pdf_charts import bar_chart_drawing, radar_chart_drawing
+
+_WINDOWS_FONTS = (("MSGothic", "C:/Windows/Fonts/msgothic.ttc"), ("Meiryo", "C:/Windows/Fonts/meiryo.ttc"))
+_MAC_FONTS = (
+    ("HiraginoSansW3", "/System/Library/Fonts/ヒラギノ角ゴシック W3.ttc"),
+    ("HiraginoSansW3", "/Library/Fonts/ヒラギノ角ゴシック W3.ttc"),
+    ("HiraginoSansW3", "/System/Library/Fonts/Hiragino Sans GB.ttc"),
+    ("PingFang", "/System/Library/Fonts/PingFang.ttc"),
+)
+_LINUX_FONTS = (
+    ("NotoSansJP", "/usr/share/fonts/truetype/noto/NotoSansCJK-Regular.ttc"),
+    ("NotoSansJP", "/usr/share/fonts/truetype/noto/NotoSansCJKjp-Regular.otf"),
+)
+
+
+def register_japanese_font() -> str:
+    """Register the first available Japanese font and return its PDF name (Helvetica if none)."""
+    if os.name == "nt":
+        candidates = _WINDOWS_FONTS
+    elif sys.platform == "darwin":
+        candidates = _MAC_FONTS
+    else:
+        candidates = _LINUX_FONTS
+    for font_name, path in candidates:
+        if not os.path.exists(path):
+            continue
+        try:
+            pdfmetrics.registerFont(TTFont(font_name, path))
+            return font_name
+        except Exception as e:
+            print(f"日本語フォント登録試行エラー ({path}): {e}")
+    return "Helvetica"
+
+
+DEFAULT_PDF_FONT = register_japanese_font()
+
+# PDFのグラフはベクター描画。Matplotlibは描画に失敗したときの代替のみ
+_pyplot_module = None
+
+
+def _pyplot():
+    """Import Matplotlib (Agg backend, Japanese fonts) on first use."""
+    global _pyplot_module
+    if _pyplot_module is None:
+        import matplotlib
+        matplotlib.use('Agg')
+        import matplotlib.pyplot as plt
+
+        # 日本語フォント対応
+        plt.rcParams['font.family'] = 'sans-serif'
+        if os.name == 'nt':
+            if os.path.exists('C:/Windows/Fonts/meiryo.ttc'):
+                plt.rcParams['font.sans-serif'] = ['Meiryo', 'MS Gothic', 'Yu Gothic', 'sans-serif']
+            elif os.path.exists('C:/Windows/Fonts/msgothic.ttc'):
+                plt.rcParams['font.sans-serif'] = ['MS Gothic', 'sans-serif']
+        elif sys.platform == 'darwin':
+            plt.rcParams['font.sans-serif'] = ['Hiragino Sans', 'AppleGothic', 'sans-serif']
+        else:
+            plt.rcParams['font.sans-serif'] = ['Noto Sans CJK JP', 'sans-serif']
+        _pyplot_module = plt
+    return _pyplot_module
+
+
+def add_corner(canvas, doc_obj) -> None:
+    """Draw a small blue square on page corners."""
+    canvas.saveState()
+    canvas.setFillColor(colors.HexColor(COLOR_PALETTE["primary"]))
+    x = doc_obj.pagesize[0] - 25
+    y = doc_obj.pagesize[1] - 25
+    canvas.rect(x, y, 15, 15, fill=1, stroke=0)
+    canvas.restoreState()
+
+
+def section_break(story, width) -> None:
+    """Insert a thin divider line."""
+    line = Table(
+        [[""]],
+        colWidths=[width],
+        style=TableStyle(
+            [
+                ("LINEBELOW", (0, 0), (-1, -1), 0.5, colors.HexColor(COLOR_PALETTE["divider"]))
+            ]
+        ),
+    )
+    story.append(Spacer(1, 2 * mm))
+    story.append(line)
+    story.append(Spacer(1, 2 * mm))
+
+
+class PDFReportBuilder:
+    """分析結果の dict（analyze_url の戻り値）だけから強化版PDFレポートを生成する
+
+    分析器のインスタンスを必要としないため、バックグラウンドのジョブや
+    一括生成のワーカープロセスからも使える。logo_path はパスまたは画像の
+    バイナリバッファ。
+    """
+
+    def __init__(self, results, logo_path=None):
+        if not results:
+            raise ValueError("分析結果がありません。分析を先に実行してください。")
+        self.results = results
+        self.seo_results = results.get("seo_results") or {}
+        self.aio_results = results.get("aio_results") or {}
+        self.logo_path = logo_path
+
+    def to_bytes(self) -> bytes:
+        buffer = io.BytesIO()
+        self.write(buffer)
+        return buffer.getvalue()
+
+    def iter_chunks(self, chunk_size=PDF_STREAM_CHUNK_SIZE):
+        pdf_bytes = memoryview(self.to_bytes())
+        for start in range(0, len(pdf_bytes), chunk_size):
+            yield bytes(pdf_bytes[start:start + chunk_size])
+
+    def write(self, out):
+        """強化版PDF生成（グラフ含む）
+
+        out はバイナリの書き込み先（BytesIO など）。一時ファイルは作らず、
+        グラフもベクター描画（代替のPNGもメモリ上のバッファ）で埋め込む。
+        """
+        logo_path = self.logo_path
+
+        def safe_str(value, default=""):
+            return str(value) if value is not None else default
+
+        doc = SimpleDocTemplate(
+            out,
+            pagesize=A4,
+            rightMargin=2*cm,
+            leftMargin=2*cm,
+            topMargin=2*cm,
+            bottomMargin=2*cm,
+        )
+
+
+        styles = getSampleStyleSheet()
+        title_style = ParagraphStyle(
+            'DocTitle',
+            parent=styles['h1'],
+            fontName=DEFAULT_PDF_FONT,
+            fontSize=22,
+            alignment=TA_CENTER,
+            spaceAfter=6*mm,
+            textColor=colors.HexColor(COLOR_PALETTE["secondary"]),
+        )
+        h1_style = ParagraphStyle(
+            'DocH1',
+            parent=styles['h1'],
+            fontName=DEFAULT_PDF_FONT,
+            fontSize=16,
+            spaceBefore=6*mm,
+            spaceAfter=3*mm,
+            textColor=colors.HexColor(COLOR_PALETTE["primary"]),
+        )
+        h2_style = ParagraphStyle(
+            'DocH2',
+            parent=styles['h2'],
+            fontName=DEFAULT_PDF_FONT,
+            fontSize=14,
+            spaceBefore=4*mm,
+            spaceAfter=2*mm,
+            textColor=colors.HexColor(COLOR_PALETTE["secondary"]),
+        )
+        normal_style = ParagraphStyle(
+            'DocNormal',
+            parent=styles['Normal'],
+            fontName=DEFAULT_PDF_FONT,
+            fontSize=10,
+            spaceAfter=2*mm,
+            leading=14,
+            textColor=colors.HexColor(COLOR_PALETTE["text_primary"]),
+        )
+        centered_style = ParagraphStyle('DocCentered', parent=normal_style, alignment=TA_CENTER, fontName=DEFAULT_PDF_FONT)
+
+        story = []
+
+
+        # ロゴ
+        if logo_path and (hasattr(logo_path, "read") or os.path.exists(logo_path)):
+            try:
+                img = ReportLabImage(logo_path, width=40*mm, height=15*mm)
+                story.append(img)
+                story.append(Spacer(1, 2*mm))
+            except Exception as e:
+                print(f"ロゴ画像の読み込みに失敗: {e}")
+
+        # タイトル
+        story.append(Paragraph(f"{APP_NAME} 詳細分析レポート", title_style))
+        story.append(Paragraph(f"分析日時: {datetime.now().strftime('%Y年%m月%d日 %H:%M')}", centered_style))
+        story.append(Spacer(1, 6*mm))
+
+        # 1. エグゼクティブサマリー
+        story.append(Paragraph("<u>1. エグゼクティブサマリー</u>", h1_style))
+        section_break(story, doc.width)
+        story.append(Paragraph(f"<b>対象URL:</b> {self.results['url']}", normal_style))
+        
+        final_industry = self.results['final_industry']
+        industry_analysis = self.results['industry_analysis']
+        integrated_results = self.results["integrated_results"]
+        
+        story.append(Paragraph(f"<b>業界判定:</b> {final_industry['primary']} ({final_industry['source']})", normal_style))
+        story.append(Paragraph(f"<b>総合スコア:</b> {integrated_results.get('integrated_score',0.0):.1f}/100", normal_style))
+        story.append(Paragraph(f"<b>SEOスコア:</b> {integrated_results.get('seo_score',0.0):.1f}/100", normal_style))
+        story.append(Paragraph(f"<b>AIOスコア:</b> {integrated_results.get('aio_score',0.0):.1f}/100", normal_style))
+        story.append(Paragraph(f"<b>主要改善領域:</b> {integrated_results.get('primary_focus', 'N/A')}", normal_style))
+
+        improvements = integrated_results.get('improvements', [])[:3]
+        if improvements:
+            bullet_items = [ListItem(Paragraph(imp, normal_style)) for imp in improvements]
+            story.append(ListFlowable(bullet_items, bulletType='bullet'))
+
+        advice_txt = self.results.get("industry_advice", "")
+        if advice_txt:
+            story.append(Spacer(1, 2*mm))
+            story.append(Paragraph(f"<b>業界向けアドバイス:</b> {advice_txt}", normal_style))
+
+        story.append(Spacer(1, 5*mm))
+
+        # スコア分布グラフの追加
+        story.append(Paragraph("<u>2. スコア分析（視覚化）</u>", h1_style))
+        section_break(story, doc.width)
+        
+        # グラフはベクター描画（失敗時のみMatplotlibのPNGで代替）
+        charts = [
+            ("SEOスコア分布", self._seo_chart_data(), 16 * cm, self._seo_chart_drawing, self._create_seo_score_graph),
+            ("AIOスコア分布", self._aio_chart_data(), 16 * cm, self._aio_chart_drawing, self._create_aio_score_graph),
+            ("AIOカテゴリ レーダーチャート", self._radar_chart_data(), 12 * cm,
+             self._radar_chart_drawing, self._create_aio_radar_graph),
+        ]
+        for heading, data, width, draw, fallback in charts:
+            if not data:
+                continue
+            flowable = self._chart_flowable(data, width, draw, fallback)
+            if flowable is not None:
+                story.append(Paragraph(heading, h2_style))
+                story.append(flowable)
+                story.append(PageBreak())
+
+        story.append(Spacer(1, 5*mm))
+
+        # 3. SEO分析結果
+        story.append(Paragraph("<u>3. SEO分析結果</u>", h1_style))
+        section_break(story, doc.width)
+        seo_res = self.results.get("seo_results", {})
+        basics = seo_res.get("basics", {})
+        garbled = seo_res.get("garbled", {})
+        title_txt = safe_str(basics.get('title'))
+        if garbled.get('title'):
+            title_txt += " (文字化けの可能性あり)"
+        story.append(Paragraph(f"<b>タイトル:</b> {title_txt}", normal_style))
+        desc_txt = safe_str(basics.get('meta_description'))
+        if garbled.get('meta_description'):
+            desc_txt += " (文字化けの可能性あり)"
+        story.append(Paragraph(f"<b>メタディスクリプション:</b> {desc_txt}", normal_style))
+        story.append(Paragraph(f"<b>タイトル文字数:</b> {basics.get('title_length',0)}", normal_style))
+        story.append(Paragraph(f"<b>ディスクリプション文字数:</b> {basics.get('meta_description_length',0)}", normal_style))
+        story.append(Paragraph(
+            "これらのスコアは検索結果での表示最適化に影響します。値が低い項目は優先的に調整してください。",
+            normal_style))
+
+        story.append(PageBreak())
+
+        # 4. 業界特化分析
+        story.append(Paragraph("<u>4. 業界特化分析</u>", h1_style))
+        section_break(story, doc.width)
+        aio_res = self.results.get("aio_results", {})
+        industry_analysis_result = aio_res.get("industry_analysis", {})
+        
+        if industry_analysis_result:
+            story.append(Paragraph(f"<b>業界適合度:</b>", h2_style))
+            story.append(Paragraph(f"{safe_str(industry_analysis_result.get('industry_fit'))}", normal_style))
+            story.append(Spacer(1, 3*mm))
+            
+            story.append(Paragraph(f"<b>市場トレンド分析:</b>", h2_style))
+            story.append(Paragraph(f"{safe_str(industry_analysis_result.get('market_trends'))}", normal_style))
+            story.append(Spacer(1, 3*mm))
+            
+            story.append(Paragraph(f"<b>業界特化改善提案:</b>", h2_style))
+            story.append(Paragraph(f"{safe_str(industry_analysis_result.get('specialized_improvements'))}", normal_style))
+            story.append(Spacer(1, 3*mm))
+            
+            story.append(Paragraph(f"<b>規制対応状況:</b>", h2_style))
+            story.append(Paragraph(f"{safe_str(industry_analysis_result.get('compliance_check'))}", normal_style))
+
+        # 5. 即効改善施策（詳細版）
+        story.append(Paragraph("<u>5. 即効改善施策（1-2週間）</u>", h1_style))
+        section_break(story, doc.width)
+        immediate_actions = aio_res.get("immediate_actions", [])
+        for i, action in enumerate(immediate_actions, 1):
+            story.append(Paragraph(f"<b>{i}. {safe_str(action.get('action'))}</b>", h2_style))
+            story.append(Paragraph(f"<b>実装方法:</b> {safe_str(action.get('method'))}", normal_style))
+            story.append(Paragraph(f"<b>期待効果:</b> {safe_str(action.get('expected_impact'))}", normal_style))
+            story.append(Spacer(1, 3*mm))
+
+        # 6. 中期戦略施策
+        story.append(Paragraph("<u>6. 中期戦略施策（1-3ヶ月）</u>", h1_style))
+        section_break(story, doc.width)
+        medium_term_strategies = aio_res.get("medium_term_strategies", [])
+        for i, strategy in enumerate(medium_term_strategies, 1):
+            story.append(Paragraph(f"<b>{i}. {safe_str(strategy.get('strategy'))}</b>", h2_style))
+            story.append(Paragraph(f"<b>実装期間:</b> {safe_str(strategy.get('timeline'))}", normal_style))
+            story.append(Paragraph(f"<b>期待成果:</b> {safe_str(strategy.get('expected_outcome'))}", normal_style))
+            story.append(Spacer(1, 3*mm))
+
+        story.append(PageBreak())
+
+        # 7. 競合差別化ポイント（詳細版）
+        story.append(Paragraph("<u>7. 競合差別化ポイント</u>", h1_style))
+        section_break(story, doc.width)
+        competitive_advantages = aio_res.get("competitive_advantages", [])
+        for i, advantage in enumerate(competitive_advantages, 1):
+            story.append(Paragraph(f"<b>{i}. {safe_str(advantage.get('advantage'))}</b>", h2_style))
+            story.append(Paragraph(f"<b>実装方法:</b> {safe_str(advantage.get('implementation'))}", normal_style))
+            story.append(Spacer(1, 3*mm))
+
+        # 8. 市場トレンド対応戦略（新機能）
+        story.append(Paragraph("<u>8. 市場トレンド対応戦略</u>", h1_style))
+        section_break(story, doc.width)
+        market_trend_strategies = aio_res.get("market_trend_strategies", [])
+        if market_trend_strategies:
+            for i, trend_strategy in enumerate(market_trend_strategies, 1):
+                story.append(Paragraph(f"<b>{i}. トレンド: {safe_str(trend_strategy.get('trend'))}</b>", h2_style))
+                story.append(Paragraph(f"<b>対応戦略:</b> {safe_str(trend_strategy.get('strategy'))}", normal_style))
+                story.append(Paragraph(f"<b>優先度:</b> {safe_str(trend_strategy.get('priority'))}", normal_style))
+                story.append(Spacer(1, 3*mm))
+        else:
+            story.append(Paragraph("市場トレンド分析データが利用できません。", normal_style))
+
+        # 9. 詳細スコア分析
+        story.append(Paragraph("<u>9. 詳細スコア分析</u>", h1_style))
+        section_break(story, doc.width)
+        
+        # AIOスコア詳細
+        story.append(Paragraph("AIO評価項目詳細", h2_style))
+        scores_data = aio_res.get("scores", {})
+        
+        # 上位8項目
+        story.append(Paragraph("【E-E-A-T及びAI検索最適化項目】", normal_style))
+        for key_eng, label_jp in AIO_SCORE_MAP_JP_UPPER.items():
+            score_item = scores_data.get(key_eng, {"score":0, "advice":"N/A"})
+            story.append(Paragraph(f"<b>{label_jp}: {score_item.get('score',0)}/10</b>", normal_style))
+            story.append(Paragraph(f"{score_item.get('advice','N/A')}", normal_style))
+            story.append(Spacer(1, 2*mm))
+
+        story.append(Spacer(1, 3*mm))
+        
+        # 下位8項目
+        story.append(Paragraph("【ユーザー体験・技術項目】", normal_style))
+        for key_eng, label_jp in AIO_SCORE_MAP_JP_LOWER.items():
+            score_item = scores_data.get(key_eng, {"score":0, "advice":"N/A"})
+            story.append(Paragraph(f"<b>{label_jp}: {score_item.get('score',0)}/10</b>", normal_style))
+            story.append(Paragraph(f"{score_item.get('advice','N/A')}", normal_style))
+            story.append(Spacer(1, 2*mm))
+
+        story.append(PageBreak())
+
+        # 10. 結論と次のステップ
+        story.append(Paragraph("<u>10. 結論と次のステップ</u>", h1_style))
+        section_break(story, doc.width)
+        story.append(Paragraph(
+            "本レポートではSEOとAIOの両面から課題を抽出しました。以下の優先アクションに沿って改善を進めてください。",
+            normal_style))
+
+        all_actions = integrated_results.get('improvements', [])
+        if all_actions:
+            bullet_items = [ListItem(Paragraph(act, normal_style)) for act in all_actions]
+            story.append(ListFlowable(bullet_items, bulletType='bullet'))
+
+        story.append(Paragraph(
+            "施策実施後は再度分析を行い、数値改善を確認することを推奨します。",
+            normal_style))
+
+        # フッター
+        story.append(Spacer(1, 10*mm))
+        story.append(Paragraph(f"このレポートは{APP_NAME} v{APP_VERSION}によって生成されました。", centered_style))
+        story.append(Paragraph("最新の市場トレンドと業界動向を反映した分析結果です。", centered_style))
+
+        try:
+            doc.build(story, onFirstPage=add_corner, onLaterPages=add_corner)
+        except Exception as e_build:
+            print(f"PDFのビルド中にエラーが発生しました: {str(e_build)}")
+            import traceback
+            traceback.print_exc()
+            raise Exception(f"PDFのビルドエラー: {str(e_build)}")
+
+    def _seo_chart_data(self) -> Optional[Tuple[List[str], List[float]]]:
+        """SEOスコアグラフのラベルと値"""
+        scores = (self.seo_results or {}).get("scores", {})
+        if not scores:
+            return None
+        labels = [SEO_SCORE_LABELS.get(k, k.replace("_score", "").title()) for k in scores.keys()]
+        return labels, list(scores.values())
+
+    def _aio_chart_data(self) -> Optional[Tuple[List[str], List[float]]]:
+        """AIOスコアグラフのラベルと値"""
+        scores_data = (self.aio_results or {}).get("scores", {})
+        if not scores_data:
+            return None
+        labels = [AIO_SCORE_MAP_JP.get(k, k.title()) for k in AIO_SCORE_MAP_JP.keys()]
+        values = [scores_data.get(k, {"score": 0}).get("score", 0) for k in AIO_SCORE_MAP_JP.keys()]
+        return labels, values
+
+    def _radar_chart_data(self) -> Optional[Tuple[List[str], List[float]]]:
+        """AIOカテゴリ レーダーチャートのラベルと値"""
+        if not self.aio_results:
+            return None
+        cat = self.aio_results.get("category_scores", {})
+        labels = ["E-E-A-T", "AI検索最適化", "ユーザー体験", "技術", "業種適合性", "AIO総合"]
+        values = [
+            cat.get("eeat_score", 0),
+            cat.get("ai_search_score", 0),
+            cat.get("user_experience_score", 0),
+            cat.get("technical_score", 0),
+            self.results.get("industry_fit_score", 0),
+            self.aio_results.get("total_score", 0),
+        ]
+        return labels, values
+
+    @staticmethod
+    def _seo_chart_drawing(data, width):
+        return bar_chart_drawing(*data, title="SEOスコア分布", width=width, font_name=DEFAULT_PDF_FONT)
+
+    @staticmethod
+    def _aio_chart_drawing(data, width):
+        return bar_chart_drawing(*data, title="AIOスコア分布", width=width, font_name=DEFAULT_PDF_FONT)
+
+    @staticmethod
+    def _radar_chart_drawing(data, width):
+        return radar_chart_drawing(*data, size=width, font_name=DEFAULT_PDF_FONT)
+
+    @staticmethod
+    def _chart_flowable(data, width, draw, fallback):
+        """グラフのフローアブル（ベクター描画に失敗した場合のみPNGを埋め込む）"""
+        try:
+            return draw(data, width)
+        except Exception as e:
+            print(f"ベクターグラフ描画エラー（Matplotlibで代替）: {e}")
+        graph_png = fallback()
+        if not graph_png:
+            return None
+        try:
+            w, h = ImageReader(graph_png).getSize()
+            graph_png.seek(0)
+            return ReportLabImage(graph_png, width=width, height=width * h / float(w))
+        except Exception as e:
+            print(f"グラフ画像挿入エラー: {e}")
+            return None
+
+    def _create_seo_score_graph(self):
+        """SEOスコアグラフ生成（Matplotlib・ベクター描画の代替、PNGのBytesIOを返す）"""
+        try:
+            data = self._seo_chart_data()
+            if not data:
+                return None
+            labels, values = data
+            plt = _pyplot()
+
+            num_labels = len(labels)
+            fig_height = max(0.6 * num_labels, 4)
+            fig, ax = plt.subplots(figsize=(10, fig_height))
+            bars = ax.barh(labels, values, color=COLOR_PALETTE["primary"], height=0.6)
+            ax.set_xlim(0, 10)
+            ax.set_xlabel("スコア ( /10)", fontsize=12)
+            ax.set_title("SEOスコア分布", fontsize=16, fontweight='bold')
+            ax.tick_params(axis='y', labelsize=12)
+            ax.tick_params(axis='x', labelsize=11)
+            ax.invert_yaxis()
+
+            for bar, value in zip(bars, values):
+                ax.text(
+                    value + 0.1,
+                    bar.get_y() + bar.get_height() / 2.0,
+                    f"{value:.1f}",
+                    va='center',
+                    ha='left',
+                    fontsize=11,
+                )
+
+            plt.tight_layout()
+
+            graph_png = io.BytesIO()
+            plt.savefig(graph_png, format="png", dpi=300, bbox_inches='tight')
+            plt.close()
+            graph_png.seek(0)
+            return graph_png
+            
+        except Exception as e:
+            print(f"SEOグラフ生成エラー: {e}")
+            return None
+
+    def _create_aio_score_graph(self):
+        """AIOスコアグラフ生成（縦長・拡大版、Matplotlib・ベクター描画の代替、PNGのBytesIOを返す）"""
+        try:
+            data = self._aio_chart_data()
+            if not data:
+                return None
+            labels, values = data
+            plt = _pyplot()
+
+            num_labels = len(labels)
+            fig_height = max(0.6 * num_labels, 6)
+            fig, ax = plt.subplots(figsize=(10, fig_height))
+            bars = ax.barh(labels, values, color=COLOR_PALETTE["primary"], height=0.6)
+            ax.set_xlim(0, 10)
+            ax.set_xlabel("スコア ( /10)", fontsize=12)
+            ax.set_title("AIOスコア分布", fontsize=16, fontweight='bold')
+            ax.tick_params(axis='y', labelsize=11)
+            ax.tick_params(axis='x', labelsize=11)
+            ax.invert_yaxis()
+
+            for bar, value in zip(bars, values):
+                ax.text(
+                    value + 0.1,
+                    bar.get_y() + bar.get_height() / 2.0,
+                    f"{value:.1f}",
+                    va='center',
+                    ha='left',
+                    fontsize=11,
+                )
+
+            plt.tight_layout()
+
+            graph_png = io.BytesIO()
+            plt.savefig(graph_png, format="png", dpi=300, bbox_inches='tight')
+            plt.close()
+            graph_png.seek(0)
+            return graph_png
+
+        except Exception as e:
+            print(f"AIOグラフ生成エラー: {e}")
+            return None
+
+    def _create_aio_radar_graph(self):
+        """AIOカテゴリのレーダーチャート生成（Matplotlib・ベクター描画の代替、PNGのBytesIOを返す）"""
+        try:
+            data = self._radar_chart_data()
+            if not data:
+                return None
+            labels, values = data
+            plt = _pyplot()
+
+            angles = np.linspace(0, 2 * np.pi, len(labels), endpoint=False).tolist()
+            values += values[:1]
+            angles += angles[:1]
+            fig = plt.figure(figsize=(6, 6))
+            ax = plt.subplot(111, polar=True)
+            ax.plot(angles, values, color=COLOR_PALETTE["primary"])
+            ax.fill(angles, values, color=COLOR_PALETTE["primary"], alpha=0.25)
+            ax.set_thetagrids([a * 180 / np.pi for a in angles[:-1]], labels)
+            ax.set_ylim(0, 100)
+
+            plt.tight_layout()
+            graph_png = io.BytesIO()
+            plt.savefig(graph_png, format="png", dpi=300, bbox_inches="tight")
+            plt.close()
+            graph_png.seek(0)
+            return graph_png
+
+        except Exception as e:
+            print(f"AIOレーダーチャート生成エラー: {e}")
+            return None
+
+
+
+def build_pdf_report(results, logo_path=None) -> bytes:
+    """分析結果の dict からPDFを生成する（バックグラウンド生成・一括生成用）"""
+    return PDFReportBuilder(results, logo_path).to_bytes()
@@ -0,0 +1,239 @@
+# -*- coding: utf-8 -*-
+"""Versioned prompt templates for the AIO analysis.
+
+The static rubric and JSON schema come first and the page-specific data is
+appended last, so that consecutive requests share an identical prefix that
+the provider can cache.  Bump ``AIO_PROMPT_VERSION`` whenever the static part
+changes.
+"""
+from typing import Any, Dict, List, Optional
+
+from .constants import AIO_SCORE_MAP_JP, LOCAL_AIO_CRITERIA
+
+AIO_PROMPT_VERSION = "aio-2025.4"
+
+AIO_SYSTEM_MESSAGE = """あなたはSEOとAIO（生成AI検索最適化）の専門家です。
+必要に応じて最新の市場トレンドを検索して分析結果に含めてください。
+
+**重要**: 回答は必ず有効なJSON形式でのみ返してください。
+JSON以外のテキストや説明は一切含めないでください。
+回答の最初と最後に```json や ``` などのマークダウンも不要です。
+純粋なJSONオブジェクトのみを返してください。"""
+
+AIO_FALLBACK_SYSTEM_MESSAGE = "あなたはSEOとAIO（生成AI検索最適化）の専門家です。分析結果を指示されたJSON形式で返してください。"
+
+_AIO_RUBRIC = """
+あなたは最先端のAIO（生成AI検索最適化）専門家です。
+末尾の「分析対象ページ」に示すウェブページを、生成AI検索エンジン（ChatGPT Search、Claude、Gemini、Perplexity等）での
+パフォーマンス向上の観点から専門的に分析してください。
+
+## 評価項目（各10点満点）
+
+### 1. E-E-A-T評価（40%）
+- **Experience（経験）**: 実体験・一次情報の豊富さ、具体的事例の質
+- **Expertise（専門性）**: 専門知識の深さ、最新情報への対応度
+- **Authoritativeness（権威性）**: 引用価値、業界認知度、信頼できる情報源との関連性
+- **Trustworthiness（信頼性）**: 事実確認の容易さ、透明性、偏見のなさ
+
+### 2. AI検索最適化（35%）
+- **構造化・整理**: 論理的構造、AI理解しやすい情報階層
+- **質問応答適合性**: ユーザーの質問に直接答える形式度
+- **引用可能性**: AI回答での引用されやすさ、要約しやすさ
+- **マルチモーダル対応**: 画像・表・図表とその説明の質
+
+### 3. ユーザー体験（25%）
+- **検索意図マッチング**: 様々な検索意図への対応度
+- **パーソナライズ可能性**: 異なるユーザー層への適応性
+- **情報の独自性**: オリジナルコンテンツ、独自視点の提供
+- **コンテンツ完全性**: トピックの包括的カバー、深さ
+
+## 業界特化分析
+「業界分析結果」に示された主要業界について、現在の市場トレンドを踏まえて以下観点から評価してください：
+- 業界専門用語の適切な使用と説明
+- 2025年の業界トレンド・最新情報の反映度
+- ターゲットユーザーへの適合性
+- 競合他社との差別化ポイント
+- 業界特有の信頼性指標（資格、実績、認証等）
+- 規制・コンプライアンス要素への対応
+
+## 改善アクション
+1. **即効改善施策**（1-2週間で実装可能）- 3つ以上
+2. **中期戦略施策**（1-3ヶ月）- 3つ以上
+3. **競合差別化施策** - 3つ以上
+4. **市場トレンド対応施策** - 主要業界の現在のトレンドに基づく具体的施策
+
+"""
+
+_AIO_SCHEMA_HEAD = """## JSON出力形式
+{
+  "basic_info": { "url": "分析対象URL", "industry": "主要業界", "title": "ページタイトル" },
+"""
+
+_AIO_SCHEMA_TAIL = """  "category_scores": {
+    "eeat_score": 0.0, "ai_search_score": 0.0, "user_experience_score": 0.0, "technical_score": 0.0
+  },
+  "total_score": 0.0,
+  "immediate_actions": [
+    {"action": "施策", "method": "具体的な実装方法", "expected_impact": "期待効果"}
+  ],
+  "medium_term_strategies": [
+    {"strategy": "戦略", "timeline": "実装期間", "expected_outcome": "期待成果"}
+  ],
+  "competitive_advantages": [
+    {"advantage": "差別化ポイント", "implementation": "具体的な実装方法"}
+  ],
+  "market_trend_strategies": [
+    {"trend": "トレンド", "strategy": "対応戦略", "priority": "優先度"}
+  ],
+  "industry_analysis": {
+    "industry_fit": "主要業界への適合度評価",
+    "specialized_improvements": "業界特化改善提案",
+    "compliance_check": "規制・コンプライアンス対応状況",
+    "market_trends": "現在の市場トレンドと対応状況"
+  }
+}
+"""
+
+_AIO_COMPACT_NOTE = """
+## ローカル計測済み項目
+以下の項目は「分析対象ページ」に記載したローカル計測スコアを採用するため、scoresへの出力は不要です。
+改善アクションの検討には参考情報として利用してください：
+""" + "\n".join(f"- {key}" for key in LOCAL_AIO_CRITERIA) + "\n\n"
+
+
+def _scores_schema(keys) -> str:
+    lines = [f'    "{key}": {{"score": 0, "advice": "具体的で実践的なアドバイス"}}' for key in keys]
+    return '  "scores": {\n' + ",\n".join(lines) + "\n  },\n"
+
+
+# ページ固有の値を一切含まない静的部分（キャッシュ対象のプレフィックス）
+AIO_STATIC_INSTRUCTIONS = (
+    _AIO_RUBRIC + _AIO_SCHEMA_HEAD + _scores_schema(AIO_SCORE_MAP_JP.keys()) + _AIO_SCHEMA_TAIL
+)
+# 標準モード用: ローカル計測済み項目をLLMの出力対象から除外した版
+AIO_STATIC_INSTRUCTIONS_COMPACT = (
+    _AIO_RUBRIC
+    + _AIO_COMPACT_NOTE
+    + _AIO_SCHEMA_HEAD
+    + _scores_schema(k for k in AIO_SCORE_MAP_JP if k not in LOCAL_AIO_CRITERIA)
+    + _AIO_SCHEMA_TAIL
+)
+
+# ページ固有部分（必ずプロンプトの末尾に置く）
+AIO_PAGE_TEMPLATE = """
+## 分析対象ページ
+URL: {url}
+タイトル: {title}
+
+**業界分析結果:**
+{industry_info}
+{local_section}{context_section}
+**コンテンツ:**
+{content_preview}
+"""
+
+
+def build_industry_info(final_industry: Dict, industry_analysis: Any) -> str:
+    """Return the industry summary block embedded in the page section."""
+    secondary = final_industry.get("secondary_detected") or []
+    specialized = industry_analysis.specialized_terms
+    audience = industry_analysis.target_audience_clues
+    regulatory = industry_analysis.regulatory_indicators
+    return (
+        f"主要業界: {final_industry['primary']} ({final_industry['source']})\n"
+        f"信頼度: {final_industry['confidence']:.1f}%\n"
+        f"検出された副業界: {', '.join(secondary[:3]) if secondary else 'なし'}\n"
+        f"専門用語: {', '.join(specialized[:5]) if specialized else 'なし'}\n"
+        f"ターゲット層: {', '.join(audience) if audience else '不明'}\n"
+        f"規制要件: {', '.join(regulatory) if regulatory else 'なし'}"
+    )
+
+
+def build_local_section(local_scores: Optional[Dict[str, Dict]]) -> str:
+    """Return the block listing locally computed scores as hints for the LLM."""
+    if not local_scores:
+        return ""
+    lines = ["", "**ローカル計測スコア（各10点満点）:**"]
+    for key, item in local_scores.items():
+        evidence = item.get("evidence", "")
+        lines.append(f"- {key}: {item.get('score', 0)} {f'({evidence})' if evidence else ''}".rstrip())
+    return "\n".join(lines) + "\n"
+
+
+def build_context_section(context: Optional[Dict[str, str]]) -> str:
+    """Return supplementary analysis blocks (site structure etc.) for the page section."""
+    blocks = [f"**{heading}:**\n{body}" for heading, body in (context or {}).items() if body]
+    return "\n" + "\n\n".join(blocks) + "\n" if blocks else ""
+
+
+def build_aio_prompt(
+    url: str,
+    title: str,
+    industry_info: str,
+    content_preview: str,
+    local_scores: Optional[Dict[str, Dict]] = None,
+    compact: bool = False,
+    context: Optional[Dict[str, str]] = None,
+) -> str:
+    """Return the user prompt: static instructions first, page data last.
+
+    ``compact`` selects the rubric without the locally scored criteria; the
+    local scores themselves always go into the page-specific section, as do
+    the ``context`` blocks (heading -> text).
+    """
+    page_section = AIO_PAGE_TEMPLATE.format(
+        url=url,
+        title=title,
+        industry_info=industry_info,
+        local_section=build_local_section(local_scores),
+        context_section=build_context_section(context),
+        content_preview=content_preview,
+    )
+    static = AIO_STATIC_INSTRUCTIONS_COMPACT if compact else AIO_STATIC_INSTRUCTIONS
+    return static + page_section
+
+
+def build_aio_messages(prompt: str, system_message: str = AIO_SYSTEM_MESSAGE) -> List[Dict[str, str]]:
+    """Return chat messages with the cacheable system message first."""
+    return [
+        {"role": "system", "content": system_message},
+        {"role": "user", "content": prompt},
+    ]
+
+
+def _usage_value(obj: Any, name: str) -> Any:
+    if obj is None:
+        return None
+    if isinstance(obj, dict):
+        return obj.get(name)
+    return getattr(obj, name, None)
+
+
+def extract_usage_stats(usage: Any) -> Dict[str, Any]:
+    """Return token counts and the cached-token ratio from an API usage object.
+
+    Accepts either the SDK usage object or a plain dict; missing fields count
+    as zero.
+    """
+    prompt_tokens = _usage_value(usage, "prompt_tokens") or 0
+    completion_tokens = _usage_value(usage, "completion_tokens") or 0
+    details = _usage_value(usage, "prompt_tokens_details")
+    cached_tokens = _usage_value(details, "cached_tokens") or 0
+    ratio = cached_tokens / prompt_tokens if prompt_tokens else 0.0
+    return {
+        "prompt_version": AIO_PROMPT_VERSION,
+        "prompt_tokens": int(prompt_tokens),
+        "completion_tokens": int(completion_tokens),
+        "cached_tokens": int(cached_tokens),
+        "cached_ratio": ratio,
+    }
+
+
+def accumulate_usage(totals: Dict[str, Any], stats: Dict[str, Any]) -> Dict[str, Any]:
+    """Add ``stats`` into ``totals`` in place and refresh the overall ratio."""
+    for key in ("prompt_tokens", "completion_tokens", "cached_tokens"):
+        totals[key] = totals.get(key, 0) + stats.get(key, 0)
+    totals["requests"] = totals.get("requests", 0) + 1
+    prompt_tokens = totals.get("prompt_tokens", 0)
+    totals["cached_ratio"] = totals.get("cached_tokens", 0) / prompt_tokens if prompt_tokens else 0.0
+    return totals
@@ -0,0 +1,215 @@
+# -*- coding: utf-8 -*-
+"""Vectorized Japanese readability scoring.
+
+Texts are converted to code-point arrays and classified with a lookup
+table in one pass; sentence boundaries (。！？, a period before a space, and
+the spaces ``get_text`` inserts between Japanese blocks) and all per-text
+counts come from ``np.cumsum`` / ``np.bincount`` over the concatenated batch.
+The score combines the sentence length distribution, the kanji / kana /
+Latin balance and, when the page structure is known, paragraph density and
+heading / list frequency.  Thousands of pages per second can be scored, so
+``readability_scores`` also works as a cheap pre-filter.
+"""
+from typing import Dict, List, Optional, Sequence
+
+import numpy as np
+
+OTHER, KANJI, HIRAGANA, KATAKANA, LATIN, DIGIT, SPACE, TERMINAL, PERIOD = range(9)
+_N_CLASSES = 9
+
+LONG_SENTENCE = 100  # 字。これを超える文は読みにくい
+SENTENCE_BINS = (40, 80, 120)  # 文長の分布（〜40, 〜80, 〜120, 120超）
+KANJI_RANGE = (0.2, 0.4)  # 読みやすいとされる漢字の割合
+KATAKANA_LIMIT = 0.2
+PARAGRAPH_CHARS = (200, 400)
+
+
+def _class_table() -> np.ndarray:
+    table = np.zeros(0x10000, dtype=np.uint8)
+    ranges = (
+        (0x4E00, 0x9FFF, KANJI), (0x3400, 0x4DBF, KANJI), (0xF900, 0xFAFF, KANJI),
+        (0x3041, 0x309F, HIRAGANA), (0x30A0, 0x30FF, KATAKANA), (0xFF66, 0xFF9F, KATAKANA),
+        (0x41, 0x5A, LATIN), (0x61, 0x7A, LATIN), (0xFF21, 0xFF3A, LATIN), (0xFF41, 0xFF5A, LATIN),
+        (0x30, 0x39, DIGIT), (0xFF10, 0xFF19, DIGIT),
+    )
+    for start, end, cls in ranges:
+        table[start:end + 1] = cls
+    table[[0x3005, 0x3006]] = KANJI  # 々〆
+    table[[0x20, 0x09, 0x0A, 0x0D, 0x3000]] = SPACE
+    table[[ord(c) for c in "。！？!?．"]] = TERMINAL
+    table[ord(".")] = PERIOD
+    return table
+
+
+_CLASS_TABLE = _class_table()
+_JAPANESE = np.zeros(_N_CLASSES, dtype=bool)
+_JAPANESE[[KANJI, HIRAGANA, KATAKANA]] = True
+
+
+def _structure_arrays(structures: Optional[Sequence[Optional[Dict]]], n: int) -> Dict[str, np.ndarray]:
+    paragraphs = np.zeros(n)
+    headings = np.zeros(n)
+    lists = np.zeros(n)
+    known = np.zeros(n, dtype=bool)
+    for i, structure in enumerate(structures or []):
+        if not structure:
+            continue
+        known[i] = True
+        paragraphs[i] = structure.get("paragraphs_count", 0)
+        headings[i] = sum((structure.get("headings") or {}).values())
+        lists[i] = structure.get("lists_count", 0)
+    return {"paragraphs": paragraphs, "headings": headings, "lists": lists, "known": known}
+
+
+def readability_features(texts: Sequence[str], structures: Optional[Sequence[Optional[Dict]]] = None) -> Dict[str, np.ndarray]:
+    """Return per-text readability features as arrays (one entry per text)."""
+    n = len(texts)
+    lengths = np.fromiter((len(t or "") for t in texts), dtype=np.int64, count=n)
+    joined = "".join(t or "" for t in texts)
+    codes = np.frombuffer(joined.encode("utf-32-le"), dtype=np.uint32)
+    cls = _CLASS_TABLE[np.minimum(codes, 0xFFFF)]
+    doc = np.repeat(np.arange(n), lengths)
+
+    counts = np.bincount(doc * _N_CLASSES + cls, minlength=n * _N_CLASSES).reshape(n, _N_CLASSES)
+    chars = lengths - counts[:, SPACE]
+
+    # 文末: 句点・感嘆符・疑問符、空白前のピリオド、日本語同士の間の空白（要素の区切り）、各テキストの末尾
+    doc_end = np.zeros(len(cls), dtype=bool)
+    doc_end[np.cumsum(lengths)[lengths > 0] - 1] = True
+    next_cls = np.append(cls[1:], SPACE)
+    prev_cls = np.insert(cls[:-1], 0, SPACE)
+    boundary = (
+        (cls == TERMINAL)
+        | ((cls == PERIOD) & ((next_cls == SPACE) | doc_end))
+        | ((cls == SPACE) & _JAPANESE[prev_cls] & _JAPANESE[next_cls])
+        | doc_end
+    )
+    content = (cls != SPACE) & (cls != TERMINAL) & ~((cls == PERIOD) & boundary)
+    cumulative = np.cumsum(content)
+    ends = np.flatnonzero(boundary)
+    sentence_len = np.diff(np.concatenate(([0], cumulative[ends])))
+    sentence_doc = doc[ends]
+    keep = sentence_len > 0
+    sentence_len, sentence_doc = sentence_len[keep], sentence_doc[keep]
+
+    sentences = np.bincount(sentence_doc, minlength=n)
+    total = np.bincount(sentence_doc, weights=sentence_len, minlength=n)
+    squares = np.bincount(sentence_doc, weights=sentence_len.astype(np.float64) ** 2, minlength=n)
+    long_count = np.bincount(sentence_doc, weights=sentence_len > LONG_SENTENCE, minlength=n)
+    bins = np.searchsorted(SENTENCE_BINS, sentence_len, side="left")
+    histogram = np.bincount(sentence_doc * 4 + bins, minlength=n * 4).reshape(n, 4)
+    longest = np.zeros(n)
+    np.maximum.at(longest, sentence_doc, sentence_len)
+
+    with np.errstate(divide="ignore", invalid="ignore"):
+        mean = np.where(sentences > 0, total / np.maximum(sentences, 1), 0.0)
+        std = np.sqrt(np.maximum(squares / np.maximum(sentences, 1) - mean ** 2, 0.0))
+        japanese = counts[:, [KANJI, HIRAGANA, KATAKANA]].sum(axis=1)
+        kana_kanji = np.maximum(japanese, 1)
+        letters = np.maximum(japanese + counts[:, LATIN], 1)
+        structure = _structure_arrays(structures, n)
+        per_1000 = np.maximum(chars, 1) / 1000
+        features = {
+            "chars": chars,
+            "sentences": sentences,
+            "sentence_mean": mean,
+            "sentence_std": std,
+            "sentence_max": longest,
+            "long_sentence_ratio": np.where(sentences > 0, long_count / np.maximum(sentences, 1), 0.0),
+            "sentence_histogram": histogram,
+            # 漢字・かなの割合は日本語文字に占める割合、英字は文字全体に占める割合
+            "kanji_ratio": counts[:, KANJI] / kana_kanji,
+            "hiragana_ratio": counts[:, HIRAGANA] / kana_kanji,
+            "katakana_ratio": counts[:, KATAKANA] / kana_kanji,
+            "latin_ratio": counts[:, LATIN] / letters,
+            "japanese_ratio": japanese / np.maximum(chars, 1),
+            "chars_per_paragraph": np.where(structure["paragraphs"] > 0, chars / np.maximum(structure["paragraphs"], 1), chars),
+            "headings_per_1000": structure["headings"] / per_1000,
+            "lists_per_1000": structure["lists"] / per_1000,
+            "structure_known": structure["known"],
+        }
+    return features
+
+
+def _interval_penalty(values: np.ndarray, low: float, high: float, slope: float) -> np.ndarray:
+    distance = np.maximum(low - values, 0) + np.maximum(values - high, 0)
+    return np.minimum(10.0, distance * slope)
+
+
+def score_features(features: Dict[str, np.ndarray]) -> np.ndarray:
+    """Return 0-10 readability scores for the arrays from ``readability_features``."""
+    mean = features["sentence_mean"]
+    sentence = np.select(
+        [mean <= 60, mean <= 80, mean <= 100, mean <= 140], [10.0, 8.0, 6.0, 4.0], default=2.0
+    ) - 3 * features["long_sentence_ratio"]
+
+    # 日本語ページのみ文字種バランスを評価（英語ページは満点扱い）
+    balance = 10.0 - _interval_penalty(features["kanji_ratio"], *KANJI_RANGE, slope=40.0)
+    balance -= np.maximum(features["katakana_ratio"] - KATAKANA_LIMIT, 0) * 30.0
+    balance = np.where(features["japanese_ratio"] >= 0.3, np.clip(balance, 0, 10), 10.0)
+
+    cpp = features["chars_per_paragraph"]
+    layout = np.select([cpp <= PARAGRAPH_CHARS[0], cpp <= PARAGRAPH_CHARS[1]], [10.0, 7.0], default=4.0)
+    long_page = features["chars"] > 1500
+    layout -= np.where(long_page & (features["headings_per_1000"] < 0.5), 2.0, 0.0)
+    layout -= np.where(long_page & (features["lists_per_1000"] == 0), 2.0, 0.0)
+
+    with_structure = sentence * 0.5 + balance * 0.25 + layout * 0.25
+    without_structure = sentence * 0.7 + balance * 0.3
+    score = np.where(features["structure_known"], with_structure, without_structure)
+    return np.where(features["sentences"] > 0, np.clip(score, 0, 10), 0.0)
+
+
+def readability_scores(texts: Sequence[str], structures: Optional[Sequence[Optional[Dict]]] = None) -> np.ndarray:
+    """Score many texts at once (e.g. as a pre-filter before LLM analysis)."""
+    if not len(texts):
+        return np.zeros(0)
+    return score_features(readability_features(texts, structures))
+
+
+def analyze_readability(text: str, structure: Optional[Dict] = None) -> Dict:
+    """Score one text and return the score with its features as plain values."""
+    features = readability_features([text], [structure])
+    score = float(score_features(features)[0])
+    details = {
+        key: (values[0].tolist() if key == "sentence_histogram" else values[0].item())
+        for key, values in features.items()
+    }
+    details["score"] = round(score, 1)
+    return details
+
+
+def readability_evidence(details: Dict) -> str:
+    """Short Japanese evidence string for the AIO results and prompt."""
+    evidence = (
+        f"文数:{details['sentences']} 平均文長:{details['sentence_mean']:.0f}字 "
+        f"最長:{details['sentence_max']:.0f}字 {LONG_SENTENCE}字超の文:{details['long_sentence_ratio']:.0%} "
+        f"漢字:{details['kanji_ratio']:.0%} ひらがな:{details['hiragana_ratio']:.0%} "
+        f"カタカナ:{details['katakana_ratio']:.0%} 英字:{details['latin_ratio']:.0%}"
+    )
+    if details["structure_known"]:
+        evidence += (
+            f" 段落あたり:{details['chars_per_paragraph']:.0f}字 "
+            f"見出し:{details['headings_per_1000']:.1f}/千字 リスト:{details['lists_per_1000']:.1f}/千字"
+        )
+    return evidence
+
+
+def readability_advice(details: Dict) -> List[str]:
+    """Concrete improvement hints derived from the features."""
+    advice = []
+    if details["sentence_mean"] > 60 or details["long_sentence_ratio"] > 0.1:
+        advice.append("1文を40〜60字程度に区切り、長い文は箇条書きに分解してください。")
+    if details["japanese_ratio"] >= 0.3:
+        if details["kanji_ratio"] > KANJI_RANGE[1]:
+            advice.append("漢字の割合が高めです。ひらがなで書ける語を開き、漢字を3割程度に抑えてください。")
+        elif details["kanji_ratio"] < KANJI_RANGE[0]:
+            advice.append("ひらがなが多く間延びしています。適度に漢字を使うと読みやすくなります。")
+        if details["katakana_ratio"] > KATAKANA_LIMIT:
+            advice.append("カタカナ語が多めです。専門用語・外来語には日本語の説明を添えてください。")
+    if details["structure_known"]:
+        if details["chars_per_paragraph"] > PARAGRAPH_CHARS[0]:
+            advice.append("段落が長めです。1段落を200字程度までにまとめてください。")
+        if details["chars"] > 1500 and details["headings_per_1000"] < 0.5:
+            advice.append("見出しが少なめです。内容のまとまりごとに小見出しを付けてください。")
+    return advice
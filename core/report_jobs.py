@@ -0,0 +1,152 @@
+# -*- coding: utf-8 -*-
+"""Background PDF report builds with job IDs and a per-analysis result cache.
+
+Building the PDF inside the Streamlit script run blocks the session, so the
+統合レポート tab submits the analysis results to a ``ReportJobManager``
+instead.  Builds run on a small thread pool and return a job ID the UI
+polls.  Jobs are keyed by analysis ID: submitting the same analysis again
+returns the queued, running or finished job, so a repeated download never
+rebuilds the report.  Finished reports are kept in an LRU of
+``REPORT_CACHE_SIZE`` analyses.  A failed job stays in the LRU (so its error
+can be shown) until the same analysis is submitted again, which replaces it
+with a new build.
+
+The manager lives in this module (not in the Streamlit script, which is
+re-executed on every rerun) and is shared by all sessions of the process.
+"""
+import copy
+import hashlib
+import json
+import threading
+import time
+import uuid
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+from typing import Callable, Dict, Optional
+
+from .constants import REPORT_CACHE_SIZE, REPORT_WORKERS
+
+QUEUED, RUNNING, DONE, FAILED = "queued", "running", "done", "error"
+
+
+def analysis_key(results: Dict) -> str:
+    """ID of an analysis result: its ``analysis_id`` or, for older results, a content digest."""
+    if results.get("analysis_id"):
+        return str(results["analysis_id"])
+    payload = json.dumps(results, sort_keys=True, ensure_ascii=False, default=str)
+    return hashlib.sha1(payload.encode("utf-8")).hexdigest()
+
+
+@dataclass
+class ReportJob:
+    """One report build; ``data`` holds the PDF bytes once ``status`` is ``done``."""
+    job_id: str
+    analysis_id: str
+    status: str = QUEUED
+    created_at: float = field(default_factory=time.time)
+    started_at: Optional[float] = None
+    finished_at: Optional[float] = None
+    error: str = ""
+    data: Optional[bytes] = None
+
+    @property
+    def pending(self) -> bool:
+        return self.status in (QUEUED, RUNNING)
+
+    @property
+    def elapsed(self) -> float:
+        """Seconds since submission (or until completion)."""
+        return (self.finished_at or time.time()) - self.created_at
+
+
+class ReportJobManager:
+    """Run ``build(results) -> bytes`` on a worker pool, one job per analysis."""
+
+    def __init__(self, build: Callable[[Dict], bytes], max_workers: int = REPORT_WORKERS,
+                 cache_size: int = REPORT_CACHE_SIZE):
+        self.build = build
+        self.cache_size = cache_size
+        self._pool = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="report")
+        self._lock = threading.Lock()
+        self._jobs: Dict[str, ReportJob] = {}
+        self._by_analysis: "OrderedDict[str, ReportJob]" = OrderedDict()
+
+    def submit(self, results: Dict) -> ReportJob:
+        """Queue a build for ``results`` unless one for the same analysis exists."""
+        key = analysis_key(results)
+        with self._lock:
+            job = self._by_analysis.get(key)
+            if job is not None and job.status != FAILED:
+                self._by_analysis.move_to_end(key)
+                return job
+            if job is not None:
+                # 失敗したジョブは作り直すジョブで置き換える（ジョブIDも残さない）
+                del self._by_analysis[key]
+                self._jobs.pop(job.job_id, None)
+            job = ReportJob(job_id=uuid.uuid4().hex, analysis_id=key)
+            self._jobs[job.job_id] = job
+            self._by_analysis[key] = job
+            self._evict()
+        # 分析結果はビルド中に変更されないよう複製して渡す
+        self._pool.submit(self._run, job, copy.deepcopy(results))
+        return job
+
+    def _run(self, job: ReportJob, results: Dict) -> None:
+        job.started_at = time.time()
+        job.status = RUNNING
+        try:
+            job.data = self.build(results)
+            job.status = DONE
+        except Exception as e:
+            job.error = str(e)
+            job.status = FAILED
+        finally:
+            job.finished_at = time.time()
+
+    def _evict(self) -> None:
+        """Drop the least recently used finished jobs beyond ``cache_size``."""
+        excess = len(self._by_analysis) - self.cache_size
+        for key in list(self._by_analysis):
+            if excess <= 0:
+                break
+            job = self._by_analysis[key]
+            if job.pending:
+                continue
+            del self._by_analysis[key]
+            self._jobs.pop(job.job_id, None)
+            excess -= 1
+
+    def get(self, job_id: str) -> Optional[ReportJob]:
+        with self._lock:
+            return self._jobs.get(job_id)
+
+    def job_for(self, results: Dict) -> Optional[ReportJob]:
+        """Existing job for the analysis in ``results`` (None if never submitted or evicted)."""
+        with self._lock:
+            return self._by_analysis.get(analysis_key(results))
+
+    def wait(self, job_id: str, timeout: Optional[float] = None, interval: float = 0.05) -> Optional[ReportJob]:
+        """Block until the job finishes or ``timeout`` passes (for scripts and tests)."""
+        deadline = None if timeout is None else time.monotonic() + timeout
+        job = self.get(job_id)
+        while job is not None and job.pending and (deadline is None or time.monotonic() < deadline):
+            time.sleep(interval)
+        return job
+
+    def shutdown(self, wait: bool = True) -> None:
+        self._pool.shutdown(wait=wait)
+
+
+_manager: Optional[ReportJobManager] = None
+_manager_lock = threading.Lock()
+
+
+def get_report_jobs(build: Callable[[Dict], bytes]) -> ReportJobManager:
+    """Return the process-wide manager, creating it with ``build`` on first use."""
+    global _manager
+    if _manager is None:
+        with _manager_lock:
+            if _manager is None:
+                _manager = ReportJobManager(build)
+    return _manager
@@ -0,0 +1,223 @@
+# -*- coding: utf-8 -*-
+"""Site-wide duplicate, thin-content and canonical checks across a crawl.
+
+Each page's main content is reduced to a MinHash signature and inserted into
+an LSH banding table as it arrives, so finding its near duplicates costs a
+bucket lookup instead of a comparison against every page seen so far.
+Duplicate pairs are kept as a per-page adjacency map, so a page's
+duplicates are read in O(degree), and clusters are maintained with a
+union-find as pages arrive.  Replacing a page that had duplicates marks the
+union-find stale; it is rebuilt from the adjacency map on the next summary.
+"""
+from dataclasses import dataclass
+from typing import Dict, List, Optional
+from urllib.parse import urljoin
+
+import numpy as np
+
+from .constants import SITE_DUPLICATE_THRESHOLD, THIN_CONTENT_CHARS, THIN_CONTENT_WORDS
+from .fingerprint import LSHIndex, MinHasher, content_hash, estimate_similarity, normalize_text
+from .page_cache import normalize_url
+
+
+@dataclass
+class PageContent:
+    """What the index keeps per page."""
+    url: str
+    signature: np.ndarray
+    digest: str
+    word_count: int
+    char_count: Optional[int]  # 不明（保存済み結果に無い）なら None
+    canonical: str  # 正規化済みの canonical（未指定なら空文字）
+
+    @property
+    def thin(self) -> bool:
+        if self.char_count is None:
+            return False
+        return self.word_count < THIN_CONTENT_WORDS and self.char_count < THIN_CONTENT_CHARS
+
+
+class SiteContentIndex:
+    """Incrementally compare the pages of one site with each other."""
+
+    def __init__(self, threshold: float = SITE_DUPLICATE_THRESHOLD, num_perm: int = 128):
+        self.threshold = threshold
+        self._hasher = MinHasher(num_perm=num_perm)
+        self._lsh = LSHIndex(num_perm=num_perm, threshold=threshold)
+        self._pages: Dict[str, PageContent] = {}
+        self._adjacency: Dict[str, Dict[str, float]] = {}
+        self._by_digest: Dict[str, List[str]] = {}
+        self._parent: Dict[str, str] = {}
+        self._forest_stale = False
+
+    def __len__(self) -> int:
+        return len(self._pages)
+
+    def __contains__(self, url: str) -> bool:
+        return normalize_url(url) in self._pages
+
+    def signature(self, text: str) -> np.ndarray:
+        return self._hasher.signature(text)
+
+    def _remove(self, key: str) -> None:
+        page = self._pages.pop(key, None)
+        if page is None:
+            return
+        self._lsh.remove(key)
+        self._by_digest[page.digest].remove(key)
+        neighbours = self._adjacency.pop(key, {})
+        for other in neighbours:
+            del self._adjacency[other][key]
+        if neighbours:
+            # union-find は辺を削除できないので、次の集計で隣接リストから作り直す
+            self._forest_stale = True
+
+    def _find(self, x: str) -> str:
+        parent = self._parent
+        parent.setdefault(x, x)
+        while parent[x] != x:
+            parent[x] = parent[parent[x]]
+            x = parent[x]
+        return x
+
+    def _union(self, a: str, b: str) -> None:
+        root_a, root_b = self._find(a), self._find(b)
+        if root_a != root_b:
+            self._parent[root_b] = root_a
+
+    def add_page(self, url: str, text: Optional[str] = None, signature: Optional[np.ndarray] = None,
+                 word_count: int = 0, char_count: Optional[int] = None, canonical_url: str = "",
+                 digest: str = "") -> Dict:
+        """Index one page and return its report against the pages seen so far.
+
+        Either ``text`` or a precomputed ``signature`` (with ``digest``) is
+        needed.  Re-adding a URL replaces its previous entry.
+        """
+        key = normalize_url(url)
+        self._remove(key)
+        if signature is None:
+            signature = self.signature(text or "")
+        if text is not None:
+            digest = content_hash(text)
+            if char_count is None:
+                char_count = len(normalize_text(text))
+        canonical = normalize_url(urljoin(url, canonical_url)) if canonical_url else ""
+        page = PageContent(key, signature, digest, word_count, char_count, canonical)
+
+        matches: Dict[str, float] = {other: 1.0 for other in self._by_digest.get(digest, [])} if digest else {}
+        for other in self._lsh.query(signature):
+            if other not in matches:
+                similarity = estimate_similarity(signature, self._pages[other].signature)
+                if similarity >= self.threshold:
+                    matches[other] = similarity
+        if matches:
+            self._adjacency[key] = matches
+            for other, similarity in matches.items():
+                self._adjacency.setdefault(other, {})[key] = similarity
+                if not self._forest_stale:
+                    self._union(other, key)
+
+        self._pages[key] = page
+        self._lsh.insert(key, signature)
+        self._by_digest.setdefault(digest, []).append(key)
+        return self.page_report(url)
+
+    def _duplicates_of(self, key: str) -> List[Dict]:
+        found = [{"url": other, "similarity": similarity} for other, similarity in self._adjacency.get(key, {}).items()]
+        return sorted(found, key=lambda d: -d["similarity"])
+
+    def _canonical_status(self, page: PageContent) -> str:
+        if not page.canonical:
+            return "missing"
+        return "self" if page.canonical == page.url else "other"
+
+    def page_report(self, url: str) -> Optional[Dict]:
+        """Duplicates, thin-content flag and canonical check for one indexed page."""
+        key = normalize_url(url)
+        page = self._pages.get(key)
+        if page is None:
+            return None
+        duplicates = self._duplicates_of(key)
+        return {
+            "duplicates": duplicates,
+            "thin": page.thin,
+            "word_count": page.word_count,
+            "char_count": page.char_count,
+            "canonical": page.canonical,
+            "canonical_status": self._canonical_status(page),
+            "canonical_issue": self._canonical_issue(page, {d["url"] for d in duplicates}),
+        }
+
+    def _canonical_issue(self, page: PageContent, duplicate_urls) -> str:
+        """Return a short issue code, or "" when the canonical looks consistent."""
+        status = self._canonical_status(page)
+        if status == "other":
+            target = self._pages.get(page.canonical)
+            # canonical 先の内容が別物なら誤設定の可能性が高い
+            if target is not None and page.canonical not in duplicate_urls and page.digest != target.digest:
+                return "canonical_to_different_content"
+            return ""
+        if not duplicate_urls:
+            return ""
+        if status == "missing":
+            return "duplicate_without_canonical"
+        # 自己参照同士の重複ページは正規URLが競合している
+        if any(self._pages[u].canonical == u for u in duplicate_urls):
+            return "duplicate_without_canonical"
+        return ""
+
+    def clusters(self) -> List[List[str]]:
+        """Groups of mutually (transitively) duplicate pages, largest first."""
+        if self._forest_stale:
+            self._parent = {}
+            for key, neighbours in self._adjacency.items():
+                for other in neighbours:
+                    self._union(key, other)
+            self._forest_stale = False
+        groups: Dict[str, List[str]] = {}
+        for node in self._parent:
+            if self._adjacency.get(node):
+                groups.setdefault(self._find(node), []).append(node)
+        return sorted((sorted(g) for g in groups.values()), key=lambda g: (-len(g), g[0]))
+
+    def summary(self) -> Dict:
+        """Site-level report: duplicate clusters, thin pages and canonical mismatches."""
+        clusters = self.clusters()
+        mismatches = []
+        for key, page in self._pages.items():
+            issue = self._canonical_issue(page, self._adjacency.get(key, {}).keys())
+            if issue:
+                mismatches.append({"url": key, "canonical": page.canonical, "issue": issue})
+        return {
+            "pages": len(self._pages),
+            "duplicate_clusters": clusters,
+            "duplicate_pages": sum(len(c) for c in clusters),
+            "thin_pages": sorted(k for k, p in self._pages.items() if p.thin),
+            "canonical_mismatches": mismatches,
+        }
+
+
+_CANONICAL_ISSUES = {
+    "canonical_to_different_content": "canonical が内容の異なるページを指しています",
+    "duplicate_without_canonical": "重複ページがあるのに canonical で正規URLが統一されていません",
+}
+
+
+def format_content_context(report: Optional[Dict]) -> str:
+    """Return a short Japanese summary of a page report for the AIO prompt."""
+    if not report:
+        return ""
+    lines = []
+    if report["duplicates"]:
+        top = report["duplicates"][0]
+        lines.append(
+            f"サイト内の重複・類似ページ: {len(report['duplicates'])} 件"
+            f"（最も近いページ {top['url']} との類似度 {top['similarity']:.2f}）"
+        )
+    else:
+        lines.append("サイト内の重複・類似ページ: なし（これまでに分析したページとの比較）")
+    if report["thin"]:
+        lines.append(f"本文量が少ないページ（本文 {report['char_count']} 文字）")
+    if report["canonical_issue"]:
+        lines.append(_CANONICAL_ISSUES[report["canonical_issue"]])
+    return "\n".join(lines)
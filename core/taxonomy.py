@@ -0,0 +1,247 @@
+# -*- coding: utf-8 -*-
+"""Industry taxonomy loaded from an external file and compiled once per process.
+
+The taxonomy (industries with primary/secondary/specialized keywords, the
+recommended contents per industry, audience patterns and regulatory terms)
+lives in ``core/data/industry_taxonomy.json``; set ``AIO_TAXONOMY_PATH`` to
+use another file (``.yaml``/``.yml`` works when PyYAML is installed).  It is
+compiled into an immutable ``Taxonomy`` whose ``KeywordMatcher`` counts every
+keyword in one regex pass, and ``get_taxonomy()`` shares that object
+process-wide, reloading it when the file's mtime or size changes.  The
+``version`` combines the file's ``version`` field with a content digest so
+cached analysis results can be invalidated when the taxonomy changes.
+"""
+import hashlib
+import json
+import os
+import re
+import threading
+from collections import Counter
+from types import MappingProxyType
+from typing import Dict, Iterable, List, Optional, Tuple
+
+try:  # 任意: YAML 形式のタクソノミー
+    import yaml
+except Exception:  # pragma: no cover - PyYAML is optional
+    yaml = None
+
+DEFAULT_TAXONOMY_PATH = os.path.join(os.path.dirname(__file__), "data", "industry_taxonomy.json")
+TAXONOMY_PATH_ENV = "AIO_TAXONOMY_PATH"
+KEYWORD_LEVELS = ("primary", "secondary", "specialized")
+
+
+class TaxonomyError(ValueError):
+    """Raised when a taxonomy file cannot be read or is malformed."""
+
+
+def _trie_pattern(words: Iterable[str]) -> str:
+    """Regex alternation of ``words`` merged by common prefix (longest match first)."""
+    trie: Dict = {}
+    for word in words:
+        node = trie
+        for ch in word:
+            node = node.setdefault(ch, {})
+        node[""] = True
+
+    def build(node: Dict) -> str:
+        branches = [re.escape(ch) + build(child) for ch, child in sorted(node.items()) if ch]
+        if not branches:
+            return ""
+        body = branches[0] if len(branches) == 1 else "(?:" + "|".join(branches) + ")"
+        return f"(?:{body})?" if "" in node else body
+
+    return build(trie)
+
+
+class KeywordMatcher:
+    """Count many keywords in a lowercased text with one trie-regex scan.
+
+    Occurrences are counted per start position like ``str.count`` does for
+    each keyword.  The scan takes the longest keyword at each match and jumps
+    to its end; keywords inside the match ("dx" in "医療dx") are added from a
+    precomputed table, and only keywords whose tail can start another keyword
+    resume the scan one character later.  Unlike one ``str.count`` per
+    keyword, the cost barely grows with the number of keywords.
+    """
+
+    def __init__(self, keywords: Iterable[str]):
+        self.keywords = tuple(sorted({k.lower() for k in keywords if k}))
+        self._pattern = re.compile(_trie_pattern(self.keywords)) if self.keywords else None
+        keyword_set = set(self.keywords)
+        prefixes = {k[:i] for k in self.keywords for i in range(1, len(k))}
+        self._inner: Dict[str, Counter] = {}
+        self._resume_next: Dict[str, bool] = {}
+        for k in self.keywords:
+            # 末尾の一部が別のキーワードの先頭になり得る語は、次の文字から走査を再開する
+            overlapping = any(k[i:] in prefixes for i in range(1, len(k)))
+            starts = range(1) if overlapping else range(len(k))
+            self._inner[k] = Counter(
+                k[i:j] for i in starts for j in range(i + 1, len(k) + 1)
+                if (i, j) != (0, len(k)) and k[i:j] in keyword_set
+            )
+            self._resume_next[k] = overlapping
+
+    @property
+    def max_length(self) -> int:
+        return max((len(k) for k in self.keywords), default=0)
+
+    def scan(self, text: str, counts: Counter, start: int = 0, end: Optional[int] = None) -> int:
+        """Add matches starting in ``[start, end)`` to ``counts``; return where scanning should resume.
+
+        Used for streaming: with ``end`` at least ``max_length - 1`` characters
+        before the end of ``text``, every match starting before ``end`` is complete.
+        """
+        end = len(text) if end is None else end
+        if self._pattern is None:
+            return max(start, end)
+        search = self._pattern.search
+        pos = start
+        match = search(text, pos)
+        while match is not None and match.start() < end:
+            keyword = match.group()
+            counts[keyword] += 1
+            if self._inner[keyword]:
+                counts.update(self._inner[keyword])
+            pos = match.start() + 1 if self._resume_next[keyword] else match.end()
+            match = search(text, pos)
+        return max(pos, end)
+
+    def count(self, text: str) -> Counter:
+        counts: Counter = Counter()
+        if text:
+            self.scan(text, counts)
+        return counts
+
+
+def _freeze(value):
+    if isinstance(value, dict):
+        return MappingProxyType({k: _freeze(v) for k, v in value.items()})
+    if isinstance(value, list):
+        return tuple(_freeze(v) for v in value)
+    return value
+
+
+def _string_list(value, where: str) -> List[str]:
+    if not isinstance(value, list) or not all(isinstance(v, str) for v in value):
+        raise TaxonomyError(f"{where} must be a list of strings")
+    return value
+
+
+class Taxonomy:
+    """Immutable, compiled industry taxonomy."""
+
+    def __init__(self, data: Dict, digest: str = "", source: str = ""):
+        if not isinstance(data, dict) or not isinstance(data.get("industries"), dict):
+            raise TaxonomyError("taxonomy must be an object with an 'industries' mapping")
+        for name, levels in data["industries"].items():
+            for level in KEYWORD_LEVELS:
+                _string_list((levels or {}).get(level, []), f"industries.{name}.{level}")
+        for key, info in data.get("contents", {}).items():
+            _string_list((info or {}).get("keywords", []), f"contents.{key}.keywords")
+        for name, patterns in data.get("audiences", {}).items():
+            _string_list(patterns, f"audiences.{name}")
+        _string_list(data.get("regulatory_terms", []), "regulatory_terms")
+
+        self.source = source
+        self.digest = digest or hashlib.sha1(json.dumps(data, sort_keys=True, ensure_ascii=False).encode("utf-8")).hexdigest()
+        self.version = f"{data.get('version', '0')}+{self.digest[:8]}"
+        self.weights = MappingProxyType({level: data.get("weights", {}).get(level, w)
+                                         for level, w in zip(KEYWORD_LEVELS, (3, 2, 5))})
+        self.industries = _freeze({
+            name: {level: list((levels or {}).get(level, [])) for level in KEYWORD_LEVELS}
+            for name, levels in data["industries"].items()
+        })
+        self.contents = _freeze(data.get("contents", {}))
+        self.audiences = _freeze(data.get("audiences", {}))
+        self.regulatory_terms = _freeze(data.get("regulatory_terms", []))
+
+        words = [kw for levels in self.industries.values() for kws in levels.values() for kw in kws]
+        words += [kw for info in self.contents.values() for kw in info.get("keywords", ())]
+        words += [p for patterns in self.audiences.values() for p in patterns]
+        words += list(self.regulatory_terms)
+        self.matcher = KeywordMatcher(words)
+
+    @classmethod
+    def from_file(cls, path: str) -> "Taxonomy":
+        try:
+            with open(path, "rb") as f:
+                raw = f.read()
+            if path.endswith((".yaml", ".yml")):
+                if yaml is None:
+                    raise TaxonomyError("PyYAML is required for YAML taxonomy files")
+                data = yaml.safe_load(raw.decode("utf-8"))
+            else:
+                data = json.loads(raw.decode("utf-8"))
+        except TaxonomyError:
+            raise
+        except Exception as e:  # OSError, JSON/YAML の構文エラー
+            raise TaxonomyError(f"cannot load taxonomy {path}: {e}") from e
+        return cls(data, hashlib.sha1(raw).hexdigest(), source=path)
+
+    def count(self, text: str) -> Counter:
+        """Occurrences of every taxonomy keyword in ``text`` (case-insensitive)."""
+        return self.matcher.count((text or "").lower())
+
+    def industry_for_contents(self, key: str) -> Optional[str]:
+        """IndustryDetector name linked to an ``INDUSTRY_CONTENTS`` key."""
+        return self.contents.get(key, {}).get("industry")
+
+
+class TaxonomyStore:
+    """Share one compiled ``Taxonomy`` and reload it when the file changes.
+
+    A failed reload keeps serving the previous taxonomy and records the
+    error in ``last_error``.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self.last_error: Optional[str] = None
+        self._lock = threading.Lock()
+        self._taxonomy: Optional[Taxonomy] = None
+        self._stamp: Optional[Tuple[int, int]] = None
+
+    def get(self) -> Taxonomy:
+        try:
+            stat = os.stat(self.path)
+            stamp = (stat.st_mtime_ns, stat.st_size)
+        except OSError as e:
+            stamp = None
+            if self._taxonomy is None:
+                raise TaxonomyError(f"taxonomy file not found: {self.path}") from e
+        if stamp is None or stamp == self._stamp:
+            return self._taxonomy
+        with self._lock:
+            if stamp != self._stamp:
+                try:
+                    self._taxonomy = Taxonomy.from_file(self.path)
+                    self.last_error = None
+                except TaxonomyError as e:
+                    if self._taxonomy is None:
+                        raise
+                    self.last_error = str(e)
+                self._stamp = stamp
+        return self._taxonomy
+
+
+_stores: Dict[str, TaxonomyStore] = {}
+_stores_lock = threading.Lock()
+
+
+def taxonomy_path() -> str:
+    return os.getenv(TAXONOMY_PATH_ENV) or DEFAULT_TAXONOMY_PATH
+
+
+def get_taxonomy(path: Optional[str] = None) -> Taxonomy:
+    """Return the process-wide taxonomy for ``path`` (default: ``AIO_TAXONOMY_PATH`` or the bundled file)."""
+    path = os.path.abspath(path or taxonomy_path())
+    store = _stores.get(path)
+    if store is None:
+        with _stores_lock:
+            store = _stores.setdefault(path, TaxonomyStore(path))
+    return store.get()
+
+
+def taxonomy_version() -> str:
+    return get_taxonomy().version
+
@@ -1,19 +1,71 @@
 # -*- coding: utf-8 -*-
-"""Utility functions for text handling."""
-import re
+"""Utility functions for text handling.
 
+Mojibake detection classifies code points with a lookup table over a numpy
+array instead of matching characters one by one, so whole body texts and
+every heading of a crawl can be checked cheaply.  ``detect_mojibake_batch``
+scores many strings in one pass.
+"""
+from typing import Optional, Sequence
 
-def detect_mojibake(text: str) -> bool:
+import numpy as np
+
+MOJIBAKE_THRESHOLD = 0.3  # 想定外の文字がこの割合を超えたら文字化けとみなす
+
+_INVALID, _VALID, _MARKER, _SJIS_LEAD = range(4)
+# UTF-8 の日本語を Shift_JIS として読んだときに頻出する文字（ひらがな・カタカナの先頭バイト由来）
+_SJIS_LEADS = "縺繧繝"
+_SJIS_LEAD_RATIO = 0.15
+
+
+def _class_table() -> np.ndarray:
+    table = np.full(0x10000, _INVALID, dtype=np.uint8)
+    for start, end in ((0x20, 0x7E), (0x3000, 0x30FF), (0x4E00, 0x9FFF), (0xFF01, 0xFF9F)):
+        table[start:end + 1] = _VALID
+    table[[0x09, 0x0A, 0x0D]] = _VALID
+    table[[ord(c) for c in "ÃÂ�"]] = _MARKER  # Latin-1 で読んだ UTF-8、置換文字
+    table[[ord(c) for c in _SJIS_LEADS]] = _SJIS_LEAD
+    return table
+
+
+_CLASS_TABLE = _class_table()
+
+
+def detect_mojibake_batch(texts: Sequence[str], long_text: Optional[Sequence[bool]] = None) -> np.ndarray:
+    """Return a per-string garbling ratio in ``[0, 1]`` for many strings at once.
+
+    The ratio is the share of characters outside ASCII, Japanese and
+    full-width forms.  Short strings (titles, headings, alt texts) containing
+    typical mis-decoding markers (``Ã``, ``Â``, U+FFFD) score 1.0.  Strings
+    flagged in ``long_text`` (page bodies) count markers as unexpected
+    characters instead, so one stray marker does not flag a whole body.
+    Many UTF-8-read-as-Shift_JIS lead characters score 1.0; empty strings
+    score 0.0.
+    """
+    n = len(texts)
+    if not n:
+        return np.zeros(0)
+    lengths = np.fromiter((len(t or "") for t in texts), dtype=np.int64, count=n)
+    codes = np.frombuffer("".join(t or "" for t in texts).encode("utf-32-le"), dtype=np.uint32)
+    # BMP外（絵文字等）は想定外の文字として数える
+    cls = np.where(codes > 0xFFFF, _INVALID, _CLASS_TABLE[np.minimum(codes, 0xFFFF)])
+    doc = np.repeat(np.arange(n), lengths)
+    counts = np.bincount(doc * 4 + cls, minlength=n * 4).reshape(n, 4)
+    total = np.maximum(lengths, 1)
+    long_mask = np.zeros(n, dtype=bool) if long_text is None else np.asarray(long_text, dtype=bool)
+    markers = counts[:, _MARKER]
+    ratios = (counts[:, _INVALID] + np.where(long_mask, markers, 0)) / total
+    garbled = ((markers > 0) & ~long_mask) | (counts[:, _SJIS_LEAD] / total >= _SJIS_LEAD_RATIO)
+    return np.where(lengths > 0, np.where(garbled, 1.0, ratios), 0.0)
+
+
+def detect_mojibake(text: str, long_text: bool = False) -> bool:
     """Heuristic check for garbled Japanese text.
 
-    This function is lightweight and has no external dependencies so that unit
-    tests can run without the full Streamlit application environment.
+    This function is lightweight and has no external dependencies beyond
+    numpy so that unit tests can run without the full Streamlit application
+    environment.
     """
     if not text:
         return False
-    suspicious_sequences = ["Ã", "Â", "�"]
-    if any(seq in text for seq in suspicious_sequences):
-        return True
-    valid = re.compile(r"[\u0020-\u007E\u3000-\u30FF\u4E00-\u9FFF]+")
-    valid_count = sum(1 for ch in text if valid.match(ch))
-    return valid_count / len(text) < 0.7
+    return bool(detect_mojibake_batch([text], [long_text])[0] > MOJIBAKE_THRESHOLD)
@@ -1,17 +1,17 @@
 import os
 import sys
+import copy
 import json
 import time
 import requests
 from bs4 import BeautifulSoup
 import tldextract
 import re
-from collections import Counter
 from datetime import datetime
 from typing import Dict, List, Tuple, Optional
 from urllib.parse import urlparse
 import numpy as np
-import tempfile
+import uuid
 
 # Streamlit関連
 try:
@@ -23,105 +23,6 @@ except ImportError as e:
     print(f"Streamlit/Plotlyインポートエラー: {e}")
     sys.exit(1)
 
-# データ可視化関連
-try:
-    import matplotlib.pyplot as plt
-    import matplotlib
-    matplotlib.use('Agg')
-except ImportError as e:
-    print(f"Matplotlibインポートエラー: {e}")
-    sys.exit(1)
-
-# 日本語フォント対応
-plt.rcParams['font.family'] = 'sans-serif'
-if os.name == 'nt':
-    if os.path.exists('C:/Windows/Fonts/meiryo.ttc'):
-        plt.rcParams['font.sans-serif'] = ['Meiryo', 'MS Gothic', 'Yu Gothic', 'sans-serif']
-    elif os.path.exists('C:/Windows/Fonts/msgothic.ttc'):
-        plt.rcParams['font.sans-serif'] = ['MS Gothic', 'sans-serif']
-elif sys.platform == 'darwin':
-    plt.rcParams['font.sans-serif'] = ['Hiragino Sans', 'AppleGothic', 'sans-serif']
-else:
-    plt.rcParams['font.sans-serif'] = ['Noto Sans CJK JP', 'sans-serif']
-
-# PDF生成関連
-try:
-    from reportlab.lib.pagesizes import A4
-    from reportlab.lib import colors
-    from reportlab.lib.styles import getSampleStyleSheet, ParagraphStyle
-    from reportlab.platypus import (
-        SimpleDocTemplate,
-        Paragraph,
-        Spacer,
-        Image as ReportLabImage,
-        Table,
-        TableStyle,
-        PageBreak,
-        ListFlowable,
-        ListItem,
-    )
-    from reportlab.lib.units import mm, cm
-    from reportlab.lib.enums import TA_CENTER, TA_LEFT, TA_RIGHT
-    from reportlab.lib.utils import ImageReader
-    from reportlab.pdfbase import pdfmetrics
-    from reportlab.pdfbase.ttfonts import TTFont
-except ImportError as e:
-    print(f"ReportLabインポートエラー: {e}")
-    print("pip install reportlab でインストールしてください")
-
-# 日本語フォント登録
-try:
-    if os.name == 'nt':
-        if os.path.exists('C:/Windows/Fonts/msgothic.ttc'):
-            pdfmetrics.registerFont(TTFont('MSGothic', 'C:/Windows/Fonts/msgothic.ttc'))
-            DEFAULT_PDF_FONT = 'MSGothic'
-        elif os.path.exists('C:/Windows/Fonts/meiryo.ttc'):
-            pdfmetrics.registerFont(TTFont('Meiryo', 'C:/Windows/Fonts/meiryo.ttc'))
-            DEFAULT_PDF_FONT = 'Meiryo'
-        else:
-            DEFAULT_PDF_FONT = 'Helvetica'
-    elif sys.platform == 'darwin':
-        font_paths_mac = [
-            '/System/Library/Fonts/ヒラギノ角ゴシック W3.ttc',
-            '/Library/Fonts/ヒラギノ角ゴシック W3.ttc',
-            '/System/Library/Fonts/Hiragino Sans GB.ttc',
-            '/System/Library/Fonts/PingFang.ttc'
-        ]
-        found_font_mac = False
-        for p in font_paths_mac:
-            if os.path.exists(p):
-                try:
-                    font_name_in_pdf = 'HiraginoSansW3'
-                    if 'PingFang' in p: font_name_in_pdf = 'PingFang'
-                    pdfmetrics.registerFont(TTFont(font_name_in_pdf, p))
-                    DEFAULT_PDF_FONT = font_name_in_pdf
-                    found_font_mac = True
-                    break
-                except Exception as e_font_mac:
-                    print(f"macOSフォント登録試行エラー ({p}): {e_font_mac}")
-        if not found_font_mac:
-            DEFAULT_PDF_FONT = 'Helvetica'
-    else:
-        font_paths_noto = [
-            '/usr/share/fonts/truetype/noto/NotoSansCJK-Regular.ttc',
-            '/usr/share/fonts/truetype/noto/NotoSansCJKjp-Regular.otf',
-        ]
-        found_font_linux = False
-        for p in font_paths_noto:
-            if os.path.exists(p):
-                try:
-                    pdfmetrics.registerFont(TTFont('NotoSansJP', p))
-                    DEFAULT_PDF_FONT = 'NotoSansJP'
-                    found_font_linux = True
-                    break
-                except Exception as e_font_linux:
-                    print(f"Notoフォント登録試行エラー ({p}): {e_font_linux}")
-        if not found_font_linux:
-            DEFAULT_PDF_FONT = 'Helvetica'
-except Exception as font_error:
-    print(f"日本語フォントの登録に失敗しました: {font_error}")
-    DEFAULT_PDF_FONT = 'Helvetica'
-
 try:
     from openai import OpenAI
 except ImportError as e:
@@ -155,6 +56,19 @@ from core.constants import (
     AIO_SCORE_MAP_JP_UPPER,
     AIO_SCORE_MAP_JP_LOWER,
     SEO_SCORE_LABELS,
+    LOCAL_AIO_CRITERIA,
+    ANALYSIS_TIERS,
+    DEFAULT_ANALYSIS_TIER,
+    NEAR_DUPLICATE_THRESHOLD,
+    MAX_FETCH_BYTES,
+    PAGE_CACHE_DIR,
+    PAGE_CACHE_MAX_BYTES,
+    INDUSTRY_MODEL_MIN_CONFIDENCE,
+    PDF_STREAM_CHUNK_SIZE,
+    REPORT_POLL_SECONDS,
+    CRAWL_MAX_PAGES,
+    CRAWL_MAX_DEPTH,
+    CRAWL_STATE_PATH,
 )
 from core.ui_components import load_global_styles, primary_button, text_input
 from core.industry_detector import (
@@ -164,36 +78,40 @@ from core.industry_detector import (
     detect_industry,
     get_industry_display_name,
 )
+from core.industry_stream import detect_industry_streaming
+from core.industry_model import IndustryPrediction, industry_model_version, load_industry_model
 from core.aio_scorer import calculate_personalization_score
+from core.local_scorer import calculate_local_aio_scores, local_category_scores, page_speed_score
+from core.fetcher import collect_subresource_urls, create_session, fetch_page, measure_subresources
+from core.fingerprint import SIGNATURE_VERSION, NearDuplicateIndex, content_hash
+from core.crawler import CrawlConfig, SiteCrawler
+from core.crawl_state import CrawlStateStore, PageState
+from core.link_checker import LinkChecker, link_check_penalty
+from core.link_graph import LinkGraph, format_link_context
+from core.site_content import SiteContentIndex, format_content_context
+from core.page_cache import PageCache
+from core.taxonomy import taxonomy_version
+from core.passage_index import (
+    build_content_preview,
+    build_question_set,
+    format_coverage_context,
+    question_coverage,
+)
 from core.visualization import create_aio_score_chart_vertical, create_aio_radar_chart
-from core.text_utils import detect_mojibake
+from core.pdf_report import PDFReportBuilder, build_pdf_report
+from core.report_jobs import get_report_jobs
+from core.text_utils import MOJIBAKE_THRESHOLD, detect_mojibake_batch
+from core.tokenizer import analyze_text
 from core.advice_utils import generate_actionable_advice
-
-
-def add_corner(canvas, doc_obj) -> None:
-    """Draw a small blue square on page corners."""
-    canvas.saveState()
-    canvas.setFillColor(colors.HexColor(COLOR_PALETTE["primary"]))
-    x = doc_obj.pagesize[0] - 25
-    y = doc_obj.pagesize[1] - 25
-    canvas.rect(x, y, 15, 15, fill=1, stroke=0)
-    canvas.restoreState()
-
-
-def section_break(story, width) -> None:
-    """Insert a thin divider line."""
-    line = Table(
-        [[""]],
-        colWidths=[width],
-        style=TableStyle(
-            [
-                ("LINEBELOW", (0, 0), (-1, -1), 0.5, colors.HexColor(COLOR_PALETTE["divider"]))
-            ]
-        ),
-    )
-    story.append(Spacer(1, 2 * mm))
-    story.append(line)
-    story.append(Spacer(1, 2 * mm))
+from core.prompt_templates import (
+    AIO_PROMPT_VERSION,
+    AIO_FALLBACK_SYSTEM_MESSAGE,
+    accumulate_usage,
+    build_aio_messages,
+    build_aio_prompt,
+    build_industry_info,
+    extract_usage_stats,
+)
 
 
 def calculate_aio_score(text: str) -> Tuple[float, Dict[str, float], str, List[str]]:
@@ -212,7 +130,8 @@ def calculate_aio_score(text: str) -> Tuple[float, Dict[str, float], str, List[s
 
 
 class SEOAIOAnalyzer:
-    def __init__(self):
+    def __init__(self, near_duplicate_threshold=NEAR_DUPLICATE_THRESHOLD, max_fetch_bytes=MAX_FETCH_BYTES,
+                 page_cache=None, crawl_state=None):
         # 環境変数から直接取得（システム環境変数優先）
         try:
             self.api_key = os.getenv("OPENAI_API_KEY")
@@ -249,10 +168,37 @@ class SEOAIOAnalyzer:
         except Exception as e:
             print(f"[ERROR] 業界検出器初期化エラー: {e}")
             raise ValueError(f"業界検出器の初期化に失敗しました: {str(e)}")
+        # 学習済みの業界分類モデル（任意・成果物がなければ None でキーワード判定のみ）
+        print(f"[DEBUG] 業界分類モデル: {industry_model_version() or 'なし'}")
         
         self.last_analysis_results = None
         self.seo_results = None
         self.aio_results = None
+        self.last_crawl_stats = {}
+        self.last_link_summary = {}
+        self.last_content_summary = {}
+        self.token_usage = {}
+        self.http_session = create_session()
+        # リンク切れチェック（結果キャッシュはページ間・クロール中で共有）
+        self.link_checker = LinkChecker(session=self.http_session)
+        # 巨大ページでもメモリ使用量が一定に収まるよう、取得サイズに上限を設ける
+        self.max_fetch_bytes = max_fetch_bytes
+        # 条件付きGET用のページキャッシュ（Noneなら無効）
+        self.page_cache = page_cache
+        # 差分クロール用のクロール状態ストア（Noneなら無効）
+        self.crawl_state = crawl_state
+        # 類似ページのAIO結果を再利用するためのインデックス（一括分析でも共有）
+        self.near_duplicate_index = NearDuplicateIndex(threshold=near_duplicate_threshold)
+
+    def _record_usage(self, response) -> Dict:
+        """APIレスポンスのトークン使用量を記録し、キャッシュ率を返す"""
+        stats = extract_usage_stats(getattr(response, "usage", None))
+        accumulate_usage(self.token_usage, stats)
+        print(
+            f"[DEBUG] プロンプトトークン: {stats['prompt_tokens']} / キャッシュ: {stats['cached_tokens']}"
+            f" ({stats['cached_ratio']:.1%}) / 累計キャッシュ率: {self.token_usage['cached_ratio']:.1%}"
+        )
+        return stats
 
     def _scale_to_100(self, value: float) -> float:
         """Normalize a score to 0-100 range."""
@@ -264,27 +210,59 @@ class SEOAIOAnalyzer:
             return 100.0
         return float(value)
 
-    def analyze_url(self, url, user_industry, balance=50):
+    def analyze_url(self, url, user_industry, balance=50, tier=DEFAULT_ANALYSIS_TIER, measure_resources=False,
+                    previous_state=None, site_context=None, check_links=False):
+        """URLを分析する。previous_state（前回クロール時のPageState）があれば、
+        本文に変更がない限りそのAIO結果を再利用する。site_context はサイト分析で
+        得たページの位置付け（"link_metrics": LinkGraph.page_metrics の結果、
+        "content_index": 他ページとの重複を調べる SiteContentIndex）。
+        check_links=True ならページ内リンクのリンク切れも確認する"""
         try:
             if not url.startswith(('http://', 'https://')):
                 url = 'https://' + url
+            if tier not in ANALYSIS_TIERS:
+                raise ValueError(f"不明な分析モードです: {tier}")
 
-            # API接続テスト
-            try:
-                self.client.models.list(timeout=10)
-                print("API接続テスト成功")
-            except Exception as api_error:
-                raise Exception(f"OpenAI APIへの接続に失敗しました。APIキーと接続を確認してください。詳細: {str(api_error)}")
-
-            # Webコンテンツ取得
-            response = requests.get(url, headers={
-                'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36'
-            }, timeout=15)
-            response.raise_for_status()
-            html_content = response.text
+            # API接続テスト（クイックモードではAPIを使用しない）
+            if tier != "quick":
+                try:
+                    self.client.models.list(timeout=10)
+                    print("API接続テスト成功")
+                except Exception as api_error:
+                    raise Exception(f"OpenAI APIへの接続に失敗しました。APIキーと接続を確認してください。詳細: {str(api_error)}")
+
+            # Webコンテンツ取得（タイミング・転送量を計測）
+            fetch_result = fetch_page(
+                url, session=self.http_session, timeout=15, max_bytes=self.max_fetch_bytes, cache=self.page_cache
+            )
+            html_content = fetch_result.text
+            performance = fetch_result.metrics()
+            if fetch_result.truncated:
+                print(f"[WARN] ページが上限 {self.max_fetch_bytes // 1024}KB を超えたため途中までを分析します: {url}")
+
+            # 内容が前回分析時と同一なら、解析・LLM呼び出しを省略して保存済みの結果を使う
+            cache_variant = self._analysis_cache_variant(user_industry, tier, measure_resources, check_links)
+            if self.page_cache is not None:
+                cached = self.page_cache.get_analysis(url, fetch_result.content_hash, cache_variant)
+                if cached is not None:
+                    print(f"[INFO] 前回から内容の変更がないため保存済みの分析結果を使用: {url}")
+                    return self._restore_cached_analysis(cached, balance, fetch_result)
 
             soup = BeautifulSoup(html_content, 'html.parser')
 
+            # CSS・JS・画像の重量計測（任意）
+            if measure_resources:
+                resources = collect_subresource_urls(soup, fetch_result.final_url)
+                performance["subresources"] = measure_subresources(resources, session=self.http_session)
+
+            # SEO分析（メインコンテンツ抽出でscript等が除去される前に実行）
+            site_context = site_context or {}
+            link_metrics = site_context.get("link_metrics")
+            self.seo_results = self._analyze_seo(
+                soup, url, html_text=html_content, performance=performance, link_metrics=link_metrics,
+                link_checker=self.link_checker if check_links else None,
+            )
+
             # 業界分析
             title = soup.title.string.strip() if soup.title and soup.title.string else ""
             meta_desc = ""
@@ -301,12 +279,59 @@ class SEOAIOAnalyzer:
                 main_content, detected_key, INDUSTRY_CONTENTS
             )
 
+            model_prediction = self._predict_industry_with_model(title, main_content, meta_desc)
+
             # 最終業界決定
-            final_industry = self._determine_final_industry(user_industry, industry_analysis)
+            final_industry = self._determine_final_industry(user_industry, industry_analysis, model_prediction)
+
+            # 業界別の想定質問に対する回答パッセージの検索（BM25）
+            questions = build_question_set(detected_key, final_industry["primary"], self.industry_detector)
+            passage_coverage = question_coverage(main_content, questions)
+
+            # ローカル評価（API不要の項目）
+            local_scores = calculate_local_aio_scores(self.seo_results, main_content, passage_coverage)
+
+            # 本文のシグネチャとハッシュは一度だけ計算し、重複検出・再利用・保存で使い回す
+            signature = self.near_duplicate_index.signature(main_content)
+            main_content_hash = content_hash(main_content)
+
+            # サイト内の他ページとの重複・本文量・canonical の比較（サイト分析時のみ）
+            content_index = site_context.get("content_index")
+            site_content = None
+            if content_index is not None:
+                site_content = content_index.add_page(
+                    url, main_content, signature=signature,
+                    word_count=self.seo_results["content"]["word_count"],
+                    char_count=self.seo_results["content"]["char_count"],
+                    canonical_url=self.seo_results["technical"]["canonical_url"],
+                )
 
-            # 分析実行
-            self.seo_results = self._analyze_seo(soup, url)
-            self.aio_results = self._analyze_aio(soup, url, final_industry, industry_analysis)
+            # AIO分析
+            if tier == "quick":
+                self.aio_results = self._build_local_aio_results(url, title, final_industry, local_scores)
+            else:
+                self.aio_results = self._reuse_unchanged_aio_results(
+                    previous_state, main_content_hash, url, title, local_scores, tier, user_industry, final_industry
+                )
+                if self.aio_results is None:
+                    self.aio_results = self._reuse_similar_aio_results(
+                        url, title, main_content, local_scores, tier, user_industry, final_industry, signature
+                    )
+                if self.aio_results is None:
+                    self.aio_results = self._analyze_aio(
+                        soup, url, final_industry, industry_analysis, local_scores=local_scores, tier=tier,
+                        context={
+                            "サイト内リンク構造": format_link_context(link_metrics),
+                            "サイト内の重複・本文量": format_content_context(site_content),
+                            "想定質問への回答状況": format_coverage_context(passage_coverage),
+                        },
+                        passage_coverage=passage_coverage,
+                    )
+                    if "error" not in self.aio_results:
+                        self.near_duplicate_index.add(url, main_content, {
+                            "tier": tier, "user_industry": user_industry or "",
+                            "industry": final_industry["primary"], "results": self.aio_results,
+                        }, signature=signature)
 
             # 統合結果
             seo_weight = (100 - balance) / 100
@@ -318,6 +343,7 @@ class SEOAIOAnalyzer:
             advice = generate_actionable_advice(missing_contents, detected_key)
 
             self.last_analysis_results = {
+                "analysis_id": uuid.uuid4().hex,
                 "url": url,
                 "user_industry": user_industry,
                 "final_industry": final_industry,
@@ -330,8 +356,24 @@ class SEOAIOAnalyzer:
                 "industry_fit_score": industry_fit_score,
                 "missing_industry_contents": missing_contents,
                 "industry_advice": advice,
+                "tier": tier,
+                "local_aio_scores": local_scores,
+                "site_content": site_content,
+                "passage_coverage": passage_coverage,
+                "fingerprints": {
+                    "content_hash": fetch_result.content_hash,
+                    "main_content_hash": main_content_hash,
+                    "minhash": signature.tolist(),
+                    "minhash_version": SIGNATURE_VERSION,
+                    "etag": fetch_result.headers.get("ETag", ""),
+                    "last_modified": fetch_result.headers.get("Last-Modified", ""),
+                },
                 "timestamp": datetime.now().isoformat()
             }
+            if self.page_cache is not None and "error" not in self.aio_results:
+                self.page_cache.store_analysis(
+                    url, fetch_result.content_hash, cache_variant, self.last_analysis_results
+                )
             return self.last_analysis_results
 
         except requests.exceptions.Timeout:
@@ -343,15 +385,257 @@ class SEOAIOAnalyzer:
             traceback.print_exc()
             raise Exception(f"分析中に予期せぬエラーが発生しました: {str(e)}")
 
-    def _determine_final_industry(self, user_industry: str, auto_analysis: IndustryAnalysis) -> Dict:
-        """最終業界を決定"""
+    @staticmethod
+    def _predict_industry_with_model(title, main_content, meta_desc):
+        """業界分類モデルで予測する（モデルは毎回取得し、差し替え後はキャッシュキーの版と同じモデルを使う）"""
+        model = load_industry_model()
+        return model.predict(title, main_content, meta_desc) if model is not None else None
+
+    @staticmethod
+    def _analysis_cache_variant(user_industry, tier, measure_resources, check_links=False):
+        """保存済み分析結果を区別するキー（設定・プロンプト・業界タクソノミーが変われば再分析する）"""
+        return (
+            f"{tier}|{AIO_PROMPT_VERSION}|{taxonomy_version()}|{industry_model_version()}|{user_industry or ''}"
+            f"|{int(bool(measure_resources))}|{int(bool(check_links))}"
+        )
+
+    def _restore_cached_analysis(self, cached, balance, fetch_result):
+        """保存済みの分析結果を復元し、現在のバランス設定で統合スコアを再計算する"""
+        results = copy.deepcopy(cached)
+        if isinstance(results.get("industry_analysis"), dict):
+            results["industry_analysis"] = IndustryAnalysis(**results["industry_analysis"])
+        self.seo_results = results["seo_results"]
+        self.aio_results = results["aio_results"]
+        results["analysis_id"] = uuid.uuid4().hex  # 統合スコアを再計算するので別の分析として扱う
+        results["site_content"] = None  # 前回のサイト内比較は現在のクロールと無関係
+        results["balance"] = balance
+        results["integrated_results"] = self._integrate_results(
+            self.seo_results, self.aio_results, (100 - balance) / 100, balance / 100
+        )
+        results["analysis_cache"] = {
+            "analyzed_at": cached.get("timestamp", ""),
+            "not_modified": fetch_result.not_modified,
+            "revalidated_at": datetime.now().isoformat(),
+        }
+        self.last_analysis_results = results
+        return results
+
+    @staticmethod
+    def _adapt_reused_aio(payload, url, title, local_scores, tier, final_industry=None):
+        """再利用するAIO結果をこのページのURL・タイトル・業界・ローカル評価に合わせる"""
+        reused = copy.deepcopy(payload)
+        reused["basic_info"] = dict(reused.get("basic_info", {}), url=url, title=title)
+        if final_industry is not None:
+            reused["basic_info"]["industry"] = final_industry["primary"]
+        if tier == "standard" and local_scores:
+            SEOAIOAnalyzer._merge_local_aio_scores(reused, local_scores)
+        reused.pop("usage", None)
+        return reused
+
+    @staticmethod
+    def _merge_local_aio_scores(aio_results, local_scores):
+        """ローカル評価の項目とカテゴリを採用し、総合スコアを全項目から計算し直す（標準モード）"""
+        for key_score in LOCAL_AIO_CRITERIA:
+            aio_results["scores"][key_score] = local_scores[key_score]
+        aio_results["category_scores"] = dict(aio_results.get("category_scores", {}), **local_category_scores(local_scores))
+        values = [item.get("score", 0) for item in aio_results["scores"].values()]
+        values = [v if isinstance(v, (int, float)) else 0 for v in values]
+        aio_results["total_score"] = sum(values) / len(values) * 10 if values else 0.0
+
+    def _reuse_similar_aio_results(self, url, title, main_content, local_scores, tier, user_industry, final_industry,
+                                   signature=None):
+        """分析済みの類似ページがあれば、そのAIO結果をこのページ向けに調整して返す
+
+        分析モード・指定業界・最終業界が同じ他のページだけを対象にする（同じURLの
+        再分析は業界設定を変えた可能性があるため、必ずAIO分析をやり直す）。
+        """
+        def accept(key, payload):
+            return (
+                key != url
+                and payload.get("tier") == tier
+                and payload.get("user_industry") == (user_industry or "")
+                and payload.get("industry") == final_industry["primary"]
+            )
+
+        match = self.near_duplicate_index.find(main_content, signature=signature, accept=accept)
+        if match is None:
+            return None
+        print(f"[INFO] 類似ページのAIO結果を再利用: {match.key} (類似度: {match.similarity:.2f})")
+        reused = self._adapt_reused_aio(match.payload["results"], url, title, local_scores, tier, final_industry)
+        reused["reused_from"] = {"url": match.key, "similarity": match.similarity}
+        return reused
+
+    def _reuse_unchanged_aio_results(self, previous_state, main_content_hash, url, title, local_scores, tier,
+                                     user_industry, final_industry):
+        """前回クロール時から本文（メインコンテンツ）と業界設定が変わっていなければ、そのAIO結果を返す"""
+        stored = previous_state.aio_results if previous_state is not None else None
+        if (
+            not stored
+            or previous_state.main_content_hash != main_content_hash
+            or stored.get("tier") != tier
+            or stored.get("prompt_version") != AIO_PROMPT_VERSION
+            or stored.get("taxonomy_version") != taxonomy_version()
+            or stored.get("industry_model_version") != industry_model_version()
+            or stored.get("user_industry") != (user_industry or "")
+            or stored.get("industry") != final_industry["primary"]
+        ):
+            return None
+        print(f"[INFO] 本文に変更がないため前回のAIO結果を再利用: {url}")
+        reused = self._adapt_reused_aio(stored["results"], url, title, local_scores, tier, final_industry)
+        reused["unchanged_since"] = datetime.fromtimestamp(previous_state.last_analyzed).isoformat()
+        return reused
+
+    def analyze_urls(self, urls, user_industry="", balance=50, tier=DEFAULT_ANALYSIS_TIER):
+        """複数URLを順に分析し、結果を1件ずつ返す（類似ページはAIO結果を再利用）"""
+        for url in urls:
+            try:
+                yield self.analyze_url(url, user_industry, balance, tier)
+            except Exception as e:
+                print(f"[WARN] 一括分析でエラー ({url}): {e}")
+                yield {"url": url, "error": str(e), "timestamp": datetime.now().isoformat()}
+
+    def analyze_site(self, start_url, user_industry="", balance=50, tier=DEFAULT_ANALYSIS_TIER,
+                     max_pages=CRAWL_MAX_PAGES, max_depth=CRAWL_MAX_DEPTH, crawl_config=None,
+                     incremental=False, recrawl_policy=None, check_links=False):
+        """サイトをクロールしながら1ページずつ分析し、結果を順に返す
+
+        sitemap.xml と各ページの内部リンクから巡回先を見つけ、robots.txt と
+        ホスト単位のアクセス間隔を守って取得する。incremental=True なら
+        クロール状態ストアを参照し、lastmod が更新されたページと一定期間
+        再取得していないページだけを分析する。
+        """
+        if not start_url.startswith(('http://', 'https://')):
+            start_url = 'https://' + start_url
+        if incremental and self.crawl_state is None:
+            raise ValueError("差分クロールにはクロール状態ストアの設定が必要です")
+        config = crawl_config or CrawlConfig(max_pages=max_pages, max_depth=max_depth)
+        crawler = SiteCrawler(
+            start_url, session=self.http_session, config=config,
+            state_store=self.crawl_state if incremental else None, policy=recrawl_policy,
+        )
+        # 最後のページの後にスキップされた分も含め、クロール統計を参照できるようにする
+        self.last_crawl_stats = crawler.stats
+        # 内部リンクグラフ（指標は辺が5%増えるまで同じスナップショットを使い回す）
+        graph = LinkGraph(refresh_ratio=0.05)
+        if incremental:
+            for known_url, known_links in self.crawl_state.iter_links():
+                graph.add_page(known_url, known_links)
+        # ページ同士の重複・薄いコンテンツ（LSHで到着順に比較）
+        content_index = SiteContentIndex()
+        self.last_link_summary = {}
+        self.last_content_summary = {}
+        for task in crawler:
+            site_context = {
+                # クロール途中のグラフでは孤立ページかどうかもクリック深度も確定しない（完了後の集計で報告）
+                "link_metrics": graph.page_metrics(task.url, start_url, complete=False) if len(graph) else None,
+                "content_index": content_index,
+            }
+            try:
+                with crawler.fetch_slot(task.url):
+                    results = self.analyze_url(
+                        task.url, user_industry, balance, tier, previous_state=task.state, site_context=site_context,
+                        check_links=check_links,
+                    )
+            except Exception as e:
+                print(f"[WARN] クロール中のエラー ({task.url}): {e}")
+                yield {"url": task.url, "error": str(e), "crawl": task.to_dict(), "timestamp": datetime.now().isoformat()}
+                continue
+            internal_links = results["seo_results"].get("links", {}).get("internal", [])
+            crawler.add_links(task, internal_links)
+            graph.add_page(task.url, internal_links)
+            if task.url not in content_index:
+                # 保存済み結果を使ったページは保存されたシグネチャで登録する
+                self._index_cached_content(content_index, task.url, results)
+            if incremental:
+                self._record_crawl_state(task, results, internal_links)
+            results["crawl"] = {**task.to_dict(), "stats": dict(crawler.stats)}
+            yield results
+        self.last_link_summary = graph.summary(start_url)
+        self.last_content_summary = content_index.summary()
+
+    @staticmethod
+    def _index_cached_content(content_index, url, results):
+        fingerprints = results.get("fingerprints", {})
+        # 方式の異なる古いシグネチャは今のシグネチャと比較できない
+        if not fingerprints.get("minhash") or fingerprints.get("minhash_version") != SIGNATURE_VERSION:
+            return
+        seo_results = results["seo_results"]
+        results["site_content"] = content_index.add_page(
+            url, signature=np.array(fingerprints["minhash"], dtype=np.uint64),
+            digest=fingerprints.get("main_content_hash", ""),
+            word_count=seo_results["content"]["word_count"],
+            char_count=seo_results["content"].get("char_count"),
+            canonical_url=seo_results["technical"]["canonical_url"],
+        )
+
+    def _record_crawl_state(self, task, results, internal_links):
+        """分析結果からクロール状態を保存する（AIO結果は本文ハッシュと組で保持）"""
+        fingerprints = results.get("fingerprints", {})
+        aio_results = results.get("aio_results") or {}
+        previous = task.state
+        reused = "unchanged_since" in aio_results or "analysis_cache" in results
+        stored_aio = None
+        if results.get("tier") != "quick" and "error" not in aio_results:
+            stored_aio = {
+                "tier": results.get("tier"), "prompt_version": AIO_PROMPT_VERSION,
+                "taxonomy_version": taxonomy_version(), "industry_model_version": industry_model_version(),
+                "user_industry": results.get("user_industry") or "",
+                "industry": (results.get("final_industry") or {}).get("primary"), "results": aio_results,
+            }
+        now = time.time()
+        self.crawl_state.upsert(PageState(
+            url=task.url,
+            last_fetched=now,
+            etag=fingerprints.get("etag", ""),
+            last_modified=fingerprints.get("last_modified", ""),
+            content_hash=fingerprints.get("content_hash", ""),
+            main_content_hash=fingerprints.get("main_content_hash", ""),
+            lastmod=task.lastmod or (previous.lastmod if previous else None),
+            links=internal_links,
+            aio_results=stored_aio,
+            last_analyzed=previous.last_analyzed if reused and previous else now,
+        ))
+
+    def _build_local_aio_results(self, url, title, final_industry, local_scores):
+        """クイックモード用: ローカル評価のみでAIO結果を構成"""
+        scores = {
+            key: local_scores.get(key, {"score": 0, "advice": "クイック分析では評価対象外です（標準・詳細モードで評価）"})
+            for key in AIO_SCORE_MAP_JP.keys()
+        }
+        local_values = [item["score"] for item in local_scores.values()]
+        total = sum(local_values) / len(local_values) * 10 if local_values else 0.0
+        return {
+            "basic_info": {"url": url, "industry": final_industry['primary'], "title": title},
+            "scores": scores,
+            "category_scores": local_category_scores(local_scores),
+            "total_score": total,
+            "immediate_actions": [
+                {"action": AIO_SCORE_MAP_JP[key], "method": item["advice"], "expected_impact": item["evidence"]}
+                for key, item in sorted(local_scores.items(), key=lambda kv: kv[1]["score"])[:3]
+            ],
+            "medium_term_strategies": [],
+            "competitive_advantages": [],
+            "market_trend_strategies": [],
+            "industry_analysis": {},
+            "tier": "quick",
+        }
+
+    def _determine_final_industry(self, user_industry: str, auto_analysis: IndustryAnalysis,
+                                  model_prediction: Optional[IndustryPrediction] = None) -> Dict:
+        """最終業界を決定
+
+        model_prediction は学習済み分類モデルの予測（任意）。キーワード判定の
+        信頼度が低いとき、確率が INDUSTRY_MODEL_MIN_CONFIDENCE 以上なら採用する。
+        """
         result = {
             "primary": user_industry if user_industry else auto_analysis.primary_industry,
             "source": "",
             "confidence": 0.0,
             "secondary_detected": auto_analysis.secondary_industries,
             "auto_primary": auto_analysis.primary_industry,
-            "auto_confidence": auto_analysis.confidence_score
+            "auto_confidence": auto_analysis.confidence_score,
+            "model_primary": model_prediction.label if model_prediction else "",
+            "model_confidence": model_prediction.confidence if model_prediction else 0.0,
         }
         
         if user_industry and auto_analysis.confidence_score > 50:
@@ -367,6 +651,10 @@ class SEOAIOAnalyzer:
         elif auto_analysis.confidence_score > 70:
             result["source"] = f"自動判定（信頼度: {auto_analysis.confidence_score:.1f}%）"
             result["confidence"] = auto_analysis.confidence_score
+        elif model_prediction and model_prediction.confidence >= INDUSTRY_MODEL_MIN_CONFIDENCE:
+            result["primary"] = model_prediction.label
+            result["source"] = f"分類モデル（確率: {model_prediction.confidence:.1f}%）"
+            result["confidence"] = model_prediction.confidence
         else:
             result["primary"] = "指定なし"
             result["source"] = "判定困難"
@@ -400,17 +688,19 @@ class SEOAIOAnalyzer:
         body = soup.find('body')
         return body.get_text(separator=' ', strip=True) if body else soup.get_text(separator=' ', strip=True)
 
-    def _analyze_seo(self, soup, url):
-        """SEO分析"""
+    def _analyze_seo(self, soup, url, html_text=None, performance=None, link_metrics=None, link_checker=None):
+        """SEO分析
+
+        html_text は取得した生のHTML、performance は fetch_page の計測値、
+        link_metrics はサイト内リンクグラフ上の指標（サイト分析時のみ）。
+        link_checker を渡すと内部・外部リンクのリンク切れを確認する。
+        """
         title_tag = soup.find('title')
         title = title_tag.string.strip() if title_tag and title_tag.string else ""
 
         meta_description_tag = soup.find('meta', attrs={'name': 'description'})
         description = meta_description_tag['content'].strip() if meta_description_tag and meta_description_tag.has_attr('content') else ""
 
-        garbled_title = detect_mojibake(title)
-        garbled_description = detect_mojibake(description)
-
         og_title_tag = soup.find('meta', attrs={'property': 'og:title'})
         og_title = og_title_tag['content'].strip() if og_title_tag and og_title_tag.has_attr('content') else ""
 
@@ -450,7 +740,7 @@ class SEOAIOAnalyzer:
                 continue
 
             try:
-                full_url = requests.compat.urljoin(url, href.strip())
+                full_url = requests.compat.urljoin(url, href.strip()).split('#', 1)[0]
                 link_domain_ext = tldextract.extract(full_url)
                 link_domain = link_domain_ext.domain + '.' + link_domain_ext.suffix
 
@@ -461,6 +751,24 @@ class SEOAIOAnalyzer:
             except Exception:
                 continue
 
+        # リンク切れチェック（任意。内部リンクを優先して時間予算内で確認）
+        link_validation = None
+        if link_checker is not None:
+            link_validation = link_checker.check(list(dict.fromkeys(internal_links + external_links)))
+
+        # 構造要素（ローカルAIO評価用）
+        lists_count = len(soup.find_all(['ul', 'ol']))
+        definition_lists_count = len(soup.find_all('dl'))
+        tables_count = len(soup.find_all('table'))
+        paragraphs_count = sum(1 for p in soup.find_all('p') if len(p.get_text(strip=True)) >= 20)
+        videos_count = len(soup.find_all('video')) + sum(
+            1 for f in soup.find_all('iframe') if re.search(r'youtube|vimeo', f.get('src', ''))
+        )
+        question_headings = sum(
+            1 for h in soup.find_all(['h2', 'h3', 'h4'])
+            if re.search(r'[?？]\s*$|^\s*Q[\s.:：]|とは', h.get_text(strip=True))
+        )
+
         # 画像分析
         images = soup.find_all('img')
         images_with_alt = sum(1 for img in images if img.get('alt', '').strip())
@@ -491,7 +799,7 @@ class SEOAIOAnalyzer:
         if meta_generator_tag and meta_generator_tag.has_attr('content'):
             generator = meta_generator_tag['content'].strip().lower()
 
-        html_code = soup.prettify()
+        html_code = html_text if html_text is not None else str(soup)
         html_lower = html_code.lower()
         if 'wordpress' in generator or 'wp-content' in html_lower:
             tech_stack.append('WordPress')
@@ -501,21 +809,34 @@ class SEOAIOAnalyzer:
             tech_stack.append('Wix')
 
         main_content_text = self._extract_main_content(soup)
-        word_count = len(main_content_text.split())
-
-        words = re.findall(r'[A-Za-z]{3,}', main_content_text.lower())
-        stop_words = {
-            'the','and','for','with','that','this','you','your','from','are','was','were','have','has','not','but','can','will','his','her','its','she','him','our','out','use','using'
-        }
-        filtered = [w for w in words if w not in stop_words]
-        freq = Counter(filtered)
-        top_keywords = freq.most_common(10)
+        # 日本語も語数・キーワードを数えられるよう文字種で分割する（fugashiがあれば辞書を使用）
+        text_stats = analyze_text(main_content_text)
+        word_count = text_stats.word_count
+        top_keywords = text_stats.top_terms(10)
+
+        # 文字化けチェック（タイトル・説明文・OGP・本文・見出し・alt を一括判定）
+        heading_list = [h.get_text(strip=True) for h in soup.find_all(['h1', 'h2', 'h3', 'h4', 'h5', 'h6'])]
+        alt_list = [img.get('alt', '').strip() for img in images if img.get('alt', '').strip()]
+        fields = {"title": title, "meta_description": description, "og_title": og_title,
+                  "og_description": og_description, "content": main_content_text}
+        # 本文は置換文字などが1文字混じっただけで全体を文字化け扱いしないよう割合で判定する
+        long_text = [key == "content" for key in fields] + [False] * (len(heading_list) + len(alt_list))
+        mojibake_ratios = detect_mojibake_batch(list(fields.values()) + heading_list + alt_list, long_text)
+        garbled_flags = mojibake_ratios > MOJIBAKE_THRESHOLD
+        garbled = {key: bool(flag) for key, flag in zip(fields, garbled_flags)}
+        garbled["content_ratio"] = round(float(mojibake_ratios[len(fields) - 1]), 3)
+        element_flags = garbled_flags[len(fields):]
+        garbled["headings"] = [text for text, flag in zip(heading_list, element_flags) if flag]
+        garbled["alt_texts"] = [text for text, flag in zip(alt_list, element_flags[len(heading_list):]) if flag]
 
         text_content_all = soup.get_text(separator=' ', strip=True)
         text_html_ratio = (len(text_content_all) / max(len(html_code), 1)) * 100 if html_code else 0
 
         meta_tags_count = len(soup.find_all('meta'))
-        page_size_kb = len(html_code.encode('utf-8', errors='ignore')) / 1024 if html_code else 0
+        if performance:
+            page_size_kb = performance.get("uncompressed_bytes", 0) / 1024
+        else:
+            page_size_kb = len(html_code.encode('utf-8', errors='ignore')) / 1024 if html_code else 0
 
         personalization = {
             "meta": {
@@ -536,9 +857,11 @@ class SEOAIOAnalyzer:
             "meta_description_score": self._calculate_meta_description_score(description),
             "headings_score": self._calculate_headings_score(headings),
             "content_score": self._calculate_content_score(word_count, text_html_ratio),
-            "links_score": self._calculate_links_score(len(internal_links), len(external_links)),
+            "links_score": self._calculate_links_score(
+                len(internal_links), len(external_links), link_metrics, link_validation
+            ),
             "images_score": self._calculate_images_score(images_with_alt, images_without_alt),
-            "technical_score": self._calculate_technical_score(has_structured_data, has_viewport, canonical_url),
+            "technical_score": self._calculate_technical_score(has_structured_data, has_viewport, canonical_url, performance),
         }
         total_score = sum(scores.values()) / len(scores) * 10 if scores else 0
 
@@ -547,14 +870,25 @@ class SEOAIOAnalyzer:
                        "meta_description_length": len(description), "og_title": og_title, "og_description": og_description},
             "structure": {"headings": headings, "internal_links_count": len(internal_links),
                           "external_links_count": len(external_links), "images_count": len(images),
-                          "images_with_alt": images_with_alt, "images_without_alt": images_without_alt},
+                          "images_with_alt": images_with_alt, "images_without_alt": images_without_alt,
+                          "lists_count": lists_count, "definition_lists_count": definition_lists_count,
+                          "tables_count": tables_count, "paragraphs_count": paragraphs_count,
+                          "videos_count": videos_count, "question_headings": question_headings},
             "technical": {"has_structured_data": has_structured_data, "structured_data_count": len(structured_data_scripts),
                           "canonical_url": canonical_url, "has_viewport": has_viewport,
-                          "meta_tags_count": meta_tags_count, "page_size_kb": page_size_kb},
-            "content": {"word_count": word_count, "text_html_ratio": text_html_ratio},
+                          "meta_tags_count": meta_tags_count, "page_size_kb": page_size_kb,
+                          "charset": (performance or {}).get("charset", ""),
+                          "charset_source": (performance or {}).get("charset_source", ""),
+                          "truncated": (performance or {}).get("truncated", False),
+                          "performance": performance or {}},
+            "content": {"word_count": word_count, "char_count": text_stats.char_count,
+                        "japanese_ratio": text_stats.japanese_ratio, "tokenizer": text_stats.tokenizer,
+                        "text_html_ratio": text_html_ratio},
+            "links": {"internal": list(dict.fromkeys(internal_links)), "external": list(dict.fromkeys(external_links)),
+                      "graph": link_metrics, "validation": link_validation},
             "personalization": personalization,
             "scores": scores, "total_score": total_score,
-            "garbled": {"title": garbled_title, "meta_description": garbled_description},
+            "garbled": garbled,
         }
 
     # SEOスコア計算メソッド群
@@ -586,10 +920,22 @@ class SEOAIOAnalyzer:
         r_sc = 10 if tr >= 20 else (8 if tr >= 15 else (6 if tr >= 10 else (4 if tr >= 5 else 2)))
         return w_sc * 0.7 + r_sc * 0.3
 
-    def _calculate_links_score(self, int_l, ext_l):
+    def _calculate_links_score(self, int_l, ext_l, link_metrics=None, link_validation=None):
         int_sc = 10 if int_l >= 5 else (8 if int_l >= 3 else (5 if int_l >= 1 else 0))
         ext_sc = 10 if ext_l >= 3 else (8 if ext_l >= 1 else 5)
-        return int_sc * 0.7 + ext_sc * 0.3
+        score = int_sc * 0.7 + ext_sc * 0.3
+        if link_metrics:
+            # サイト内での位置付け: 孤立ページ・深すぎる階層は減点（未確定の None は除く）、重要ページは加点
+            if link_metrics.get("orphan"):
+                score -= 3
+            depth = link_metrics.get("click_depth")
+            if depth is not None and depth > 3:
+                score -= min(3, depth - 3)
+            if link_metrics.get("pagerank_percentile", 0) >= 80:
+                score += 1
+        # リンク切れ・多段リダイレクトは減点
+        score -= link_check_penalty(link_validation)
+        return max(0, min(10, score))
 
     def _calculate_images_score(self, img_alt, img_no_alt):
         total = img_alt + img_no_alt
@@ -601,150 +947,52 @@ class SEOAIOAnalyzer:
         elif ratio >= 0.4: return 4
         else: return 2 if ratio >= 0.2 else 0
 
-    def _calculate_technical_score(self, struct_data, viewport, canon_url):
+    def _calculate_technical_score(self, struct_data, viewport, canon_url, performance=None):
         sc = [(10 if struct_data else 0), (10 if viewport else 0), (10 if canon_url else 5)]
+        if performance:
+            sc.append(page_speed_score(performance))
         return sum(sc) / len(sc) if sc else 0
 
-    def _analyze_aio(self, soup, url, final_industry, industry_analysis):
-        """AIO分析（GPT-4.1-mini使用）"""
+    def _analyze_aio(self, soup, url, final_industry, industry_analysis, local_scores=None, tier="deep",
+                     context=None, passage_coverage=None):
+        """AIO分析（GPT-4.1-mini使用）
+
+        標準モードではローカル評価済み項目をLLMの出力対象から外し、
+        詳細モードでは全項目をLLMに評価させつつローカル評価を参考値として渡す。
+        context（見出し→本文）はサイト構造などの補足情報としてページ固有部分に加える。
+        本文が長い場合は冒頭と想定質問への回答パッセージ（passage_coverage）だけを送る。
+        """
+        compact = tier == "standard" and bool(local_scores)
         title = soup.title.string.strip() if soup.title and soup.title.string else "N/A"
         main_content = self._extract_main_content(soup)
-        content_preview = main_content[:7000]
-
-        # 業界情報の整理
-        industry_info = f"""
-主要業界: {final_industry['primary']} ({final_industry['source']})
-信頼度: {final_industry['confidence']:.1f}%
-検出された副業界: {', '.join(final_industry['secondary_detected'][:3]) if final_industry['secondary_detected'] else 'なし'}
-専門用語: {', '.join(industry_analysis.specialized_terms[:5]) if industry_analysis.specialized_terms else 'なし'}
-ターゲット層: {', '.join(industry_analysis.target_audience_clues) if industry_analysis.target_audience_clues else '不明'}
-規制要件: {', '.join(industry_analysis.regulatory_indicators) if industry_analysis.regulatory_indicators else 'なし'}
-        """
+        content_preview = build_content_preview(main_content, passage_coverage)
 
-        aio_prompt = f"""
-あなたは最先端のAIO（生成AI検索最適化）専門家です。
-以下のウェブページを、生成AI検索エンジン（ChatGPT Search、Claude、Gemini、Perplexity等）での
-パフォーマンス向上の観点から専門的に分析してください。
-
-**分析対象:**
-URL: {url}
-タイトル: {title}
-
-**業界分析結果:**
-{industry_info}
-
-**コンテンツ:**
-{content_preview}
-
-## 評価項目（各10点満点）
-
-### 1. E-E-A-T評価（40%）
-- **Experience（経験）**: 実体験・一次情報の豊富さ、具体的事例の質
-- **Expertise（専門性）**: 専門知識の深さ、最新情報への対応度  
-- **Authoritativeness（権威性）**: 引用価値、業界認知度、信頼できる情報源との関連性
-- **Trustworthiness（信頼性）**: 事実確認の容易さ、透明性、偏見のなさ
-
-### 2. AI検索最適化（35%）
-- **構造化・整理**: 論理的構造、AI理解しやすい情報階層
-- **質問応答適合性**: ユーザーの質問に直接答える形式度
-- **引用可能性**: AI回答での引用されやすさ、要約しやすさ
-- **マルチモーダル対応**: 画像・表・図表とその説明の質
-
-### 3. ユーザー体験（25%）
-- **検索意図マッチング**: 様々な検索意図への対応度
-- **パーソナライズ可能性**: 異なるユーザー層への適応性
-- **情報の独自性**: オリジナルコンテンツ、独自視点の提供
-- **コンテンツ完全性**: トピックの包括的カバー、深さ
-
-## {final_industry['primary']}業界特化分析
-現在の市場トレンドを踏まえて以下観点から評価してください：
-- 業界専門用語の適切な使用と説明
-- 2025年の業界トレンド・最新情報の反映度  
-- ターゲットユーザーへの適合性
-- 競合他社との差別化ポイント
-- 業界特有の信頼性指標（資格、実績、認証等）
-- 規制・コンプライアンス要素への対応
-
-## 改善アクション
-1. **即効改善施策**（1-2週間で実装可能）- 3つ以上
-2. **中期戦略施策**（1-3ヶ月）- 3つ以上
-3. **競合差別化施策** - 3つ以上
-4. **市場トレンド対応施策** - 現在の{final_industry['primary']}業界トレンドに基づく具体的施策
-
-## JSON出力形式
-{{
-  "basic_info": {{ "url": "{url}", "industry": "{final_industry['primary']}", "title": "{title}" }},
-  "scores": {{
-    "experience": {{"score": 0, "advice": "具体的で実践的なアドバイス"}},
-    "expertise": {{"score": 0, "advice": "具体的で実践的なアドバイス"}},
-    "authoritativeness": {{"score": 0, "advice": "具体的で実践的なアドバイス"}},
-    "trustworthiness": {{"score": 0, "advice": "具体的で実践的なアドバイス"}},
-    "structure": {{"score": 0, "advice": "具体的で実践的なアドバイス"}},
-    "qa_compatibility": {{"score": 0, "advice": "具体的で実践的なアドバイス"}},
-    "citation_potential": {{"score": 0, "advice": "具体的で実践的なアドバイス"}},
-    "multimodal": {{"score": 0, "advice": "具体的で実践的なアドバイス"}},
-    "search_intent": {{"score": 0, "advice": "具体的で実践的なアドバイス"}},
-    "personalization": {{"score": 0, "advice": "具体的で実践的なアドバイス"}},
-    "uniqueness": {{"score": 0, "advice": "具体的で実践的なアドバイス"}},
-    "completeness": {{"score": 0, "advice": "具体的で実践的なアドバイス"}},
-    "readability": {{"score": 0, "advice": "具体的で実践的なアドバイス"}},
-    "mobile_friendly": {{"score": 0, "advice": "具体的で実践的なアドバイス"}},
-    "page_speed": {{"score": 0, "advice": "具体的で実践的なアドバイス"}},
-    "metadata": {{"score": 0, "advice": "具体的で実践的なアドバイス"}}
-  }},
-  "category_scores": {{
-    "eeat_score": 0.0, "ai_search_score": 0.0, "user_experience_score": 0.0, "technical_score": 0.0
-  }},
-  "total_score": 0.0,
-  "immediate_actions": [
-    {{"action": "施策", "method": "具体的な実装方法", "expected_impact": "期待効果"}}
-  ],
-  "medium_term_strategies": [
-    {{"strategy": "戦略", "timeline": "実装期間", "expected_outcome": "期待成果"}}
-  ],
-  "competitive_advantages": [
-    {{"advantage": "差別化ポイント", "implementation": "具体的な実装方法"}}
-  ],
-  "market_trend_strategies": [
-    {{"trend": "トレンド", "strategy": "対応戦略", "priority": "優先度"}}
-  ],
-  "industry_analysis": {{
-    "industry_fit": "{final_industry['primary']}業界への適合度評価",
-    "specialized_improvements": "業界特化改善提案",
-    "compliance_check": "規制・コンプライアンス対応状況",
-    "market_trends": "現在の市場トレンドと対応状況"
-  }}
-}}
-"""
+        # 業界情報の整理（静的な指示の後ろに置くページ固有データ）
+        industry_info = build_industry_info(final_industry, industry_analysis)
+        aio_prompt = build_aio_prompt(
+            url, title, industry_info, content_preview, local_scores=local_scores, compact=compact,
+            context=context,
+        )
+        cache_key = f"{AIO_PROMPT_VERSION}-{'compact' if compact else 'full'}"
 
         try:
             # GPTモデルを利用
             model_name = DEFAULT_CHAT_MODEL
             print(f"[DEBUG] 使用モデル: {model_name}")
             
-            # JSON形式を強制するシステムメッセージ
-            system_message = """あなたはSEOとAIO（生成AI検索最適化）の専門家です。
-必要に応じて最新の市場トレンドを検索して分析結果に含めてください。
-
-**重要**: 回答は必ず有効なJSON形式でのみ返してください。
-JSON以外のテキストや説明は一切含めないでください。
-回答の最初と最後に```json や ``` などのマークダウンも不要です。
-純粋なJSONオブジェクトのみを返してください。"""
-            
             # 基本パラメータ設定
             base_params = {
                 "model": model_name,
-                "messages": [
-                    {"role": "system", "content": system_message},
-                    {"role": "user", "content": aio_prompt}
-                ],
+                "messages": build_aio_messages(aio_prompt),
                 "timeout": 180,
                 "temperature": DEFAULT_TEMPERATURE,
                 "top_p": DEFAULT_TOP_P,
                 "response_format": {"type": "json_object"},
+                "extra_body": {"prompt_cache_key": cache_key},
             }
             
             response = self.client.chat.completions.create(**base_params)
+            usage_stats = self._record_usage(response)
 
             aio_analysis_str = response.choices[0].message.content
             print(f"[DEBUG] APIレスポンス長: {len(aio_analysis_str) if aio_analysis_str else 0}")
@@ -784,18 +1032,17 @@ JSON以外のテキストや説明は一切含めないでください。
                 # フォールバック: DEFAULT_CHAT_MODEL に切り替え
                 fallback_params = {
                     "model": DEFAULT_CHAT_MODEL,
-                    "messages": [
-                        {"role": "system", "content": "あなたはSEOとAIO（生成AI検索最適化）の専門家です。分析結果を指示されたJSON形式で返してください。"},
-                        {"role": "user", "content": aio_prompt}
-                    ],
+                    "messages": build_aio_messages(aio_prompt, AIO_FALLBACK_SYSTEM_MESSAGE),
                     "response_format": {"type": "json_object"},
                     "temperature": DEFAULT_TEMPERATURE,
                     "top_p": DEFAULT_TOP_P,
-                    "timeout": 180
+                    "timeout": 180,
+                    "extra_body": {"prompt_cache_key": cache_key},
                 }
 
                 print(f"[DEBUG] フォールバックモデル: {DEFAULT_CHAT_MODEL}")
                 response = self.client.chat.completions.create(**fallback_params)
+                usage_stats = self._record_usage(response)
                 aio_analysis_str = response.choices[0].message.content
                 aio_analysis = json.loads(aio_analysis_str)
                 print("[INFO] フォールバック成功")
@@ -808,7 +1055,7 @@ JSON以外のテキストや説明は一切含めないでください。
 
             # 結果の正規化
             normalized_result = {
-                "basic_info": aio_analysis.get("basic_info", {"url": url, "industry": final_industry['primary'], "title": title}),
+                "basic_info": {"url": url, "industry": final_industry['primary'], "title": title},
                 "scores": {},
                 "category_scores": aio_analysis.get("category_scores", {}),
                 "total_score": aio_analysis.get("total_score", 0.0),
@@ -816,7 +1063,8 @@ JSON以外のテキストや説明は一切含めないでください。
                 "medium_term_strategies": aio_analysis.get("medium_term_strategies", []),
                 "competitive_advantages": aio_analysis.get("competitive_advantages", []),
                 "market_trend_strategies": aio_analysis.get("market_trend_strategies", []),
-                "industry_analysis": aio_analysis.get("industry_analysis", {})
+                "industry_analysis": aio_analysis.get("industry_analysis", {}),
+                "usage": usage_stats,
             }
 
             # スコアの検証
@@ -838,6 +1086,10 @@ JSON以外のテキストや説明は一切含めないでください。
             for cat, val in normalized_result.get("category_scores", {}).items():
                 categories[cat] = self._scale_to_100(val)
             normalized_result["category_scores"] = categories
+            if compact:
+                # ローカル評価済み項目はローカルスコアを採用し、カテゴリと総合スコアもそれに合わせる
+                self._merge_local_aio_scores(normalized_result, local_scores)
+            normalized_result["tier"] = tier
 
             return normalized_result
 
@@ -853,6 +1105,8 @@ JSON以外のテキストや説明は一切含めないでください。
 
         # エラー時のフォールバックデータ
         default_scores = {key: {"score": 1, "advice": f"APIエラーのため評価できません: {error_message}"} for key in AIO_SCORE_MAP_JP.keys()}
+        if local_scores:
+            default_scores.update(local_scores)
         return {
             "basic_info": {"url": url, "industry": final_industry['primary'], "title": title},
             "scores": default_scores,
@@ -924,442 +1178,63 @@ JSON以外のテキストや説明は一切含めないでください。
         }
 
     def generate_enhanced_pdf_report(self, output_path, logo_path=None):
-        """強化版PDF生成（グラフ含む）"""
-        if not self.last_analysis_results:
-            raise ValueError("分析結果がありません。分析を先に実行してください。")
-
-        def safe_str(value, default=""):
-            return str(value) if value is not None else default
-
-        doc = SimpleDocTemplate(
-            output_path,
-            pagesize=A4,
-            rightMargin=2*cm,
-            leftMargin=2*cm,
-            topMargin=2*cm,
-            bottomMargin=2*cm,
-        )
+        """強化版PDFをファイルに保存する（generate_pdf_report_bytes の薄いラッパー）"""
+        pdf_bytes = self.generate_pdf_report_bytes(logo_path)
+        with open(output_path, "wb") as f:
+            f.write(pdf_bytes)
+        return output_path
 
+    def pdf_report_builder(self, logo_path=None) -> "PDFReportBuilder":
+        """直近の分析結果からPDFを作るビルダー（分析器の他の状態は使わない）"""
+        return PDFReportBuilder(self.last_analysis_results, logo_path)
 
-        styles = getSampleStyleSheet()
-        title_style = ParagraphStyle(
-            'DocTitle',
-            parent=styles['h1'],
-            fontName=DEFAULT_PDF_FONT,
-            fontSize=22,
-            alignment=TA_CENTER,
-            spaceAfter=6*mm,
-            textColor=colors.HexColor(COLOR_PALETTE["secondary"]),
-        )
-        h1_style = ParagraphStyle(
-            'DocH1',
-            parent=styles['h1'],
-            fontName=DEFAULT_PDF_FONT,
-            fontSize=16,
-            spaceBefore=6*mm,
-            spaceAfter=3*mm,
-            textColor=colors.HexColor(COLOR_PALETTE["primary"]),
-        )
-        h2_style = ParagraphStyle(
-            'DocH2',
-            parent=styles['h2'],
-            fontName=DEFAULT_PDF_FONT,
-            fontSize=14,
-            spaceBefore=4*mm,
-            spaceAfter=2*mm,
-            textColor=colors.HexColor(COLOR_PALETTE["secondary"]),
-        )
-        normal_style = ParagraphStyle(
-            'DocNormal',
-            parent=styles['Normal'],
-            fontName=DEFAULT_PDF_FONT,
-            fontSize=10,
-            spaceAfter=2*mm,
-            leading=14,
-            textColor=colors.HexColor(COLOR_PALETTE["text_primary"]),
-        )
-        centered_style = ParagraphStyle('DocCentered', parent=normal_style, alignment=TA_CENTER, fontName=DEFAULT_PDF_FONT)
+    def generate_pdf_report_bytes(self, logo_path=None) -> bytes:
+        """強化版PDF（グラフ含む）をメモリ上で生成してバイト列で返す"""
+        return self.pdf_report_builder(logo_path).to_bytes()
 
-        story = []
+    def iter_pdf_report(self, logo_path=None, chunk_size=PDF_STREAM_CHUNK_SIZE):
+        """強化版PDFを chunk_size ごとのバイト列で順に返す（レスポンスへの逐次書き込み用）"""
+        return self.pdf_report_builder(logo_path).iter_chunks(chunk_size)
 
+    def write_pdf_report(self, out, logo_path=None):
+        """強化版PDFをバイナリの書き込み先 out（BytesIO など）に書き出す"""
+        self.pdf_report_builder(logo_path).write(out)
 
-        # ロゴ
-        if logo_path and os.path.exists(logo_path):
-            try:
-                img = ReportLabImage(logo_path, width=40*mm, height=15*mm)
-                story.append(img)
-                story.append(Spacer(1, 2*mm))
-            except Exception as e:
-                print(f"ロゴ画像の読み込みに失敗: {e}")
-
-        # タイトル
-        story.append(Paragraph(f"{APP_NAME} 詳細分析レポート", title_style))
-        story.append(Paragraph(f"分析日時: {datetime.now().strftime('%Y年%m月%d日 %H:%M')}", centered_style))
-        story.append(Spacer(1, 6*mm))
-
-        # 1. エグゼクティブサマリー
-        story.append(Paragraph("<u>1. エグゼクティブサマリー</u>", h1_style))
-        section_break(story, doc.width)
-        story.append(Paragraph(f"<b>対象URL:</b> {self.last_analysis_results['url']}", normal_style))
-        
-        final_industry = self.last_analysis_results['final_industry']
-        industry_analysis = self.last_analysis_results['industry_analysis']
-        integrated_results = self.last_analysis_results["integrated_results"]
-        
-        story.append(Paragraph(f"<b>業界判定:</b> {final_industry['primary']} ({final_industry['source']})", normal_style))
-        story.append(Paragraph(f"<b>総合スコア:</b> {integrated_results.get('integrated_score',0.0):.1f}/100", normal_style))
-        story.append(Paragraph(f"<b>SEOスコア:</b> {integrated_results.get('seo_score',0.0):.1f}/100", normal_style))
-        story.append(Paragraph(f"<b>AIOスコア:</b> {integrated_results.get('aio_score',0.0):.1f}/100", normal_style))
-        story.append(Paragraph(f"<b>主要改善領域:</b> {integrated_results.get('primary_focus', 'N/A')}", normal_style))
-
-        improvements = integrated_results.get('improvements', [])[:3]
-        if improvements:
-            bullet_items = [ListItem(Paragraph(imp, normal_style)) for imp in improvements]
-            story.append(ListFlowable(bullet_items, bulletType='bullet'))
-
-        advice_txt = self.last_analysis_results.get("industry_advice", "")
-        if advice_txt:
-            story.append(Spacer(1, 2*mm))
-            story.append(Paragraph(f"<b>業界向けアドバイス:</b> {advice_txt}", normal_style))
-
-        story.append(Spacer(1, 5*mm))
-
-        # スコア分布グラフの追加
-        story.append(Paragraph("<u>2. スコア分析（視覚化）</u>", h1_style))
-        section_break(story, doc.width)
-        
-        # SEOスコアグラフを生成
-        seo_graph_path = self._create_seo_score_graph()
-        if seo_graph_path:
-            story.append(Paragraph("SEOスコア分布", h2_style))
-            try:
-                img_reader = ImageReader(seo_graph_path)
-                w, h = img_reader.getSize()
-                aspect = h / float(w)
-                desired_width = 16 * cm
-                seo_img = ReportLabImage(
-                    seo_graph_path, width=desired_width, height=desired_width * aspect
-                )
-                story.append(seo_img)
-                story.append(PageBreak())
-            except Exception as e:
-                print(f"SEOグラフ挿入エラー: {e}")
-
-        # AIOスコアグラフを生成
-        aio_graph_path = self._create_aio_score_graph()
-        if aio_graph_path:
-            story.append(Paragraph("AIOスコア分布", h2_style))
-            try:
-                img_reader = ImageReader(aio_graph_path)
-                w, h = img_reader.getSize()
-                aspect = h / float(w)
-                desired_width = 16 * cm
-                aio_img = ReportLabImage(
-                    aio_graph_path, width=desired_width, height=desired_width * aspect
-                )
-                story.append(aio_img)
-                story.append(PageBreak())
-            except Exception as e:
-                print(f"AIOグラフ挿入エラー: {e}")
 
-        # AIOレーダーチャート
-        radar_path = self._create_aio_radar_graph()
-        if radar_path:
-            story.append(Paragraph("AIOカテゴリ レーダーチャート", h2_style))
-            try:
-                radar_img = ReportLabImage(radar_path, width=12*cm, height=12*cm)
-                story.append(radar_img)
-                story.append(PageBreak())
-            except Exception as e:
-                print(f"レーダーチャート挿入エラー: {e}")
-
-        story.append(Spacer(1, 5*mm))
-
-        # 3. SEO分析結果
-        story.append(Paragraph("<u>3. SEO分析結果</u>", h1_style))
-        section_break(story, doc.width)
-        seo_res = self.last_analysis_results.get("seo_results", {})
-        basics = seo_res.get("basics", {})
-        garbled = seo_res.get("garbled", {})
-        title_txt = safe_str(basics.get('title'))
-        if garbled.get('title'):
-            title_txt += " (文字化けの可能性あり)"
-        story.append(Paragraph(f"<b>タイトル:</b> {title_txt}", normal_style))
-        desc_txt = safe_str(basics.get('meta_description'))
-        if garbled.get('meta_description'):
-            desc_txt += " (文字化けの可能性あり)"
-        story.append(Paragraph(f"<b>メタディスクリプション:</b> {desc_txt}", normal_style))
-        story.append(Paragraph(f"<b>タイトル文字数:</b> {basics.get('title_length',0)}", normal_style))
-        story.append(Paragraph(f"<b>ディスクリプション文字数:</b> {basics.get('meta_description_length',0)}", normal_style))
-        story.append(Paragraph(
-            "これらのスコアは検索結果での表示最適化に影響します。値が低い項目は優先的に調整してください。",
-            normal_style))
-
-        story.append(PageBreak())
-
-        # 4. 業界特化分析
-        story.append(Paragraph("<u>4. 業界特化分析</u>", h1_style))
-        section_break(story, doc.width)
-        aio_res = self.last_analysis_results.get("aio_results", {})
-        industry_analysis_result = aio_res.get("industry_analysis", {})
-        
-        if industry_analysis_result:
-            story.append(Paragraph(f"<b>業界適合度:</b>", h2_style))
-            story.append(Paragraph(f"{safe_str(industry_analysis_result.get('industry_fit'))}", normal_style))
-            story.append(Spacer(1, 3*mm))
-            
-            story.append(Paragraph(f"<b>市場トレンド分析:</b>", h2_style))
-            story.append(Paragraph(f"{safe_str(industry_analysis_result.get('market_trends'))}", normal_style))
-            story.append(Spacer(1, 3*mm))
-            
-            story.append(Paragraph(f"<b>業界特化改善提案:</b>", h2_style))
-            story.append(Paragraph(f"{safe_str(industry_analysis_result.get('specialized_improvements'))}", normal_style))
-            story.append(Spacer(1, 3*mm))
-            
-            story.append(Paragraph(f"<b>規制対応状況:</b>", h2_style))
-            story.append(Paragraph(f"{safe_str(industry_analysis_result.get('compliance_check'))}", normal_style))
-
-        # 5. 即効改善施策（詳細版）
-        story.append(Paragraph("<u>5. 即効改善施策（1-2週間）</u>", h1_style))
-        section_break(story, doc.width)
-        immediate_actions = aio_res.get("immediate_actions", [])
-        for i, action in enumerate(immediate_actions, 1):
-            story.append(Paragraph(f"<b>{i}. {safe_str(action.get('action'))}</b>", h2_style))
-            story.append(Paragraph(f"<b>実装方法:</b> {safe_str(action.get('method'))}", normal_style))
-            story.append(Paragraph(f"<b>期待効果:</b> {safe_str(action.get('expected_impact'))}", normal_style))
-            story.append(Spacer(1, 3*mm))
-
-        # 6. 中期戦略施策
-        story.append(Paragraph("<u>6. 中期戦略施策（1-3ヶ月）</u>", h1_style))
-        section_break(story, doc.width)
-        medium_term_strategies = aio_res.get("medium_term_strategies", [])
-        for i, strategy in enumerate(medium_term_strategies, 1):
-            story.append(Paragraph(f"<b>{i}. {safe_str(strategy.get('strategy'))}</b>", h2_style))
-            story.append(Paragraph(f"<b>実装期間:</b> {safe_str(strategy.get('timeline'))}", normal_style))
-            story.append(Paragraph(f"<b>期待成果:</b> {safe_str(strategy.get('expected_outcome'))}", normal_style))
-            story.append(Spacer(1, 3*mm))
-
-        story.append(PageBreak())
-
-        # 7. 競合差別化ポイント（詳細版）
-        story.append(Paragraph("<u>7. 競合差別化ポイント</u>", h1_style))
-        section_break(story, doc.width)
-        competitive_advantages = aio_res.get("competitive_advantages", [])
-        for i, advantage in enumerate(competitive_advantages, 1):
-            story.append(Paragraph(f"<b>{i}. {safe_str(advantage.get('advantage'))}</b>", h2_style))
-            story.append(Paragraph(f"<b>実装方法:</b> {safe_str(advantage.get('implementation'))}", normal_style))
-            story.append(Spacer(1, 3*mm))
-
-        # 8. 市場トレンド対応戦略（新機能）
-        story.append(Paragraph("<u>8. 市場トレンド対応戦略</u>", h1_style))
-        section_break(story, doc.width)
-        market_trend_strategies = aio_res.get("market_trend_strategies", [])
-        if market_trend_strategies:
-            for i, trend_strategy in enumerate(market_trend_strategies, 1):
-                story.append(Paragraph(f"<b>{i}. トレンド: {safe_str(trend_strategy.get('trend'))}</b>", h2_style))
-                story.append(Paragraph(f"<b>対応戦略:</b> {safe_str(trend_strategy.get('strategy'))}", normal_style))
-                story.append(Paragraph(f"<b>優先度:</b> {safe_str(trend_strategy.get('priority'))}", normal_style))
-                story.append(Spacer(1, 3*mm))
+# Streamlitアプリケーション
+def render_report_job(report_jobs, results):
+    """PDFレポート生成ジョブの状態表示（生成中は一定間隔でこの部分だけ再描画する）"""
+    job = report_jobs.job_for(results)
+    if job is None or job.job_id != st.session_state.get("report_job_id"):
+        return
+
+    was_pending = job.pending
+
+    @st.fragment(run_every=REPORT_POLL_SECONDS if was_pending else None)
+    def _status():
+        current = report_jobs.get(job.job_id)
+        if was_pending and current is not None and not current.pending:
+            st.rerun()  # 完了したらページ全体を再描画してポーリングを止める
+        if current is None:
+            st.info("PDFレポートの保持期間が過ぎました。もう一度生成してください。")
+        elif current.pending:
+            st.info(f"PDFレポートを生成中です（{current.elapsed:.0f}秒経過）。他のタブを見ながらお待ちください。")
+        elif current.status == "error":
+            st.error(f"❌ PDFレポート生成エラー: {current.error}")
         else:
-            story.append(Paragraph("市場トレンド分析データが利用できません。", normal_style))
-
-        # 9. 詳細スコア分析
-        story.append(Paragraph("<u>9. 詳細スコア分析</u>", h1_style))
-        section_break(story, doc.width)
-        
-        # AIOスコア詳細
-        story.append(Paragraph("AIO評価項目詳細", h2_style))
-        scores_data = aio_res.get("scores", {})
-        
-        # 上位8項目
-        story.append(Paragraph("【E-E-A-T及びAI検索最適化項目】", normal_style))
-        for key_eng, label_jp in AIO_SCORE_MAP_JP_UPPER.items():
-            score_item = scores_data.get(key_eng, {"score":0, "advice":"N/A"})
-            story.append(Paragraph(f"<b>{label_jp}: {score_item.get('score',0)}/10</b>", normal_style))
-            story.append(Paragraph(f"{score_item.get('advice','N/A')}", normal_style))
-            story.append(Spacer(1, 2*mm))
-
-        story.append(Spacer(1, 3*mm))
-        
-        # 下位8項目
-        story.append(Paragraph("【ユーザー体験・技術項目】", normal_style))
-        for key_eng, label_jp in AIO_SCORE_MAP_JP_LOWER.items():
-            score_item = scores_data.get(key_eng, {"score":0, "advice":"N/A"})
-            story.append(Paragraph(f"<b>{label_jp}: {score_item.get('score',0)}/10</b>", normal_style))
-            story.append(Paragraph(f"{score_item.get('advice','N/A')}", normal_style))
-            story.append(Spacer(1, 2*mm))
-
-        story.append(PageBreak())
-
-        # 10. 結論と次のステップ
-        story.append(Paragraph("<u>10. 結論と次のステップ</u>", h1_style))
-        section_break(story, doc.width)
-        story.append(Paragraph(
-            "本レポートではSEOとAIOの両面から課題を抽出しました。以下の優先アクションに沿って改善を進めてください。",
-            normal_style))
-
-        all_actions = integrated_results.get('improvements', [])
-        if all_actions:
-            bullet_items = [ListItem(Paragraph(act, normal_style)) for act in all_actions]
-            story.append(ListFlowable(bullet_items, bulletType='bullet'))
-
-        story.append(Paragraph(
-            "施策実施後は再度分析を行い、数値改善を確認することを推奨します。",
-            normal_style))
-
-        # フッター
-        story.append(Spacer(1, 10*mm))
-        story.append(Paragraph(f"このレポートは{APP_NAME} v{APP_VERSION}によって生成されました。", centered_style))
-        story.append(Paragraph("最新の市場トレンドと業界動向を反映した分析結果です。", centered_style))
-
-        try:
-            doc.build(story, onFirstPage=add_corner, onLaterPages=add_corner)
-            return output_path
-        except Exception as e_build:
-            print(f"PDFのビルド中にエラーが発生しました: {str(e_build)}")
-            import traceback
-            traceback.print_exc()
-            raise Exception(f"PDFのビルドエラー: {str(e_build)}")
-        finally:
-            for p in [seo_graph_path, aio_graph_path, radar_path]:
-                if p and os.path.exists(p):
-                    os.remove(p)
-
-    def _create_seo_score_graph(self):
-        """SEOスコアグラフ生成"""
-        try:
-            if not self.seo_results:
-                return None
-                
-            scores = self.seo_results.get("scores", {})
-            if not scores:
-                return None
-                
-            labels = [SEO_SCORE_LABELS.get(k, k.replace("_score", "").title()) for k in scores.keys()]
-            values = list(scores.values())
-
-            num_labels = len(labels)
-            fig_height = max(0.6 * num_labels, 4)
-            fig, ax = plt.subplots(figsize=(10, fig_height))
-            bars = ax.barh(labels, values, color=COLOR_PALETTE["primary"], height=0.6)
-            ax.set_xlim(0, 10)
-            ax.set_xlabel("スコア ( /10)", fontsize=12)
-            ax.set_title("SEOスコア分布", fontsize=16, fontweight='bold')
-            ax.tick_params(axis='y', labelsize=12)
-            ax.tick_params(axis='x', labelsize=11)
-            ax.invert_yaxis()
-
-            for bar, value in zip(bars, values):
-                ax.text(
-                    value + 0.1,
-                    bar.get_y() + bar.get_height() / 2.0,
-                    f"{value:.1f}",
-                    va='center',
-                    ha='left',
-                    fontsize=11,
-                )
-
-            plt.tight_layout()
-            
-            graph_path = "temp_seo_graph.png"
-            plt.savefig(graph_path, dpi=300, bbox_inches='tight')
-            plt.close()
-            return graph_path
-            
-        except Exception as e:
-            print(f"SEOグラフ生成エラー: {e}")
-            return None
-
-    def _create_aio_score_graph(self):
-        """AIOスコアグラフ生成（縦長・拡大版）"""
-        try:
-            if not self.aio_results:
-                return None
-                
-            scores_data = self.aio_results.get("scores", {})
-            if not scores_data:
-                return None
-                
-            labels = [AIO_SCORE_MAP_JP.get(k, k.title()) for k in AIO_SCORE_MAP_JP.keys()]
-            values = [
-                scores_data.get(k, {"score": 0}).get("score", 0)
-                for k in AIO_SCORE_MAP_JP.keys()
-            ]
-
-            num_labels = len(labels)
-            fig_height = max(0.6 * num_labels, 6)
-            fig, ax = plt.subplots(figsize=(10, fig_height))
-            bars = ax.barh(labels, values, color=COLOR_PALETTE["primary"], height=0.6)
-            ax.set_xlim(0, 10)
-            ax.set_xlabel("スコア ( /10)", fontsize=12)
-            ax.set_title("AIOスコア分布", fontsize=16, fontweight='bold')
-            ax.tick_params(axis='y', labelsize=11)
-            ax.tick_params(axis='x', labelsize=11)
-            ax.invert_yaxis()
-
-            for bar, value in zip(bars, values):
-                ax.text(
-                    value + 0.1,
-                    bar.get_y() + bar.get_height() / 2.0,
-                    f"{value:.1f}",
-                    va='center',
-                    ha='left',
-                    fontsize=11,
-                )
-
-            plt.tight_layout()
-
-            tmp = tempfile.NamedTemporaryFile(delete=False, suffix=".png")
-            graph_path = tmp.name
-            tmp.close()
-            plt.savefig(graph_path, dpi=300, bbox_inches='tight')
-            plt.close()
-            return graph_path
-
-        except Exception as e:
-            print(f"AIOグラフ生成エラー: {e}")
-            return None
+            st.download_button(
+                label="PDFレポートをダウンロード",
+                data=current.data,
+                file_name=f"seo_aio_report_{datetime.fromtimestamp(current.created_at).strftime('%Y%m%d_%H%M%S')}.pdf",
+                mime="application/pdf",
+                use_container_width=True,
+                key=f"report_download_{current.job_id}",
+            )
+            st.success(f"PDFレポートが生成されました！（{current.finished_at - current.created_at:.1f}秒）")
 
-    def _create_aio_radar_graph(self):
-        """AIOカテゴリのレーダーチャート生成"""
-        try:
-            if not self.aio_results:
-                return None
-
-            cat = self.aio_results.get("category_scores", {})
-            labels = ["E-E-A-T", "AI検索最適化", "ユーザー体験", "技術", "業種適合性", "AIO総合"]
-            values = [
-                cat.get("eeat_score", 0),
-                cat.get("ai_search_score", 0),
-                cat.get("user_experience_score", 0),
-                cat.get("technical_score", 0),
-                self.last_analysis_results.get("industry_fit_score", 0),
-                self.aio_results.get("total_score", 0),
-            ]
-
-            angles = np.linspace(0, 2 * np.pi, len(labels), endpoint=False).tolist()
-            values += values[:1]
-            angles += angles[:1]
-            fig = plt.figure(figsize=(6, 6))
-            ax = plt.subplot(111, polar=True)
-            ax.plot(angles, values, color=COLOR_PALETTE["primary"])
-            ax.fill(angles, values, color=COLOR_PALETTE["primary"], alpha=0.25)
-            ax.set_thetagrids([a * 180 / np.pi for a in angles[:-1]], labels)
-            ax.set_ylim(0, 100)
-
-            tmp = tempfile.NamedTemporaryFile(delete=False, suffix=".png")
-            graph_path = tmp.name
-            tmp.close()
-            plt.tight_layout()
-            plt.savefig(graph_path, dpi=300, bbox_inches="tight")
-            plt.close()
-            return graph_path
+    _status()
 
-        except Exception as e:
-            print(f"AIOレーダーチャート生成エラー: {e}")
-            return None
 
-# Streamlitアプリケーション
 def set_custom_css():
     """Apply global design CSS."""
     load_global_styles()
@@ -1396,6 +1271,39 @@ def set_custom_css():
     )
 
 
+def _site_result_row(page_results: Dict) -> Dict:
+    """サイト分析の一覧表示用に1ページ分の結果を要約する"""
+    crawl = page_results.get("crawl", {})
+    row = {
+        "URL": page_results.get("url", ""), "深さ": crawl.get("depth"), "発見元": crawl.get("source", ""),
+        "優先度": crawl.get("score"),
+    }
+    if "error" in page_results:
+        row.update({"統合スコア": None, "SEO": None, "AIO": None, "備考": page_results["error"]})
+        return row
+    notes = []
+    if page_results.get("aio_results", {}).get("unchanged_since"):
+        notes.append("本文変更なし（AIO再利用）")
+    elif page_results.get("analysis_cache"):
+        notes.append("変更なし（保存済み結果）")
+    site_content = page_results.get("site_content") or {}
+    if site_content.get("duplicates"):
+        notes.append(f"重複候補 {len(site_content['duplicates'])} 件")
+    if site_content.get("thin"):
+        notes.append("本文量不足")
+    if site_content.get("canonical_issue"):
+        notes.append("canonical要確認")
+    note = " / ".join(notes)
+    integrated = page_results.get("integrated_results", {})
+    row.update({
+        "統合スコア": round(integrated.get("integrated_score", 0), 1),
+        "SEO": round(integrated.get("seo_score", 0), 1),
+        "AIO": round(integrated.get("aio_score", 0), 1),
+        "備考": note,
+    })
+    return row
+
+
 def main():
     # ページ設定
     st.set_page_config(
@@ -1420,7 +1328,12 @@ def main():
     # Analyzerの初期化
     if 'analyzer' not in st.session_state:
         try:
-            st.session_state.analyzer = SEOAIOAnalyzer()
+            page_cache = PageCache(os.getenv("AIO_PAGE_CACHE_DIR", PAGE_CACHE_DIR), max_bytes=PAGE_CACHE_MAX_BYTES)
+            crawl_state_path = os.getenv("AIO_CRAWL_STATE_PATH", CRAWL_STATE_PATH)
+            os.makedirs(os.path.dirname(crawl_state_path) or ".", exist_ok=True)
+            st.session_state.analyzer = SEOAIOAnalyzer(
+                page_cache=page_cache, crawl_state=CrawlStateStore(crawl_state_path)
+            )
             
             # APIキーの取得確認（初期化後）
             if hasattr(st.session_state.analyzer, 'api_key') and st.session_state.analyzer.api_key:
@@ -1475,30 +1388,65 @@ def main():
         )
         
         st.markdown(f"**現在の設定:** SEO {100-balance}% - AIO {balance}%")
+
+        # 分析モード
+        tier = st.selectbox(
+            "分析モード",
+            options=list(ANALYSIS_TIERS.keys()),
+            index=list(ANALYSIS_TIERS.keys()).index(DEFAULT_ANALYSIS_TIER),
+            format_func=lambda key: ANALYSIS_TIERS[key],
+            help="クイックはAPIを使用せず1秒以内に概算結果を返します"
+        )
+        measure_resources = st.checkbox(
+            "CSS・JS・画像の重量を計測",
+            value=False,
+            help="サブリソースを並列取得して実際の転送量を集計します（分析時間が増えます）"
+        )
+        check_links = st.checkbox(
+            "リンク切れをチェック",
+            value=False,
+            help="ページ内のリンク先をHEADリクエストで並列に確認し、4xx/5xx・リダイレクト・タイムアウトを報告します"
+        )
         
+        with st.expander("サイト全体の分析"):
+            crawl_site = st.checkbox(
+                "サイト全体をクロールして分析",
+                value=False,
+                help="sitemap.xml と内部リンクからページを巡回します（robots.txt とアクセス間隔を遵守）"
+            )
+            crawl_max_pages = st.number_input("最大ページ数", min_value=1, max_value=1000, value=CRAWL_MAX_PAGES)
+            crawl_max_depth = st.number_input("リンクをたどる深さ", min_value=0, max_value=10, value=CRAWL_MAX_DEPTH)
+            crawl_incremental = st.checkbox(
+                "前回から更新されたページのみ分析",
+                value=False,
+                help="sitemapのlastmodが更新されたページと、一定期間取得していないページだけを再取得します。"
+                     "本文に変更がなければAIO分析（API呼び出し）も省略します"
+            )
+
         # 業界判定ボタン
         if primary_button("業界判定のみ"):
             if url:
                 with st.spinner("業界を判定中..."):
                     try:
-                        # 簡易業界判定
-                        response = requests.get(url if url.startswith(('http://', 'https://')) else 'https://' + url, 
-                                              headers={'User-Agent': 'Mozilla/5.0'}, timeout=10)
-                        soup = BeautifulSoup(response.text, 'html.parser')
-                        title = soup.title.string.strip() if soup.title and soup.title.string else ""
-                        meta_desc = ""
-                        meta_tag = soup.find('meta', attrs={'name': 'description'})
-                        if meta_tag and meta_tag.get('content'):
-                            meta_desc = meta_tag['content'].strip()
-                        
-                        main_content = st.session_state.analyzer._extract_main_content(soup)
-                        industry_analysis = st.session_state.analyzer.industry_detector.analyze_industries(title, main_content, meta_desc)
-                        
+                        # 簡易業界判定（本文を逐次解析し、判定が確定した時点で取得を打ち切る）
+                        streamed = detect_industry_streaming(
+                            url if url.startswith(('http://', 'https://')) else 'https://' + url,
+                            session=st.session_state.analyzer.http_session,
+                            timeout=10,
+                            detector=st.session_state.analyzer.industry_detector,
+                        )
+                        industry_analysis = streamed.analysis
+
                         st.success(f"**判定結果:** {industry_analysis.primary_industry}")
                         st.info(f"**信頼度:** {industry_analysis.confidence_score:.1f}%")
                         if industry_analysis.secondary_industries:
                             st.info(f"**副業界:** {', '.join(industry_analysis.secondary_industries[:2])}")
-                            
+                        read_note = {"confident": "判定確定で打ち切り", "max_bytes": "読み込み上限で打ち切り"}
+                        st.caption(
+                            f"{streamed.bytes_read / 1024:.0f}KB を読み込み"
+                            f"（{read_note.get(streamed.reason, '全体を取得')}、{streamed.elapsed_ms:.0f}ms）"
+                        )
+
                     except Exception as e:
                         st.error(f"業界判定エラー: {str(e)}")
             else:
@@ -1508,11 +1456,36 @@ def main():
         analyze_clicked = primary_button("分析開始")
     
     # メインエリア
-    if analyze_clicked and url:
+    if analyze_clicked and url and crawl_site:
+        progress = st.progress(0.0, text="サイトをクロール中...")
+        table = st.empty()
+        site_rows = []
+        st.session_state.pop("analysis_results", None)
+        for page_results in st.session_state.analyzer.analyze_site(
+            url, industry, balance, tier, max_pages=int(crawl_max_pages), max_depth=int(crawl_max_depth),
+            incremental=crawl_incremental, check_links=check_links,
+        ):
+            site_rows.append(_site_result_row(page_results))
+            if "error" not in page_results and "analysis_results" not in st.session_state:
+                st.session_state.analysis_results = page_results
+            progress.progress(min(1.0, len(site_rows) / int(crawl_max_pages)), text=f"{len(site_rows)} ページ分析済み")
+            table.dataframe(site_rows, use_container_width=True)
+        progress.empty()
+        st.session_state.site_results = site_rows
+        st.session_state.site_link_summary = st.session_state.analyzer.last_link_summary
+        st.session_state.site_content_summary = st.session_state.analyzer.last_content_summary
+        st.success(f"サイト分析が完了しました（{len(site_rows)} ページ）")
+        crawl_stats = st.session_state.analyzer.last_crawl_stats
+        if crawl_stats.get("skipped_fresh"):
+            st.info(f"前回から更新のない {crawl_stats['skipped_fresh']} ページは取得を省略しました。")
+    elif analyze_clicked and url:
+        st.session_state.pop("site_results", None)
         with st.spinner("詳細分析を実行中... しばらくお待ちください"):
             try:
                 # 分析実行
-                results = st.session_state.analyzer.analyze_url(url, industry, balance)
+                results = st.session_state.analyzer.analyze_url(
+                    url, industry, balance, tier, measure_resources=measure_resources, check_links=check_links
+                )
                 st.session_state.analysis_results = results
                 st.success("分析が完了しました！")
                 
@@ -1521,6 +1494,30 @@ def main():
                 st.stop()
     
     # 結果表示
+    if st.session_state.get("site_results") and not analyze_clicked:
+        with st.expander(f"サイト分析結果（{len(st.session_state.site_results)} ページ）", expanded=False):
+            st.dataframe(st.session_state.site_results, use_container_width=True)
+            link_summary = st.session_state.get("site_link_summary") or {}
+            if link_summary.get("top_pages"):
+                st.markdown("**内部リンク構造（PageRank上位）**")
+                st.dataframe(link_summary["top_pages"], use_container_width=True)
+            if link_summary.get("orphans"):
+                st.warning(f"内部リンクのない孤立ページ: {len(link_summary['orphans'])} 件")
+                st.write(link_summary["orphans"][:20])
+            if link_summary.get("unreachable"):
+                st.info(f"トップページからリンクをたどって到達できないページ: {link_summary['unreachable']} 件")
+            content_summary = st.session_state.get("site_content_summary") or {}
+            if content_summary.get("duplicate_clusters"):
+                st.markdown(f"**重複・類似コンテンツ（{len(content_summary['duplicate_clusters'])} グループ）**")
+                for cluster in content_summary["duplicate_clusters"][:10]:
+                    st.write(cluster)
+            if content_summary.get("thin_pages"):
+                st.warning(f"本文量が少ないページ: {len(content_summary['thin_pages'])} 件")
+                st.write(content_summary["thin_pages"][:20])
+            if content_summary.get("canonical_mismatches"):
+                st.warning(f"canonical の設定に問題があるページ: {len(content_summary['canonical_mismatches'])} 件")
+                st.dataframe(content_summary["canonical_mismatches"], use_container_width=True)
+
     if 'analysis_results' in st.session_state:
         results = st.session_state.analysis_results
         
@@ -1570,6 +1567,32 @@ def main():
             
             aio_results = results.get("aio_results", {})
             scores_data = aio_results.get("scores", {})
+
+            st.caption(f"分析モード: {ANALYSIS_TIERS.get(results.get('tier', DEFAULT_ANALYSIS_TIER), '')}")
+            analysis_cache = results.get("analysis_cache")
+            if analysis_cache:
+                st.info(
+                    f"前回の分析（{analysis_cache.get('analyzed_at', '')[:16].replace('T', ' ')}）から"
+                    f"ページ内容に変更がないため、保存済みの分析結果を表示しています。"
+                    f"{'（サーバー応答: 304 Not Modified）' if analysis_cache.get('not_modified') else ''}"
+                )
+            if aio_results.get("unchanged_since"):
+                st.info(
+                    f"前回の分析（{aio_results['unchanged_since'][:16].replace('T', ' ')}）から本文に変更がないため、"
+                    "AIO分析結果を再利用しています。"
+                )
+            reused_from = aio_results.get("reused_from")
+            if reused_from:
+                st.info(
+                    f"類似ページ（{reused_from.get('url')}、類似度 {reused_from.get('similarity', 0):.0%}）の"
+                    "AIO分析結果を再利用しています。"
+                )
+            usage = aio_results.get("usage")
+            if usage:
+                st.caption(
+                    f"プロンプト {usage.get('prompt_version', '')}: 入力 {usage.get('prompt_tokens', 0)} トークン"
+                    f"（キャッシュ {usage.get('cached_tokens', 0)} / {usage.get('cached_ratio', 0.0):.1%}）"
+                )
             
             # 上位8項目
             st.subheader("E-E-A-T & AI検索最適化項目")
@@ -1582,6 +1605,8 @@ def main():
                     score_item = scores_data.get(key_eng, {"score": 0, "advice": "N/A"})
                     st.write(f"**{label_jp} ({score_item.get('score', 0)}/10)**")
                     st.write(score_item.get('advice', 'N/A'))
+                    if score_item.get('evidence'):
+                        st.caption(f"ローカル計測: {score_item['evidence']}")
                     st.write("---")
             
             # 下位8項目
@@ -1595,6 +1620,8 @@ def main():
                     score_item = scores_data.get(key_eng, {"score": 0, "advice": "N/A"})
                     st.write(f"**{label_jp} ({score_item.get('score', 0)}/10)**")
                     st.write(score_item.get('advice', 'N/A'))
+                    if score_item.get('evidence'):
+                        st.caption(f"ローカル計測: {score_item['evidence']}")
                     st.write("---")
             
             # 改善施策
@@ -1663,12 +1690,22 @@ def main():
                 if garbled.get('meta_description'):
                     st.error("メタディスクリプションが文字化けしている可能性があります")
                 st.write(f"**メタディスクリプション:** {desc_txt} ({basics.get('meta_description_length', 0)}文字)")
-                
+                if garbled.get('og_title') or garbled.get('og_description'):
+                    st.error("OGP（og:title / og:description）が文字化けしている可能性があります")
+                if garbled.get('content'):
+                    st.error(f"本文が文字化けしている可能性があります（想定外の文字 {garbled.get('content_ratio', 0):.0%}）")
+                garbled_elements = garbled.get('headings', []) + garbled.get('alt_texts', [])
+                if garbled_elements:
+                    st.warning(f"文字化けの可能性がある見出し・alt: {len(garbled_elements)}件（例: {garbled_elements[0][:40]}）")
+
             with col2:
                 st.subheader("ページ構造")
                 structure = seo_results.get("structure", {})
                 st.write(f"**内部リンク数:** {structure.get('internal_links_count', 0)}")
                 st.write(f"**外部リンク数:** {structure.get('external_links_count', 0)}")
+                validation = seo_results.get("links", {}).get("validation")
+                if validation:
+                    st.write(f"**リンク切れ:** {validation['broken_count']} / {validation['checked']} 件")
                 st.write(f"**画像数:** {structure.get('images_count', 0)}")
                 st.write(f"**Alt属性付き画像:** {structure.get('images_with_alt', 0)}")
             
@@ -1683,6 +1720,39 @@ def main():
                 st.metric("ビューポートタグ", "あり" if technical.get('has_viewport') else "なし")  
             with col3:
                 st.metric("ページサイズ", f"{technical.get('page_size_kb', 0):.1f} KB")
+            if technical.get("charset"):
+                st.caption(f"文字コード: {technical['charset']}（判定方法: {technical.get('charset_source', '')}）")
+            if technical.get("truncated"):
+                st.warning("ページサイズが取得上限を超えたため、先頭部分のみを分析しています。")
+
+            performance = technical.get("performance", {})
+            if performance:
+                st.subheader("表示速度の計測値")
+                col1, col2, col3, col4 = st.columns(4)
+                with col1:
+                    st.metric("TTFB", f"{performance.get('ttfb_ms', 0):.0f} ms")
+                with col2:
+                    st.metric("ダウンロード", f"{performance.get('download_ms', 0):.0f} ms")
+                with col3:
+                    st.metric("転送量（HTML）", f"{performance.get('compressed_bytes', 0) / 1024:.1f} KB")
+                with col4:
+                    st.metric("リダイレクト", f"{performance.get('redirect_count', 0)} 回")
+                dns_ms, connect_ms = performance.get("dns_ms"), performance.get("connect_ms")
+                if dns_ms is not None and connect_ms is not None:
+                    st.write(f"**DNS解決:** {dns_ms:.0f} ms / **TCP接続:** {connect_ms:.0f} ms")
+                elif performance.get("connection_reused"):
+                    st.write("**DNS解決・TCP接続:** 既存の接続を再利用（計測なし）")
+                for hop in performance.get("redirects", []):
+                    st.write(f"- {hop.get('status_code')} {hop.get('url')} → {hop.get('location')}")
+                subresources = performance.get("subresources")
+                if subresources:
+                    st.write(
+                        f"**サブリソース:** {subresources.get('total_requests', 0)}件 / "
+                        f"{subresources.get('total_bytes', 0) / 1024:.1f} KB"
+                    )
+                    for kind, label in (("css", "CSS"), ("js", "JavaScript"), ("image", "画像")):
+                        item = subresources.get(kind, {})
+                        st.write(f"- {label}: {item.get('requests', 0)}件 / {item.get('bytes', 0) / 1024:.1f} KB")
 
             # パーソナライズ情報
             personalization = seo_results.get("personalization", {})
@@ -1734,6 +1804,11 @@ def main():
                 st.markdown(f"**判定根拠:** {final_industry.get('source', 'N/A')}")
                 if final_industry.get('secondary_detected'):
                     st.write(f"**副業界:** {', '.join(final_industry['secondary_detected'][:3])}")
+                if final_industry.get('model_primary'):
+                    st.caption(
+                        f"分類モデル: {final_industry['model_primary']}"
+                        f"（確率 {final_industry.get('model_confidence', 0):.1f}%）"
+                    )
             
             # 業界特化分析詳細
             aio_industry_analysis = aio_results.get("industry_analysis", {})
@@ -1749,6 +1824,19 @@ def main():
                 
                 st.subheader("規制・コンプライアンス対応")
                 st.write(aio_industry_analysis.get('compliance_check', 'N/A'))
+
+            # 想定質問への回答パッセージ（ローカル検索）
+            passage_coverage = results.get("passage_coverage")
+            if passage_coverage and passage_coverage.get("questions"):
+                st.subheader("想定質問への回答状況")
+                st.write(
+                    f"回答あり: {passage_coverage['answered']}/{len(passage_coverage['questions'])} 問"
+                    f"（本文 {passage_coverage['passages']} パッセージ）"
+                )
+                marks = {"strong": "○", "partial": "△", "none": "×"}
+                for item in passage_coverage["questions"]:
+                    with st.expander(f"{marks[item['strength']]} {item['question']}"):
+                        st.write(item["passage"] or "該当する記述が見つかりません。")
             st.markdown("</div>", unsafe_allow_html=True)
 
         with tab5:  # 統合レポート
@@ -1781,38 +1869,11 @@ def main():
             fig_radar = create_aio_radar_chart(radar_values, radar_labels)
             st.plotly_chart(fig_radar, use_container_width=True)
             
-            # PDF生成ボタン
+            # PDF生成（バックグラウンドで生成し、完了したらダウンロード）
+            report_jobs = get_report_jobs(build_pdf_report)
             if st.button("詳細PDFレポート生成", use_container_width=True):
-                try:
-                    with st.spinner("PDFレポートを生成中..."):
-                        # 一時ファイル名
-                        pdf_filename = f"seo_aio_report_{datetime.now().strftime('%Y%m%d_%H%M%S')}.pdf"
-                        
-                        # PDF生成
-                        pdf_path = st.session_state.analyzer.generate_enhanced_pdf_report(pdf_filename)
-                        
-                        # PDFファイルの読み込み
-                        with open(pdf_path, "rb") as pdf_file:
-                            pdf_data = pdf_file.read()
-                        
-                        # ダウンロードボタン
-                        st.download_button(
-                            label="PDFレポートをダウンロード",
-                            data=pdf_data,
-                            file_name=pdf_filename,
-                            mime="application/pdf",
-                            use_container_width=True
-                        )
-                        
-                        st.success("PDFレポートが生成されました！")
-                        
-                        # 一時ファイル削除
-                        import os
-                        if os.path.exists(pdf_path):
-                            os.remove(pdf_path)
-                            
-                except Exception as e:
-                    st.error(f"❌ PDFレポート生成エラー: {str(e)}")
+                st.session_state.report_job_id = report_jobs.submit(results).job_id
+            render_report_job(report_jobs, results)
             
             # 競合差別化ポイント
             st.subheader("競合差別化ポイント")
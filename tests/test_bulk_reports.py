@@ -0,0 +1,164 @@
+import io
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import unittest
+import zipfile
+
+from core.bulk_reports import (
+    DEFAULT_REPORT_BUILDER,
+    BulkReportGenerator,
+    generate_bulk_reports,
+    iter_results_file,
+    latest_per_url,
+    main,
+    report_filename,
+)
+from core.page_cache import PageCache
+
+FAKE_BUILDER = "tests.test_bulk_reports:fake_build"
+
+
+def fake_build(results):
+    if "bad" in results["url"]:
+        raise ValueError("broken results")
+    return f"%PDF-{results['url']}-{os.getpid()}".encode()
+
+
+class _Exiting:
+    """Stands in for a module that calls sys.exit() while being imported."""
+
+    def __getattr__(self, name):
+        if name == "build":
+            raise SystemExit(1)
+        raise AttributeError(name)
+
+
+EXITING = _Exiting()
+
+
+def _results(n, bad=()):
+    return [
+        {"analysis_id": f"id{i}", "url": f"https://example.com/{'bad' if i in bad else 'page'}/{i}",
+         "timestamp": f"2025-01-0{i % 9 + 1}T00:00:00"}
+        for i in range(n)
+    ]
+
+
+class TestBulkReportHelpers(unittest.TestCase):
+    def test_report_filename(self):
+        a = report_filename("https://example.com/a?b=1&c=日本", "x")
+        self.assertTrue(a.startswith("example.com_a_b_1_c-") and a.endswith(".pdf"))
+        self.assertNotEqual(a, report_filename("https://example.com/a?b=1&c=日本", "y"))
+        self.assertTrue(report_filename("").startswith("report-"))
+
+    def test_latest_per_url_and_files(self):
+        old = {"url": "u", "timestamp": "2025-01-01", "seo_results": {}}
+        new = dict(old, timestamp="2025-02-01")
+        failed = {"url": "v", "error": "timeout"}
+        self.assertEqual(latest_per_url([old, new, failed]), [new])
+        with tempfile.TemporaryDirectory() as tmp:
+            jsonl = os.path.join(tmp, "r.jsonl")
+            with open(jsonl, "w", encoding="utf-8") as f:
+                f.write(json.dumps(old) + "\n\n" + json.dumps(new) + "\n")
+            single = os.path.join(tmp, "r.json")
+            with open(single, "w", encoding="utf-8") as f:
+                json.dump(old, f)
+            self.assertEqual(list(iter_results_file(jsonl)), [old, new])
+            self.assertEqual(list(iter_results_file(single)), [old])
+
+    def test_page_cache_iter_analyses(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            cache = PageCache(tmp)
+            cache.store_analysis("https://example.com/", "h1", "quick", {"url": "https://example.com/"})
+            cache.store_analysis("https://example.com/", "h1", "standard", {"url": "https://example.com/", "tier": 2})
+            cache.store_analysis("https://example.com/b", "h2", "quick", {"url": "https://example.com/b"})
+            self.assertEqual(len(list(cache.iter_analyses())), 3)
+
+
+class TestBulkReportGenerator(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        cls.generator = BulkReportGenerator(workers=2, builder=FAKE_BUILDER, window=3).start()
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.generator.close()
+
+    def test_zip_stream_with_manifest(self):
+        buffer = io.BytesIO()
+        manifest = self.generator.write_zip(_results(7, bad={3}), buffer)
+        self.assertEqual(len(manifest), 7)
+        with zipfile.ZipFile(io.BytesIO(buffer.getvalue())) as archive:
+            names = set(archive.namelist())
+            meta = json.loads(archive.read("manifest.json"))
+        self.assertEqual(meta["reports"], 6)
+        self.assertEqual(meta["errors"], 1)
+        self.assertEqual([item["index"] for item in meta["items"]], list(range(7)))
+        bad = meta["items"][3]
+        self.assertEqual(bad["status"], "error")
+        self.assertIn("broken results", bad["error"])
+        self.assertNotIn(bad["filename"], names)
+        self.assertEqual(len(names), 7)
+        self.assertTrue(all(r.bytes > 0 for r in manifest if r.status == "ok"))
+
+    def test_directory_output(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            manifest = self.generator.write_directory(_results(3), tmp)
+            for record in manifest:
+                with open(os.path.join(tmp, record.filename), "rb") as f:
+                    self.assertTrue(f.read().startswith(b"%PDF-https://example.com/page/"))
+            self.assertTrue(os.path.exists(os.path.join(tmp, "manifest.json")))
+            self.assertEqual(sorted(os.listdir(tmp)), sorted([r.filename for r in manifest] + ["manifest.json"]))
+
+
+    def test_unknown_builder_fails_fast(self):
+        with self.assertRaises(RuntimeError) as ctx:
+            BulkReportGenerator(workers=1, builder="tests.test_bulk_reports:missing").start()
+        self.assertIn("missing", str(ctx.exception))
+
+    def test_exiting_builder_fails_fast(self):
+        with self.assertRaises(RuntimeError) as ctx:
+            BulkReportGenerator(workers=1, builder="tests.test_bulk_reports:EXITING.build").start()
+        self.assertIn("SystemExit", str(ctx.exception))
+
+    def test_default_builder_does_not_import_app(self):
+        module = DEFAULT_REPORT_BUILDER.partition(":")[0]
+        code = f"import sys, {module}; print('streamlit' in sys.modules, 'seo_aio_streamlit' in sys.modules)"
+        try:
+            import reportlab  # noqa: F401
+        except ImportError:  # pragma: no cover - reportlab missing
+            self.skipTest("reportlab not available")
+        out = subprocess.run([sys.executable, "-c", code], capture_output=True, text=True, check=True,
+                             cwd=os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+        self.assertEqual(out.stdout.split(), ["False", "False"])
+
+
+class TestBulkReportsWithAppBuilder(unittest.TestCase):
+    def test_real_reports_and_cli(self):
+        try:
+            from tests.test_pdf_charts import _analyzer
+            from core.page_cache import to_jsonable
+
+            results = to_jsonable(_analyzer().last_analysis_results)
+        except Exception as e:  # pragma: no cover - app dependencies missing
+            self.skipTest(f"app not importable: {e}")
+        pages = [dict(results, url=f"https://example.com/{i}", analysis_id=f"a{i}") for i in range(2)]
+        with tempfile.TemporaryDirectory() as tmp:
+            cache = PageCache(os.path.join(tmp, "cache"))
+            for page in pages:
+                cache.store_analysis(page["url"], "h", "quick", page)
+            out = os.path.join(tmp, "reports.zip")
+            self.assertEqual(main(["--from-cache", cache.directory, "--out", out, "--workers", "1"]), 0)
+            with zipfile.ZipFile(out) as archive:
+                pdfs = [n for n in archive.namelist() if n.endswith(".pdf")]
+                self.assertEqual(len(pdfs), 2)
+                self.assertTrue(all(archive.read(n).startswith(b"%PDF") for n in pdfs))
+            manifest = generate_bulk_reports(pages[:1], os.path.join(tmp, "dir"), workers=1)
+            self.assertEqual(manifest[0].status, "ok", manifest[0].error)
+
+
+if __name__ == "__main__":
+    unittest.main()
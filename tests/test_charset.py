@@ -0,0 +1,79 @@
+import codecs
+import unittest
+
+from core.charset import SNIFF_BYTES, IncrementalHTMLDecoder, decode_html, normalize_encoding, sniff_encoding
+
+JP_HTML = (
+    "<html><head><title>日本語のページ</title></head><body><p>当店のメニューをご確認いただき、"
+    "予約も簡単にできます。アクセスも便利です。渋谷駅から徒歩三分の場所にあります。</p></body></html>"
+)
+
+
+class TestCharset(unittest.TestCase):
+    def test_bom(self):
+        text, decision = decode_html(codecs.BOM_UTF8 + JP_HTML.encode("utf-8"), "text/html; charset=shift_jis")
+        self.assertEqual(decision.source, "bom")
+        self.assertEqual(text, JP_HTML)
+
+    def test_http_header(self):
+        decision = sniff_encoding(JP_HTML.encode("cp932"), "text/html; charset=Shift_JIS")
+        self.assertEqual((decision.encoding, decision.source), ("cp932", "http-header"))
+
+    def test_meta_charset(self):
+        body = b'<meta charset="euc-jp">' + JP_HTML.encode("euc_jp")
+        text, decision = decode_html(body, "text/html")
+        self.assertEqual((decision.encoding, decision.source), ("euc_jp", "meta"))
+        self.assertIn("渋谷駅", text)
+
+    def test_meta_http_equiv(self):
+        body = b'<meta http-equiv="Content-Type" content="text/html; charset=x-sjis">' + JP_HTML.encode("cp932")
+        self.assertEqual(sniff_encoding(body).source, "meta")
+        self.assertEqual(sniff_encoding(body).encoding, "cp932")
+
+    def test_meta_outside_sniff_window_ignored(self):
+        body = b" " * SNIFF_BYTES + b'<meta charset="euc-jp">' + "本文".encode("utf-8")
+        self.assertEqual(sniff_encoding(body).source, "utf8-validation")
+
+    def test_undeclared_shift_jis(self):
+        text, decision = decode_html(JP_HTML.encode("cp932"), "text/html")
+        self.assertIn(decision.source, ("statistical", "trial"))
+        self.assertEqual(text, JP_HTML)
+
+    def test_undeclared_utf8(self):
+        self.assertEqual(sniff_encoding(JP_HTML.encode("utf-8"), "text/html").source, "utf8-validation")
+
+    def test_incremental_decoder_splits_multibyte_chars(self):
+        body = codecs.BOM_UTF8 + (JP_HTML * 200).encode("utf-8")
+        decoder = IncrementalHTMLDecoder("text/html")
+        parts = [decoder.feed(body[i:i + 7]) for i in range(0, len(body), 7)]
+        parts.append(decoder.finish())
+        self.assertEqual("".join(parts), JP_HTML * 200)
+        self.assertEqual(decoder.decision.source, "bom")
+
+    def test_incremental_decoder_matches_decode_html(self):
+        body = (JP_HTML * 50).encode("cp932")
+        decoder = IncrementalHTMLDecoder("text/html")
+        text = "".join(decoder.feed(body[i:i + 1000]) for i in range(0, len(body), 1000)) + decoder.finish()
+        expected, decision = decode_html(body, "text/html")
+        self.assertEqual(text, expected)
+        self.assertEqual(decoder.decision.encoding, decision.encoding)
+
+    def test_truncated_stream_drops_cut_character(self):
+        for content_type, encoding in (("text/html; charset=utf-8", "utf-8"), ("text/html", "utf-8"),
+                                       ("text/html", "cp932")):
+            body = (JP_HTML * 20).encode(encoding)
+            cut = body[:len(body) - 1]  # 最後の文字の途中で切る
+            decoder = IncrementalHTMLDecoder(content_type)
+            text = decoder.feed(cut) + decoder.finish(truncated=True)
+            self.assertNotIn("\ufffd", text)
+            self.assertTrue((JP_HTML * 20).startswith(text))
+            self.assertEqual(decoder.decision.encoding, encoding)
+
+    def test_normalize_encoding(self):
+        self.assertEqual(normalize_encoding("Shift_JIS"), "cp932")
+        self.assertEqual(normalize_encoding("ISO-8859-1"), "cp1252")
+        self.assertIsNone(normalize_encoding("no-such-charset"))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,55 @@
+import unittest
+
+from core.crawl_scheduler import CrawlScheduler
+
+DAY = 86400.0
+
+
+class TestCrawlScheduler(unittest.TestCase):
+    def test_ranking_features(self):
+        scheduler = CrawlScheduler()
+        scheduler.push("deep", "deep", depth=4)
+        scheduler.push("shallow", "shallow", depth=1)
+        scheduler.push("sitemap-high", "sitemap-high", depth=1, sitemap_priority=1.0)
+        scheduler.push("start", "start", pinned=True)
+        order = [scheduler.pop().key for _ in range(4)]
+        self.assertEqual(order, ["start", "sitemap-high", "shallow", "deep"])
+        self.assertIsNone(scheduler.pop())
+
+    def test_inlinks_rerank_with_lazy_invalidation(self):
+        scheduler = CrawlScheduler()
+        for key in ("a", "b", "c"):
+            scheduler.push(key, key, depth=2)
+        for _ in range(3):
+            scheduler.add_inlink("c")
+        scheduler.add_inlink("b")
+        self.assertFalse(scheduler.add_inlink("missing"))
+        self.assertEqual([scheduler.pop().key for _ in range(3)], ["c", "b", "a"])
+        self.assertEqual(len(scheduler), 0)
+
+    def test_update_keeps_payload_and_smaller_depth(self):
+        scheduler = CrawlScheduler()
+        scheduler.push("a", "task", depth=1)
+        page = scheduler.push("a", None, depth=3, inlinks=1, sitemap_priority=0.9)
+        self.assertIs(scheduler.get("a"), page)
+        self.assertEqual((page.payload, page.depth, page.inlinks, page.sitemap_priority), ("task", 1, 1, 0.9))
+        self.assertIsNone(scheduler.get("missing"))
+
+    def test_staleness(self):
+        scheduler = CrawlScheduler()
+        now = 1000 * DAY
+        fresh = scheduler.push("fresh", None, depth=1, last_analyzed=now - DAY)
+        stale = scheduler.push("stale", None, depth=1, last_analyzed=now - 60 * DAY)
+        self.assertGreater(scheduler.score(stale, now=now), scheduler.score(fresh, now=now))
+
+    def test_budget(self):
+        scheduler = CrawlScheduler(budget=2)
+        for i in range(5):
+            scheduler.push(i, i, inlinks=i)
+        self.assertEqual([scheduler.pop().key, scheduler.pop().key], [4, 3])
+        self.assertTrue(scheduler.exhausted())
+        self.assertIsNone(scheduler.pop())
+
+
+if __name__ == '__main__':
+    unittest.main()
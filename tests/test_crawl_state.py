@@ -0,0 +1,100 @@
+import os
+import tempfile
+import time
+import unittest
+
+try:
+    from core.crawl_state import CrawlStateStore, PageState, RecrawlPolicy, parse_lastmod
+    from core.crawler import CrawlConfig, SiteCrawler
+    from tests.local_server import LocalServer
+except Exception:
+    CrawlStateStore = None
+
+DAY = 86400.0
+
+
+@unittest.skipUnless(CrawlStateStore, "requests not available")
+class TestCrawlState(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.store = CrawlStateStore(os.path.join(self.tmp.name, "state.sqlite3"))
+
+    def tearDown(self):
+        self.store.close()
+        self.tmp.cleanup()
+
+    def test_roundtrip(self):
+        state = PageState(
+            url="https://Example.com/a#x", last_fetched=100.0, etag='"e"', content_hash="c",
+            main_content_hash="m", lastmod="2025-01-01", links=["https://example.com/b"],
+            aio_results={"tier": "standard", "results": {"total_score": 70}}, last_analyzed=90.0,
+        )
+        self.store.upsert(state)
+        loaded = self.store.get("https://example.com/a")
+        self.assertEqual(loaded.links, ["https://example.com/b"])
+        self.assertEqual(loaded.aio_results["results"]["total_score"], 70)
+        self.assertEqual(loaded.main_content_hash, "m")
+        self.assertEqual(len(self.store), 1)
+        self.assertEqual(list(self.store.get_many(["https://example.com/a", "https://example.com/z"])),
+                         ["https://example.com/a"])
+
+    def test_policy(self):
+        policy = RecrawlPolicy(max_age_days=7)
+        now = 100 * DAY
+        fresh = PageState(url="u", last_fetched=now - DAY, lastmod="2025-01-01")
+        self.assertEqual(policy.needs_fetch(None), (True, "new"))
+        self.assertEqual(policy.needs_fetch(fresh, "2025-01-01T00:00:00Z", now=now), (False, "fresh"))
+        self.assertEqual(policy.needs_fetch(fresh, "2025-01-02", now=now), (True, "lastmod"))
+        self.assertEqual(policy.needs_fetch(fresh, None, now=now + 7 * DAY), (True, "stale"))
+
+    def test_parse_lastmod(self):
+        self.assertEqual(parse_lastmod("2025-01-01T09:00:00+09:00"), parse_lastmod("2025-01-01"))
+        self.assertIsNone(parse_lastmod("yesterday"))
+
+    def test_crawler_skips_fresh_pages_but_follows_their_links(self):
+        with LocalServer({"/robots.txt": (404, {}, b"")}) as server:
+            self.store.upsert(PageState(url=server.url("/"), last_fetched=time.time(), links=[server.url("/new")]))
+            crawler = SiteCrawler(server.url("/"), config=CrawlConfig(default_delay=0, use_sitemaps=False),
+                                  state_store=self.store)
+            tasks = list(crawler)
+        self.assertEqual([t.url for t in tasks], [server.url("/new")])
+        self.assertEqual(tasks[0].reason, "new")
+        self.assertEqual(crawler.stats["skipped_fresh"], 1)
+
+
+@unittest.skipUnless(CrawlStateStore, "requests not available")
+class TestUnchangedAioReuse(unittest.TestCase):
+    def setUp(self):
+        try:
+            from seo_aio_streamlit import SEOAIOAnalyzer
+        except Exception as e:  # pragma: no cover - app dependencies missing
+            self.skipTest(f"app not importable: {e}")
+        self.analyzer = object.__new__(SEOAIOAnalyzer)
+        task = type("Task", (), {"url": "https://example.com/a", "state": None, "lastmod": None})()
+        results = {
+            "tier": "standard", "user_industry": "", "final_industry": {"primary": "飲食"},
+            "aio_results": {"basic_info": {"industry": "飲食"}, "total_score": 70},
+            "fingerprints": {"main_content_hash": "m"},
+        }
+        self.tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmp.cleanup)
+        self.analyzer.crawl_state = CrawlStateStore(os.path.join(self.tmp.name, "state.sqlite3"))
+        self.addCleanup(self.analyzer.crawl_state.close)
+        self.analyzer._record_crawl_state(task, results, [])
+        self.state = self.analyzer.crawl_state.get("https://example.com/a")
+
+    def _reuse(self, user_industry="", industry="飲食"):
+        return self.analyzer._reuse_unchanged_aio_results(
+            self.state, "m", "https://example.com/a", "タイトル", {}, "standard", user_industry, {"primary": industry}
+        )
+
+    def test_reused_with_same_industry(self):
+        self.assertEqual(self._reuse()["total_score"], 70)
+
+    def test_industry_change_is_reanalyzed(self):
+        self.assertIsNone(self._reuse(user_industry="医療・ヘルスケア", industry="医療・ヘルスケア"))
+        self.assertIsNone(self._reuse(industry="医療・ヘルスケア"))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,120 @@
+import gzip
+import time
+import unittest
+
+try:
+    from core.crawler import (
+        CrawlConfig,
+        CrawlTask,
+        HostThrottle,
+        RobotsCache,
+        SiteCrawler,
+        parse_sitemap,
+    )
+    from tests.local_server import LocalServer
+except Exception:
+    SiteCrawler = None
+
+URLSET = b"""<?xml version="1.0" encoding="UTF-8"?>
+<urlset xmlns="http://www.sitemaps.org/schemas/sitemap/0.9">
+  <url><loc>{base}/a</loc><lastmod>2025-01-02</lastmod><priority>0.8</priority></url>
+  <url><loc>{base}/private/x</loc></url>
+  <url><loc>{base}/b#frag</loc></url>
+</urlset>"""
+
+
+def _base(handler):
+    return f"http://127.0.0.1:{handler.server.server_address[1]}"
+
+
+def _routes():
+    return {
+        "/robots.txt": lambda h: (200, {"Content-Type": "text/plain"},
+                                  f"User-agent: *\nDisallow: /private\nCrawl-delay: 0\nSitemap: {_base(h)}/sitemap_index.xml\n".encode()),
+        "/sitemap_index.xml": lambda h: (200, {"Content-Type": "application/xml"},
+                                         f'<sitemapindex xmlns="http://www.sitemaps.org/schemas/sitemap/0.9">'
+                                         f"<sitemap><loc>{_base(h)}/sitemap1.xml.gz</loc></sitemap></sitemapindex>".encode()),
+        "/sitemap1.xml.gz": lambda h: (200, {"Content-Type": "application/gzip"},
+                                       gzip.compress(URLSET.replace(b"{base}", _base(h).encode()))),
+    }
+
+
+@unittest.skipUnless(SiteCrawler, "requests not available")
+class TestCrawler(unittest.TestCase):
+    def test_parse_sitemap(self):
+        entries, children = parse_sitemap(gzip.compress(URLSET.replace(b"{base}", b"https://example.com")))
+        self.assertEqual(children, [])
+        self.assertEqual(entries[0].url, "https://example.com/a")
+        self.assertEqual(entries[0].lastmod, "2025-01-02")
+        self.assertEqual(entries[0].priority, 0.8)
+        self.assertEqual(parse_sitemap(b"<not xml"), ([], []))
+
+    def test_robots_rules(self):
+        with LocalServer(_routes()) as server:
+            robots = RobotsCache()
+            self.assertFalse(robots.can_fetch(server.url("/private/page")))
+            self.assertTrue(robots.can_fetch(server.url("/public")))
+            self.assertEqual(robots.sitemaps(server.url("/")), [server.url("/sitemap_index.xml")])
+            robots.can_fetch(server.url("/again"))
+        self.assertEqual(sum(1 for r in server.requests if r[1] == "/robots.txt"), 1)
+
+    def test_crawl_sitemaps_and_links(self):
+        config = CrawlConfig(max_pages=10, max_depth=1, default_delay=0)
+        with LocalServer(_routes()) as server:
+            crawler = SiteCrawler(server.url("/"), config=config)
+            visited = []
+            for task in crawler:
+                visited.append((task.url.replace(server.base_url, ""), task.source, task.depth))
+                if task.source == "start":
+                    crawler.add_links(task, ["/c", "/c#x", "/doc.pdf", "https://other.example.com/", "/private/y"])
+                elif task.url.endswith("/c"):
+                    self.assertEqual(crawler.add_links(task, ["/too-deep"]), 0)
+        self.assertEqual(visited, [("/", "start", 0), ("/c", "link", 1), ("/a", "sitemap", 1), ("/b", "sitemap", 1)])
+        self.assertEqual(crawler.stats["robots_blocked"], 2)
+        self.assertEqual(crawler.stats["sitemaps"], 2)
+
+    def test_sitemap_keeps_shallower_depth_of_queued_page(self):
+        config = CrawlConfig(max_pages=10, max_depth=2, default_delay=0)
+        with LocalServer(_routes()) as server:
+            crawler = SiteCrawler(server.url("/"), config=config)
+            crawler.add_links(CrawlTask(server.url("/hub"), 1, "link"), ["/a"])
+            tasks = {task.url.replace(server.base_url, ""): task for task in crawler}
+        # リンク経由（深さ2）で待機中のページも sitemap 掲載分の深さ1になり、priority と lastmod を引き継ぐ
+        self.assertEqual(tasks["/a"].source, "link")
+        self.assertEqual(tasks["/a"].depth, 1)
+        self.assertEqual(tasks["/a"].priority, 0.8)
+        self.assertEqual(tasks["/a"].lastmod, "2025-01-02")
+        self.assertEqual(tasks["/"].depth, 0)
+
+    def test_page_budget(self):
+        config = CrawlConfig(max_pages=2, default_delay=0)
+        with LocalServer(_routes()) as server:
+            crawler = SiteCrawler(server.url("/"), config=config)
+            first = next(iter(crawler))
+            crawler.add_links(first, ["/1", "/2", "/3"])
+            self.assertEqual(len([first] + list(crawler)), 2)
+
+    def test_budget_goes_to_most_linked_pages(self):
+        config = CrawlConfig(max_pages=2, default_delay=0, use_sitemaps=False)
+        with LocalServer(_routes()) as server:
+            crawler = SiteCrawler(server.url("/"), config=config)
+            start = next(iter(crawler))
+            crawler.add_links(start, ["/a", "/b", "/c"])
+            crawler.add_links(CrawlTask(server.url("/elsewhere"), 1, "link"), ["/b", "/b"])
+            rest = list(crawler)
+        self.assertEqual([t.url for t in rest], [server.url("/b")])
+        self.assertGreater(rest[0].score, 0)
+
+    def test_host_throttle_spacing(self):
+        throttle = HostThrottle(concurrency=1, default_delay=0.05)
+        starts = []
+        for _ in range(3):
+            with throttle.slot("http://example.com/page"):
+                starts.append(time.monotonic())
+        self.assertGreaterEqual(starts[2] - starts[0], 0.09)
+        with throttle.slot("http://other.example.com/"):
+            pass
+
+
+if __name__ == '__main__':
+    unittest.main()
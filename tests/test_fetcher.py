@@ -0,0 +1,120 @@
+import gzip
+import unittest
+
+try:
+    import requests
+    from bs4 import BeautifulSoup
+    from core.fetcher import collect_subresource_urls, create_session, fetch_page, measure_subresources
+    from tests.local_server import LocalServer
+except Exception:
+    fetch_page = None
+
+HTML = (
+    '<html><head><meta charset="utf-8"><title>テスト</title>'
+    '<link rel="stylesheet" href="/style.css"><script src="/app.js"></script></head>'
+    '<body><p>本文です。</p><img src="/img.png" alt="画像"></body></html>'
+).encode("utf-8")
+
+
+def _routes():
+    return {
+        "/page": (200, {"Content-Type": "text/html; charset=utf-8", "Content-Encoding": "gzip"},
+                  gzip.compress(HTML * 20)),
+        "/plain": (200, {"Content-Type": "text/html; charset=utf-8"}, HTML),
+        "/redirect": (301, {"Location": "/hop"}, b""),
+        "/hop": (302, {"Location": "/plain"}, b""),
+        "/sjis": (200, {"Content-Type": "text/html"},
+                   "<p>渋谷駅から徒歩三分のレストランです。ご予約をお待ちしております。</p>".encode("cp932")),
+        "/huge": (200, {"Content-Type": "text/html; charset=utf-8", "Content-Encoding": "gzip"},
+                  gzip.compress(HTML * 5000)),
+        "/missing-page": (404, {"Content-Type": "text/html"}, b"no"),
+        "/style.css": (200, {"Content-Type": "text/css"}, b"a" * 1000),
+        "/app.js": (200, {"Content-Type": "application/javascript"}, b"b" * 2000),
+        "/img.png": (200, {"Content-Type": "image/png"}, b"c" * 3000),
+    }
+
+
+@unittest.skipUnless(fetch_page, "requests/bs4 not available")
+class TestFetcher(unittest.TestCase):
+    def test_sizes_and_timings(self):
+        with LocalServer(_routes()) as server:
+            result = fetch_page(server.url("/page"))
+        self.assertEqual(result.status_code, 200)
+        self.assertEqual(result.uncompressed_bytes, len(HTML) * 20)
+        self.assertLess(result.compressed_bytes, result.uncompressed_bytes)
+        self.assertIn("テスト", result.text)
+        metrics = result.metrics()
+        self.assertIsNotNone(metrics["dns_ms"])
+        self.assertIsNotNone(metrics["connect_ms"])
+        self.assertGreaterEqual(metrics["total_ms"], metrics["download_ms"])
+        self.assertEqual(metrics["content_encoding"], "gzip")
+        self.assertFalse(metrics["connection_reused"])
+
+    def test_connection_timings_from_request(self):
+        session = create_session()
+        with LocalServer(_routes(), keep_alive=True) as server:
+            first = fetch_page(server.url("/plain"), session=session)
+            second = fetch_page(server.url("/plain"), session=session)
+            unmeasured = fetch_page(server.url("/plain"), measure_connection=False)
+        self.assertFalse(first.timings.connection_reused)
+        self.assertIsNotNone(first.timings.dns_ms)
+        # keep-alive で再利用した接続には DNS・接続時間がない
+        self.assertTrue(second.timings.connection_reused)
+        self.assertIsNone(second.timings.dns_ms)
+        self.assertIsNone(second.timings.connect_ms)
+        self.assertIsNone(unmeasured.timings.connection_reused)
+        self.assertEqual(len(server.requests), 3)
+
+    def test_redirect_hops(self):
+        with LocalServer(_routes()) as server:
+            result = fetch_page(server.url("/redirect"))
+        self.assertEqual([hop["status_code"] for hop in result.redirects], [301, 302])
+        self.assertTrue(result.final_url.endswith("/plain"))
+        self.assertEqual(result.metrics()["redirect_count"], 2)
+
+    def test_charset_sniffed(self):
+        with LocalServer(_routes()) as server:
+            result = fetch_page(server.url("/sjis"), measure_connection=False)
+        self.assertIn("渋谷駅", result.text)
+        self.assertEqual(result.encoding, "cp932")
+        self.assertEqual(result.metrics()["charset_source"], result.encoding_source)
+
+    def test_size_cap_truncates(self):
+        with LocalServer(_routes()) as server:
+            result = fetch_page(server.url("/huge"), measure_connection=False, max_bytes=100_000)
+            full = fetch_page(server.url("/plain"), measure_connection=False, max_bytes=len(HTML))
+        self.assertTrue(result.truncated)
+        self.assertEqual(result.uncompressed_bytes, 100_000)
+        self.assertTrue(result.metrics()["truncated"])
+        self.assertTrue(result.text.startswith("<html>"))
+        self.assertFalse(full.truncated)
+        self.assertEqual(full.uncompressed_bytes, len(HTML))
+
+    def test_size_cap_inside_multibyte_char(self):
+        cut = HTML.index("テスト".encode("utf-8")) + 1
+        with LocalServer(_routes()) as server:
+            result = fetch_page(server.url("/plain"), measure_connection=False, max_bytes=cut)
+        self.assertTrue(result.truncated)
+        self.assertNotIn("\ufffd", result.text)
+        self.assertTrue(result.text.endswith("<title>"))
+
+    def test_http_error(self):
+        with LocalServer(_routes()) as server:
+            with self.assertRaises(requests.HTTPError):
+                fetch_page(server.url("/missing-page"))
+
+    def test_subresources(self):
+        with LocalServer(_routes()) as server:
+            soup = BeautifulSoup(HTML.decode("utf-8"), "html.parser")
+            resources = collect_subresource_urls(soup, server.url("/plain"))
+            self.assertEqual(resources["css"], [server.url("/style.css")])
+            summary = measure_subresources(resources, max_workers=3)
+        self.assertEqual(summary["css"]["bytes"], 1000)
+        self.assertEqual(summary["js"]["bytes"], 2000)
+        self.assertEqual(summary["image"]["bytes"], 3000)
+        self.assertEqual(summary["total_requests"], 3)
+        self.assertEqual(summary["total_bytes"], 6000)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,146 @@
+import unittest
+
+try:
+    from core.fingerprint import (
+        LSHIndex,
+        MinHasher,
+        NearDuplicateIndex,
+        estimate_similarity,
+        optimal_bands,
+        shingle_hashes,
+    )
+except Exception:
+    NearDuplicateIndex = None
+
+TEMPLATE = (
+    "{city}店のご案内。当店は{city}駅から徒歩5分の場所にあるイタリアンレストランです。"
+    "季節の食材を使ったパスタとピザ、厳選したワインをご用意しております。"
+    "ランチは11時から15時、ディナーは17時から22時まで営業しています。"
+    "ご予約はお電話またはウェブサイトの予約フォームから承ります。"
+    "個室のご用意もございますので、記念日や接待にもご利用ください。"
+    "テイクアウトメニューも充実しており、ご自宅でも本格的な味をお楽しみいただけます。"
+)
+
+
+@unittest.skipUnless(NearDuplicateIndex, "numpy not available")
+class TestFingerprint(unittest.TestCase):
+    def test_similar_signatures(self):
+        hasher = MinHasher(num_perm=128)
+        a = hasher.signature(TEMPLATE.format(city="渋谷"))
+        b = hasher.signature(TEMPLATE.format(city="新宿"))
+        c = hasher.signature("まったく関係のない内容の文章です。建設業の施工事例を紹介します。")
+        self.assertGreater(estimate_similarity(a, b), 0.8)
+        self.assertLess(estimate_similarity(a, c), 0.2)
+
+    def test_shingle_hashes_match_distinct_shingles(self):
+        text = TEMPLATE.format(city="渋谷") * 3
+        norm = " ".join(text.lower().split())
+        hashes = shingle_hashes(text)
+        self.assertEqual(hashes.size, len({norm[i:i + 5] for i in range(len(norm) - 4)}))
+        self.assertTrue((hashes < (1 << 32)).all())
+        self.assertEqual(shingle_hashes("短い").size, 1)
+        self.assertEqual(shingle_hashes("  ").size, 0)
+        hasher = MinHasher(num_perm=16)
+        self.assertEqual(estimate_similarity(hasher.signature("abc"), hasher.signature("ABC ")), 1.0)
+        self.assertEqual(hasher.signature("").tolist(), [1 << 32] * 16)
+
+    def test_optimal_bands(self):
+        bands, rows = optimal_bands(128, 0.9)
+        self.assertEqual(bands * rows, 128)
+        self.assertGreater(rows, 1)
+
+    def test_lsh_remove(self):
+        hasher = MinHasher(num_perm=64)
+        index = LSHIndex(num_perm=64, threshold=0.8)
+        sig = hasher.signature(TEMPLATE.format(city="渋谷"))
+        index.insert("a", sig)
+        self.assertIn("a", index.query(sig))
+        index.remove("a")
+        self.assertEqual(index.query(sig), set())
+        self.assertEqual(len(index), 0)
+
+    def test_near_duplicate_index(self):
+        index = NearDuplicateIndex(threshold=0.8)
+        index.add("https://example.com/shibuya", TEMPLATE.format(city="渋谷"), {"total_score": 70})
+        match = index.find(TEMPLATE.format(city="新宿"))
+        self.assertIsNotNone(match)
+        self.assertEqual(match.key, "https://example.com/shibuya")
+        self.assertEqual(match.payload["total_score"], 70)
+        self.assertIsNone(index.find("建設業の施工事例とお客様の声を掲載しています。" * 5))
+
+    def test_exact_duplicate(self):
+        index = NearDuplicateIndex(threshold=0.95)
+        index.add("a", "同じ  本文", 1)
+        match = index.find("同じ 本文")
+        self.assertEqual(match.similarity, 1.0)
+
+    def test_find_accept_filter(self):
+        index = NearDuplicateIndex(threshold=0.8)
+        text = TEMPLATE.format(city="渋谷")
+        index.add("self", text, {"industry": "飲食"})
+        index.add("other", TEMPLATE.format(city="新宿"), {"industry": "飲食"})
+        match = index.find(text, accept=lambda key, payload: key != "self")
+        self.assertEqual(match.key, "other")
+        self.assertIsNone(index.find(text, accept=lambda key, payload: payload["industry"] == "医療"))
+
+    def test_eviction(self):
+        index = NearDuplicateIndex(threshold=0.9, max_entries=2)
+        for i, city in enumerate(["渋谷", "新宿", "池袋"]):
+            index.add(i, TEMPLATE.format(city=city) * (i + 1), i)
+        self.assertEqual(len(index), 2)
+        match = index.find(TEMPLATE.format(city="渋谷"))
+        self.assertTrue(match is None or match.key != 0)
+
+
+@unittest.skipUnless(NearDuplicateIndex, "numpy not available")
+class TestSimilarAioReuse(unittest.TestCase):
+    def setUp(self):
+        try:
+            from seo_aio_streamlit import SEOAIOAnalyzer
+        except Exception as e:  # pragma: no cover - app dependencies missing
+            self.skipTest(f"app not importable: {e}")
+        self.analyzer = object.__new__(SEOAIOAnalyzer)
+        self.analyzer.near_duplicate_index = NearDuplicateIndex(threshold=0.8)
+        self.text = TEMPLATE.format(city="渋谷")
+        self.analyzer.near_duplicate_index.add("https://example.com/a", self.text, {
+            "tier": "deep", "user_industry": "", "industry": "飲食",
+            "results": {"basic_info": {"industry": "飲食"}, "total_score": 70},
+        })
+
+    def _reuse(self, url, user_industry="", industry="飲食"):
+        return self.analyzer._reuse_similar_aio_results(
+            url, "タイトル", self.text, {}, "deep", user_industry, {"primary": industry}
+        )
+
+    def test_reuses_same_industry_from_other_page(self):
+        reused = self._reuse("https://example.com/b")
+        self.assertEqual(reused["total_score"], 70)
+        self.assertEqual(reused["basic_info"]["url"], "https://example.com/b")
+        self.assertEqual(reused["reused_from"]["url"], "https://example.com/a")
+
+    def test_industry_change_or_same_url_is_reanalyzed(self):
+        self.assertIsNone(self._reuse("https://example.com/a"))
+        self.assertIsNone(self._reuse("https://example.com/b", user_industry="医療・ヘルスケア"))
+        self.assertIsNone(self._reuse("https://example.com/b", industry="医療・ヘルスケア"))
+
+    def test_standard_tier_uses_local_categories_and_total(self):
+        from core.constants import AIO_SCORE_MAP_JP, LOCAL_AIO_CRITERIA
+        from core.local_scorer import local_category_scores
+
+        payload = {
+            "scores": {key: {"score": 9, "advice": ""} for key in AIO_SCORE_MAP_JP},
+            "category_scores": {"eeat_score": 90, "ai_search_score": 90, "user_experience_score": 90,
+                                "technical_score": 90},
+            "total_score": 90,
+        }
+        local_scores = {key: {"score": 2, "advice": "", "evidence": ""} for key in LOCAL_AIO_CRITERIA}
+        adapted = self.analyzer._adapt_reused_aio(payload, "https://example.com/b", "タイトル", local_scores, "standard")
+        # LLM が採点しない項目のカテゴリと総合スコアはローカル評価に合わせる
+        self.assertEqual(adapted["category_scores"], dict(local_category_scores(local_scores), eeat_score=90))
+        expected = (9 * (len(AIO_SCORE_MAP_JP) - len(LOCAL_AIO_CRITERIA)) + 2 * len(LOCAL_AIO_CRITERIA)) / len(AIO_SCORE_MAP_JP) * 10
+        self.assertAlmostEqual(adapted["total_score"], expected)
+        self.assertEqual(payload["total_score"], 90)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,65 @@
+import json
+import random
+import unittest
+
+from core.industry_batch import BatchIndustryClassifier, classify_industries
+from core.industry_detector import IndustryDetector
+from core.taxonomy import DEFAULT_TAXONOMY_PATH, Taxonomy, get_taxonomy
+
+
+def _random_documents(n, seed=0):
+    taxonomy = get_taxonomy()
+    vocabulary = list(taxonomy.matcher.keywords) + [
+        kw for levels in taxonomy.industries.values() for kws in levels.values() for kw in kws
+    ]
+    filler = ["の", "です", "サービス", "について", "当社", "information", " "]
+    rng = random.Random(seed)
+    documents = []
+    for _ in range(n):
+        words = [rng.choice(vocabulary if rng.random() < 0.3 else filler) for _ in range(rng.randint(0, 60))]
+        content = rng.choice(["", " "]).join(words)
+        documents.append((rng.choice(["", "会社案内", "SaaS"]), content, rng.choice(["", "B2B向け"])))
+    return documents
+
+
+class TestBatchIndustryClassifier(unittest.TestCase):
+    def test_matches_per_document_results(self):
+        documents = _random_documents(400)
+        documents += [("", "", ""), ("IoT", "IoT DX", ""), ("医療DX", "DXコンサル 決済", "")]
+        detector = IndustryDetector()
+        expected = [detector.analyze_industries(t, c, m) for t, c, m in documents]
+        self.assertEqual(classify_industries(documents), expected)
+
+    def test_ties_keep_taxonomy_order(self):
+        with open(DEFAULT_TAXONOMY_PATH, encoding="utf-8") as f:
+            data = json.load(f)
+        data["industries"] = {
+            "A": {"primary": ["共通語"], "secondary": [], "specialized": []},
+            "B": {"primary": ["共通語"], "secondary": ["別語"], "specialized": []},
+            "C": {"primary": ["共通語"], "secondary": [], "specialized": []},
+        }
+        taxonomy = Taxonomy(data)
+        documents = [("", "共通語", ""), ("", "共通語 別語", ""), ("", "なし", "")]
+        results = classify_industries(documents, taxonomy)
+        expected = [IndustryDetector(taxonomy).analyze_industries(t, c, m) for t, c, m in documents]
+        self.assertEqual(results, expected)
+        self.assertEqual(results[0].primary_industry, "A")
+        self.assertEqual(results[0].secondary_industries, ["B(3)", "C(3)"])
+        self.assertEqual(results[1].primary_industry, "B")
+
+    def test_matrix(self):
+        classifier = BatchIndustryClassifier()
+        dtm = classifier.matrix(["saas saas と物件", "", "何もない"])
+        self.assertEqual(dtm.shape, (3, len(classifier.keywords)))
+        self.assertEqual(list(dtm.indptr[1:] - dtm.indptr[:-1]), [2, 0, 0])
+        counts = dict(zip((classifier.keywords[i] for i in dtm.indices), dtm.data))
+        self.assertEqual(counts, {"saas": 2, "物件": 1})
+        scores = classifier.scores(dtm)
+        self.assertEqual(scores[0, classifier.industries.index("IT・テクノロジー")], 6)
+        self.assertEqual(scores[1].sum(), 0)
+        self.assertEqual(classifier.label_counts(classifier.classify_matrix(dtm))["指定なし（自動判定不可）"], 2)
+        self.assertEqual(classify_industries([]), [])
+
+
+if __name__ == "__main__":
+    unittest.main()
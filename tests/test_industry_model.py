@@ -0,0 +1,168 @@
+import os
+import random
+import tempfile
+import time
+import unittest
+from unittest import mock
+
+try:
+    import numpy as np
+
+    from core.industry_detector import IndustryAnalysis
+    from core.industry_model import (
+        IndustryModel,
+        IndustryPrediction,
+        load_industry_model,
+        ngram_buckets,
+        train_industry_model,
+    )
+    from core.taxonomy import get_taxonomy
+except Exception:
+    train_industry_model = None
+
+BENCHMARK_ENV = "AIO_RUN_BENCHMARKS"
+FILLER = ["会社", "サービス", "について", "ご案内", "お問い合わせ", "私たち", "の", "を", "です"]
+
+
+def _corpus(per_label=40, seed=0):
+    taxonomy = get_taxonomy()
+    rng = random.Random(seed)
+    texts, labels = [], []
+    for label in list(taxonomy.industries)[:4]:
+        keywords = [kw for level in taxonomy.industries[label].values() for kw in level]
+        for _ in range(per_label):
+            words = [rng.choice(keywords) for _ in range(6)] + [rng.choice(FILLER) for _ in range(10)]
+            rng.shuffle(words)
+            texts.append(" ".join(words))
+            labels.append(label)
+    return texts, labels
+
+
+@unittest.skipUnless(train_industry_model, "numpy not available")
+class TestIndustryModel(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        texts, cls.labels = _corpus()
+        cls.texts = texts
+        cls.model = train_industry_model(texts, cls.labels, hash_bits=14, epochs=80)
+        test_texts, test_labels = _corpus(per_label=10, seed=1)
+        cls.test_texts, cls.test_labels = test_texts, test_labels
+
+    def test_buckets_are_stable_and_normalized(self):
+        a = ngram_buckets("ＡＢＣ  病院", 14)
+        b = ngram_buckets("abc 病院", 14)
+        np.testing.assert_array_equal(a, b)
+        self.assertTrue(((a >= 0) & (a < 2 ** 14)).all())
+        self.assertEqual(len(ngram_buckets("", 14)), 0)
+
+    def test_accuracy_and_probabilities(self):
+        predictions = [self.model.predict_text(t) for t in self.test_texts]
+        accuracy = np.mean([p.label == label for p, label in zip(predictions, self.test_labels)])
+        self.assertGreaterEqual(accuracy, 0.9)
+        for p in predictions[:5]:
+            self.assertAlmostEqual(sum(p.probabilities.values()), 1.0, places=6)
+            self.assertAlmostEqual(p.confidence, max(p.probabilities.values()) * 100, places=6)
+        self.assertGreater(self.model.temperature, 0)
+        self.assertIn("validation_accuracy", self.model.metadata)
+
+    def test_empty_text_uses_bias(self):
+        prediction = self.model.predict("", "", "")
+        self.assertIn(prediction.label, self.model.labels)
+
+    def test_save_and_mmap_load(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, "industry_model")
+            self.model.save(path)
+            loaded = load_industry_model(path + ".npy")
+            self.assertIsInstance(loaded.weights.base, np.memmap)
+            self.assertFalse(loaded.weights.flags.writeable)
+            self.assertEqual(loaded.labels, self.model.labels)
+            text = self.test_texts[0]
+            self.assertEqual(loaded.predict_text(text), self.model.predict_text(text))
+            self.assertIs(load_industry_model(path), loaded)
+
+    def test_missing_model_is_none(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            self.assertIsNone(load_industry_model(os.path.join(tmp, "absent")))
+
+    def test_shape_mismatch_rejected(self):
+        with self.assertRaises(ValueError):
+            IndustryModel(np.zeros((2, 16), dtype=np.float32), np.zeros(2), ["a", "b"], hash_bits=4)
+
+    @staticmethod
+    def _large_model_and_page():
+        labels = [str(i) for i in range(30)]
+        weights = np.random.default_rng(0).random((2 ** 18, 30), dtype=np.float32)
+        model = IndustryModel(weights, np.zeros(30), labels, hash_bits=18)
+        rng = np.random.default_rng(1)
+        chars = "医療クリニック診療案内予約病院内科外科歯科看護薬局健康相談受付時間休診日アクセス駅徒歩ですのはをにがとabcdefg 0123"
+        return model, "".join(rng.choice(list(chars), size=4000))
+
+    def test_logits_match_per_occurrence_mean(self):
+        model, page = self._large_model_and_page()
+        buckets = model.buckets(page)
+        expected = model.weights[buckets].mean(axis=0, dtype=np.float64)
+        np.testing.assert_allclose(model.logits(page), expected, rtol=1e-4)
+
+    @unittest.skipUnless(os.getenv(BENCHMARK_ENV), f"set {BENCHMARK_ENV}=1 to run timing benchmarks")
+    def test_inference_latency(self):
+        model, page = self._large_model_and_page()
+        best = float("inf")
+        for _ in range(5):
+            start = time.perf_counter()
+            for _ in range(20):
+                model.predict("タイトル", page, "説明")
+            best = min(best, (time.perf_counter() - start) / 20)
+        # 30業種・2**18 バケット・4000文字で1ms未満（手元の計測では約0.5ms）
+        self.assertLess(best, 0.001)
+
+
+@unittest.skipUnless(train_industry_model, "numpy not available")
+class TestFinalIndustryWithModel(unittest.TestCase):
+    def setUp(self):
+        try:
+            from seo_aio_streamlit import SEOAIOAnalyzer
+        except Exception as e:  # pragma: no cover - app dependencies missing
+            self.skipTest(f"app not importable: {e}")
+        self.analyzer = object.__new__(SEOAIOAnalyzer)
+
+    def _auto(self, confidence):
+        return IndustryAnalysis("IT・テクノロジー", [], confidence, [], [], [], [])
+
+    def test_model_used_when_keywords_are_weak(self):
+        prediction = IndustryPrediction("医療・ヘルスケア", 82.0, {})
+        result = self.analyzer._determine_final_industry("", self._auto(20.0), prediction)
+        self.assertEqual(result["primary"], "医療・ヘルスケア")
+        self.assertEqual(result["confidence"], 82.0)
+        self.assertEqual(result["model_primary"], "医療・ヘルスケア")
+
+    def test_confident_keywords_and_low_model_probability(self):
+        prediction = IndustryPrediction("医療・ヘルスケア", 82.0, {})
+        result = self.analyzer._determine_final_industry("", self._auto(90.0), prediction)
+        self.assertEqual(result["primary"], "IT・テクノロジー")
+        weak = IndustryPrediction("医療・ヘルスケア", 40.0, {})
+        result = self.analyzer._determine_final_industry("", self._auto(20.0), weak)
+        self.assertEqual(result["primary"], "指定なし")
+        result = self.analyzer._determine_final_industry("", self._auto(20.0))
+        self.assertEqual(result["model_primary"], "")
+
+    def test_replaced_model_is_used_for_prediction(self):
+        from core.industry_model import MODEL_PATH_ENV, industry_model_version
+
+        def save(path, hash_bits, bias, version):
+            IndustryModel(np.zeros((2 ** hash_bits, 2), dtype=np.float32), np.array(bias), ["a", "b"], hash_bits,
+                          metadata={"version": version}).save(path)
+
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, "industry_model")
+            with mock.patch.dict(os.environ, {MODEL_PATH_ENV: path}):
+                save(path, 4, [1.0, 0.0], "v1")
+                self.assertEqual(self.analyzer._predict_industry_with_model("t", "本文", "").label, "a")
+                # 分析器を作り直さなくても、差し替えたモデルで予測しキャッシュキーの版と一致する
+                save(path, 5, [0.0, 1.0], "v2")
+                self.assertEqual(self.analyzer._predict_industry_with_model("t", "本文", "").label, "b")
+                self.assertEqual(industry_model_version(), "v2")
+
+
+if __name__ == "__main__":
+    unittest.main()
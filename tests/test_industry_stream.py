@@ -0,0 +1,94 @@
+import unittest
+
+try:
+    from bs4 import BeautifulSoup
+
+    from core.industry_detector import IndustryDetector
+    from core.industry_stream import (
+        IncrementalKeywordCounter,
+        StreamingIndustryDetector,
+        detect_industry_streaming,
+    )
+    from core.taxonomy import get_taxonomy
+    from tests.local_server import LocalServer
+except Exception:
+    detect_industry_streaming = None
+
+PAGE_HEAD = (
+    "<html><head><title>渋谷の不動産会社</title>"
+    '<meta name="description" content="賃貸・売買物件をご紹介">'
+    "<script>var x = '医療 医療 医療';</script><style>.a{}</style></head><body>"
+)
+SECTION = "<section><h2>物件情報</h2><p>マンションと戸建て、土地の売買・賃貸を仲介します。</p></section>\n"
+
+
+def _page(sections):
+    return (PAGE_HEAD + SECTION * sections + "</body></html>").encode("utf-8")
+
+
+def _chunks(data, size):
+    return [data[i:i + size] for i in range(0, len(data), size)]
+
+
+@unittest.skipUnless(detect_industry_streaming, "streaming dependencies not available")
+class TestStreamingIndustry(unittest.TestCase):
+    def test_counter_across_segments(self):
+        matcher = get_taxonomy().matcher
+        counter = IncrementalKeywordCounter(matcher)
+        for segment in ["PCI", "DSS", "不動産", "投資", "不動産投資です"]:
+            counter.feed(segment)
+        counts = counter.flush()
+        expected = matcher.count("pci dss 不動産 投資 不動産投資です")
+        self.assertEqual(counts, expected)
+        self.assertEqual(counts["pci dss"], 1)
+        self.assertEqual(counter.words, 5)
+
+    def test_matches_full_analysis_without_early_exit(self):
+        body = _page(3)
+        stream = StreamingIndustryDetector(confidence_threshold=101, max_bytes=None)
+        for chunk in _chunks(body, 37):
+            self.assertFalse(stream.feed(chunk))
+        result = stream.finish()
+        soup = BeautifulSoup(body.decode("utf-8"), "html.parser")
+        for tag in soup(["script", "style"]):
+            tag.decompose()
+        visible = soup.body.get_text(separator=" ", strip=True)
+        expected = IndustryDetector().analyze_industries("渋谷の不動産会社", visible, "賃貸・売買物件をご紹介")
+        self.assertEqual(result, expected)
+        self.assertEqual(stream.reason, "complete")
+        self.assertEqual(stream.title, "渋谷の不動産会社")
+        self.assertNotIn("医療・ヘルスケア", " ".join(result.secondary_industries))
+
+    def test_early_exit_on_large_page(self):
+        body = _page(5000)
+        routes = {"/big": (200, {"Content-Type": "text/html; charset=utf-8"}, body)}
+        with LocalServer(routes) as server:
+            result = detect_industry_streaming(server.url("/big"))
+        self.assertEqual(result.analysis.primary_industry, "不動産")
+        self.assertTrue(result.stopped_early)
+        self.assertEqual(result.reason, "confident")
+        self.assertLess(result.bytes_read, len(body) // 10)
+
+    def test_byte_budget(self):
+        body = _page(5000)
+        stream = StreamingIndustryDetector(confidence_threshold=101, max_bytes=50_000)
+        stopped = False
+        for chunk in _chunks(body, 16 * 1024):
+            if stream.feed(chunk):
+                stopped = True
+                break
+        self.assertTrue(stopped)
+        self.assertEqual(stream.bytes_read, 50_000)
+        self.assertEqual(stream.reason, "max_bytes")
+        self.assertEqual(stream.finish().primary_industry, "不動産")
+
+    def test_http_error(self):
+        import requests
+
+        with LocalServer({}) as server:
+            with self.assertRaises(requests.HTTPError):
+                detect_industry_streaming(server.url("/missing"))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,84 @@
+import time
+import unittest
+
+try:
+    from core.link_checker import LinkCheckCache, LinkChecker, link_check_penalty
+    from tests.local_server import LocalServer
+except Exception:
+    LinkChecker = None
+
+
+def _no_head(handler):
+    if handler.command == "HEAD":
+        return 405, {}, b""
+    return 206, {"Content-Range": "bytes 0-0/10"}, b"x"
+
+
+def _slow(handler):
+    time.sleep(0.5)
+    return 200, {}, b""
+
+
+ROUTES = {
+    "/ok": (200, {"Content-Type": "text/html"}, b"ok"),
+    "/moved": (301, {"Location": "/moved-again"}, b""),
+    "/moved-again": (302, {"Location": "/ok"}, b""),
+    "/error": (500, {}, b""),
+    "/no-head": _no_head,
+    "/slow": _slow,
+}
+
+
+@unittest.skipUnless(LinkChecker, "requests not available")
+class TestLinkChecker(unittest.TestCase):
+    def test_statuses_and_redirect_chain(self):
+        with LocalServer(ROUTES) as server:
+            checker = LinkChecker(timeout=2)
+            report = checker.check([
+                server.url("/ok"), server.url("/ok#top"), server.url("/moved"), server.url("/missing"),
+                server.url("/error"), server.url("/no-head"), "mailto:info@example.com",
+            ])
+        self.assertEqual(report["checked"], 5)
+        broken = {item["url"].rsplit("/", 1)[1]: item["category"] for item in report["broken"]}
+        self.assertEqual(broken, {"missing": "client_error", "error": "server_error"})
+        self.assertEqual(len(report["redirects"]), 1)
+        self.assertEqual([hop["status_code"] for hop in report["redirects"][0]["redirects"]], [301, 302])
+        self.assertEqual(report["long_redirect_chains"], 1)
+        methods = [r for r in server.requests if r[1] == "/no-head"]
+        self.assertEqual([m[0] for m in methods], ["HEAD", "GET"])
+        self.assertEqual(methods[1][2].get("Range"), "bytes=0-0")
+        self.assertGreater(link_check_penalty(report), 0)
+
+    def test_cache_shared_between_checks(self):
+        with LocalServer(ROUTES) as server:
+            checker = LinkChecker(cache=LinkCheckCache(ttl=60))
+            checker.check([server.url("/ok")])
+            report = checker.check([server.url("/ok")])
+        self.assertEqual(report["cache_hits"], 1)
+        self.assertEqual(len(server.requests), 1)
+
+    def test_timeout_and_budget(self):
+        with LocalServer(ROUTES) as server:
+            checker = LinkChecker(timeout=0.2, budget_seconds=5)
+            report = checker.check([server.url("/slow")])
+            self.assertEqual(report["timeouts"], [server.url("/slow")])
+
+            checker = LinkChecker(timeout=2, budget_seconds=0.3, host_concurrency=1)
+            started = time.monotonic()
+            report = checker.check([server.url(f"/slow?{i}") for i in range(5)])
+            self.assertLess(time.monotonic() - started, 1.0)
+        self.assertGreaterEqual(len(report["unchecked"]), 4)
+        self.assertEqual(report["broken_count"], 0)
+
+    def test_many_links_checked_concurrently(self):
+        with LocalServer({"/slow": lambda h: (time.sleep(0.05), (200, {}, b""))[1]}) as server:
+            checker = LinkChecker(host_concurrency=16, max_workers=16)
+            started = time.monotonic()
+            report = checker.check([server.url(f"/slow?{i}") for i in range(160)])
+            elapsed = time.monotonic() - started
+        self.assertEqual(report["checked"], 160)
+        self.assertLess(elapsed, 160 * 0.05 / 4)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,104 @@
+import unittest
+
+try:
+    import numpy as np
+    from core.link_graph import LinkGraph, format_link_context
+except Exception:  # pragma: no cover - numpy missing
+    LinkGraph = None
+
+SITE = "https://example.com"
+
+
+def _url(path):
+    return SITE + path
+
+
+@unittest.skipUnless(LinkGraph, "numpy not available")
+class TestLinkGraph(unittest.TestCase):
+    def setUp(self):
+        self.graph = LinkGraph.from_adjacency({
+            _url("/"): [_url("/a"), _url("/b"), _url("/")],
+            _url("/a"): [_url("/b"), _url("/b#top")],
+            _url("/b"): [_url("/"), _url("/c")],
+            _url("/c"): [_url("/d")],
+            _url("/orphan"): [_url("/b")],
+        })
+
+    def test_csr_dedupes_links(self):
+        indptr, indices = self.graph.csr()
+        self.assertEqual(len(indptr) - 1, len(self.graph))
+        self.assertEqual(self.graph.edge_count, 7)
+        self.assertEqual(self.graph.out_degree()[self.graph.node_id(_url("/a"))], 1)
+
+    def test_pagerank(self):
+        rank = self.graph.pagerank()
+        self.assertAlmostEqual(rank.sum(), 1.0, places=8)
+        node = self.graph.node_id
+        self.assertGreater(rank[node(_url("/b"))], rank[node(_url("/a"))])
+        self.assertEqual(np.argmax(rank), node(_url("/b")))
+
+    def test_pagerank_matches_dense_reference(self):
+        indptr, indices = self.graph.csr()
+        n = len(indptr) - 1
+        matrix = np.zeros((n, n))
+        for src in range(n):
+            targets = indices[indptr[src]:indptr[src + 1]]
+            if targets.size:
+                matrix[targets, src] = 1.0 / targets.size
+            else:
+                matrix[:, src] = 1.0 / n
+        expected = np.full(n, 1.0 / n)
+        for _ in range(200):
+            expected = 0.85 * matrix @ expected + 0.15 / n
+        np.testing.assert_allclose(self.graph.pagerank(), expected, atol=1e-7)
+
+    def test_click_depth_and_orphans(self):
+        depth = self.graph.click_depth(_url("/"))
+        node = self.graph.node_id
+        self.assertEqual(depth[node(_url("/"))], 0)
+        self.assertEqual(depth[node(_url("/b"))], 1)
+        self.assertEqual(depth[node(_url("/d"))], 3)
+        self.assertEqual(depth[node(_url("/orphan"))], -1)
+        self.assertEqual(self.graph.orphans(_url("/")), [_url("/orphan")])
+
+    def test_hits(self):
+        hub, authority = self.graph.hits()
+        node = self.graph.node_id
+        self.assertAlmostEqual(authority.sum(), 1.0)
+        self.assertEqual(np.argmax(authority), node(_url("/b")))
+        self.assertEqual(authority[node(_url("/orphan"))], 0.0)
+
+    def test_page_metrics_and_summary(self):
+        metrics = self.graph.page_metrics(_url("/orphan"), _url("/"))
+        self.assertTrue(metrics["orphan"])
+        self.assertEqual(metrics["click_depth"], -1)
+        self.assertEqual(metrics["outlinks"], 1)
+        self.assertIn("孤立ページ", format_link_context(metrics))
+        self.assertIsNone(self.graph.page_metrics(_url("/missing")))
+        # クロール途中: 被リンクのないページは未確定、被リンクのあるページは孤立でないと確定
+        partial = self.graph.page_metrics(_url("/orphan"), _url("/"), complete=False)
+        self.assertIsNone(partial["orphan"])
+        self.assertIsNone(partial["click_depth"])
+        self.assertNotIn("孤立ページ", format_link_context(partial))
+        self.assertIn("クリック深度: 不明", format_link_context(partial))
+        self.assertIsNone(self.graph.page_metrics(_url("/d"), _url("/"), complete=False)["click_depth"])
+        self.assertFalse(self.graph.page_metrics(_url("/b"), _url("/"), complete=False)["orphan"])
+        summary = self.graph.summary(_url("/"), top=2)
+        self.assertEqual(summary["top_pages"][0]["url"], _url("/b"))
+        self.assertEqual(summary["depth_histogram"], {0: 1, 1: 2, 2: 1, 3: 1})
+        self.assertEqual(summary["unreachable"], 1)
+
+    def test_snapshot_refresh_ratio(self):
+        graph = LinkGraph(refresh_ratio=0.5)
+        for i in range(10):
+            graph.add_page(_url(f"/p{i}"), [_url(f"/p{i + 1}")])
+        self.assertEqual(graph.snapshot_nodes, 11)
+        graph.add_page(_url("/p10"), [_url("/p11")])  # 辺が10%増えただけ: スナップショットを維持
+        self.assertIsNone(graph.page_metrics(_url("/p11")))
+        for i in range(11, 20):
+            graph.add_page(_url(f"/p{i}"), [_url(f"/p{i + 1}")])
+        self.assertIsNotNone(graph.page_metrics(_url("/p11")))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,74 @@
+import time
+import unittest
+
+from core.constants import LOCAL_AIO_CRITERIA
+from core.local_scorer import (
+    calculate_local_aio_scores,
+    local_category_scores,
+    score_page_speed,
+    score_qa_compatibility,
+    score_readability,
+)
+
+
+def _seo_results(**overrides):
+    results = {
+        "basics": {"title": "テスト", "og_title": "テスト", "og_description": "説明"},
+        "structure": {
+            "headings": {"h1": 1, "h2": 3, "h3": 2},
+            "images_count": 4, "images_with_alt": 4,
+            "lists_count": 2, "tables_count": 1, "paragraphs_count": 8,
+            "videos_count": 0, "question_headings": 3,
+        },
+        "technical": {"has_structured_data": True, "canonical_url": "https://example.com/",
+                      "has_viewport": True, "page_size_kb": 120.0},
+        "content": {"text_html_ratio": 18.0},
+        "personalization": {"ogp": {"image": "https://example.com/a.png"},
+                            "structured_data_types": ["FAQPage"]},
+        "scores": {"title_score": 10, "meta_description_score": 8},
+    }
+    results.update(overrides)
+    return results
+
+
+class TestLocalScorer(unittest.TestCase):
+    def test_all_criteria_present(self):
+        scores = calculate_local_aio_scores(_seo_results(), "短い文です。読みやすい文章です。")
+        self.assertEqual(tuple(scores.keys()), LOCAL_AIO_CRITERIA)
+        for item in scores.values():
+            self.assertGreaterEqual(item["score"], 0)
+            self.assertLessEqual(item["score"], 10)
+            self.assertTrue(item["advice"])
+
+    def test_qa_uses_faq_schema(self):
+        self.assertEqual(score_qa_compatibility(_seo_results())["score"], 10)
+        plain = _seo_results(personalization={"structured_data_types": []})
+        plain["structure"]["question_headings"] = 0
+        plain["structure"]["lists_count"] = 0
+        self.assertEqual(score_qa_compatibility(plain)["score"], 0)
+
+    def test_page_speed_by_size(self):
+        heavy = _seo_results(technical={"page_size_kb": 5000})
+        self.assertEqual(score_page_speed(heavy)["score"], 2)
+        self.assertEqual(score_page_speed(_seo_results())["score"], 10)
+
+    def test_readability_long_sentences(self):
+        short = score_readability("今日は晴れです。散歩に行きます。")
+        long = score_readability("あ" * 300 + "。")
+        self.assertGreater(short["score"], long["score"])
+        self.assertEqual(score_readability("")["score"], 0)
+
+    def test_category_scores(self):
+        cats = local_category_scores(calculate_local_aio_scores(_seo_results(), "短い文です。"))
+        self.assertIn("technical_score", cats)
+        self.assertLessEqual(cats["technical_score"], 100)
+
+    def test_sub_second(self):
+        text = "これはテスト用の文章です。" * 2000
+        start = time.perf_counter()
+        calculate_local_aio_scores(_seo_results(), text)
+        self.assertLess(time.perf_counter() - start, 1.0)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -1,7 +1,7 @@
 import unittest
 
 try:
-    from core.text_utils import detect_mojibake
+    from core.text_utils import MOJIBAKE_THRESHOLD, detect_mojibake, detect_mojibake_batch
 except Exception:
     detect_mojibake = None
 
@@ -15,5 +15,40 @@ class TestMojibake(unittest.TestCase):
     def test_detect_garble(self):
         self.assertTrue(detect_mojibake("Ã§Â¨Â³"))
 
+    @unittest.skipUnless(detect_mojibake, "text utilities not available")
+    def test_detect_sjis_misread(self):
+        # UTF-8の「こんにちは」をShift_JISとして読んだ場合
+        garbled = "こんにちは".encode("utf-8").decode("cp932", errors="replace")
+        self.assertTrue(detect_mojibake(garbled))
+        self.assertTrue(detect_mojibake("縺薙ｓ縺ｫ縺｡縺ｯ繧ｵ繧､繝茨ｼ"))
+
+    @unittest.skipUnless(detect_mojibake, "text utilities not available")
+    def test_batch_ratios(self):
+        texts = ["これは正常なテキストです。", "", "Ã§Â¨Â³", "ÐŸÑ€Ð¸Ð²ÐµÑ‚ Ð¼Ð¸Ñ€", "（全角括弧）ＡＢＣ１２３"]
+        ratios = detect_mojibake_batch(texts)
+        self.assertEqual(ratios.shape, (5,))
+        self.assertEqual(ratios[0], 0.0)
+        self.assertEqual(ratios[1], 0.0)
+        self.assertEqual(ratios[2], 1.0)
+        self.assertGreater(ratios[3], MOJIBAKE_THRESHOLD)
+        self.assertEqual(ratios[4], 0.0)
+        self.assertEqual(len(detect_mojibake_batch([])), 0)
+
+    @unittest.skipUnless(detect_mojibake, "text utilities not available")
+    def test_batch_matches_single(self):
+        texts = ["日本語のタイトル", "English title", "abcdéèêëàâ", "Ã§Â¨Â³"] * 50
+        ratios = detect_mojibake_batch(texts)
+        self.assertEqual([bool(r > MOJIBAKE_THRESHOLD) for r in ratios], [detect_mojibake(t) for t in texts])
+
+    @unittest.skipUnless(detect_mojibake, "text utilities not available")
+    def test_long_text_uses_ratio_for_markers(self):
+        body = "日本語の本文です。" * 1000 + " SÃO PAULO"
+        ratios = detect_mojibake_batch(["本文です�", body, "本文です�"], [True, True, False])
+        self.assertAlmostEqual(ratios[0], 0.2)
+        self.assertLess(ratios[1], 0.001)
+        self.assertEqual(ratios[2], 1.0)
+        self.assertFalse(detect_mojibake(body, long_text=True))
+        self.assertTrue(detect_mojibake("Ã§Â¨Â³", long_text=True))
+
 if __name__ == '__main__':
     unittest.main()
@@ -0,0 +1,92 @@
+import os
+import tempfile
+import unittest
+from unittest import mock
+
+try:
+    from core.fetcher import fetch_page
+    from core.industry_detector import IndustryAnalysis
+    from core.page_cache import PageCache, normalize_url, to_jsonable
+    from tests.local_server import LocalServer
+except Exception:
+    fetch_page = None
+
+HTML = '<html><head><meta charset="utf-8"><title>キャッシュ</title></head><body><p>本文</p></body></html>'.encode("utf-8")
+ETAG = '"v1"'
+
+
+def _etag_route(handler):
+    if handler.headers.get("If-None-Match") == ETAG:
+        return 304, {"ETag": ETAG}, b""
+    return 200, {"Content-Type": "text/html; charset=utf-8", "ETag": ETAG}, HTML
+
+
+@unittest.skipUnless(fetch_page, "requests not available")
+class TestPageCache(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.cache = PageCache(self.tmp.name)
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def test_normalize_url(self):
+        self.assertEqual(
+            normalize_url("HTTPS://Example.com:443/a?b=2&a=1#top"),
+            "https://example.com/a?a=1&b=2",
+        )
+        self.assertEqual(normalize_url("http://example.com"), "http://example.com/")
+
+    def test_revalidation_uses_cached_body(self):
+        routes = {"/page": _etag_route, "/no-validator": (200, {"Content-Type": "text/html"}, HTML)}
+        with LocalServer(routes) as server:
+            first = fetch_page(server.url("/page"), measure_connection=False, cache=self.cache)
+            second = fetch_page(server.url("/page"), measure_connection=False, cache=self.cache)
+            fetch_page(server.url("/no-validator"), measure_connection=False, cache=self.cache)
+        self.assertFalse(first.not_modified)
+        self.assertTrue(second.not_modified)
+        self.assertEqual(second.status_code, 304)
+        self.assertEqual(second.text, first.text)
+        self.assertEqual(second.content_hash, first.content_hash)
+        self.assertEqual(second.compressed_bytes, first.compressed_bytes)
+        self.assertEqual(server.requests[1][2].get("If-None-Match"), ETAG)
+        self.assertIsNone(self.cache.get(server.url("/no-validator")))
+
+    def test_analysis_keyed_by_content_hash(self):
+        analysis = IndustryAnalysis("飲食", [], 80.0, ["メニュー"], [], [], [])
+        self.cache.store_analysis("https://example.com/", "h1", "standard", {"industry_analysis": analysis})
+        stored = self.cache.get_analysis("https://example.com", "h1", "standard")
+        self.assertEqual(stored["industry_analysis"]["primary_industry"], "飲食")
+        self.assertIsNone(self.cache.get_analysis("https://example.com/", "h2", "standard"))
+        self.assertIsNone(self.cache.get_analysis("https://example.com/", "h1", "deep"))
+        self.assertEqual(to_jsonable({"t": (1, 2)}), {"t": [1, 2]})
+
+    def test_size_based_eviction(self):
+        cache = PageCache(os.path.join(self.tmp.name, "small"), max_bytes=6000)
+        for i in range(5):
+            body = os.urandom(2000)
+            cache.store(f"https://example.com/{i}", body, {"ETag": f'"{i}"'})
+            os.utime(cache._path(f"https://example.com/{i}", ".html.gz"), (i, i))
+        self.assertLessEqual(cache.total_bytes(), 6000)
+        self.assertIsNotNone(cache.get("https://example.com/4"))
+        self.assertIsNone(cache.get("https://example.com/0"))
+
+    def test_eviction_index_in_memory(self):
+        directory = os.path.join(self.tmp.name, "lru")
+        cache = PageCache(directory, max_bytes=7000)
+        for i in range(3):
+            cache.store(f"https://example.com/{i}", os.urandom(2000), {"ETag": f'"{i}"'})
+        cache.load_body("https://example.com/0")  # 0 を最近使ったページにする
+        # 書き込みのたびにディレクトリを走査しない
+        with mock.patch("core.page_cache.os.scandir", side_effect=AssertionError("scanned")):
+            cache.store("https://example.com/3", os.urandom(2000), {"ETag": '"3"'})
+            cache.store_analysis("https://example.com/3", "h", "quick", {"score": 1})
+        self.assertIsNotNone(cache.get("https://example.com/0"))
+        self.assertIsNone(cache.get("https://example.com/1"))
+        on_disk = sum(e.stat().st_size for e in os.scandir(directory))
+        self.assertEqual(cache.total_bytes(), on_disk)
+        self.assertEqual(PageCache(directory, max_bytes=7000).total_bytes(), on_disk)
+
+
+if __name__ == '__main__':
+    unittest.main()
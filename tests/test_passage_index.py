@@ -0,0 +1,78 @@
+import unittest
+
+from core.industry_detector import IndustryDetector
+from core.local_scorer import score_qa_compatibility
+from core.passage_index import (
+    PassageIndex,
+    build_content_preview,
+    build_question_set,
+    question_coverage,
+    split_passages,
+)
+
+PAGE = (
+    "渋谷駅徒歩5分の不動産会社です。賃貸マンションや売買物件を多数取り扱っています。"
+    "仲介手数料は家賃の0.5か月分です。初期費用のご相談も承ります。"
+    "所在地は東京都渋谷区道玄坂1-2-3、アクセスは渋谷駅から徒歩5分です。"
+    "営業時間は10時から19時、定休日は水曜日です。"
+    "お問い合わせはフォームまたはお電話で受け付けています。"
+)
+
+
+class TestPassageIndex(unittest.TestCase):
+    def test_split_passages(self):
+        passages = split_passages(PAGE, max_chars=60)
+        self.assertGreater(len(passages), 2)
+        self.assertTrue(all(len(p) <= 60 for p in passages))
+        self.assertTrue(passages[0].startswith("渋谷駅"))
+        # 句点のない長文も上限で区切る
+        self.assertEqual([len(p) for p in split_passages("あ" * 250, max_chars=100)], [100, 100, 50])
+
+    def test_bm25_search(self):
+        index = PassageIndex(split_passages(PAGE, max_chars=60))
+        pid, score = index.search("定休日", top=1)[0]
+        self.assertIn("定休日", index.passages[pid])
+        self.assertGreater(score, 0)
+        self.assertEqual(index.search("ラーメン"), [])
+
+    def test_question_set(self):
+        questions = build_question_set("real_estate", "不動産", IndustryDetector())
+        texts = [q.text for q in questions]
+        self.assertIn("料金・費用はいくらですか？", texts)
+        self.assertTrue(any(q.source == "industry_contents" for q in questions))
+        self.assertTrue(any(q.source.startswith("taxonomy") for q in questions))
+        self.assertEqual(len(texts), len(set(texts)))
+        self.assertLessEqual(len(build_question_set("real_estate", "不動産", IndustryDetector(), max_questions=8)), 8)
+
+    def test_coverage(self):
+        questions = build_question_set("real_estate", "不動産", IndustryDetector())
+        report = question_coverage(PAGE, questions)
+        by_question = {q["question"]: q for q in report["questions"]}
+        hours = by_question["営業時間・対応時間は？"]
+        self.assertEqual(hours["strength"], "strong")
+        self.assertIn("定休日", hours["passage"])
+        self.assertEqual(by_question["実績・事例はありますか？"]["strength"], "none")
+        self.assertIn("実績・事例はありますか？", report["unanswered"])
+        self.assertAlmostEqual(report["answered_ratio"], report["answered"] / len(questions))
+
+    def test_qa_score_uses_coverage(self):
+        seo = {"structure": {"question_headings": 0}}
+        answered = {"questions": [{}] * 4, "answered": 4, "answered_ratio": 1.0, "unanswered": []}
+        item = score_qa_compatibility(seo, answered)
+        self.assertEqual(item["score"], 3.0)
+        self.assertIn("想定質問への回答:4/4", item["evidence"])
+        self.assertEqual(score_qa_compatibility(seo)["score"], 0.0)
+
+    def test_content_preview(self):
+        filler = "当社の歴史と理念についてご紹介します。" * 400
+        text = filler + PAGE
+        report = question_coverage(text, build_question_set("real_estate"))
+        preview = build_content_preview(text, report, limit=2000)
+        self.assertLessEqual(len(preview), 2000)
+        self.assertTrue(preview.startswith("当社の歴史"))
+        self.assertIn("定休日", preview)
+        self.assertEqual(build_content_preview(PAGE, report), PAGE)
+
+
+if __name__ == "__main__":
+    unittest.main()
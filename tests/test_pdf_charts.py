@@ -0,0 +1,139 @@
+import io
+import os
+import tempfile
+import unittest
+
+try:
+    from reportlab.graphics.shapes import Drawing, Polygon, Rect, String
+
+    from core.constants import AIO_SCORE_MAP_JP
+    from core.pdf_charts import bar_chart_drawing, radar_chart_drawing
+except Exception:
+    bar_chart_drawing = None
+
+
+def _analyzer():
+    from seo_aio_streamlit import SEOAIOAnalyzer
+
+    analyzer = object.__new__(SEOAIOAnalyzer)
+    analyzer.seo_results = {
+        "scores": {"title_score": 8, "meta_score": 6.5, "headings_score": 7, "content_score": 5},
+        "basics": {"title": "タイトル", "meta_description": "説明", "title_length": 4, "meta_description_length": 2},
+        "garbled": {},
+    }
+    analyzer.aio_results = {
+        "scores": {k: {"score": (i % 10) + 0.5, "advice": "アドバイス"} for i, k in enumerate(AIO_SCORE_MAP_JP)},
+        "category_scores": {"eeat_score": 60, "ai_search_score": 70, "user_experience_score": 55, "technical_score": 80},
+        "total_score": 66, "industry_analysis": {}, "immediate_actions": [], "medium_term_strategies": [],
+        "competitive_advantages": [], "market_trend_strategies": [],
+    }
+    analyzer.last_analysis_results = {
+        "url": "https://example.com", "final_industry": {"primary": "IT", "source": "自動判定"},
+        "industry_analysis": {}, "industry_fit_score": 50,
+        "integrated_results": {"integrated_score": 70, "seo_score": 70, "aio_score": 66, "improvements": ["改善1"]},
+        "seo_results": analyzer.seo_results, "aio_results": analyzer.aio_results,
+    }
+    return analyzer
+
+
+@unittest.skipUnless(bar_chart_drawing, "reportlab not available")
+class TestPdfCharts(unittest.TestCase):
+    def test_bar_chart_clips_values(self):
+        drawing = bar_chart_drawing(["A", "B", "C"], [5, 12, "n/a"], title="T", width=300)
+        self.assertIsInstance(drawing, Drawing)
+        bars = [s for s in drawing.contents if isinstance(s, Rect)]
+        self.assertEqual(len(bars), 3)
+        self.assertAlmostEqual(bars[1].width, 2 * bars[0].width)
+        self.assertEqual(bars[2].width, 0)
+        texts = {s.text for s in drawing.contents if isinstance(s, String)}
+        self.assertTrue({"A", "T", "5.0", "10.0", "0.0"} <= texts)
+        self.assertLessEqual(max(b.x + b.width for b in bars), 300)
+
+    def test_radar_chart_polygon(self):
+        drawing = radar_chart_drawing(["a", "b", "c", "d"], [100, 0, 50, 100], size=200)
+        data = [s for s in drawing.contents if isinstance(s, Polygon) and s.fillColor is not None][-1]
+        xs, ys = data.points[0::2], data.points[1::2]
+        self.assertEqual(len(xs), 4)
+        self.assertAlmostEqual(xs[0], 100)  # 最初の軸は真上
+        self.assertGreater(ys[0], 100)
+        self.assertAlmostEqual((xs[1], ys[1]), (100, 100))
+        self.assertEqual(len(radar_chart_drawing(["a", "b"], [1, 2]).contents), 0)
+
+
+@unittest.skipUnless(bar_chart_drawing, "reportlab not available")
+class TestPdfReportCharts(unittest.TestCase):
+    def setUp(self):
+        try:
+            self.analyzer = _analyzer()
+        except Exception as e:  # pragma: no cover - app dependencies missing
+            self.skipTest(f"app not importable: {e}")
+        self.tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmp.cleanup)
+
+    def _build(self):
+        return self.analyzer.generate_pdf_report_bytes()
+
+    def test_report_has_vector_charts_only(self):
+        pdf = self._build()
+        self.assertTrue(pdf.startswith(b"%PDF"))
+        self.assertNotIn(b"/Subtype /Image", pdf)
+        self.assertLess(len(pdf), 100 * 1024)
+
+    def test_stream_and_file_wrappers(self):
+        chunks = list(self.analyzer.iter_pdf_report(chunk_size=1024))
+        self.assertTrue(all(len(c) == 1024 for c in chunks[:-1]))
+        pdf = b"".join(chunks)
+        self.assertTrue(pdf.startswith(b"%PDF") and pdf.rstrip().endswith(b"%%EOF"))
+        path = os.path.join(self.tmp.name, "report.pdf")
+        self.assertEqual(self.analyzer.generate_enhanced_pdf_report(path), path)
+        with open(path, "rb") as f:
+            self.assertEqual(len(f.read()), len(pdf))
+
+    def test_logo_buffer(self):
+        png = io.BytesIO()
+        from core.pdf_report import _pyplot
+
+        plt = _pyplot()
+        fig = plt.figure(figsize=(1, 0.4))
+        fig.savefig(png, format="png")
+        plt.close(fig)
+        png.seek(0)
+        pdf = self.analyzer.generate_pdf_report_bytes(logo_path=png)
+        self.assertIn(b"/Subtype /Image", pdf)
+
+    def test_matplotlib_fallback_embeds_png(self):
+        def broken(data, width):
+            raise RuntimeError("boom")
+
+        builder = self.analyzer.pdf_report_builder()
+        builder._radar_chart_drawing = broken
+        created = []
+        original = builder._create_aio_radar_graph
+
+        def fallback():
+            buffer = original()
+            created.append(buffer)
+            return buffer
+
+        builder._create_aio_radar_graph = fallback
+        pdf = builder.to_bytes()
+        self.assertIn(b"/Subtype /Image", pdf)
+        self.assertEqual(len(created), 1)
+        self.assertIsInstance(created[0], io.BytesIO)
+
+    def test_requires_results(self):
+        self.analyzer.last_analysis_results = None
+        with self.assertRaises(ValueError):
+            self.analyzer.generate_pdf_report_bytes()
+
+    def test_builder_from_results_only(self):
+        from core.pdf_report import build_pdf_report
+
+        results = self.analyzer.last_analysis_results
+        pdf = build_pdf_report(results)
+        self.assertTrue(pdf.startswith(b"%PDF"))
+        self.assertEqual(len(pdf), len(self._build()))
+
+
+if __name__ == "__main__":
+    unittest.main()
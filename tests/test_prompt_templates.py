@@ -0,0 +1,85 @@
+import unittest
+from types import SimpleNamespace
+
+from core.industry_detector import IndustryAnalysis
+from core.prompt_templates import (
+    AIO_STATIC_INSTRUCTIONS,
+    accumulate_usage,
+    build_aio_prompt,
+    build_industry_info,
+    extract_usage_stats,
+)
+
+
+class TestPromptTemplates(unittest.TestCase):
+    def setUp(self):
+        self.analysis = IndustryAnalysis(
+            primary_industry="不動産",
+            secondary_industries=[],
+            confidence_score=80.0,
+            industry_keywords=["物件"],
+            specialized_terms=["登記"],
+            regulatory_indicators=[],
+            target_audience_clues=["個人向け"],
+        )
+        self.final_industry = {
+            "primary": "不動産",
+            "source": "自動判定",
+            "confidence": 80.0,
+            "secondary_detected": [],
+        }
+
+    def test_static_prefix_shared_between_pages(self):
+        info = build_industry_info(self.final_industry, self.analysis)
+        first = build_aio_prompt("https://a.example.com", "A", info, "本文A")
+        second = build_aio_prompt("https://b.example.com", "B", info, "本文B")
+        self.assertTrue(first.startswith(AIO_STATIC_INSTRUCTIONS))
+        self.assertTrue(second.startswith(AIO_STATIC_INSTRUCTIONS))
+        self.assertNotIn("https://", AIO_STATIC_INSTRUCTIONS)
+        self.assertNotIn("不動産", AIO_STATIC_INSTRUCTIONS)
+
+    def test_page_data_is_last(self):
+        info = build_industry_info(self.final_industry, self.analysis)
+        prompt = build_aio_prompt("https://a.example.com", "A", info, "本文A")
+        self.assertGreater(prompt.index("https://a.example.com"), prompt.index('"metadata"'))
+        self.assertTrue(prompt.rstrip().endswith("本文A"))
+        self.assertIn("主要業界: 不動産", prompt)
+
+    def test_context_section_precedes_content(self):
+        info = build_industry_info(self.final_industry, self.analysis)
+        prompt = build_aio_prompt(
+            "https://a.example.com", "A", info, "本文A",
+            context={"サイト内リンク構造": "被リンク数（内部）: 3", "空": ""},
+        )
+        self.assertIn("**サイト内リンク構造:**\n被リンク数（内部）: 3", prompt)
+        self.assertNotIn("**空:**", prompt)
+        self.assertLess(prompt.index("サイト内リンク構造"), prompt.index("**コンテンツ:**"))
+        self.assertTrue(prompt.rstrip().endswith("本文A"))
+
+    def test_extract_usage_stats_from_object(self):
+        usage = SimpleNamespace(
+            prompt_tokens=2000,
+            completion_tokens=500,
+            prompt_tokens_details=SimpleNamespace(cached_tokens=1536),
+        )
+        stats = extract_usage_stats(usage)
+        self.assertEqual(stats["cached_tokens"], 1536)
+        self.assertAlmostEqual(stats["cached_ratio"], 0.768)
+
+    def test_extract_usage_stats_missing(self):
+        stats = extract_usage_stats(None)
+        self.assertEqual(stats["prompt_tokens"], 0)
+        self.assertEqual(stats["cached_ratio"], 0.0)
+
+    def test_accumulate_usage(self):
+        totals = {}
+        accumulate_usage(totals, extract_usage_stats({"prompt_tokens": 1000}))
+        accumulate_usage(totals, extract_usage_stats(
+            {"prompt_tokens": 1000, "prompt_tokens_details": {"cached_tokens": 1000}}
+        ))
+        self.assertEqual(totals["requests"], 2)
+        self.assertAlmostEqual(totals["cached_ratio"], 0.5)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,59 @@
+import time
+import unittest
+
+try:
+    from core.readability import analyze_readability, readability_evidence, readability_scores
+except Exception:  # pragma: no cover - numpy missing
+    analyze_readability = None
+
+EASY = "今日は晴れです。公園まで散歩に行きました。桜がとてもきれいでした。"
+HARD = "当該不動産物件固定資産税評価額証明書取得手続関連費用負担区分明確化要請事項" * 4 + "。"
+STRUCTURE = {"paragraphs_count": 3, "headings": {"h1": 1, "h2": 2}, "lists_count": 1}
+
+
+@unittest.skipUnless(analyze_readability, "numpy not available")
+class TestReadability(unittest.TestCase):
+    def test_sentence_statistics(self):
+        details = analyze_readability(EASY)
+        self.assertEqual(details["sentences"], 3)
+        self.assertEqual(details["sentence_max"], 12)
+        self.assertEqual(details["sentence_histogram"], [3, 0, 0, 0])
+        self.assertEqual(details["long_sentence_ratio"], 0.0)
+        self.assertFalse(details["structure_known"])
+
+    def test_element_boundaries_split_sentences(self):
+        # get_text(separator=' ') が挟む日本語間の空白は文の区切りとみなす
+        details = analyze_readability("会社概要 当社は東京の会社です。 Visit our site. Thanks")
+        self.assertEqual(details["sentences"], 4)
+
+    def test_character_balance(self):
+        details = analyze_readability(HARD)
+        self.assertGreater(details["kanji_ratio"], 0.9)
+        self.assertLess(analyze_readability(HARD)["score"], analyze_readability(EASY)["score"])
+        self.assertIn("漢字:", readability_evidence(details))
+
+    def test_structure_features(self):
+        details = analyze_readability(EASY * 3, STRUCTURE)
+        self.assertTrue(details["structure_known"])
+        self.assertAlmostEqual(details["chars_per_paragraph"], details["chars"] / 3)
+        self.assertIn("段落あたり", readability_evidence(details))
+
+    def test_batch_matches_single(self):
+        texts = [EASY, HARD, "", "Short English text. Another one!"]
+        structures = [STRUCTURE, None, None, None]
+        batch = readability_scores(texts, structures)
+        single = [analyze_readability(t, s)["score"] for t, s in zip(texts, structures)]
+        self.assertEqual([round(float(b), 1) for b in batch], single)
+        self.assertEqual(single[2], 0.0)
+        self.assertEqual(len(readability_scores([])), 0)
+
+    def test_batch_throughput(self):
+        texts = [EASY * 40] * 2000  # 約1300字 × 2000ページ
+        readability_scores(texts[:10])
+        start = time.perf_counter()
+        readability_scores(texts)
+        self.assertLess(time.perf_counter() - start, 2.0)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,108 @@
+import threading
+import unittest
+
+from core.report_jobs import ReportJobManager, analysis_key
+
+
+class _Build:
+    def __init__(self, gate=None, fail=False):
+        self.calls = []
+        self.gate = gate
+        self.fail = fail
+
+    def __call__(self, results):
+        self.calls.append(results["analysis_id"])
+        if self.gate is not None:
+            self.gate.wait(5)
+        if self.fail:
+            raise RuntimeError("build failed")
+        return f"PDF:{results['analysis_id']}:{results.get('score')}".encode()
+
+
+class TestReportJobs(unittest.TestCase):
+    def _manager(self, build, **kwargs):
+        manager = ReportJobManager(build, **kwargs)
+        self.addCleanup(manager.shutdown)
+        return manager
+
+    def test_build_and_cache_by_analysis(self):
+        build = _Build()
+        manager = self._manager(build)
+        job = manager.submit({"analysis_id": "a1", "score": 1})
+        done = manager.wait(job.job_id, timeout=5)
+        self.assertEqual(done.status, "done")
+        self.assertEqual(done.data, b"PDF:a1:1")
+        self.assertIs(manager.submit({"analysis_id": "a1", "score": 1}), job)
+        self.assertIs(manager.job_for({"analysis_id": "a1"}), job)
+        self.assertEqual(build.calls, ["a1"])
+
+    def test_pending_job_is_shared_and_results_are_snapshotted(self):
+        gate = threading.Event()
+        build = _Build(gate)
+        manager = self._manager(build)
+        results = {"analysis_id": "a1", "score": 1}
+        job = manager.submit(results)
+        results["score"] = 2  # 投入後の変更はビルドに影響しない
+        self.assertTrue(manager.get(job.job_id).pending)
+        self.assertIs(manager.submit(results), job)
+        gate.set()
+        self.assertEqual(manager.wait(job.job_id, timeout=5).data, b"PDF:a1:1")
+        self.assertEqual(build.calls, ["a1"])
+
+    def test_failed_job_is_retried(self):
+        build = _Build(fail=True)
+        manager = self._manager(build)
+        job = manager.wait(manager.submit({"analysis_id": "a1"}).job_id, timeout=5)
+        self.assertEqual(job.status, "error")
+        self.assertIn("build failed", job.error)
+        build.fail = False
+        retry = manager.submit({"analysis_id": "a1"})
+        self.assertNotEqual(retry.job_id, job.job_id)
+        self.assertEqual(manager.wait(retry.job_id, timeout=5).status, "done")
+        self.assertIsNone(manager.get(job.job_id))  # 置き換えた失敗ジョブは残らない
+
+    def test_repeated_failures_do_not_leak_jobs(self):
+        manager = self._manager(_Build(fail=True), cache_size=2)
+        for _ in range(5):
+            manager.wait(manager.submit({"analysis_id": "a1"}).job_id, timeout=5)
+        self.assertEqual(len(manager._jobs), 1)
+        self.assertEqual(len(manager._by_analysis), 1)
+
+    def test_lru_eviction_keeps_pending_jobs(self):
+        gate = threading.Event()
+        manager = self._manager(_Build(gate), max_workers=1, cache_size=2)
+        first = manager.submit({"analysis_id": "a1"})
+        second = manager.submit({"analysis_id": "a2"})
+        third = manager.submit({"analysis_id": "a3"})
+        self.assertIsNotNone(manager.get(first.job_id))  # 生成中・待機中は追い出さない
+        gate.set()
+        for job in (first, second, third):
+            manager.wait(job.job_id, timeout=5)
+        manager.submit({"analysis_id": "a2"})  # a2 を最近使ったものにする
+        fourth = manager.submit({"analysis_id": "a4"})
+        manager.wait(fourth.job_id, timeout=5)
+        self.assertIsNone(manager.get(first.job_id))
+        self.assertIsNone(manager.job_for({"analysis_id": "a3"}))
+        self.assertIsNotNone(manager.job_for({"analysis_id": "a2"}))
+
+    def test_analysis_key_without_id(self):
+        a = {"url": "https://example.com", "score": 1}
+        self.assertEqual(analysis_key(a), analysis_key(dict(a)))
+        self.assertNotEqual(analysis_key(a), analysis_key(dict(a, score=2)))
+        self.assertEqual(analysis_key({"analysis_id": "x"}), "x")
+
+    def test_builds_pdf_from_results(self):
+        try:
+            from core.pdf_report import build_pdf_report
+            from tests.test_pdf_charts import _analyzer
+        except Exception as e:  # pragma: no cover - app dependencies missing
+            self.skipTest(f"app not importable: {e}")
+        results = dict(_analyzer().last_analysis_results, analysis_id="a1")
+        manager = self._manager(build_pdf_report)
+        job = manager.wait(manager.submit(results).job_id, timeout=30)
+        self.assertEqual(job.status, "done", job.error)
+        self.assertTrue(job.data.startswith(b"%PDF"))
+
+
+if __name__ == "__main__":
+    unittest.main()
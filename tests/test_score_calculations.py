@@ -32,6 +32,19 @@ class TestScoreCalculations(unittest.TestCase):
     def test_links_score_high(self):
         self.assertEqual(self.links_score(5, 3), 10)
 
+    def test_links_score_uses_link_graph(self):
+        orphan = {"orphan": True, "click_depth": 6, "pagerank_percentile": 10.0}
+        self.assertEqual(self.links_score(5, 3, orphan), 4)
+        hub = {"orphan": False, "click_depth": 1, "pagerank_percentile": 95.0}
+        self.assertEqual(self.links_score(3, 1, hub), 9)
+        # クロール途中で孤立か・クリック深度が未確定のページは減点しない
+        undetermined = {"orphan": None, "click_depth": None, "pagerank_percentile": 10.0}
+        self.assertEqual(self.links_score(5, 3, undetermined), 10)
+
+    def test_links_score_broken_link_penalty(self):
+        report = {"checked": 10, "broken_count": 1, "broken_ratio": 0.1, "long_redirect_chains": 0}
+        self.assertEqual(self.links_score(5, 3, None, report), 8)
+
     def test_images_score_mixed(self):
         self.assertEqual(self.images_score(1, 4), 2)
 
@@ -0,0 +1,96 @@
+import random
+import unittest
+
+try:
+    from core.site_content import SiteContentIndex, format_content_context
+except Exception:  # pragma: no cover - numpy missing
+    SiteContentIndex = None
+
+WORDS = "不動産 物件 賃貸 売買 査定 住宅 ローン 金利 駅 徒歩 間取り 築年数 リフォーム 相談 見学 予約 エリア 価格".split()
+
+
+def _text(seed, length=600):
+    rng = random.Random(seed)
+    return "".join(rng.choice(WORDS) for _ in range(length))
+
+
+@unittest.skipUnless(SiteContentIndex, "numpy not available")
+class TestSiteContentIndex(unittest.TestCase):
+    def setUp(self):
+        self.index = SiteContentIndex()
+        self.body = _text(0)
+
+    def test_duplicates_are_found_incrementally(self):
+        first = self.index.add_page("https://example.com/a", self.body, canonical_url="/a")
+        self.assertEqual(first["duplicates"], [])
+        second = self.index.add_page("https://example.com/b", self.body[:-20] + "お問い合わせはこちら")
+        self.assertEqual(second["duplicates"][0]["url"], "https://example.com/a")
+        self.assertGreaterEqual(second["duplicates"][0]["similarity"], 0.85)
+        other = self.index.add_page("https://example.com/c", _text(1))
+        self.assertEqual(other["duplicates"], [])
+        self.assertEqual(self.index.clusters(), [["https://example.com/a", "https://example.com/b"]])
+
+    def test_clusters_are_transitive(self):
+        self.index.add_page("https://example.com/1", self.body)
+        self.index.add_page("https://example.com/2", self.body + "追記")
+        self.index.add_page("https://example.com/3", self.body + "追記" + "さらに追記")
+        self.index.add_page("https://example.com/x", _text(2))
+        self.assertEqual(len(self.index.clusters()), 1)
+        self.assertEqual(len(self.index.clusters()[0]), 3)
+
+    def test_thin_pages(self):
+        self.index.add_page("https://example.com/short", "お問い合わせ", word_count=1)
+        self.index.add_page("https://example.com/long", self.body, word_count=1)
+        self.index.add_page("https://example.com/english", self.body, word_count=400)
+        summary = self.index.summary()
+        self.assertEqual(summary["thin_pages"], ["https://example.com/short"])
+        self.assertIn("本文量が少ない", format_content_context(self.index.page_report("https://example.com/short")))
+
+    def test_canonical_mismatches(self):
+        self.index.add_page("https://example.com/a", self.body, canonical_url="https://example.com/a")
+        ok = self.index.add_page("https://example.com/a?ref=1", self.body, canonical_url="/a")
+        self.assertEqual(ok["canonical_status"], "other")
+        self.assertEqual(ok["canonical_issue"], "")
+        missing = self.index.add_page("https://example.com/copy", self.body)
+        self.assertEqual(missing["canonical_issue"], "duplicate_without_canonical")
+        wrong = self.index.add_page("https://example.com/other", _text(3), canonical_url="/a")
+        self.assertEqual(wrong["canonical_issue"], "canonical_to_different_content")
+        issues = {m["url"]: m["issue"] for m in self.index.summary()["canonical_mismatches"]}
+        self.assertEqual(issues, {
+            "https://example.com/copy": "duplicate_without_canonical",
+            "https://example.com/other": "canonical_to_different_content",
+        })
+
+    def test_readding_replaces_page(self):
+        self.index.add_page("https://example.com/a", self.body)
+        self.index.add_page("https://example.com/b", self.body)
+        self.index.add_page("https://example.com/b", _text(4))
+        self.assertEqual(len(self.index), 2)
+        self.assertEqual(self.index.clusters(), [])
+
+    def test_large_identical_cluster(self):
+        # テンプレートだけの同一ページが大量にある場合（辺の数はページ数の2乗）
+        signature = self.index.signature(self.body)
+        urls = [f"https://example.com/tag/{i}" for i in range(800)]
+        for url in urls:
+            report = self.index.add_page(url, signature=signature, digest="template")
+        self.assertEqual(len(report["duplicates"]), 799)
+        self.assertEqual(self.index.clusters(), [sorted(urls)])
+        summary = self.index.summary()
+        self.assertEqual(summary["duplicate_pages"], 800)
+        self.assertEqual(len(summary["canonical_mismatches"]), 800)
+        # 1ページを別内容で置き換えるとクラスタから外れる
+        self.index.add_page(urls[0], _text(5))
+        self.assertEqual(self.index.clusters(), [sorted(urls[1:])])
+        self.assertEqual(len(self.index.page_report(urls[1])["duplicates"]), 798)
+
+    def test_precomputed_signature(self):
+        signature = self.index.signature(self.body)
+        self.index.add_page("https://example.com/a", self.body)
+        report = self.index.add_page("https://example.com/b", signature=signature, digest="other")
+        self.assertEqual(report["duplicates"][0]["similarity"], 1.0)
+        self.assertFalse(report["thin"])
+
+
+if __name__ == "__main__":
+    unittest.main()
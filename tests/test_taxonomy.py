@@ -0,0 +1,119 @@
+import json
+import os
+import random
+import tempfile
+import unittest
+
+from core.industry_detector import INDUSTRY_CONTENTS, IndustryDetector, detect_industry
+from core.taxonomy import (
+    DEFAULT_TAXONOMY_PATH,
+    KeywordMatcher,
+    Taxonomy,
+    TaxonomyError,
+    TaxonomyStore,
+    get_taxonomy,
+)
+
+
+def _load_default():
+    with open(DEFAULT_TAXONOMY_PATH, encoding="utf-8") as f:
+        return json.load(f)
+
+
+class TestKeywordMatcher(unittest.TestCase):
+    def test_counts_match_str_count(self):
+        keywords = ["dx", "医療dx", "dxコンサル", "投資", "不動産投資", "不動産", "ab", "ba", "aba"]
+        matcher = KeywordMatcher(keywords)
+        random.seed(7)
+        pieces = keywords + ["の", "a", "b", "x", "産"]
+        for _ in range(500):
+            text = "".join(random.choice(pieces) for _ in range(random.randint(0, 20)))
+            counts = matcher.count(text)
+            for keyword in ("dx", "医療dx", "dxコンサル", "投資", "不動産投資", "不動産", "ab", "ba"):
+                self.assertEqual(counts[keyword], text.count(keyword), (text, keyword))
+
+    def test_case_insensitive_keywords(self):
+        matcher = KeywordMatcher(["SaaS", "AWS"])
+        self.assertEqual(matcher.count("saasとawsとsaas")["saas"], 2)
+        self.assertEqual(KeywordMatcher([]).count("text"), {})
+
+
+class TestTaxonomy(unittest.TestCase):
+    def test_default_taxonomy(self):
+        taxonomy = get_taxonomy()
+        self.assertIs(taxonomy, get_taxonomy())
+        self.assertIn("不動産", taxonomy.industries)
+        self.assertEqual(taxonomy.industry_for_contents("restaurant"), "飲食・食品")
+        self.assertTrue(taxonomy.version.startswith(_load_default()["version"] + "+"))
+        with self.assertRaises(TypeError):
+            taxonomy.industries["新業界"] = {}
+        self.assertEqual(set(INDUSTRY_CONTENTS), set(taxonomy.contents))
+
+    def test_invalid_taxonomy(self):
+        with self.assertRaises(TaxonomyError):
+            Taxonomy({"industries": {"x": {"primary": "not a list"}}})
+        with self.assertRaises(TaxonomyError):
+            Taxonomy([])
+
+    def test_detector_with_added_industry(self):
+        data = _load_default()
+        data["industries"]["美容"] = {"primary": ["美容室", "ヘアカット"], "secondary": ["カラー"], "specialized": []}
+        detector = IndustryDetector(Taxonomy(data))
+        result = detector.analyze_industries("表参道の美容室", "ヘアカットとカラーのメニュー。B2Bの法人向けではありません。")
+        self.assertEqual(result.primary_industry, "美容")
+        self.assertEqual(result.industry_keywords, ["美容室", "ヘアカット", "カラー"])
+        self.assertIn("法人向け", result.target_audience_clues)
+
+    def test_detector_defaults_unchanged(self):
+        self.assertEqual(detect_industry("予約やテイクアウトに対応した当店のメニュー"), "restaurant")
+        result = IndustryDetector().analyze_industries("", "薬機法と個人情報保護法に対応した診療と治療")
+        self.assertEqual(result.primary_industry, "医療・ヘルスケア")
+        self.assertEqual(result.regulatory_indicators, ["薬機法", "個人情報保護法"])
+
+
+class TestTaxonomyStore(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.tmp.name, "taxonomy.json")
+        self.data = _load_default()
+        self.writes = 0
+        self._write(self.data)
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def _write(self, data, raw=None):
+        with open(self.path, "w", encoding="utf-8") as f:
+            f.write(raw if raw is not None else json.dumps(data, ensure_ascii=False))
+        # mtime の分解能に依存しないよう書き込みごとに時刻を進める
+        self.writes += 1
+        os.utime(self.path, (1_700_000_000 + self.writes, 1_700_000_000 + self.writes))
+
+    def test_hot_reload(self):
+        store = TaxonomyStore(self.path)
+        first = store.get()
+        self.assertIs(store.get(), first)
+        self.data["industries"]["美容"] = {"primary": ["美容室"], "secondary": [], "specialized": []}
+        self._write(self.data)
+        second = store.get()
+        self.assertIsNot(second, first)
+        self.assertIn("美容", second.industries)
+        self.assertNotEqual(second.version, first.version)
+
+    def test_broken_reload_keeps_previous(self):
+        store = TaxonomyStore(self.path)
+        first = store.get()
+        self._write(None, raw="{broken")
+        self.assertIs(store.get(), first)
+        self.assertIn("cannot load taxonomy", store.last_error)
+        self._write(self.data)
+        store.get()
+        self.assertIsNone(store.last_error)
+
+    def test_missing_file(self):
+        with self.assertRaises(TaxonomyError):
+            TaxonomyStore(os.path.join(self.tmp.name, "missing.json")).get()
+
+
+if __name__ == "__main__":
+    unittest.main()
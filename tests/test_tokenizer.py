@@ -0,0 +1,61 @@
+import os
+import time
+import unittest
+
+from core.tokenizer import analyze_text, top_terms
+
+BENCHMARK_ENV = "AIO_RUN_BENCHMARKS"
+
+SAMPLE = (
+    "不動産の売却査定は無料です。東京都渋谷区のマンション・アパート情報をお探しなら"
+    "SEO対策済みのWebサイトで。価格は3,500万円から。固定資産税評価額証明書の取得方法も解説します。"
+)
+
+
+class TestTokenizer(unittest.TestCase):
+    def test_japanese_word_count(self):
+        stats = analyze_text("不動産の査定は無料です。", use_dictionary=False)
+        # 不動産 / の / 査定 / は / 無料 / です
+        self.assertEqual(stats.word_count, 6)
+        self.assertEqual(stats.char_count, 12)
+        self.assertGreater(stats.japanese_ratio, 0.9)
+        self.assertGreater(analyze_text(SAMPLE, use_dictionary=False).word_count, len(SAMPLE.split()) * 10)
+
+    def test_terms(self):
+        stats = analyze_text(SAMPLE + " SEO the guide", use_dictionary=False)
+        terms = stats.term_frequencies
+        self.assertEqual(terms["seo"], 2)
+        self.assertIn("不動産", terms)
+        self.assertIn("マンション", terms)
+        self.assertNotIn("the", terms)
+        self.assertNotIn("の", terms)
+        # 長い漢字列は2文字単位でも数える
+        self.assertIn("渋谷", terms)
+        self.assertIn("証明", terms)
+        self.assertNotIn("方法", terms)
+
+    def test_mixed_tokens(self):
+        stats = analyze_text("3ヶ月で A3サイズ 100", use_dictionary=False)
+        # 3 / ヶ / 月 / で / A3 / サイズ / 100
+        self.assertEqual(stats.word_count, 7)
+        self.assertEqual(stats.char_count, 12)
+        self.assertEqual(analyze_text("").word_count, 0)
+        self.assertEqual(top_terms("SEO seo Seo", 1), [("seo", 3)])
+
+    def test_english_keywords(self):
+        stats = analyze_text("Python tutorial for beginners. Python basics and Python tips.", use_dictionary=False)
+        self.assertEqual(stats.word_count, 9)
+        self.assertEqual(stats.top_terms(1), [("python", 3)])
+
+    @unittest.skipUnless(os.getenv(BENCHMARK_ENV), f"set {BENCHMARK_ENV}=1 to run timing benchmarks")
+    def test_speed(self):
+        text = SAMPLE * 200  # 約2万文字
+        analyze_text(text, use_dictionary=False)
+        start = time.perf_counter()
+        for _ in range(10):
+            analyze_text(text, use_dictionary=False)
+        self.assertLess((time.perf_counter() - start) / 10, 0.05)
+
+
+if __name__ == '__main__':
+    unittest.main()